@@ -21,6 +21,20 @@ parser.add_argument(
     "--sinogram_orders", default=["PVR", "PRV", "VPR", "VRP", "RPV", "RVP"], nargs="+"
 )
 parser.add_argument("--symmetry_axes", default=["0", "1", "2"], nargs="+")
+parser.add_argument(
+    "--back_accumulations",
+    default=["atomic"],
+    nargs="+",
+    choices=["atomic", "private", "slab"],
+    help="accumulation strategies of the OpenMP back projection to compare",
+)
+parser.add_argument(
+    "--num_threads",
+    default=None,
+    nargs="+",
+    type=int,
+    help="numbers of OpenMP threads to compare, by default the OpenMP default",
+)
 
 args = parser.parse_args()
 
@@ -71,6 +85,12 @@ num_rings = 36
 sinogram_orders = args.sinogram_orders
 symmetry_axes = [int(x) for x in args.symmetry_axes]
 
+back_accumulations = args.back_accumulations
+if args.num_threads is None:
+    num_threads_list = [parallelproj.get_num_threads()]
+else:
+    num_threads_list = args.num_threads
+
 # ---------------------------------------------------------------------
 
 df = pd.DataFrame()
@@ -130,44 +150,50 @@ for ia, symmetry_axis in enumerate(symmetry_axes):
         print(sinogram_order)
         print(symmetry_axis, img_shape)
 
-        for ir in range(num_runs + 1):
-            # perform a complete fwd projection
-            t0 = time.time()
-            img_fwd = parallelproj.joseph3d_fwd(
-                xstart,
-                xend,
-                img,
-                img_origin,
-                voxel_size,
-                threadsperblock=threadsperblock,
-            )
-            t1 = time.time()
-
-            # perform a complete backprojection
-            ones = xp.ones(img_fwd.shape, dtype=xp.float32, device=dev)
-            t2 = time.time()
-            back_img = parallelproj.joseph3d_back(
-                xstart,
-                xend,
-                img_shape,
-                img_origin,
-                voxel_size,
-                ones,
-                threadsperblock=threadsperblock,
-            )
-            t3 = time.time()
-            if ir > 0:
-                tmp = pd.DataFrame(
-                    {
-                        "sinogram order": sinogram_order,
-                        "symmetry axis": str(symmetry_axis),
-                        "run": ir,
-                        "t forward (s)": t1 - t0,
-                        "t back (s)": t3 - t2,
-                    },
-                    index=[0],
-                )
-                df = pd.concat((df, tmp))
+        for num_threads in num_threads_list:
+            parallelproj.set_num_threads(num_threads)
+            for accumulation in back_accumulations:
+                for ir in range(num_runs + 1):
+                    # perform a complete fwd projection
+                    t0 = time.time()
+                    img_fwd = parallelproj.joseph3d_fwd(
+                        xstart,
+                        xend,
+                        img,
+                        img_origin,
+                        voxel_size,
+                        threadsperblock=threadsperblock,
+                    )
+                    t1 = time.time()
+
+                    # perform a complete backprojection
+                    ones = xp.ones(img_fwd.shape, dtype=xp.float32, device=dev)
+                    t2 = time.time()
+                    back_img = parallelproj.joseph3d_back(
+                        xstart,
+                        xend,
+                        img_shape,
+                        img_origin,
+                        voxel_size,
+                        ones,
+                        threadsperblock=threadsperblock,
+                        accumulation=accumulation,
+                    )
+                    t3 = time.time()
+                    if ir > 0:
+                        tmp = pd.DataFrame(
+                            {
+                                "sinogram order": sinogram_order,
+                                "symmetry axis": str(symmetry_axis),
+                                "run": ir,
+                                "num threads": num_threads,
+                                "accumulation": accumulation,
+                                "t forward (s)": t1 - t0,
+                                "t back (s)": t3 - t2,
+                            },
+                            index=[0],
+                        )
+                        df = pd.concat((df, tmp))
 
 # ----------------------------------------------------------------------------
 # save results
@@ -222,3 +248,25 @@ for i, axx in enumerate(ax.ravel()):
         axx.get_legend().remove()
 
 fig.show()
+
+# compare the back projection accumulation strategies across thread counts
+if len(back_accumulations) > 1 or len(num_threads_list) > 1:
+    fig2, ax2 = plt.subplots(
+        1, len(symmetry_axes), figsize=(7, 7 / 3), sharex=True, sharey=True
+    )
+    ax2 = [ax2] if len(symmetry_axes) == 1 else ax2.ravel()
+
+    for i, symmetry_axis in enumerate(symmetry_axes):
+        sns.lineplot(
+            data=df[df["symmetry axis"] == str(symmetry_axis)],
+            x="num threads",
+            y="t back (s)",
+            hue="accumulation",
+            marker="o",
+            errorbar="sd",
+            ax=ax2[i],
+        )
+        ax2[i].set_title(f"symmetry axis {symmetry_axis}")
+        ax2[i].grid(ls=":")
+
+    fig2.show()
@@ -23,6 +23,7 @@ parser.add_argument("--output_file", type=int, default=None)
 parser.add_argument("--output_dir", default="results")
 parser.add_argument("--symmetry_axes", default=["0", "1", "2"], nargs="+")
 parser.add_argument("--presort", action="store_true")
+parser.add_argument("--morton_sort", action="store_true")
 
 args = parser.parse_args()
 
@@ -65,6 +66,8 @@ threadsperblock = args.threadsperblock
 data_str = "nontof_listmode"
 if args.presort:
     data_str += "_presorted"
+if args.morton_sort:
+    data_str += "_mortonsorted"
 
 output_dir = args.output_dir
 if args.output_file is None:
@@ -150,6 +153,13 @@ for ia, symmetry_axis in enumerate(symmetry_axes):
     xstart = scanner.get_lor_endpoints(events[:, 0], events[:, 1])
     xend = scanner.get_lor_endpoints(events[:, 2], events[:, 3])
 
+    # sort events by dominant direction and Morton code of the LOR mid point
+    if args.morton_sort:
+        print("sorting events by Morton code")
+        isorted = parallelproj.lor_sort_permutation(xstart, xend)
+        xstart = xp.take(xstart, isorted, axis=0)
+        xend = xp.take(xend, isorted, axis=0)
+
     for ir in range(num_runs + 1):
         t0 = time.time()
         img_fwd = parallelproj.joseph3d_fwd(
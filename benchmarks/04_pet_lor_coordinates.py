@@ -0,0 +1,138 @@
+import time
+import argparse
+import os
+import pandas as pd
+import parallelproj
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from pathlib import Path
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--num_runs", type=int, default=5)
+parser.add_argument("--num_subsets", type=int, default=34)
+parser.add_argument(
+    "--mode", default="GPU", choices=["GPU", "GPU-torch", "CPU", "CPU-torch", "hybrid"]
+)
+parser.add_argument("--max_ring_difference", type=int, default=None)
+parser.add_argument("--output_file", type=str, default=None)
+parser.add_argument("--output_dir", default="results")
+
+args = parser.parse_args()
+
+if args.mode == "GPU":
+    os.environ["CUDA_VISIBLE_DEVICES"] = "0"
+    import array_api_compat.cupy as xp
+
+    dev = "cuda"
+elif args.mode == "GPU-torch":
+    os.environ["CUDA_VISIBLE_DEVICES"] = "0"
+    import array_api_compat.torch as xp
+
+    dev = "cuda"
+elif args.mode == "hybrid":
+    os.environ["CUDA_VISIBLE_DEVICES"] = "0"
+    import array_api_compat.numpy as xp
+
+    dev = "cpu"
+elif args.mode == "CPU":
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    import array_api_compat.numpy as xp
+
+    dev = "cpu"
+elif args.mode == "CPU-torch":
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    import array_api_compat.torch as xp
+
+    dev = "cpu"
+else:
+    raise ValueError
+
+num_runs = args.num_runs
+num_subsets = args.num_subsets
+
+output_dir = args.output_dir
+output_file = args.output_file
+if output_file is None:
+    output_file = f"lor_coordinates__mode_{args.mode}__numruns_{num_runs}__numsubsets_{num_subsets}.csv"
+
+# ---------------------------------------------------------------------
+
+num_rings = 36
+ring_positions = (
+    5.31556 * xp.arange(num_rings, device=dev, dtype=xp.float32)
+    + (xp.astype(xp.arange(num_rings, device=dev) // 9, xp.float32)) * 2.8
+)
+ring_positions -= 0.5 * xp.max(ring_positions)
+
+scanner = parallelproj.RegularPolygonPETScannerGeometry(
+    xp,
+    dev,
+    radius=0.5 * (744.1 + 2 * 8.51),
+    num_sides=34,
+    num_lor_endpoints_per_side=16,
+    lor_spacing=4.03125,
+    ring_positions=ring_positions,
+    symmetry_axis=2,
+)
+
+lor_descriptor = parallelproj.RegularPolygonPETLORDescriptor(
+    scanner,
+    radial_trim=65,
+    max_ring_difference=args.max_ring_difference,
+    sinogram_order=parallelproj.SinogramSpatialAxisOrder.RVP,
+)
+
+subset_views, _ = lor_descriptor.get_distributed_views_and_slices(num_subsets, 4)
+
+df = pd.DataFrame()
+
+for ir in range(num_runs + 1):
+    # LOR coordinates of all views
+    t0 = time.time()
+    xstart, xend = lor_descriptor.get_lor_coordinates()
+    t1 = time.time()
+
+    # LOR coordinates of all subsets (as used in OSEM with uncached LOR endpoints)
+    t2 = time.time()
+    for views in subset_views:
+        xstart, xend = lor_descriptor.get_lor_coordinates(views=views)
+    t3 = time.time()
+
+    if ir > 0:
+        tmp = pd.DataFrame(
+            {
+                "run": [ir, ir],
+                "views": ["all", f"{num_subsets} subsets"],
+                "t LOR coordinates (s)": [t1 - t0, t3 - t2],
+            },
+        )
+        df = pd.concat((df, tmp))
+
+# ----------------------------------------------------------------------------
+# save results
+df["mode"] = args.mode
+df["num_subsets"] = num_subsets
+df["num_planes"] = lor_descriptor.num_planes
+
+Path(output_dir).mkdir(exist_ok=True, parents=True)
+df.to_csv(os.path.join(output_dir, output_file), index=False)
+
+print(df.groupby("views")["t LOR coordinates (s)"].agg(["mean", "std"]))
+
+# ----------------------------------------------------------------------------
+# show results
+
+sns.set_context("paper")
+
+fig, ax = plt.subplots(1, 1, figsize=(7 / 3, 7 / 3))
+sns.barplot(
+    data=df,
+    x="views",
+    y="t LOR coordinates (s)",
+    ax=ax,
+    capsize=0.15,
+    errorbar="sd",
+)
+ax.grid(ls=":")
+fig.show()
@@ -0,0 +1,181 @@
+#ifndef __PARALLELPROJ_JOSEPH3D_RAY_H__
+#define __PARALLELPROJ_JOSEPH3D_RAY_H__
+
+/** @brief geometry of a single LOR needed to step through an image with Joseph's method
+ *
+ *  The quantities are calculated once per LOR by joseph3d_ray_setup() and can then be
+ *  used for (multiple) forward and back projections along the same LOR.
+ */
+typedef struct
+{
+  float xstart[3];  /**< start point of the LOR */
+  float xend[3];    /**< end point of the LOR */
+  float d[3];       /**< xend - xstart */
+  float u[3];       /**< unit vector pointing from xstart to xend */
+  float x_m[3];     /**< mid point of the LOR */
+  float cf;         /**< correction factor for voxel size and cos(theta) */
+  int direction;    /**< axis (0,1,2) the LOR is most parallel to */
+  int istart;       /**< first image plane (along direction) to step through */
+  int iend;         /**< last image plane (along direction) to step through + 1 */
+} joseph3d_ray;
+
+unsigned char joseph3d_ray_setup(const float *xstart,
+                                 const float *xend,
+                                 const float *img_origin,
+                                 const float *voxsize,
+                                 const int *img_dim,
+                                 joseph3d_ray *ray);
+
+float joseph3d_ray_fwd(const joseph3d_ray *ray,
+                       const float *img,
+                       const float *img_origin,
+                       const float *voxsize,
+                       const int *img_dim);
+
+void joseph3d_ray_back(const joseph3d_ray *ray,
+                       float *img,
+                       float p,
+                       const float *img_origin,
+                       const float *voxsize,
+                       const int *img_dim,
+                       int plane_min,
+                       int plane_max,
+                       unsigned char atomic);
+
+void joseph3d_ray_fwd_tof_sino(const joseph3d_ray *ray,
+                               const float *img,
+                               const float *img_origin,
+                               const float *voxsize,
+                               const int *img_dim,
+                               float tofbin_width,
+                               float sig_tof,
+                               float tc_offset,
+                               float n_sigmas,
+                               short n_tofbins,
+                               float *p);
+
+void joseph3d_ray_back_tof_sino(const joseph3d_ray *ray,
+                                float *img,
+                                const float *p,
+                                const float *img_origin,
+                                const float *voxsize,
+                                const int *img_dim,
+                                float tofbin_width,
+                                float sig_tof,
+                                float tc_offset,
+                                float n_sigmas,
+                                short n_tofbins,
+                                unsigned char atomic);
+
+float joseph3d_ray_fwd_tof_lm(const joseph3d_ray *ray,
+                              const float *img,
+                              const float *img_origin,
+                              const float *voxsize,
+                              const int *img_dim,
+                              float tofbin_width,
+                              float sig_tof,
+                              float tc_offset,
+                              float n_sigmas,
+                              short it);
+
+void joseph3d_ray_back_tof_lm(const joseph3d_ray *ray,
+                              float *img,
+                              float p,
+                              const float *img_origin,
+                              const float *voxsize,
+                              const int *img_dim,
+                              float tofbin_width,
+                              float sig_tof,
+                              float tc_offset,
+                              float n_sigmas,
+                              short it,
+                              unsigned char atomic);
+
+void joseph3d_sym_lor_endpoints(long long i,
+                                const float *xstart_2d,
+                                const float *xend_2d,
+                                const float *zstart,
+                                const float *zend,
+                                long long nplanes,
+                                long long n_inner,
+                                int symmetry_axis,
+                                float *xstart,
+                                float *xend);
+
+void joseph3d_ray_fwd_batch(const joseph3d_ray *ray,
+                            const float *img,
+                            long long nbatch,
+                            const float *img_origin,
+                            const float *voxsize,
+                            const int *img_dim,
+                            float *p,
+                            long long p_stride);
+
+void joseph3d_ray_back_batch(const joseph3d_ray *ray,
+                             float *img,
+                             long long nbatch,
+                             const float *p,
+                             long long p_stride,
+                             const float *img_origin,
+                             const float *voxsize,
+                             const int *img_dim,
+                             unsigned char atomic);
+
+void joseph3d_ray_fwd_tof_sino_batch(const joseph3d_ray *ray,
+                                     const float *img,
+                                     long long nbatch,
+                                     const float *img_origin,
+                                     const float *voxsize,
+                                     const int *img_dim,
+                                     float tofbin_width,
+                                     float sig_tof,
+                                     float tc_offset,
+                                     float n_sigmas,
+                                     short n_tofbins,
+                                     float *p,
+                                     long long p_stride);
+
+void joseph3d_ray_back_tof_sino_batch(const joseph3d_ray *ray,
+                                      float *img,
+                                      long long nbatch,
+                                      const float *p,
+                                      long long p_stride,
+                                      const float *img_origin,
+                                      const float *voxsize,
+                                      const int *img_dim,
+                                      float tofbin_width,
+                                      float sig_tof,
+                                      float tc_offset,
+                                      float n_sigmas,
+                                      short n_tofbins,
+                                      unsigned char atomic);
+
+void joseph3d_ray_fwd_tof_lm_batch(const joseph3d_ray *ray,
+                                   const float *img,
+                                   long long nbatch,
+                                   const float *img_origin,
+                                   const float *voxsize,
+                                   const int *img_dim,
+                                   float tofbin_width,
+                                   float sig_tof,
+                                   float tc_offset,
+                                   float n_sigmas,
+                                   short it,
+                                   float *p,
+                                   long long p_stride);
+
+void joseph3d_ray_back_tof_lm_batch(const joseph3d_ray *ray,
+                                    float *img,
+                                    long long nbatch,
+                                    const float *p,
+                                    long long p_stride,
+                                    const float *img_origin,
+                                    const float *voxsize,
+                                    const int *img_dim,
+                                    float tofbin_width,
+                                    float sig_tof,
+                                    float tc_offset,
+                                    float n_sigmas,
+                                    short it,
+                                    unsigned char atomic);
+#endif
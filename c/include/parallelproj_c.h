@@ -39,6 +39,76 @@ void joseph3d_back(const float *xstart,
 
 
 
+/** @brief 3D non-tof joseph back projector using thread private images
+ *
+ *  Every thread back projects into its own (private) image without atomic adds.
+ *  At the end, all private images are added to img using a parallel reduction.
+ *  Needs additional memory for one image per thread.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end   points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors with the values to be back projected
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @return 0 on success, 1 if the private images could not be allocated
+ *          (img is not modified)
+ */
+int joseph3d_back_private(const float *xstart, 
+                          const float *xend,
+                          float *img,
+                          const float *img_origin,
+                          const float *voxsize,
+                          const float *p,
+                          long long nlors,
+                          const int *img_dim);
+
+
+/** @brief 3D non-tof joseph back projector using slab ownership
+ *
+ *  For each of the three directions Joseph's method steps along, the image
+ *  is divided into slabs of planes perpendicular to that direction and every
+ *  thread exclusively updates the voxels of "its" slab such that no atomic
+ *  adds are needed.
+ *  The LORs are processed in chunks. The ray setup of all LORs of a chunk is
+ *  calculated once and the LORs are bucketed (in parallel) by the slabs
+ *  they step through, such that every slab only processes its own LORs.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end   points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors with the values to be back projected
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @return 0 on success, 1 if the buffers could not be allocated
+ *          (img can be partially updated)
+ */
+int joseph3d_back_slab(const float *xstart, 
+                       const float *xend,
+                       float *img,
+                       const float *img_origin,
+                       const float *voxsize,
+                       const float *p,
+                       long long nlors,
+                       const int *img_dim);
+
+
 /** @brief 3D listmode tof joseph back projector
  *
  *  All threads back project in one image using openmp's atomic add.
@@ -289,6 +359,893 @@ void joseph3d_fwd_tof_sino(const float *xstart,
                            unsigned char lor_dependent_sigma_tof,
                            unsigned char lor_dependent_tofcenter_offset);
 
+/** @brief 3D non-tof joseph forward projection, division and back projection ("ratio" back projection)
+ *
+ *  Calculates back_img += A^T (data / (A img + contamination)) in a single pass over all LORs.
+ *  The geometry of every LOR is only calculated once and the forward projection
+ *  is never stored.
+ *  LORs with data = 0 are skipped.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end   points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param back_img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                     !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param data        array of length nlors with the data (numerator)
+ *  @param contamination array of length 1 or nlors (depending on lor_dependent_contamination)
+ *                       with the additive contamination added to the forward projection
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param lor_dependent_contamination unsigned char 0 or 1
+ *                                     1 means that the contamination is LOR dependent
+ *                                     such that contamination has to have length nlors
+ */
+void joseph3d_fwd_back_ratio(const float *xstart, 
+                             const float *xend, 
+                             const float *img,
+                             float *back_img,
+                             const float *img_origin, 
+                             const float *voxsize, 
+                             const float *data,
+                             const float *contamination,
+                             long long nlors, 
+                             const int *img_dim,
+                             unsigned char lor_dependent_contamination);
+
+/** @brief 3D non-tof joseph forward projector using LOR endpoint indices
+ *
+ *  Same as joseph3d_fwd() but the LOR start and end points are gathered
+ *  from a table of all LOR endpoints using integer indices.
+ *
+ *  @param lor_endpoints array of shape [3*n_lor_endpoints] with the coordinates of all LOR endpoints
+ *                       (e.g. all_lor_endpoints of a PET scanner geometry).
+ *                       The coordinates of the n-th endpoint are at lor_endpoints[n*3 + i] with i = 0,1,2.
+ *                       Units are the ones of voxsize.
+ *  @param start_index   array of length nlors with the index of the start point of every LOR in lor_endpoints
+ *  @param end_index     array of length nlors with the index of the end point of every LOR in lor_endpoints
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors (output) used to store the projections
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ */
+void joseph3d_fwd_idx(const float *lor_endpoints,
+                      const int *start_index,
+                      const int *end_index,
+                      const float *img,
+                      const float *img_origin, 
+                      const float *voxsize, 
+                      float *p,
+                      long long nlors, 
+                      const int *img_dim);
+
+
+/** @brief 3D non-tof joseph back projector using LOR endpoint indices
+ *
+ *  Same as joseph3d_back() but the LOR start and end points are gathered
+ *  from a table of all LOR endpoints using integer indices.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param lor_endpoints array of shape [3*n_lor_endpoints] with the coordinates of all LOR endpoints
+ *                       (e.g. all_lor_endpoints of a PET scanner geometry).
+ *                       The coordinates of the n-th endpoint are at lor_endpoints[n*3 + i] with i = 0,1,2.
+ *                       Units are the ones of voxsize.
+ *  @param start_index   array of length nlors with the index of the start point of every LOR in lor_endpoints
+ *  @param end_index     array of length nlors with the index of the end point of every LOR in lor_endpoints
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors with the values to be back projected
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ */
+void joseph3d_back_idx(const float *lor_endpoints,
+                       const int *start_index,
+                       const int *end_index,
+                       float *img,
+                       const float *img_origin, 
+                       const float *voxsize, 
+                       const float *p,
+                       long long nlors, 
+                       const int *img_dim);
+
+
+/** @brief 3D sinogram tof joseph forward projector using LOR endpoint indices
+ *
+ *  Same as joseph3d_fwd_tof_sino() but the LOR start and end points are gathered
+ *  from a table of all LOR endpoints using integer indices.
+ *
+ *  @param lor_endpoints array of shape [3*n_lor_endpoints] with the coordinates of all LOR endpoints
+ *                       (e.g. all_lor_endpoints of a PET scanner geometry).
+ *                       The coordinates of the n-th endpoint are at lor_endpoints[n*3 + i] with i = 0,1,2.
+ *                       Units are the ones of voxsize.
+ *  @param start_index   array of length nlors with the index of the start point of every LOR in lor_endpoints
+ *  @param end_index     array of length nlors with the index of the end point of every LOR in lor_endpoints
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors*n_tofbins (output) used to store the projections
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins        number of TOF bins
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ */
+void joseph3d_fwd_tof_sino_idx(const float *lor_endpoints,
+                               const int *start_index,
+                               const int *end_index,
+                               const float *img,
+                               const float *img_origin,
+                               const float *voxsize,
+                               float *p,
+                               long long nlors,
+                               const int *img_dim,
+                               float tofbin_width,
+                               const float *sigma_tof,
+                               const float *tofcenter_offset,
+                               float n_sigmas,
+                               short n_tofbins,
+                               unsigned char lor_dependent_sigma_tof,
+                               unsigned char lor_dependent_tofcenter_offset);
+
+
+/** @brief 3D sinogram tof joseph back projector using LOR endpoint indices
+ *
+ *  Same as joseph3d_back_tof_sino() but the LOR start and end points are gathered
+ *  from a table of all LOR endpoints using integer indices.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param lor_endpoints array of shape [3*n_lor_endpoints] with the coordinates of all LOR endpoints
+ *                       (e.g. all_lor_endpoints of a PET scanner geometry).
+ *                       The coordinates of the n-th endpoint are at lor_endpoints[n*3 + i] with i = 0,1,2.
+ *                       Units are the ones of voxsize.
+ *  @param start_index   array of length nlors with the index of the start point of every LOR in lor_endpoints
+ *  @param end_index     array of length nlors with the index of the end point of every LOR in lor_endpoints
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors*n_tofbins with the values to be back projected
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins        number of TOF bins
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ */
+void joseph3d_back_tof_sino_idx(const float *lor_endpoints,
+                                const int *start_index,
+                                const int *end_index,
+                                float *img,
+                                const float *img_origin,
+                                const float *voxsize,
+                                const float *p,
+                                long long nlors,
+                                const int *img_dim,
+                                float tofbin_width,
+                                const float *sigma_tof,
+                                const float *tofcenter_offset,
+                                float n_sigmas,
+                                short n_tofbins,
+                                unsigned char lor_dependent_sigma_tof,
+                                unsigned char lor_dependent_tofcenter_offset);
+
+
+/** @brief 3D listmode tof joseph forward projector using LOR endpoint indices
+ *
+ *  Same as joseph3d_fwd_tof_lm() but the LOR start and end points are gathered
+ *  from a table of all LOR endpoints using integer indices.
+ *
+ *  @param lor_endpoints array of shape [3*n_lor_endpoints] with the coordinates of all LOR endpoints
+ *                       (e.g. all_lor_endpoints of a PET scanner geometry).
+ *                       The coordinates of the n-th endpoint are at lor_endpoints[n*3 + i] with i = 0,1,2.
+ *                       Units are the ones of voxsize.
+ *  @param start_index   array of length nlors with the index of the start point of every LOR in lor_endpoints
+ *  @param end_index     array of length nlors with the index of the end point of every LOR in lor_endpoints
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors (output) used to store the projections
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param tof_bin          signed integer array with the tofbin of the events
+ *                          the center of TOF bin 0 is assumed to be at the center of the LOR
+ *                          (shifted by the tofcenter_offset)
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ */
+void joseph3d_fwd_tof_lm_idx(const float *lor_endpoints,
+                             const int *start_index,
+                             const int *end_index,
+                             const float *img,
+                             const float *img_origin,
+                             const float *voxsize,
+                             float *p,
+                             long long nlors,
+                             const int *img_dim,
+                             float tofbin_width,
+                             const float *sigma_tof,
+                             const float *tofcenter_offset,
+                             float n_sigmas,
+                             const short *tof_bin,
+                             unsigned char lor_dependent_sigma_tof,
+                             unsigned char lor_dependent_tofcenter_offset);
+
+
+/** @brief 3D listmode tof joseph back projector using LOR endpoint indices
+ *
+ *  Same as joseph3d_back_tof_lm() but the LOR start and end points are gathered
+ *  from a table of all LOR endpoints using integer indices.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param lor_endpoints array of shape [3*n_lor_endpoints] with the coordinates of all LOR endpoints
+ *                       (e.g. all_lor_endpoints of a PET scanner geometry).
+ *                       The coordinates of the n-th endpoint are at lor_endpoints[n*3 + i] with i = 0,1,2.
+ *                       Units are the ones of voxsize.
+ *  @param start_index   array of length nlors with the index of the start point of every LOR in lor_endpoints
+ *  @param end_index     array of length nlors with the index of the end point of every LOR in lor_endpoints
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length nlors with the values to be back projected
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param tof_bin          signed integer array with the tofbin of the events
+ *                          the center of TOF bin 0 is assumed to be at the center of the LOR
+ *                          (shifted by the tofcenter_offset)
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ */
+void joseph3d_back_tof_lm_idx(const float *lor_endpoints,
+                              const int *start_index,
+                              const int *end_index,
+                              float *img,
+                              const float *img_origin,
+                              const float *voxsize,
+                              const float *p,
+                              long long nlors,
+                              const int *img_dim,
+                              float tofbin_width,
+                              const float *sigma_tof,
+                              const float *tofcenter_offset,
+                              float n_sigmas,
+                              const short *tof_bin,
+                              unsigned char lor_dependent_sigma_tof,
+                              unsigned char lor_dependent_tofcenter_offset);
+
+/** @brief 3D non-tof joseph forward projector used for sinograms of scanners with axial symmetry
+ *
+ *  The LORs of all sinogram planes are assembled from the LORs in plane 0 
+ *  and the coordinates of the planes along the symmetry axis such that 
+ *  the memory for the LOR geometry scales with n2d + nplanes instead of n2d*nplanes.
+ *  The sinogram has to be stored as [..., nplanes, n_inner].
+ *
+ *  @param xstart_2d  array of shape [3*n2d] with the start coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param xend_2d    array of shape [3*n2d] with the end coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param zstart     array of length nplanes with the start coordinates of all planes along the symmetry axis
+ *  @param zend       array of length nplanes with the end coordinates of all planes along the symmetry axis
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length n2d*nplanes (output) used to store the projections
+ *  @param n2d         number of LORs in plane 0
+ *  @param nplanes     number of planes
+ *  @param n_inner     number of plane 0 LORs stored after the plane axis in the sinogram
+ *                     (n2d if the plane axis is the first axis, 1 if it is the last axis)
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param symmetry_axis axis (0,1,2) of the axial symmetry
+ */
+void joseph3d_fwd_sym(const float *xstart_2d,
+                      const float *xend_2d,
+                      const float *zstart,
+                      const float *zend,
+                      const float *img,
+                      const float *img_origin, 
+                      const float *voxsize, 
+                      float *p,
+                      long long n2d,
+                      long long nplanes,
+                      long long n_inner,
+                      const int *img_dim,
+                      int symmetry_axis);
+
+
+/** @brief 3D non-tof joseph back projector used for sinograms of scanners with axial symmetry
+ *
+ *  The LORs of all sinogram planes are assembled from the LORs in plane 0 
+ *  and the coordinates of the planes along the symmetry axis such that 
+ *  the memory for the LOR geometry scales with n2d + nplanes instead of n2d*nplanes.
+ *  The sinogram has to be stored as [..., nplanes, n_inner].
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param xstart_2d  array of shape [3*n2d] with the start coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param xend_2d    array of shape [3*n2d] with the end coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param zstart     array of length nplanes with the start coordinates of all planes along the symmetry axis
+ *  @param zend       array of length nplanes with the end coordinates of all planes along the symmetry axis
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length n2d*nplanes with the values to be back projected
+ *  @param n2d         number of LORs in plane 0
+ *  @param nplanes     number of planes
+ *  @param n_inner     number of plane 0 LORs stored after the plane axis in the sinogram
+ *                     (n2d if the plane axis is the first axis, 1 if it is the last axis)
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param symmetry_axis axis (0,1,2) of the axial symmetry
+ */
+void joseph3d_back_sym(const float *xstart_2d,
+                       const float *xend_2d,
+                       const float *zstart,
+                       const float *zend,
+                       float *img,
+                       const float *img_origin, 
+                       const float *voxsize, 
+                       const float *p,
+                       long long n2d,
+                       long long nplanes,
+                       long long n_inner,
+                       const int *img_dim,
+                       int symmetry_axis);
+
+
+/** @brief 3D sinogram tof joseph forward projector used for sinograms of scanners with axial symmetry
+ *
+ *  The LORs of all sinogram planes are assembled from the LORs in plane 0 
+ *  and the coordinates of the planes along the symmetry axis such that 
+ *  the memory for the LOR geometry scales with n2d + nplanes instead of n2d*nplanes.
+ *  The sinogram has to be stored as [..., nplanes, n_inner].
+ *
+ *  @param xstart_2d  array of shape [3*n2d] with the start coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param xend_2d    array of shape [3*n2d] with the end coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param zstart     array of length nplanes with the start coordinates of all planes along the symmetry axis
+ *  @param zend       array of length nplanes with the end coordinates of all planes along the symmetry axis
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length n2d*nplanes*n_tofbins (output) used to store the projections
+ *  @param n2d         number of LORs in plane 0
+ *  @param nplanes     number of planes
+ *  @param n_inner     number of plane 0 LORs stored after the plane axis in the sinogram
+ *                     (n2d if the plane axis is the first axis, 1 if it is the last axis)
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param symmetry_axis axis (0,1,2) of the axial symmetry
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or n2d*nplanes (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or n2d*nplanes (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins        number of TOF bins
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ */
+void joseph3d_fwd_tof_sino_sym(const float *xstart_2d,
+                               const float *xend_2d,
+                               const float *zstart,
+                               const float *zend,
+                               const float *img,
+                               const float *img_origin,
+                               const float *voxsize,
+                               float *p,
+                               long long n2d,
+                               long long nplanes,
+                               long long n_inner,
+                               const int *img_dim,
+                               int symmetry_axis,
+                               float tofbin_width,
+                               const float *sigma_tof,
+                               const float *tofcenter_offset,
+                               float n_sigmas,
+                               short n_tofbins,
+                               unsigned char lor_dependent_sigma_tof,
+                               unsigned char lor_dependent_tofcenter_offset);
+
+
+/** @brief 3D sinogram tof joseph back projector used for sinograms of scanners with axial symmetry
+ *
+ *  The LORs of all sinogram planes are assembled from the LORs in plane 0 
+ *  and the coordinates of the planes along the symmetry axis such that 
+ *  the memory for the LOR geometry scales with n2d + nplanes instead of n2d*nplanes.
+ *  The sinogram has to be stored as [..., nplanes, n_inner].
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param xstart_2d  array of shape [3*n2d] with the start coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param xend_2d    array of shape [3*n2d] with the end coordinates of the LORs in plane 0.
+ *                    The coordinates along the symmetry axis are ignored.
+ *  @param zstart     array of length nplanes with the start coordinates of all planes along the symmetry axis
+ *  @param zend       array of length nplanes with the end coordinates of all planes along the symmetry axis
+ *  @param img    array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of length n2d*nplanes*n_tofbins with the values to be back projected
+ *  @param n2d         number of LORs in plane 0
+ *  @param nplanes     number of planes
+ *  @param n_inner     number of plane 0 LORs stored after the plane axis in the sinogram
+ *                     (n2d if the plane axis is the first axis, 1 if it is the last axis)
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param symmetry_axis axis (0,1,2) of the axial symmetry
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or n2d*nplanes (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or n2d*nplanes (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins        number of TOF bins
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ */
+void joseph3d_back_tof_sino_sym(const float *xstart_2d,
+                                const float *xend_2d,
+                                const float *zstart,
+                                const float *zend,
+                                float *img,
+                                const float *img_origin,
+                                const float *voxsize,
+                                const float *p,
+                                long long n2d,
+                                long long nplanes,
+                                long long n_inner,
+                                const int *img_dim,
+                                int symmetry_axis,
+                                float tofbin_width,
+                                const float *sigma_tof,
+                                const float *tofcenter_offset,
+                                float n_sigmas,
+                                short n_tofbins,
+                                unsigned char lor_dependent_sigma_tof,
+                                unsigned char lor_dependent_tofcenter_offset);
+
+/** @brief 3D non-tof joseph forward projector of a batch of images
+ *
+ *  Same as joseph3d_fwd() but all nbatch images are projected along every LOR
+ *  such that the ray geometry and interpolation weights are calculated only once
+ *  per LOR for all images.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [nbatch*n0*n1*n2] containing the batch of 3D images to be projected.
+ *                The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of shape [nbatch*nlors] (output) used to store the projections.
+ *                     The projection of image b along LOR n is stored at p[b*nlors + n].
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param nbatch      number of images in the batch
+ *  @param lor_weights array of shape [nlors] with multiplicative weights of the LORs
+ *                     (e.g. attenuation or normalization factors) applied to the
+ *                     projections of all images, or NULL (no weights).
+ *                     LORs with weight 0 are skipped.
+ */
+void joseph3d_fwd_batch(const float *xstart,
+                        const float *xend,
+                        const float *img,
+                        const float *img_origin,
+                        const float *voxsize,
+                        float *p,
+                        long long nlors,
+                        const int *img_dim,
+                        long long nbatch,
+                        const float *lor_weights);
+
+/** @brief 3D non-tof joseph back projector of a batch of sinograms
+ *
+ *  Same as joseph3d_back() but nbatch sinograms are back projected into nbatch images
+ *  such that the ray geometry and interpolation weights are calculated only once
+ *  per LOR for all images.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [nbatch*n0*n1*n2] containing the batch of 3D images used for back projection (output).
+ *                The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of shape [nbatch*nlors] with the values to be back projected.
+ *                     The value of image b along LOR n is stored at p[b*nlors + n].
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param nbatch      number of images in the batch
+ *  @param lor_weights array of shape [nlors] with multiplicative weights of the LORs
+ *                     (e.g. attenuation or normalization factors) applied to the
+ *                     values before back projection, or NULL (no weights).
+ *                     LORs with weight 0 are skipped.
+ */
+void joseph3d_back_batch(const float *xstart,
+                         const float *xend,
+                         float *img,
+                         const float *img_origin,
+                         const float *voxsize,
+                         const float *p,
+                         long long nlors,
+                         const int *img_dim,
+                         long long nbatch,
+                         const float *lor_weights);
+
+/** @brief 3D sinogram tof joseph forward projector of a batch of images
+ *
+ *  Same as joseph3d_fwd_tof_sino() but all nbatch images are projected along every LOR
+ *  such that the ray geometry, interpolation and TOF weights are calculated only once
+ *  per LOR for all images.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [nbatch*n0*n1*n2] containing the batch of 3D images to be projected.
+ *                The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of shape [nbatch*nlors*n_tofbins] (output) used to store the projections.
+ *                     TOF bin it of image b along LOR n is stored at p[(b*nlors + n)*n_tofbins + it].
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param nbatch      number of images in the batch
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins        number of TOF bins
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ *  @param lor_weights array of shape [nlors] with multiplicative weights of the LORs
+ *                     (e.g. attenuation or normalization factors) applied to the
+ *                     projections of all images, or NULL (no weights).
+ *                     LORs with weight 0 are skipped.
+ */
+void joseph3d_fwd_tof_sino_batch(const float *xstart,
+                                 const float *xend,
+                                 const float *img,
+                                 const float *img_origin,
+                                 const float *voxsize,
+                                 float *p,
+                                 long long nlors,
+                                 const int *img_dim,
+                                 long long nbatch,
+                                 float tofbin_width,
+                                 const float *sigma_tof,
+                                 const float *tofcenter_offset,
+                                 float n_sigmas,
+                                 short n_tofbins,
+                                 unsigned char lor_dependent_sigma_tof,
+                                 unsigned char lor_dependent_tofcenter_offset,
+                                 const float *lor_weights);
+
+/** @brief 3D sinogram tof joseph back projector of a batch of TOF sinograms
+ *
+ *  Same as joseph3d_back_tof_sino() but nbatch TOF sinograms are back projected into 
+ *  nbatch images such that the ray geometry, interpolation and TOF weights are calculated
+ *  only once per LOR for all images.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [nbatch*n0*n1*n2] containing the batch of 3D images used for back projection (output).
+ *                The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of shape [nbatch*nlors*n_tofbins] with the values to be back projected.
+ *                     TOF bin it of image b along LOR n is stored at p[(b*nlors + n)*n_tofbins + it].
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param nbatch      number of images in the batch
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins        number of TOF bins
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ *  @param lor_weights array of shape [nlors] with multiplicative weights of the LORs
+ *                     (e.g. attenuation or normalization factors) applied to the
+ *                     values before back projection, or NULL (no weights).
+ *                     LORs with weight 0 are skipped.
+ */
+void joseph3d_back_tof_sino_batch(const float *xstart,
+                                  const float *xend,
+                                  float *img,
+                                  const float *img_origin,
+                                  const float *voxsize,
+                                  const float *p,
+                                  long long nlors,
+                                  const int *img_dim,
+                                  long long nbatch,
+                                  float tofbin_width,
+                                  const float *sigma_tof,
+                                  const float *tofcenter_offset,
+                                  float n_sigmas,
+                                  short n_tofbins,
+                                  unsigned char lor_dependent_sigma_tof,
+                                  unsigned char lor_dependent_tofcenter_offset,
+                                  const float *lor_weights);
+
+/** @brief 3D listmode tof joseph forward projector of a batch of images
+ *
+ *  Same as joseph3d_fwd_tof_lm() but all nbatch images are projected along every LOR
+ *  such that the ray geometry, interpolation and TOF weights are calculated only once
+ *  per LOR for all images.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [nbatch*n0*n1*n2] containing the batch of 3D images to be projected.
+ *                The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of shape [nbatch*nlors] (output) used to store the projections.
+ *                     The projection of image b along LOR n is stored at p[b*nlors + n].
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param nbatch      number of images in the batch
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param tof_bin          signed integer array with the tofbin of the events
+ *                          the center of TOF bin 0 is assumed to be at the center of the LOR
+ *                          (shifted by the tofcenter_offset)
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ *  @param lor_weights array of shape [nlors] with multiplicative weights of the LORs
+ *                     (e.g. attenuation or normalization factors) applied to the
+ *                     projections of all images, or NULL (no weights).
+ *                     LORs with weight 0 are skipped.
+ */
+void joseph3d_fwd_tof_lm_batch(const float *xstart,
+                               const float *xend,
+                               const float *img,
+                               const float *img_origin,
+                               const float *voxsize,
+                               float *p,
+                               long long nlors,
+                               const int *img_dim,
+                               long long nbatch,
+                               float tofbin_width,
+                               const float *sigma_tof,
+                               const float *tofcenter_offset,
+                               float n_sigmas,
+                               const short *tof_bin,
+                               unsigned char lor_dependent_sigma_tof,
+                               unsigned char lor_dependent_tofcenter_offset,
+                               const float *lor_weights);
+
+/** @brief 3D listmode tof joseph back projector of a batch of listmode values
+ *
+ *  Same as joseph3d_back_tof_lm() but nbatch arrays of event values are back projected
+ *  into nbatch images such that the ray geometry, interpolation and TOF weights are 
+ *  calculated only once per LOR for all images.
+ *  All threads back project in one image using openmp's atomic add.
+ *
+ *  @param xstart array of shape [3*nlors] with the coordinates of the start points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param xend   array of shape [3*nlors] with the coordinates of the end points of the LORs.
+ *                The start coordinates of the n-th LOR are at xstart[n*3 + i] with i = 0,1,2.
+ *                Units are the ones of voxsize.
+ *  @param img    array of shape [nbatch*n0*n1*n2] containing the batch of 3D images used for back projection (output).
+ *                The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *                !! values are added to existing array !!
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param p           array of shape [nbatch*nlors] with the values to be back projected.
+ *                     The value of image b along LOR n is stored at p[b*nlors + n].
+ *  @param nlors       number of geometrical LORs
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param nbatch      number of images in the batch
+ *  @param tofbin_width     width of the TOF bins in spatial units (units of xstart and xend)
+ *  @param sigma_tof        array of length 1 or nlors (depending on lor_dependent_sigma_tof)
+ *                          with the TOF resolution (sigma) for each LOR in
+ *                          spatial units (units of xstart and xend) 
+ *  @param tofcenter_offset array of length 1 or nlors (depending on lor_dependent_tofcenter_offset)
+ *                          with the offset of the central TOF bin from the 
+ *                          midpoint of each LOR in spatial units (units of xstart and xend). 
+ *                          A positive value means a shift towards the end point of the LOR.
+ *  @param n_sigmas         number of sigmas to consider for calculation of TOF kernel
+ *  @param tof_bin          signed integer array with the tofbin of the events
+ *                          the center of TOF bin 0 is assumed to be at the center of the LOR
+ *                          (shifted by the tofcenter_offset)
+ *  @param lor_dependent_sigma_tof unsigned char 0 or 1
+ *                                  1 means that the TOF sigmas are LOR dependent
+ *                                  any other value means that the first value in the sigma_tof
+ *                                  array is used for all LORs
+ *  @param lor_dependent_tofcenter_offset unsigned char 0 or 1
+ *                                        1 means that the TOF center offsets are LOR dependent
+ *                                        any other value means that the first value in the tofcenter_offset
+ *                                        array is used for all LORs
+ *  @param lor_weights array of shape [nlors] with multiplicative weights of the LORs
+ *                     (e.g. attenuation or normalization factors) applied to the
+ *                     values before back projection, or NULL (no weights).
+ *                     LORs with weight 0 are skipped.
+ */
+void joseph3d_back_tof_lm_batch(const float *xstart,
+                                const float *xend,
+                                float *img,
+                                const float *img_origin,
+                                const float *voxsize,
+                                const float *p,
+                                long long nlors,
+                                const int *img_dim,
+                                long long nbatch,
+                                float tofbin_width,
+                                const float *sigma_tof,
+                                const float *tofcenter_offset,
+                                float n_sigmas,
+                                const short *tof_bin,
+                                unsigned char lor_dependent_sigma_tof,
+                                unsigned char lor_dependent_tofcenter_offset,
+                                const float *lor_weights);
+
+/** @brief set the number of OpenMP threads used in subsequent parallel regions
+ *
+ *  @param num_threads number of threads
+ */
+void set_omp_num_threads(int num_threads);
+
+/** @brief get the maximum number of OpenMP threads used in parallel regions
+ *
+ *  @return maximum number of threads
+ */
+int get_omp_max_threads(void);
+
 #ifdef __cplusplus
 }  /* extern "C" */
 #endif
@@ -0,0 +1,42 @@
+/**
+ * @file joseph3d_back_idx.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_back_idx(const float *lor_endpoints,
+                       const int *start_index,
+                       const int *end_index,
+                       float *img,
+                       const float *img_origin, 
+                       const float *voxsize, 
+                       const float *p,
+                       long long nlors, 
+                       const int *img_dim)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+
+    if(p[i] != 0)
+    {
+      // the LOR start and end points are gathered from the table of all LOR endpoints
+      if(joseph3d_ray_setup(&lor_endpoints[3*(long long)start_index[i]], 
+                            &lor_endpoints[3*(long long)end_index[i]], 
+                            img_origin, voxsize, img_dim, &ray) == 1)
+      {
+        joseph3d_ray_back(&ray, img, p[i], img_origin, voxsize, img_dim, 
+                          0, img_dim[ray.direction], 1);
+      }
+    }
+  }
+}
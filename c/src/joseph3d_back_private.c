@@ -0,0 +1,85 @@
+/**
+ * @file joseph3d_back_private.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+int joseph3d_back_private(const float *xstart, 
+                          const float *xend, 
+                          float *img,
+                          const float *img_origin, 
+                          const float *voxsize,
+                          const float *p, 
+                          long long nlors, 
+                          const int *img_dim)
+{
+  long long nvox = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  int max_threads = omp_get_max_threads();
+  int t;
+  int status = 0;
+
+  // array of pointers to the private images of all threads
+  float **priv_imgs = (float **)calloc(max_threads, sizeof(float *));
+
+  if(priv_imgs == NULL){return 1;}
+
+  // allocate all private images before entering the parallel region such that
+  // allocation failures can be reported
+  for(t = 0; t < max_threads; t++)
+  {
+    priv_imgs[t] = (float *)calloc(nvox, sizeof(float));
+    if(priv_imgs[t] == NULL)
+    {
+      status = 1;
+      break;
+    }
+  }
+
+  if(status == 0)
+  {
+    # pragma omp parallel
+    {
+      long long i, j;
+      int tt;
+      int tid = omp_get_thread_num();
+      int nthreads = omp_get_num_threads();
+      joseph3d_ray ray;
+
+      // every thread back projects into its own image without atomic adds
+      # pragma omp for schedule(static)
+      for(i = 0; i < nlors; i++)
+      {
+        if(p[i] != 0)
+        {
+          if(joseph3d_ray_setup(&xstart[i*3], &xend[i*3], img_origin, voxsize, img_dim, &ray) == 1)
+          {
+            joseph3d_ray_back(&ray, priv_imgs[tid], p[i], img_origin, voxsize, img_dim, 
+                              0, img_dim[ray.direction], 0);
+          }
+        }
+      }
+      // (implicit barrier)
+
+      // parallel reduction of all private images into the output image
+      # pragma omp for schedule(static)
+      for(j = 0; j < nvox; j++)
+      {
+        for(tt = 0; tt < nthreads; tt++)
+        {
+          img[j] += priv_imgs[tt][j];
+        }
+      }
+    }
+  }
+
+  for(t = 0; t < max_threads; t++){free(priv_imgs[t]);}
+  free(priv_imgs);
+
+  return status;
+}
@@ -0,0 +1,192 @@
+/**
+ * @file joseph3d_back_slab.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<string.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+// maximum number of LORs whose ray setup is stored at once
+#define SLAB_CHUNK_SIZE 1048576LL
+
+// index of the slab (out of nslabs slabs dividing n planes) containing plane
+static int slab_of_plane(int plane, int n, int nslabs)
+{
+  return (int)((((long long)plane + 1)*nslabs - 1) / n);
+}
+
+int joseph3d_back_slab(const float *xstart, 
+                       const float *xend, 
+                       float *img,
+                       const float *img_origin, 
+                       const float *voxsize,
+                       const float *p, 
+                       long long nlors, 
+                       const int *img_dim)
+{
+  int d;
+  int status = 0;
+  int max_threads = omp_get_max_threads();
+
+  // every direction d is divided into nslabs[d] slabs of planes perpendicular to d
+  // the LORs of a chunk are bucketed by (direction, slab), bucket b of slab s in
+  // direction d is slab_offset[d] + s
+  int nslabs[3];
+  int slab_offset[4];
+
+  slab_offset[0] = 0;
+  for(d = 0; d < 3; d++)
+  {
+    nslabs[d] = (max_threads < img_dim[d]) ? max_threads : img_dim[d];
+    slab_offset[d+1] = slab_offset[d] + nslabs[d];
+  }
+  int nbuckets = slab_offset[3];
+
+  long long chunk_size = (nlors < SLAB_CHUNK_SIZE) ? nlors : SLAB_CHUNK_SIZE;
+  if(chunk_size < 1){return 0;}
+
+  // ray setup of all LORs of a chunk (calculated once and reused in all slabs)
+  joseph3d_ray *rays = (joseph3d_ray *)malloc(chunk_size*sizeof(joseph3d_ray));
+  // whether a LOR of the chunk contributes
+  unsigned char *valid = (unsigned char *)malloc(chunk_size*sizeof(unsigned char));
+  // number of (and later write offsets for) the LORs of every thread in every bucket
+  long long *thread_counts = (long long *)malloc((size_t)max_threads*nbuckets*sizeof(long long));
+  // start of every bucket in bucket_lors
+  long long *bucket_start = (long long *)malloc((nbuckets + 1)*sizeof(long long));
+  // chunk LOR numbers sorted into the buckets
+  int *bucket_lors = NULL;
+  long long bucket_capacity = 0;
+
+  if((rays == NULL) || (valid == NULL) || (thread_counts == NULL) || (bucket_start == NULL))
+  {
+    status = 1;
+    goto cleanup;
+  }
+
+  for(long long c0 = 0; c0 < nlors; c0 += chunk_size)
+  {
+    long long n = ((nlors - c0) < chunk_size) ? (nlors - c0) : chunk_size;
+
+    memset(thread_counts, 0, (size_t)max_threads*nbuckets*sizeof(long long));
+
+    # pragma omp parallel
+    {
+      long long i, j;
+      int s, b, t;
+      int tid = omp_get_thread_num();
+      long long *my_counts = &thread_counts[(long long)tid*nbuckets];
+
+      // (1) setup all rays and count the LORs of this thread in every slab they touch
+      # pragma omp for schedule(static)
+      for(i = 0; i < n; i++)
+      {
+        long long k = c0 + i;
+        valid[i] = 0;
+
+        if(p[k] != 0)
+        {
+          if(joseph3d_ray_setup(&xstart[k*3], &xend[k*3], img_origin, voxsize, img_dim, &rays[i]) == 1)
+          {
+            if(rays[i].iend > rays[i].istart)
+            {
+              int dir = rays[i].direction;
+              int s0 = slab_of_plane(rays[i].istart, img_dim[dir], nslabs[dir]);
+              int s1 = slab_of_plane(rays[i].iend - 1, img_dim[dir], nslabs[dir]);
+
+              valid[i] = 1;
+              for(s = s0; s <= s1; s++){my_counts[slab_offset[dir] + s]++;}
+            }
+          }
+        }
+      }
+      // (implicit barrier)
+
+      // (2) convert the counts into write offsets of every thread in every bucket
+      # pragma omp single
+      {
+        int nthreads = omp_get_num_threads();
+        long long total = 0;
+
+        for(b = 0; b < nbuckets; b++)
+        {
+          bucket_start[b] = total;
+          for(t = 0; t < nthreads; t++)
+          {
+            long long c = thread_counts[(long long)t*nbuckets + b];
+            thread_counts[(long long)t*nbuckets + b] = total;
+            total += c;
+          }
+        }
+        bucket_start[nbuckets] = total;
+
+        if(total > bucket_capacity)
+        {
+          free(bucket_lors);
+          bucket_lors = (int *)malloc(total*sizeof(int));
+          bucket_capacity = (bucket_lors == NULL) ? 0 : total;
+          if(bucket_lors == NULL){status = 1;}
+        }
+      }
+      // (implicit barrier)
+
+      if(status == 0)
+      {
+        // (3) sort the LORs into the buckets, using the same static schedule as in (1)
+        // such that every thread writes into its own range of every bucket and
+        // every bucket is sorted by LOR number
+        # pragma omp for schedule(static)
+        for(i = 0; i < n; i++)
+        {
+          if(valid[i])
+          {
+            int dir = rays[i].direction;
+            int s0 = slab_of_plane(rays[i].istart, img_dim[dir], nslabs[dir]);
+            int s1 = slab_of_plane(rays[i].iend - 1, img_dim[dir], nslabs[dir]);
+
+            for(s = s0; s <= s1; s++){bucket_lors[my_counts[slab_offset[dir] + s]++] = (int)i;}
+          }
+        }
+        // (implicit barrier)
+
+        // (4) every thread owns a slab of planes perpendicular to d and only updates
+        // the voxels in its slab such that no atomic adds are needed
+        // LORs with different directions can update the same voxels, so the
+        // directions are processed one after the other
+        for(int dir = 0; dir < 3; dir++)
+        {
+          # pragma omp for schedule(dynamic, 1)
+          for(s = 0; s < nslabs[dir]; s++)
+          {
+            int plane_min = (int)(((long long)s*img_dim[dir]) / nslabs[dir]);
+            int plane_max = (int)(((long long)(s + 1)*img_dim[dir]) / nslabs[dir]);
+
+            b = slab_offset[dir] + s;
+
+            for(j = bucket_start[b]; j < bucket_start[b+1]; j++)
+            {
+              int l = bucket_lors[j];
+              joseph3d_ray_back(&rays[l], img, p[c0 + l], img_origin, voxsize, img_dim, 
+                                plane_min, plane_max, 0);
+            }
+          }
+          // (implicit barrier)
+        }
+      }
+    }
+
+    if(status != 0){break;}
+  }
+
+cleanup:
+  free(rays);
+  free(valid);
+  free(thread_counts);
+  free(bucket_start);
+  free(bucket_lors);
+
+  return status;
+}
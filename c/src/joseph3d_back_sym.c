@@ -0,0 +1,48 @@
+/**
+ * @file joseph3d_back_sym.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_back_sym(const float *xstart_2d,
+                       const float *xend_2d,
+                       const float *zstart,
+                       const float *zend,
+                       float *img,
+                       const float *img_origin, 
+                       const float *voxsize, 
+                       const float *p,
+                       long long n2d,
+                       long long nplanes,
+                       long long n_inner,
+                       const int *img_dim,
+                       int symmetry_axis)
+{
+  long long i;
+  long long nlors = n2d*nplanes;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    float xstart[3], xend[3];
+
+    if(p[i] != 0)
+    {
+      // the LOR start and end points are assembled from the plane 0 LOR and the plane coordinates
+      joseph3d_sym_lor_endpoints(i, xstart_2d, xend_2d, zstart, zend, nplanes, n_inner, 
+                                 symmetry_axis, xstart, xend);
+
+      if(joseph3d_ray_setup(xstart, xend, img_origin, voxsize, img_dim, &ray) == 1)
+      {
+        joseph3d_ray_back(&ray, img, p[i], img_origin, voxsize, img_dim, 0, img_dim[ray.direction], 1);
+      }
+    }
+  }
+}
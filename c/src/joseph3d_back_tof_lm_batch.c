@@ -0,0 +1,54 @@
+/**
+ * @file joseph3d_back_tof_lm_batch.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_back_tof_lm_batch(const float *xstart, 
+                                const float *xend, 
+                                float *img,
+                                const float *img_origin, 
+                                const float *voxsize, 
+                                const float *p,
+                                long long nlors, 
+                                const int *img_dim,
+                                long long nbatch,
+                                float tofbin_width,
+                                const float *sigma_tof,
+                                const float *tofcenter_offset,
+                                float n_sigmas,
+                                const short *tof_bin,
+                                unsigned char lor_dependent_sigma_tof,
+                                unsigned char lor_dependent_tofcenter_offset,
+                                const float *lor_weights)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+
+    float sig_tof   = (lor_dependent_sigma_tof == 1) ? sigma_tof[i] : sigma_tof[0];
+    float tc_offset = (lor_dependent_tofcenter_offset == 1) ? tofcenter_offset[i] : tofcenter_offset[0];
+
+    // LORs with zero weight do not contribute
+    if((lor_weights != NULL) && (lor_weights[i] == 0)){continue;}
+
+    // the LOR is traversed only once for all images
+    if(joseph3d_ray_setup(&xstart[i*3], &xend[i*3], img_origin, voxsize, img_dim, &ray) == 1)
+    {
+      // the multiplicative LOR weight is applied to all interpolation weights
+      if(lor_weights != NULL){ray.cf *= lor_weights[i];}
+
+      joseph3d_ray_back_tof_lm_batch(&ray, img, nbatch, &p[i], nlors, img_origin, voxsize, img_dim, 
+                                     tofbin_width, sig_tof, tc_offset, n_sigmas, tof_bin[i], 1);
+    }
+  }
+}
@@ -0,0 +1,52 @@
+/**
+ * @file joseph3d_back_tof_lm_idx.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_back_tof_lm_idx(const float *lor_endpoints,
+                              const int *start_index,
+                              const int *end_index,
+                              float *img,
+                              const float *img_origin,
+                              const float *voxsize,
+                              const float *p,
+                              long long nlors,
+                              const int *img_dim,
+                              float tofbin_width,
+                              const float *sigma_tof,
+                              const float *tofcenter_offset,
+                              float n_sigmas,
+                              const short *tof_bin,
+                              unsigned char lor_dependent_sigma_tof,
+                              unsigned char lor_dependent_tofcenter_offset)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+
+    float sig_tof   = (lor_dependent_sigma_tof == 1) ? sigma_tof[i] : sigma_tof[0];
+    float tc_offset = (lor_dependent_tofcenter_offset == 1) ? tofcenter_offset[i] : tofcenter_offset[0];
+
+    if(p[i] != 0)
+    {
+      // the LOR start and end points are gathered from the table of all LOR endpoints
+      if(joseph3d_ray_setup(&lor_endpoints[3*(long long)start_index[i]], 
+                            &lor_endpoints[3*(long long)end_index[i]], 
+                            img_origin, voxsize, img_dim, &ray) == 1)
+      {
+        joseph3d_ray_back_tof_lm(&ray, img, p[i], img_origin, voxsize, img_dim, 
+                                 tofbin_width, sig_tof, tc_offset, n_sigmas, tof_bin[i], 1);
+      }
+    }
+  }
+}
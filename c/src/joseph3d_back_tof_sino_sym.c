@@ -0,0 +1,56 @@
+/**
+ * @file joseph3d_back_tof_sino_sym.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_back_tof_sino_sym(const float *xstart_2d,
+                                const float *xend_2d,
+                                const float *zstart,
+                                const float *zend,
+                                float *img,
+                                const float *img_origin,
+                                const float *voxsize,
+                                const float *p,
+                                long long n2d,
+                                long long nplanes,
+                                long long n_inner,
+                                const int *img_dim,
+                                int symmetry_axis,
+                                float tofbin_width,
+                                const float *sigma_tof,
+                                const float *tofcenter_offset,
+                                float n_sigmas,
+                                short n_tofbins,
+                                unsigned char lor_dependent_sigma_tof,
+                                unsigned char lor_dependent_tofcenter_offset)
+{
+  long long i;
+  long long nlors = n2d*nplanes;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    float xstart[3], xend[3];
+
+    float sig_tof   = (lor_dependent_sigma_tof == 1) ? sigma_tof[i] : sigma_tof[0];
+    float tc_offset = (lor_dependent_tofcenter_offset == 1) ? tofcenter_offset[i] : tofcenter_offset[0];
+
+    // the LOR start and end points are assembled from the plane 0 LOR and the plane coordinates
+    joseph3d_sym_lor_endpoints(i, xstart_2d, xend_2d, zstart, zend, nplanes, n_inner, 
+                               symmetry_axis, xstart, xend);
+
+    if(joseph3d_ray_setup(xstart, xend, img_origin, voxsize, img_dim, &ray) == 1)
+    {
+      joseph3d_ray_back_tof_sino(&ray, img, &p[i*n_tofbins], img_origin, voxsize, img_dim,
+                                 tofbin_width, sig_tof, tc_offset, n_sigmas, n_tofbins, 1);
+    }
+  }
+}
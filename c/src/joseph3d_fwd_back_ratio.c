@@ -0,0 +1,54 @@
+/**
+ * @file joseph3d_fwd_back_ratio.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_fwd_back_ratio(const float *xstart, 
+                             const float *xend, 
+                             const float *img,
+                             float *back_img,
+                             const float *img_origin, 
+                             const float *voxsize, 
+                             const float *data,
+                             const float *contamination,
+                             long long nlors, 
+                             const int *img_dim,
+                             unsigned char lor_dependent_contamination)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    float ybar;
+
+    // LORs with zero data do not contribute to the back projection
+    if(data[i] != 0)
+    {
+      if(joseph3d_ray_setup(&xstart[i*3], &xend[i*3], img_origin, voxsize, img_dim, &ray) == 1)
+      {
+        ybar = joseph3d_ray_fwd(&ray, img, img_origin, voxsize, img_dim);
+
+        if(lor_dependent_contamination == 1)
+        {
+          ybar += contamination[i];
+        }
+        else
+        {
+          ybar += contamination[0];
+        }
+
+        joseph3d_ray_back(&ray, back_img, data[i] / ybar, img_origin, voxsize, img_dim, 
+                          0, img_dim[ray.direction], 1);
+      }
+    }
+  }
+}
@@ -0,0 +1,47 @@
+/**
+ * @file joseph3d_fwd_batch.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_fwd_batch(const float *xstart, 
+                        const float *xend, 
+                        const float *img,
+                        const float *img_origin, 
+                        const float *voxsize, 
+                        float *p,
+                        long long nlors, 
+                        const int *img_dim,
+                        long long nbatch,
+                        const float *lor_weights)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    long long b;
+
+    // initialize the projections of all images along the current LOR with 0
+    for(b = 0; b < nbatch; b++){p[b*nlors + i] = 0;}
+
+    // LORs with zero weight do not contribute
+    if((lor_weights != NULL) && (lor_weights[i] == 0)){continue;}
+
+    // the LOR is traversed only once for all images
+    if(joseph3d_ray_setup(&xstart[i*3], &xend[i*3], img_origin, voxsize, img_dim, &ray) == 1)
+    {
+      // the multiplicative LOR weight is applied to all interpolation weights
+      if(lor_weights != NULL){ray.cf *= lor_weights[i];}
+
+      joseph3d_ray_fwd_batch(&ray, img, nbatch, img_origin, voxsize, img_dim, &p[i], nlors);
+    }
+  }
+}
@@ -0,0 +1,47 @@
+/**
+ * @file joseph3d_fwd_sym.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_fwd_sym(const float *xstart_2d,
+                      const float *xend_2d,
+                      const float *zstart,
+                      const float *zend,
+                      const float *img,
+                      const float *img_origin, 
+                      const float *voxsize, 
+                      float *p,
+                      long long n2d,
+                      long long nplanes,
+                      long long n_inner,
+                      const int *img_dim,
+                      int symmetry_axis)
+{
+  long long i;
+  long long nlors = n2d*nplanes;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    float xstart[3], xend[3];
+
+    p[i] = 0;
+
+    // the LOR start and end points are assembled from the plane 0 LOR and the plane coordinates
+    joseph3d_sym_lor_endpoints(i, xstart_2d, xend_2d, zstart, zend, nplanes, n_inner, 
+                               symmetry_axis, xstart, xend);
+
+    if(joseph3d_ray_setup(xstart, xend, img_origin, voxsize, img_dim, &ray) == 1)
+    {
+      p[i] = joseph3d_ray_fwd(&ray, img, img_origin, voxsize, img_dim);
+    }
+  }
+}
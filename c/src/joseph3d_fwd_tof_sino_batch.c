@@ -0,0 +1,64 @@
+/**
+ * @file joseph3d_fwd_tof_sino_batch.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_fwd_tof_sino_batch(const float *xstart, 
+                                 const float *xend, 
+                                 const float *img,
+                                 const float *img_origin, 
+                                 const float *voxsize, 
+                                 float *p,
+                                 long long nlors, 
+                                 const int *img_dim,
+                                 long long nbatch,
+                                 float tofbin_width,
+                                 const float *sigma_tof,
+                                 const float *tofcenter_offset,
+                                 float n_sigmas,
+                                 short n_tofbins,
+                                 unsigned char lor_dependent_sigma_tof,
+                                 unsigned char lor_dependent_tofcenter_offset,
+                                 const float *lor_weights)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    long long b;
+    int it;
+
+    float sig_tof   = (lor_dependent_sigma_tof == 1) ? sigma_tof[i] : sigma_tof[0];
+    float tc_offset = (lor_dependent_tofcenter_offset == 1) ? tofcenter_offset[i] : tofcenter_offset[0];
+
+    // initialize all TOF bins of all images along the current LOR with 0
+    for(b = 0; b < nbatch; b++){
+      for(it = 0; it < n_tofbins; it++){
+        p[(b*nlors + i)*n_tofbins + it] = 0;
+      }
+    }
+
+    // LORs with zero weight do not contribute
+    if((lor_weights != NULL) && (lor_weights[i] == 0)){continue;}
+
+    // the LOR is traversed only once for all images
+    if(joseph3d_ray_setup(&xstart[i*3], &xend[i*3], img_origin, voxsize, img_dim, &ray) == 1)
+    {
+      // the multiplicative LOR weight is applied to all interpolation weights
+      if(lor_weights != NULL){ray.cf *= lor_weights[i];}
+
+      joseph3d_ray_fwd_tof_sino_batch(&ray, img, nbatch, img_origin, voxsize, img_dim, 
+                                      tofbin_width, sig_tof, tc_offset, n_sigmas, n_tofbins,
+                                      &p[i*n_tofbins], nlors*n_tofbins);
+    }
+  }
+}
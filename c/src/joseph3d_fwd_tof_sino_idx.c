@@ -0,0 +1,56 @@
+/**
+ * @file joseph3d_fwd_tof_sino_idx.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "joseph3d_ray.h"
+
+
+void joseph3d_fwd_tof_sino_idx(const float *lor_endpoints,
+                               const int *start_index,
+                               const int *end_index,
+                               const float *img,
+                               const float *img_origin,
+                               const float *voxsize,
+                               float *p,
+                               long long nlors,
+                               const int *img_dim,
+                               float tofbin_width,
+                               const float *sigma_tof,
+                               const float *tofcenter_offset,
+                               float n_sigmas,
+                               short n_tofbins,
+                               unsigned char lor_dependent_sigma_tof,
+                               unsigned char lor_dependent_tofcenter_offset)
+{
+  long long i;
+
+  # pragma omp parallel for schedule(static)
+  for(i = 0; i < nlors; i++)
+  {
+    joseph3d_ray ray;
+    int it;
+
+    float sig_tof   = (lor_dependent_sigma_tof == 1) ? sigma_tof[i] : sigma_tof[0];
+    float tc_offset = (lor_dependent_tofcenter_offset == 1) ? tofcenter_offset[i] : tofcenter_offset[0];
+
+    // initialize all TOF bins in projection along current LOR with 0
+    for(it = 0; it < n_tofbins; it++){
+      p[i*n_tofbins + it] = 0;
+    }
+
+    // the LOR start and end points are gathered from the table of all LOR endpoints
+    if(joseph3d_ray_setup(&lor_endpoints[3*(long long)start_index[i]], 
+                          &lor_endpoints[3*(long long)end_index[i]], 
+                          img_origin, voxsize, img_dim, &ray) == 1)
+    {
+      joseph3d_ray_fwd_tof_sino(&ray, img, img_origin, voxsize, img_dim, 
+                                tofbin_width, sig_tof, tc_offset, n_sigmas, n_tofbins,
+                                &p[i*n_tofbins]);
+    }
+  }
+}
@@ -0,0 +1,1101 @@
+/**
+ * @file joseph3d_ray.c
+ */
+
+#include<stdio.h>
+#include<stdlib.h>
+#include<math.h>
+#include<omp.h>
+
+#include "tof_utils.h"
+#include "ray_cube_intersection.h"
+#include "joseph3d_ray.h"
+
+/** @brief Calculate the geometry of a LOR needed to step through an image with Joseph's method
+ *
+ *  @param xstart      array [x_0, x_1, x_2] with the start point of the LOR
+ *  @param xend        array [x_0, x_1, x_2] with the end point of the LOR
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param ray         (output) the geometry of the LOR
+ *
+ *  @return            unsigned char (0 or 1) whether the LOR intersects the image
+ */
+unsigned char joseph3d_ray_setup(const float *xstart,
+                                 const float *xend,
+                                 const float *img_origin,
+                                 const float *voxsize,
+                                 const int *img_dim,
+                                 joseph3d_ray *ray)
+{
+  int k, dir;
+  float d_sq[3], cos_sq[3], lsq, d_norm;
+
+  unsigned char intersec;
+  float t1, t2;
+  float istart_f, iend_f, tmp;
+  int   istart, iend;
+
+  for(k = 0; k < 3; k++)
+  {
+    ray->xstart[k] = xstart[k];
+    ray->xend[k]   = xend[k];
+    ray->d[k]      = xend[k] - xstart[k];
+  }
+
+  ray->istart = 0;
+  ray->iend   = 0;
+
+  //-----------
+  //--- test whether ray and cube intersect
+  intersec = ray_cube_intersection(xstart[0], xstart[1], xstart[2],
+                                   img_origin[0] - 1*voxsize[0], img_origin[1] - 1*voxsize[1], img_origin[2] - 1*voxsize[2],
+                                   img_origin[0] + img_dim[0]*voxsize[0], img_origin[1] + img_dim[1]*voxsize[1], img_origin[2] + img_dim[2]*voxsize[2],
+                                   ray->d[0], ray->d[1], ray->d[2], &t1, &t2);
+
+  if (intersec == 0){return intersec;}
+
+  // test whether the ray between the two detectors is most parallel
+  // with the 0, 1, or 2 axis
+  for(k = 0; k < 3; k++){d_sq[k] = ray->d[k]*ray->d[k];}
+
+  lsq = d_sq[0] + d_sq[1] + d_sq[2];
+
+  for(k = 0; k < 3; k++){cos_sq[k] = d_sq[k] / lsq;}
+
+  dir = 0;
+  if ((cos_sq[1] >= cos_sq[0]) && (cos_sq[1] >= cos_sq[2]))
+  {
+    dir = 1;
+  }
+  else
+  {
+    if ((cos_sq[2] >= cos_sq[0]) && (cos_sq[2] >= cos_sq[1]))
+    {
+      dir = 2;
+    }
+  }
+
+  ray->direction = dir;
+
+  // factor for correctiong voxel size and |cos(theta)|
+  ray->cf = voxsize[dir] / sqrtf(cos_sq[dir]);
+
+  // unit vector that points from xstart to end and mid point of LOR
+  // (needed for TOF weights)
+  d_norm = sqrtf(lsq);
+  for(k = 0; k < 3; k++)
+  {
+    ray->u[k]   = ray->d[k] / d_norm;
+    ray->x_m[k] = 0.5f*(xstart[k] + xend[k]);
+  }
+
+  //--- check where ray enters / leaves cube
+  istart_f = (xstart[dir] + t1*ray->d[dir] - img_origin[dir]) / voxsize[dir];
+  iend_f   = (xstart[dir] + t2*ray->d[dir] - img_origin[dir]) / voxsize[dir];
+
+  if (istart_f > iend_f){
+    tmp      = iend_f;
+    iend_f   = istart_f;
+    istart_f = tmp;
+  }
+
+  istart = (int)floor(istart_f);
+  iend   = (int)ceil(iend_f);
+  if (istart < 0){istart = 0;}
+  if (iend >= img_dim[dir]){iend = img_dim[dir];}
+
+  // check in which "plane" the start and end points are
+  // we have to do this to avoid that we include voxels
+  // that are "outside" the line segment bewteen xstart and xend
+
+  // !! for these calculations we overwrite the istart_f and iend_f variables !!
+  istart_f = (xstart[dir] - img_origin[dir]) / voxsize[dir];
+  iend_f   = (xend[dir]   - img_origin[dir]) / voxsize[dir];
+
+  if (istart_f > iend_f){
+    tmp      = iend_f;
+    iend_f   = istart_f;
+    istart_f = tmp;
+  }
+
+  if (istart < (int)floor(istart_f)){istart = (int)floor(istart_f);}
+  if (iend >= (int)ceil(iend_f)){iend = (int)ceil(iend_f);}
+  //---
+
+  ray->istart = istart;
+  ray->iend   = iend;
+
+  return intersec;
+}
+
+/** @brief intersection of a LOR with an image plane and bilinear interpolation weights
+ */
+typedef struct
+{
+  int ia_floor;     /**< floor index along the first interpolation axis */
+  int ib_floor;     /**< floor index along the second interpolation axis */
+  float tmp_a;      /**< normalized distance to the floor along the first interpolation axis */
+  float tmp_b;      /**< normalized distance to the floor along the second interpolation axis */
+  float x_v[3];     /**< coordinates of the intersection point (needed for TOF weights) */
+} joseph3d_plane;
+
+/** @brief calculate the intersection of a LOR with image plane i (along the ray direction)
+ */
+static void joseph3d_ray_plane(const joseph3d_ray *ray,
+                               int i,
+                               const float *img_origin,
+                               const float *voxsize,
+                               joseph3d_plane *pl)
+{
+  // axis we step along and the two axes used for bilinear interpolation
+  int d = ray->direction;
+  int a = (d == 0) ? 1 : 0;
+  int b = (d == 2) ? 1 : 2;
+
+  float x_pr_a, x_pr_b;
+
+  // get the indices where the ray intersects the image plane
+  x_pr_a = ray->xstart[a] + (img_origin[d] + i*voxsize[d] - ray->xstart[d])*ray->d[a] / ray->d[d];
+  x_pr_b = ray->xstart[b] + (img_origin[d] + i*voxsize[d] - ray->xstart[d])*ray->d[b] / ray->d[d];
+
+  pl->ia_floor = (int)floor((x_pr_a - img_origin[a])/voxsize[a]);
+  pl->ib_floor = (int)floor((x_pr_b - img_origin[b])/voxsize[b]);
+
+  // calculate the distances to the floor normalized to [0,1]
+  // for the bilinear interpolation
+  pl->tmp_a = (x_pr_a - (pl->ia_floor*voxsize[a] + img_origin[a])) / voxsize[a];
+  pl->tmp_b = (x_pr_b - (pl->ib_floor*voxsize[b] + img_origin[b])) / voxsize[b];
+
+  // the voxel center needed for TOF weights
+  pl->x_v[d] = img_origin[d] + i*voxsize[d];
+  pl->x_v[a] = x_pr_a;
+  pl->x_v[b] = x_pr_b;
+}
+
+/** @brief bilinear interpolation of image plane i (along the ray direction)
+ */
+static float joseph3d_ray_interp(const joseph3d_ray *ray,
+                                 const joseph3d_plane *pl,
+                                 int i,
+                                 const float *img,
+                                 const int *img_dim)
+{
+  int d = ray->direction;
+  int a = (d == 0) ? 1 : 0;
+  int b = (d == 2) ? 1 : 2;
+
+  int na = img_dim[a];
+  int nb = img_dim[b];
+
+  long long stride[3] = {(long long)img_dim[1]*img_dim[2], img_dim[2], 1};
+  long long offset = stride[d]*i;
+
+  int ia_floor = pl->ia_floor;
+  int ia_ceil  = ia_floor + 1;
+  int ib_floor = pl->ib_floor;
+  int ib_ceil  = ib_floor + 1;
+
+  float tmp_a = pl->tmp_a;
+  float tmp_b = pl->tmp_b;
+
+  float toAdd = 0;
+
+  if ((ia_floor >= 0) && (ia_floor < na) && (ib_floor >= 0) && (ib_floor < nb))
+  {
+    toAdd += img[offset + stride[a]*ia_floor + stride[b]*ib_floor] * (1 - tmp_a) * (1 - tmp_b);
+  }
+  if ((ia_ceil >= 0) && (ia_ceil < na) && (ib_floor >= 0) && (ib_floor < nb))
+  {
+    toAdd += img[offset + stride[a]*ia_ceil + stride[b]*ib_floor] * tmp_a * (1 - tmp_b);
+  }
+  if ((ia_floor >= 0) && (ia_floor < na) && (ib_ceil >= 0) && (ib_ceil < nb))
+  {
+    toAdd += img[offset + stride[a]*ia_floor + stride[b]*ib_ceil] * (1 - tmp_a) * tmp_b;
+  }
+  if ((ia_ceil >= 0) && (ia_ceil < na) && (ib_ceil >= 0) && (ib_ceil < nb))
+  {
+    toAdd += img[offset + stride[a]*ia_ceil + stride[b]*ib_ceil] * tmp_a * tmp_b;
+  }
+
+  return toAdd;
+}
+
+/** @brief add a value to an image voxel (optionally using an atomic add)
+ */
+static void add_to_voxel(float *img, long long idx, float val, unsigned char atomic)
+{
+  if (atomic == 1)
+  {
+    #pragma omp atomic
+    img[idx] += val;
+  }
+  else
+  {
+    img[idx] += val;
+  }
+}
+
+/** @brief adjoint of the bilinear interpolation of image plane i (along the ray direction)
+ */
+static void joseph3d_ray_scatter(const joseph3d_ray *ray,
+                                 const joseph3d_plane *pl,
+                                 int i,
+                                 float *img,
+                                 float val,
+                                 const int *img_dim,
+                                 unsigned char atomic)
+{
+  int d = ray->direction;
+  int a = (d == 0) ? 1 : 0;
+  int b = (d == 2) ? 1 : 2;
+
+  int na = img_dim[a];
+  int nb = img_dim[b];
+
+  long long stride[3] = {(long long)img_dim[1]*img_dim[2], img_dim[2], 1};
+  long long offset = stride[d]*i;
+
+  int ia_floor = pl->ia_floor;
+  int ia_ceil  = ia_floor + 1;
+  int ib_floor = pl->ib_floor;
+  int ib_ceil  = ib_floor + 1;
+
+  float tmp_a = pl->tmp_a;
+  float tmp_b = pl->tmp_b;
+  float cf = ray->cf;
+
+  if ((ia_floor >= 0) && (ia_floor < na) && (ib_floor >= 0) && (ib_floor < nb))
+  {
+    add_to_voxel(img, offset + stride[a]*ia_floor + stride[b]*ib_floor,
+                 (val * (1 - tmp_a) * (1 - tmp_b) * cf), atomic);
+  }
+  if ((ia_ceil >= 0) && (ia_ceil < na) && (ib_floor >= 0) && (ib_floor < nb))
+  {
+    add_to_voxel(img, offset + stride[a]*ia_ceil + stride[b]*ib_floor,
+                 (val * tmp_a * (1 - tmp_b) * cf), atomic);
+  }
+  if ((ia_floor >= 0) && (ia_floor < na) && (ib_ceil >= 0) && (ib_ceil < nb))
+  {
+    add_to_voxel(img, offset + stride[a]*ia_floor + stride[b]*ib_ceil,
+                 (val * (1 - tmp_a) * tmp_b * cf), atomic);
+  }
+  if ((ia_ceil >= 0) && (ia_ceil < na) && (ib_ceil >= 0) && (ib_ceil < nb))
+  {
+    add_to_voxel(img, offset + stride[a]*ia_ceil + stride[b]*ib_ceil,
+                 (val * tmp_a * tmp_b * cf), atomic);
+  }
+}
+
+/** @brief TOF weight of a voxel (center x_v) for TOF bin it
+ */
+static float joseph3d_ray_tof_weight(const joseph3d_ray *ray,
+                                     const float *x_v,
+                                     int it,
+                                     float tofbin_width,
+                                     float sig_tof,
+                                     float tc_offset)
+{
+  float dtof;
+
+  // calculate distance of voxel to tof bin center
+  dtof = sqrtf(powf((ray->x_m[0] + (it*tofbin_width + tc_offset)*ray->u[0] - x_v[0]), 2) + 
+               powf((ray->x_m[1] + (it*tofbin_width + tc_offset)*ray->u[1] - x_v[1]), 2) + 
+               powf((ray->x_m[2] + (it*tofbin_width + tc_offset)*ray->u[2] - x_v[2]), 2));
+
+  //calculate the TOF weight
+  return 0.5f*(erff((dtof + 0.5f*tofbin_width)/(sqrtf(2)*sig_tof)) - 
+               erff((dtof - 0.5f*tofbin_width)/(sqrtf(2)*sig_tof)));
+}
+
+/** @brief range of image planes [istart_tof, iend_tof) (along the ray direction)
+ *         within +- n_sigmas of the center of TOF bin it
+ */
+static void joseph3d_ray_tof_planes(const joseph3d_ray *ray,
+                                    int it,
+                                    const float *img_origin,
+                                    const float *voxsize,
+                                    float tofbin_width,
+                                    float sig_tof,
+                                    float n_sigmas,
+                                    int *istart_tof,
+                                    int *iend_tof)
+{
+  int d = ray->direction;
+  float istart_tof_f, iend_tof_f, tmp;
+
+  istart_tof_f = (ray->x_m[d] + (it*tofbin_width - n_sigmas*sig_tof)*ray->u[d] - img_origin[d]) / voxsize[d];
+  iend_tof_f   = (ray->x_m[d] + (it*tofbin_width + n_sigmas*sig_tof)*ray->u[d] - img_origin[d]) / voxsize[d];
+
+  if (istart_tof_f > iend_tof_f){
+    tmp          = iend_tof_f;
+    iend_tof_f   = istart_tof_f;
+    istart_tof_f = tmp;
+  }
+
+  *istart_tof = (int)floor(istart_tof_f);
+  *iend_tof   = (int)ceil(iend_tof_f);
+}
+
+/** @brief Joseph forward projection of an image along a single LOR
+ *
+ *  @param ray         geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img         array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *                     The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *
+ *  @return            the line integral of the image along the LOR
+ */
+float joseph3d_ray_fwd(const joseph3d_ray *ray,
+                       const float *img,
+                       const float *img_origin,
+                       const float *voxsize,
+                       const int *img_dim)
+{
+  int i;
+  float toAdd;
+  float p = 0;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    toAdd = joseph3d_ray_interp(ray, &pl, i, img, img_dim);
+
+    if(toAdd != 0){p += (ray->cf * toAdd);}
+  }
+
+  return p;
+}
+
+/** @brief Joseph back projection of a value along a single LOR
+ *
+ *  Only the image planes (along the direction the LOR is most parallel to) in
+ *  [plane_min, plane_max) are updated.
+ *
+ *  @param ray         geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img         array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                     The pixel [i,j,k] ist stored at [n1*n2*i + n2*j + k].
+ *                     !! values are added to existing array !!
+ *  @param p           value to be back projected
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param plane_min   first image plane to update
+ *  @param plane_max   last image plane to update + 1
+ *  @param atomic      unsigned char 0 or 1 whether to use openmp's atomic add
+ */
+void joseph3d_ray_back(const joseph3d_ray *ray,
+                       float *img,
+                       float p,
+                       const float *img_origin,
+                       const float *voxsize,
+                       const int *img_dim,
+                       int plane_min,
+                       int plane_max,
+                       unsigned char atomic)
+{
+  int istart = (ray->istart > plane_min) ? ray->istart : plane_min;
+  int iend   = (ray->iend < plane_max) ? ray->iend : plane_max;
+  int i;
+  joseph3d_plane pl;
+
+  for(i = istart; i < iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    joseph3d_ray_scatter(ray, &pl, i, img, p, img_dim, atomic);
+  }
+}
+
+/** @brief Joseph TOF forward projection of an image along a single LOR into all TOF bins
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins    number of TOF bins
+ *  @param p            (output) array of length n_tofbins
+ *                      !! values are added to existing array !!
+ */
+void joseph3d_ray_fwd_tof_sino(const joseph3d_ray *ray,
+                               const float *img,
+                               const float *img_origin,
+                               const float *voxsize,
+                               const int *img_dim,
+                               float tofbin_width,
+                               float sig_tof,
+                               float tc_offset,
+                               float n_sigmas,
+                               short n_tofbins,
+                               float *p)
+{
+  int n_half = n_tofbins/2;
+  int i, it, it1, it2, istart_tof, iend_tof;
+  float toAdd, tw;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    toAdd = joseph3d_ray_interp(ray, &pl, i, img, img_dim);
+
+    it1 = -n_half;
+    it2 =  n_half;
+
+    // get the relevant tof bins (the TOF bins where the TOF weight is not close to 0)
+    relevant_tof_bins(ray->x_m[0], ray->x_m[1], ray->x_m[2], pl.x_v[0], pl.x_v[1], pl.x_v[2],
+                      ray->u[0], ray->u[1], ray->u[2], 
+                      tofbin_width, tc_offset, sig_tof, n_sigmas, n_half,
+                      &it1, &it2);
+
+    if(toAdd != 0){
+      for(it = it1; it <= it2; it++){
+        //--- add extra check to be compatible with behavior of LM projector
+        joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                                &istart_tof, &iend_tof);
+
+        if ((i >= istart_tof) && (i < iend_tof)){
+          tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+          p[it + n_half] += (tw * ray->cf * toAdd);
+        }
+      }
+    }
+  }
+}
+
+/** @brief Joseph TOF back projection of all TOF bins along a single LOR
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                      !! values are added to existing array !!
+ *  @param p            array of length n_tofbins with the values to be back projected
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins    number of TOF bins
+ *  @param atomic       unsigned char 0 or 1 whether to use openmp's atomic add
+ */
+void joseph3d_ray_back_tof_sino(const joseph3d_ray *ray,
+                                float *img,
+                                const float *p,
+                                const float *img_origin,
+                                const float *voxsize,
+                                const int *img_dim,
+                                float tofbin_width,
+                                float sig_tof,
+                                float tc_offset,
+                                float n_sigmas,
+                                short n_tofbins,
+                                unsigned char atomic)
+{
+  int n_half = n_tofbins/2;
+  int i, it, it1, it2, istart_tof, iend_tof;
+  float tw;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+
+    it1 = -n_half;
+    it2 =  n_half;
+
+    // get the relevant tof bins (the TOF bins where the TOF weight is not close to 0)
+    relevant_tof_bins(ray->x_m[0], ray->x_m[1], ray->x_m[2], pl.x_v[0], pl.x_v[1], pl.x_v[2],
+                      ray->u[0], ray->u[1], ray->u[2], 
+                      tofbin_width, tc_offset, sig_tof, n_sigmas, n_half,
+                      &it1, &it2);
+
+    for(it = it1; it <= it2; it++){
+      //--- add extra check to be compatible with behavior of LM projector
+      joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                              &istart_tof, &iend_tof);
+
+      if ((i >= istart_tof) && (i < iend_tof)){
+        if(p[it + n_half] != 0){
+          tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+          joseph3d_ray_scatter(ray, &pl, i, img, tw * p[it + n_half], img_dim, atomic);
+        }
+      }
+    }
+  }
+}
+
+/** @brief Joseph TOF forward projection of an image along a single LOR into a single TOF bin
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [n0*n1*n2] containing the 3D image to be projected.
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param it           TOF bin (0 is the central TOF bin)
+ *
+ *  @return             the TOF weighted line integral of the image along the LOR
+ */
+float joseph3d_ray_fwd_tof_lm(const joseph3d_ray *ray,
+                              const float *img,
+                              const float *img_origin,
+                              const float *voxsize,
+                              const int *img_dim,
+                              float tofbin_width,
+                              float sig_tof,
+                              float tc_offset,
+                              float n_sigmas,
+                              short it)
+{
+  int i, istart, iend, istart_tof, iend_tof;
+  float toAdd, tw;
+  float p = 0;
+  joseph3d_plane pl;
+
+  //-- check where we should start and stop according to the TOF kernel
+  //-- the tof weights outside +- n_sigmas will be close to 0 so we can
+  //-- ignore them         
+  joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                          &istart_tof, &iend_tof);
+
+  istart = (istart_tof > ray->istart) ? istart_tof : ray->istart;
+  iend   = (iend_tof < ray->iend) ? iend_tof : ray->iend;
+
+  for(i = istart; i < iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    toAdd = joseph3d_ray_interp(ray, &pl, i, img, img_dim);
+
+    if(toAdd != 0){
+      tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+      p += (tw * ray->cf * toAdd);
+    }
+  }
+
+  return p;
+}
+
+/** @brief Joseph TOF back projection of a value in a single TOF bin along a single LOR
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [n0*n1*n2] containing the 3D image used for back projection (output).
+ *                      !! values are added to existing array !!
+ *  @param p            value to be back projected
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param it           TOF bin (0 is the central TOF bin)
+ *  @param atomic       unsigned char 0 or 1 whether to use openmp's atomic add
+ */
+void joseph3d_ray_back_tof_lm(const joseph3d_ray *ray,
+                              float *img,
+                              float p,
+                              const float *img_origin,
+                              const float *voxsize,
+                              const int *img_dim,
+                              float tofbin_width,
+                              float sig_tof,
+                              float tc_offset,
+                              float n_sigmas,
+                              short it,
+                              unsigned char atomic)
+{
+  int i, istart, iend, istart_tof, iend_tof;
+  float tw;
+  joseph3d_plane pl;
+
+  if(p == 0){return;}
+
+  joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                          &istart_tof, &iend_tof);
+
+  istart = (istart_tof > ray->istart) ? istart_tof : ray->istart;
+  iend   = (iend_tof < ray->iend) ? iend_tof : ray->iend;
+
+  for(i = istart; i < iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+    joseph3d_ray_scatter(ray, &pl, i, img, tw * p, img_dim, atomic);
+  }
+}
+
+/** @brief get the start and end point of a sinogram LOR from its plane 0 geometry
+ *
+ *  The LORs of a sinogram of a scanner with axial symmetry only differ in the 
+ *  coordinate along the symmetry axis. The sinogram is assumed to be stored
+ *  as [..., nplanes, n_inner] where n_inner is the number of 2D LORs stored 
+ *  after the plane axis (1 if the plane axis is the last axis).
+ *
+ *  @param i           linear index of the LOR in the sinogram
+ *  @param xstart_2d   array of shape [3*n2d] with the start coordinates of the LORs in plane 0
+ *  @param xend_2d     array of shape [3*n2d] with the end coordinates of the LORs in plane 0
+ *  @param zstart      array of length nplanes with the start coordinates along the symmetry axis
+ *  @param zend        array of length nplanes with the end coordinates along the symmetry axis
+ *  @param nplanes     number of planes
+ *  @param n_inner     number of 2D LORs stored after the plane axis
+ *  @param symmetry_axis axis (0,1,2) of the axial symmetry
+ *  @param xstart      array of length 3 (output) for the LOR start point
+ *  @param xend        array of length 3 (output) for the LOR end point
+ */
+void joseph3d_sym_lor_endpoints(long long i,
+                                const float *xstart_2d,
+                                const float *xend_2d,
+                                const float *zstart,
+                                const float *zend,
+                                long long nplanes,
+                                long long n_inner,
+                                int symmetry_axis,
+                                float *xstart,
+                                float *xend)
+{
+  int k;
+  long long plane = (i / n_inner) % nplanes;
+  long long j     = (i / (n_inner*nplanes))*n_inner + (i % n_inner);
+
+  for(k = 0; k < 3; k++)
+  {
+    xstart[k] = xstart_2d[3*j + k];
+    xend[k]   = xend_2d[3*j + k];
+  }
+
+  xstart[symmetry_axis] = zstart[plane];
+  xend[symmetry_axis]   = zend[plane];
+}
+
+/** @brief voxel indices and bilinear interpolation weights of image plane i (along the ray direction)
+ *
+ *  @return  number of voxels (0 to 4) inside the image
+ */
+static int joseph3d_ray_plane_voxels(const joseph3d_ray *ray,
+                                     const joseph3d_plane *pl,
+                                     int i,
+                                     const int *img_dim,
+                                     long long *idx,
+                                     float *w)
+{
+  int d = ray->direction;
+  int a = (d == 0) ? 1 : 0;
+  int b = (d == 2) ? 1 : 2;
+
+  int na = img_dim[a];
+  int nb = img_dim[b];
+
+  long long stride[3] = {(long long)img_dim[1]*img_dim[2], img_dim[2], 1};
+  long long offset = stride[d]*i;
+
+  int ia[2] = {pl->ia_floor, pl->ia_floor + 1};
+  int ib[2] = {pl->ib_floor, pl->ib_floor + 1};
+  float wa[2] = {1 - pl->tmp_a, pl->tmp_a};
+  float wb[2] = {1 - pl->tmp_b, pl->tmp_b};
+
+  int ka, kb;
+  int n = 0;
+
+  for(kb = 0; kb < 2; kb++)
+  {
+    for(ka = 0; ka < 2; ka++)
+    {
+      if ((ia[ka] >= 0) && (ia[ka] < na) && (ib[kb] >= 0) && (ib[kb] < nb))
+      {
+        idx[n] = offset + stride[a]*ia[ka] + stride[b]*ib[kb];
+        w[n]   = wa[ka]*wb[kb];
+        n++;
+      }
+    }
+  }
+
+  return n;
+}
+
+/** @brief Joseph forward projection of a batch of images along a single LOR
+ *
+ *  The geometry of the LOR and the interpolation weights of every image plane
+ *  are calculated only once for all images of the batch.
+ *
+ *  @param ray         geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img         array of shape [nbatch*n0*n1*n2] containing the 3D images to be projected.
+ *                     The pixel [i,j,k] of image b ist stored at [b*n0*n1*n2 + n1*n2*i + n2*j + k].
+ *  @param nbatch      number of images
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param p           (output) the line integral of image b is added to p[b*p_stride]
+ *  @param p_stride    stride of p between two images
+ */
+void joseph3d_ray_fwd_batch(const joseph3d_ray *ray,
+                            const float *img,
+                            long long nbatch,
+                            const float *img_origin,
+                            const float *voxsize,
+                            const int *img_dim,
+                            float *p,
+                            long long p_stride)
+{
+  long long img_stride = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  long long b, idx[4];
+  float w[4], toAdd;
+  int i, k, n;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    n = joseph3d_ray_plane_voxels(ray, &pl, i, img_dim, idx, w);
+
+    for(b = 0; b < nbatch; b++)
+    {
+      toAdd = 0;
+      for(k = 0; k < n; k++){toAdd += img[b*img_stride + idx[k]] * w[k];}
+
+      if(toAdd != 0){p[b*p_stride] += (ray->cf * toAdd);}
+    }
+  }
+}
+
+/** @brief Joseph back projection of a batch of values along a single LOR
+ *
+ *  @param ray         geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img         array of shape [nbatch*n0*n1*n2] containing the 3D images used for back projection (output).
+ *                     !! values are added to existing array !!
+ *  @param nbatch      number of images
+ *  @param p           the value p[b*p_stride] is back projected into image b
+ *  @param p_stride    stride of p between two images
+ *  @param img_origin  array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize     array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim     array with dimensions of image [n0,n1,n2]
+ *  @param atomic      unsigned char 0 or 1 whether to use openmp's atomic add
+ */
+void joseph3d_ray_back_batch(const joseph3d_ray *ray,
+                             float *img,
+                             long long nbatch,
+                             const float *p,
+                             long long p_stride,
+                             const float *img_origin,
+                             const float *voxsize,
+                             const int *img_dim,
+                             unsigned char atomic)
+{
+  long long img_stride = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  long long b, idx[4];
+  float w[4], val;
+  int i, k, n;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    n = joseph3d_ray_plane_voxels(ray, &pl, i, img_dim, idx, w);
+
+    for(b = 0; b < nbatch; b++)
+    {
+      val = p[b*p_stride];
+      if(val != 0)
+      {
+        for(k = 0; k < n; k++)
+        {
+          add_to_voxel(img, b*img_stride + idx[k], val * w[k] * ray->cf, atomic);
+        }
+      }
+    }
+  }
+}
+
+/** @brief Joseph TOF forward projection of a batch of images along a single LOR into all TOF bins
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [nbatch*n0*n1*n2] containing the 3D images to be projected.
+ *  @param nbatch       number of images
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins    number of TOF bins
+ *  @param p            (output) the TOF bins of image b are added to p[b*p_stride + it]
+ *  @param p_stride     stride of p between two images
+ */
+void joseph3d_ray_fwd_tof_sino_batch(const joseph3d_ray *ray,
+                                     const float *img,
+                                     long long nbatch,
+                                     const float *img_origin,
+                                     const float *voxsize,
+                                     const int *img_dim,
+                                     float tofbin_width,
+                                     float sig_tof,
+                                     float tc_offset,
+                                     float n_sigmas,
+                                     short n_tofbins,
+                                     float *p,
+                                     long long p_stride)
+{
+  long long img_stride = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  int n_half = n_tofbins/2;
+  int i, k, n, it, it1, it2, istart_tof, iend_tof;
+  long long b, idx[4];
+  float w[4], toAdd, tw;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    n = joseph3d_ray_plane_voxels(ray, &pl, i, img_dim, idx, w);
+
+    if(n == 0){continue;}
+
+    it1 = -n_half;
+    it2 =  n_half;
+
+    // get the relevant tof bins (the TOF bins where the TOF weight is not close to 0)
+    relevant_tof_bins(ray->x_m[0], ray->x_m[1], ray->x_m[2], pl.x_v[0], pl.x_v[1], pl.x_v[2],
+                      ray->u[0], ray->u[1], ray->u[2], 
+                      tofbin_width, tc_offset, sig_tof, n_sigmas, n_half,
+                      &it1, &it2);
+
+    for(it = it1; it <= it2; it++){
+      //--- add extra check to be compatible with behavior of LM projector
+      joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                              &istart_tof, &iend_tof);
+
+      if ((i >= istart_tof) && (i < iend_tof)){
+        // the TOF weight is the same for all images of the batch
+        tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+
+        for(b = 0; b < nbatch; b++)
+        {
+          toAdd = 0;
+          for(k = 0; k < n; k++){toAdd += img[b*img_stride + idx[k]] * w[k];}
+
+          if(toAdd != 0){p[b*p_stride + it + n_half] += (tw * ray->cf * toAdd);}
+        }
+      }
+    }
+  }
+}
+
+/** @brief Joseph TOF back projection of all TOF bins of a batch along a single LOR
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [nbatch*n0*n1*n2] containing the 3D images used for back projection (output).
+ *                      !! values are added to existing array !!
+ *  @param nbatch       number of images
+ *  @param p            the values p[b*p_stride + it] are back projected into image b
+ *  @param p_stride     stride of p between two images
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param n_tofbins    number of TOF bins
+ *  @param atomic       unsigned char 0 or 1 whether to use openmp's atomic add
+ */
+void joseph3d_ray_back_tof_sino_batch(const joseph3d_ray *ray,
+                                      float *img,
+                                      long long nbatch,
+                                      const float *p,
+                                      long long p_stride,
+                                      const float *img_origin,
+                                      const float *voxsize,
+                                      const int *img_dim,
+                                      float tofbin_width,
+                                      float sig_tof,
+                                      float tc_offset,
+                                      float n_sigmas,
+                                      short n_tofbins,
+                                      unsigned char atomic)
+{
+  long long img_stride = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  int n_half = n_tofbins/2;
+  int i, k, n, it, it1, it2, istart_tof, iend_tof;
+  long long b, idx[4];
+  float w[4], tw, val;
+  joseph3d_plane pl;
+
+  for(i = ray->istart; i < ray->iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    n = joseph3d_ray_plane_voxels(ray, &pl, i, img_dim, idx, w);
+
+    if(n == 0){continue;}
+
+    it1 = -n_half;
+    it2 =  n_half;
+
+    // get the relevant tof bins (the TOF bins where the TOF weight is not close to 0)
+    relevant_tof_bins(ray->x_m[0], ray->x_m[1], ray->x_m[2], pl.x_v[0], pl.x_v[1], pl.x_v[2],
+                      ray->u[0], ray->u[1], ray->u[2], 
+                      tofbin_width, tc_offset, sig_tof, n_sigmas, n_half,
+                      &it1, &it2);
+
+    for(it = it1; it <= it2; it++){
+      //--- add extra check to be compatible with behavior of LM projector
+      joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                              &istart_tof, &iend_tof);
+
+      if ((i >= istart_tof) && (i < iend_tof)){
+        tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+
+        for(b = 0; b < nbatch; b++)
+        {
+          val = p[b*p_stride + it + n_half];
+          if(val != 0)
+          {
+            for(k = 0; k < n; k++)
+            {
+              add_to_voxel(img, b*img_stride + idx[k], tw * val * w[k] * ray->cf, atomic);
+            }
+          }
+        }
+      }
+    }
+  }
+}
+
+/** @brief Joseph TOF forward projection of a batch of images along a single LOR into a single TOF bin
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [nbatch*n0*n1*n2] containing the 3D images to be projected.
+ *  @param nbatch       number of images
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param it           TOF bin (0 is the central TOF bin)
+ *  @param p            (output) the TOF weighted line integral of image b is added to p[b*p_stride]
+ *  @param p_stride     stride of p between two images
+ */
+void joseph3d_ray_fwd_tof_lm_batch(const joseph3d_ray *ray,
+                                   const float *img,
+                                   long long nbatch,
+                                   const float *img_origin,
+                                   const float *voxsize,
+                                   const int *img_dim,
+                                   float tofbin_width,
+                                   float sig_tof,
+                                   float tc_offset,
+                                   float n_sigmas,
+                                   short it,
+                                   float *p,
+                                   long long p_stride)
+{
+  long long img_stride = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  int i, k, n, istart, iend, istart_tof, iend_tof;
+  long long b, idx[4];
+  float w[4], toAdd, tw;
+  joseph3d_plane pl;
+
+  joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                          &istart_tof, &iend_tof);
+
+  istart = (istart_tof > ray->istart) ? istart_tof : ray->istart;
+  iend   = (iend_tof < ray->iend) ? iend_tof : ray->iend;
+
+  for(i = istart; i < iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    n = joseph3d_ray_plane_voxels(ray, &pl, i, img_dim, idx, w);
+
+    if(n == 0){continue;}
+
+    tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+
+    for(b = 0; b < nbatch; b++)
+    {
+      toAdd = 0;
+      for(k = 0; k < n; k++){toAdd += img[b*img_stride + idx[k]] * w[k];}
+
+      if(toAdd != 0){p[b*p_stride] += (tw * ray->cf * toAdd);}
+    }
+  }
+}
+
+/** @brief Joseph TOF back projection of a batch of values in a single TOF bin along a single LOR
+ *
+ *  @param ray          geometry of the LOR calculated with joseph3d_ray_setup()
+ *  @param img          array of shape [nbatch*n0*n1*n2] containing the 3D images used for back projection (output).
+ *                      !! values are added to existing array !!
+ *  @param nbatch       number of images
+ *  @param p            the value p[b*p_stride] is back projected into image b
+ *  @param p_stride     stride of p between two images
+ *  @param img_origin   array [x0_0,x0_1,x0_2] of coordinates of the center of the [0,0,0] voxel
+ *  @param voxsize      array [vs0, vs1, vs2] of the voxel sizes
+ *  @param img_dim      array with dimensions of image [n0,n1,n2]
+ *  @param tofbin_width width of the TOF bins in spatial units
+ *  @param sig_tof      TOF resolution (sigma) in spatial units
+ *  @param tc_offset    offset of the central TOF bin from the midpoint of the LOR
+ *  @param n_sigmas     number of sigmas to consider for calculation of TOF kernel
+ *  @param it           TOF bin (0 is the central TOF bin)
+ *  @param atomic       unsigned char 0 or 1 whether to use openmp's atomic add
+ */
+void joseph3d_ray_back_tof_lm_batch(const joseph3d_ray *ray,
+                                    float *img,
+                                    long long nbatch,
+                                    const float *p,
+                                    long long p_stride,
+                                    const float *img_origin,
+                                    const float *voxsize,
+                                    const int *img_dim,
+                                    float tofbin_width,
+                                    float sig_tof,
+                                    float tc_offset,
+                                    float n_sigmas,
+                                    short it,
+                                    unsigned char atomic)
+{
+  long long img_stride = (long long)img_dim[0]*img_dim[1]*img_dim[2];
+  int i, k, n, istart, iend, istart_tof, iend_tof;
+  long long b, idx[4];
+  float w[4], tw, val;
+  joseph3d_plane pl;
+
+  joseph3d_ray_tof_planes(ray, it, img_origin, voxsize, tofbin_width, sig_tof, n_sigmas,
+                          &istart_tof, &iend_tof);
+
+  istart = (istart_tof > ray->istart) ? istart_tof : ray->istart;
+  iend   = (iend_tof < ray->iend) ? iend_tof : ray->iend;
+
+  for(i = istart; i < iend; i++)
+  {
+    joseph3d_ray_plane(ray, i, img_origin, voxsize, &pl);
+    n = joseph3d_ray_plane_voxels(ray, &pl, i, img_dim, idx, w);
+
+    if(n == 0){continue;}
+
+    tw = joseph3d_ray_tof_weight(ray, pl.x_v, it, tofbin_width, sig_tof, tc_offset);
+
+    for(b = 0; b < nbatch; b++)
+    {
+      val = p[b*p_stride];
+      if(val != 0)
+      {
+        for(k = 0; k < n; k++)
+        {
+          add_to_voxel(img, b*img_stride + idx[k], tw * val * w[k] * ray->cf, atomic);
+        }
+      }
+    }
+  }
+}
@@ -0,0 +1,15 @@
+/**
+ * @file openmp_utils.c
+ */
+
+#include<omp.h>
+
+void set_omp_num_threads(int num_threads)
+{
+  omp_set_num_threads(num_threads);
+}
+
+int get_omp_max_threads(void)
+{
+  return omp_get_max_threads();
+}
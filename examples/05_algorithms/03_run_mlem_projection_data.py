@@ -231,8 +231,9 @@ def em_update(
     Array
         _description_
     """
-    ybar = op(x_cur) + s
-    return x_cur * op.adjoint(data / ybar) / adjoint_ones
+    # A^H (data / (A x + s)) - calculated in a single pass by the
+    # non-TOF projectors using the OpenMP backend
+    return x_cur * op.apply_ratio_adjoint(x_cur, data, s) / adjoint_ones
 
 
 # %%
@@ -264,8 +264,9 @@ def lm_em_update(
     -------
     Array
     """
-    ybar = op(x_cur) + s
-    return x_cur * op.adjoint(1 / ybar) / adjoint_ones
+    # A^H (1 / (A x + s)) - calculated in a single pass by the
+    # non-TOF projectors using the OpenMP backend
+    return x_cur * op.apply_ratio_adjoint(x_cur, xp.ones_like(s), s) / adjoint_ones
 
 
 # %%
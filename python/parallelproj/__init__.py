@@ -6,9 +6,21 @@ from .backend import (
     empty_cuda_cache,
 )
 from .backend import num_visible_cuda_devices
+from .backend import set_num_threads, get_num_threads
 from .backend import joseph3d_fwd, joseph3d_back
 from .backend import joseph3d_fwd_tof_sino, joseph3d_back_tof_sino
 from .backend import joseph3d_fwd_tof_lm, joseph3d_back_tof_lm
+from .backend import joseph3d_fwd_back_ratio
+from .backend import joseph3d_fwd_idx, joseph3d_back_idx
+from .backend import joseph3d_fwd_tof_sino_idx, joseph3d_back_tof_sino_idx
+from .backend import joseph3d_fwd_tof_lm_idx, joseph3d_back_tof_lm_idx
+from .backend import joseph3d_fwd_sym, joseph3d_back_sym
+from .backend import joseph3d_fwd_tof_sino_sym, joseph3d_back_tof_sino_sym
+from .backend import joseph3d_fwd_batch, joseph3d_back_batch
+from .backend import joseph3d_fwd_tof_sino_batch, joseph3d_back_tof_sino_batch
+from .backend import joseph3d_fwd_tof_lm_batch, joseph3d_back_tof_lm_batch
+
+from .context import ProjectionContext
 
 from .operators import LinearOperator, MatrixOperator, ElementwiseMultiplicationOperator
 from .operators import TOFNonTOFElementwiseMultiplicationOperator
@@ -25,7 +37,21 @@ from .projectors import (
     ParallelViewProjector3D,
     RegularPolygonPETProjector,
 )
-from .projectors import ListmodePETProjector
+from .projectors import ListmodePETProjector, lor_sort_permutation
+from .projectors import (
+    CompactListmodePETProjector,
+    MemmapListmodePETProjector,
+    listmode_event_dtype,
+    make_listmode_events,
+)
+from .sharding import ShardedProjector, get_numa_node_cpus
+from .serialization import save, load
+from .cache import (
+    SensitivityImageCache,
+    fingerprint,
+    lor_descriptor_fingerprint,
+    projector_fingerprint,
+)
 
 from .pet_scanners import (
     RegularPolygonPETScannerModule,
@@ -43,12 +69,32 @@ __all__ = [
     "is_cuda_array",
     "empty_cuda_cache",
     "num_visible_cuda_devices",
+    "set_num_threads",
+    "get_num_threads",
     "joseph3d_fwd",
     "joseph3d_back",
     "joseph3d_fwd_tof_sino",
     "joseph3d_back_tof_sino",
     "joseph3d_fwd_tof_lm",
     "joseph3d_back_tof_lm",
+    "joseph3d_fwd_back_ratio",
+    "joseph3d_fwd_idx",
+    "joseph3d_back_idx",
+    "joseph3d_fwd_tof_sino_idx",
+    "joseph3d_back_tof_sino_idx",
+    "joseph3d_fwd_tof_lm_idx",
+    "joseph3d_back_tof_lm_idx",
+    "joseph3d_fwd_sym",
+    "joseph3d_back_sym",
+    "joseph3d_fwd_tof_sino_sym",
+    "joseph3d_back_tof_sino_sym",
+    "joseph3d_fwd_batch",
+    "joseph3d_back_batch",
+    "joseph3d_fwd_tof_sino_batch",
+    "joseph3d_back_tof_sino_batch",
+    "joseph3d_fwd_tof_lm_batch",
+    "joseph3d_back_tof_lm_batch",
+    "ProjectionContext",
     "LinearOperator",
     "MatrixOperator",
     "ElementwiseMultiplicationOperator",
@@ -62,6 +108,19 @@ __all__ = [
     "ParallelViewProjector3D",
     "RegularPolygonPETProjector",
     "ListmodePETProjector",
+    "lor_sort_permutation",
+    "CompactListmodePETProjector",
+    "MemmapListmodePETProjector",
+    "listmode_event_dtype",
+    "make_listmode_events",
+    "ShardedProjector",
+    "get_numa_node_cpus",
+    "save",
+    "load",
+    "SensitivityImageCache",
+    "fingerprint",
+    "lor_descriptor_fingerprint",
+    "projector_fingerprint",
     "RegularPolygonPETScannerModule",
     "RegularPolygonPETScannerGeometry",
     "DemoPETScannerGeometry",
@@ -1,10 +1,19 @@
-"""backend functions that interface the parallelproj C/CUDA libraries"""
+"""backend functions that interface the parallelproj C/CUDA libraries
+
+All kernels of the C and CUDA libs compute in float32. float32 and float16
+inputs give results of the same dtype. float64 inputs are converted to float32
+and give float32 results (with a warning) since the projections do not have
+float64 accuracy, all other inputs (e.g. integer sinograms) give float32 results.
+float16 TOF sinograms are converted to / from float32 in chunks of LORs,
+all other float16 inputs are converted to float32 as a whole.
+"""
 from __future__ import annotations
 
 import os
 import shutil
 import importlib.util
 import math
+import logging
 
 import ctypes
 from ctypes import POINTER
@@ -20,6 +29,9 @@ from numpy.array_api._array_object import Array
 import array_api_compat
 
 from types import ModuleType
+from collections.abc import Callable
+
+from .lor_geometry import expand_sym_lor_coordinates
 
 # check if cuda is present
 cuda_present = shutil.which("nvidia-smi") is not None
@@ -34,11 +46,24 @@ torch_enabled = importlib.util.find_spec("torch") is not None
 if cupy_enabled:
     import cupy as cp
 
+logger = logging.getLogger(__name__)
+
 # numpy ctypes lib array definitions
 ar_1d_single = npct.ndpointer(dtype=ctypes.c_float, ndim=1, flags="C")
 ar_1d_int = npct.ndpointer(dtype=ctypes.c_int, ndim=1, flags="C")
 ar_1d_short = npct.ndpointer(dtype=ctypes.c_short, ndim=1, flags="C")
 
+
+class ar_1d_single_or_null:
+    """ctypes argument type of optional float32 arrays (None is passed as NULL)"""
+
+    @classmethod
+    def from_param(cls, obj):
+        if obj is None:
+            return None
+        return ar_1d_single.from_param(obj)
+
+
 # ---------------------------------------------------------------------------------------
 # ---- find the compiled C / CUDA libraries
 
@@ -81,6 +106,30 @@ else:
         ctypes.c_ulonglong,  # nlors
         ar_1d_int,  # img_dim
     ]
+    lib_parallelproj_c.joseph3d_back_private.restype = ctypes.c_int
+    lib_parallelproj_c.joseph3d_back_private.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+    ]
+
+    lib_parallelproj_c.joseph3d_back_slab.restype = ctypes.c_int
+    lib_parallelproj_c.joseph3d_back_slab.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+    ]
+
     lib_parallelproj_c.joseph3d_fwd_tof_sino.restype = None
     lib_parallelproj_c.joseph3d_fwd_tof_sino.argtypes = [
         ar_1d_single,  # xstart
@@ -157,6 +206,339 @@ else:
         ctypes.c_ubyte,  # LOR dep. TOF center offset
     ]
 
+    lib_parallelproj_c.joseph3d_fwd_back_ratio.restype = None
+    lib_parallelproj_c.joseph3d_fwd_back_ratio.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # back_img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # data
+        ar_1d_single,  # contamination
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_ubyte,  # LOR dep. contamination
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_idx.restype = None
+    lib_parallelproj_c.joseph3d_fwd_idx.argtypes = [
+        ar_1d_single,  # lor_endpoints
+        ar_1d_int,  # start_index
+        ar_1d_int,  # end_index
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+    ]
+
+    lib_parallelproj_c.joseph3d_back_idx.restype = None
+    lib_parallelproj_c.joseph3d_back_idx.argtypes = [
+        ar_1d_single,  # lor_endpoints
+        ar_1d_int,  # start_index
+        ar_1d_int,  # end_index
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_tof_sino_idx.restype = None
+    lib_parallelproj_c.joseph3d_fwd_tof_sino_idx.argtypes = [
+        ar_1d_single,  # lor_endpoints
+        ar_1d_int,  # start_index
+        ar_1d_int,  # end_index
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ctypes.c_short,  # n_tofbins
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+    ]
+
+    lib_parallelproj_c.joseph3d_back_tof_sino_idx.restype = None
+    lib_parallelproj_c.joseph3d_back_tof_sino_idx.argtypes = [
+        ar_1d_single,  # lor_endpoints
+        ar_1d_int,  # start_index
+        ar_1d_int,  # end_index
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ctypes.c_short,  # n_tofbins
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_tof_lm_idx.restype = None
+    lib_parallelproj_c.joseph3d_fwd_tof_lm_idx.argtypes = [
+        ar_1d_single,  # lor_endpoints
+        ar_1d_int,  # start_index
+        ar_1d_int,  # end_index
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ar_1d_short,  # tof bin
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+    ]
+
+    lib_parallelproj_c.joseph3d_back_tof_lm_idx.restype = None
+    lib_parallelproj_c.joseph3d_back_tof_lm_idx.argtypes = [
+        ar_1d_single,  # lor_endpoints
+        ar_1d_int,  # start_index
+        ar_1d_int,  # end_index
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ar_1d_short,  # tof bin
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_sym.restype = None
+    lib_parallelproj_c.joseph3d_fwd_sym.argtypes = [
+        ar_1d_single,  # xstart_2d
+        ar_1d_single,  # xend_2d
+        ar_1d_single,  # zstart
+        ar_1d_single,  # zend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # n2d
+        ctypes.c_longlong,  # nplanes
+        ctypes.c_longlong,  # n_inner
+        ar_1d_int,  # img_dim
+        ctypes.c_int,  # symmetry_axis
+    ]
+
+    lib_parallelproj_c.joseph3d_back_sym.restype = None
+    lib_parallelproj_c.joseph3d_back_sym.argtypes = [
+        ar_1d_single,  # xstart_2d
+        ar_1d_single,  # xend_2d
+        ar_1d_single,  # zstart
+        ar_1d_single,  # zend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # n2d
+        ctypes.c_longlong,  # nplanes
+        ctypes.c_longlong,  # n_inner
+        ar_1d_int,  # img_dim
+        ctypes.c_int,  # symmetry_axis
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_tof_sino_sym.restype = None
+    lib_parallelproj_c.joseph3d_fwd_tof_sino_sym.argtypes = [
+        ar_1d_single,  # xstart_2d
+        ar_1d_single,  # xend_2d
+        ar_1d_single,  # zstart
+        ar_1d_single,  # zend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # n2d
+        ctypes.c_longlong,  # nplanes
+        ctypes.c_longlong,  # n_inner
+        ar_1d_int,  # img_dim
+        ctypes.c_int,  # symmetry_axis
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ctypes.c_short,  # n_tofbins
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+    ]
+
+    lib_parallelproj_c.joseph3d_back_tof_sino_sym.restype = None
+    lib_parallelproj_c.joseph3d_back_tof_sino_sym.argtypes = [
+        ar_1d_single,  # xstart_2d
+        ar_1d_single,  # xend_2d
+        ar_1d_single,  # zstart
+        ar_1d_single,  # zend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # n2d
+        ctypes.c_longlong,  # nplanes
+        ctypes.c_longlong,  # n_inner
+        ar_1d_int,  # img_dim
+        ctypes.c_int,  # symmetry_axis
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ctypes.c_short,  # n_tofbins
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_batch.restype = None
+    lib_parallelproj_c.joseph3d_fwd_batch.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_longlong,  # nbatch
+        ar_1d_single_or_null,  # lor_weights
+    ]
+
+    lib_parallelproj_c.joseph3d_back_batch.restype = None
+    lib_parallelproj_c.joseph3d_back_batch.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_longlong,  # nbatch
+        ar_1d_single_or_null,  # lor_weights
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_tof_sino_batch.restype = None
+    lib_parallelproj_c.joseph3d_fwd_tof_sino_batch.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_longlong,  # nbatch
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ctypes.c_short,  # n_tofbins
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+        ar_1d_single_or_null,  # lor_weights
+    ]
+
+    lib_parallelproj_c.joseph3d_back_tof_sino_batch.restype = None
+    lib_parallelproj_c.joseph3d_back_tof_sino_batch.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_longlong,  # nbatch
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ctypes.c_short,  # n_tofbins
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+        ar_1d_single_or_null,  # lor_weights
+    ]
+
+    lib_parallelproj_c.joseph3d_fwd_tof_lm_batch.restype = None
+    lib_parallelproj_c.joseph3d_fwd_tof_lm_batch.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_longlong,  # nbatch
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ar_1d_short,  # tof bin
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+        ar_1d_single_or_null,  # lor_weights
+    ]
+
+    lib_parallelproj_c.joseph3d_back_tof_lm_batch.restype = None
+    lib_parallelproj_c.joseph3d_back_tof_lm_batch.argtypes = [
+        ar_1d_single,  # xstart
+        ar_1d_single,  # xend
+        ar_1d_single,  # img
+        ar_1d_single,  # img_origin
+        ar_1d_single,  # voxsize
+        ar_1d_single,  # p
+        ctypes.c_longlong,  # nlors
+        ar_1d_int,  # img_dim
+        ctypes.c_longlong,  # nbatch
+        ctypes.c_float,  # tofbin_width
+        ar_1d_single,  # sigma tof
+        ar_1d_single,  # tofcenter_offset
+        ctypes.c_float,  # n_sigmas
+        ar_1d_short,  # tof bin
+        ctypes.c_ubyte,  # LOR dep. TOF sigma
+        ctypes.c_ubyte,  # LOR dep. TOF center offset
+        ar_1d_single_or_null,  # lor_weights
+    ]
+
+    lib_parallelproj_c.set_omp_num_threads.restype = None
+    lib_parallelproj_c.set_omp_num_threads.argtypes = [ctypes.c_int]
+
+    lib_parallelproj_c.get_omp_max_threads.restype = ctypes.c_int
+    lib_parallelproj_c.get_omp_max_threads.argtypes = []
+
+# C functions implementing the different accumulation strategies of the
+# non-TOF back projection
+_back_accumulation_funcs = {
+    "atomic": lib_parallelproj_c.joseph3d_back,
+    "private": lib_parallelproj_c.joseph3d_back_private,
+    "slab": lib_parallelproj_c.joseph3d_back_slab,
+}
+
+# maximum number of LORs converted at once between float16 storage and
+# float32 computations in the TOF sinogram projectors
+_float16_chunk_size = 2**20
+
 # ---------------------------------------------------------------------------------------
 
 num_visible_cuda_devices = 0
@@ -422,25 +804,2621 @@ def empty_cuda_cache(xp: ModuleType) -> None:
         xp.cuda.empty_cache()
 
 
-def joseph3d_fwd(
-    xstart: Array,
-    xend: Array,
-    img: Array,
-    img_origin: Array,
-    voxsize: Array,
-    threadsperblock: int = 32,
-    num_chunks: int = 1,
-) -> Array:
-    """Non-TOF Joseph 3D forward projector
+def set_num_threads(num_threads: int) -> None:
+    """set the number of OpenMP threads used by the projectors of the C lib
 
     Parameters
     ----------
-    xstart : Array
+    num_threads : int
+        number of threads
+    """
+    lib_parallelproj_c.set_omp_num_threads(num_threads)
+
+
+def get_num_threads() -> int:
+    """get the number of OpenMP threads used by the projectors of the C lib"""
+    return lib_parallelproj_c.get_omp_max_threads()
+
+
+def _as_float32_buffer(x: Array, name: str = "array") -> np.ndarray:
+    """flat C-contiguous float32 numpy view of x that can be passed to the C lib
+
+    numpy arrays, numpy.array_api arrays and torch CPU tensors that are C-contiguous
+    and float32 are passed by pointer (via DLPack or the array interface) without
+    copying, all other arrays are copied (reported via debug logging)
+    """
+    if isinstance(x, np.ndarray):
+        a = x
+    elif hasattr(x, "__dlpack__"):
+        try:
+            a = np.from_dlpack(x)
+        except (BufferError, RuntimeError, TypeError):
+            a = np.asarray(x)
+    else:
+        a = np.asarray(x)
+
+    if a.dtype != np.float32 or not a.flags.c_contiguous:
+        logger.debug(
+            f"copying {name} with shape {a.shape} and dtype {a.dtype} "
+            f"(C-contiguous: {a.flags.c_contiguous}) to C-contiguous float32"
+        )
+        a = np.ascontiguousarray(a, dtype=np.float32)
+
+    return a.reshape(-1)
+
+
+def _get_output_buffer(
+    out: None | Array, shape: tuple[int, ...], fill_zero: bool = False
+) -> np.ndarray:
+    """C-contiguous float32 numpy array of a given shape the C lib can write into
+
+    if out can be used directly (CPU, float32, C-contiguous, correct shape)
+    a view of out is returned (set to 0 if fill_zero is True),
+    otherwise a new array of zeros is allocated
+    """
+    if out is not None and not is_cuda_array(out):
+        try:
+            # np.asarray returns a writeable view for numpy.array_api arrays
+            # and torch CPU tensors (DLPack views are read-only)
+            a = np.asarray(out)
+        except (RuntimeError, TypeError, ValueError):
+            a = None
+
+        if (
+            a is not None
+            and a.dtype == np.float32
+            and a.flags.c_contiguous
+            and a.flags.writeable
+            and tuple(a.shape) == tuple(shape)
+        ):
+            if fill_zero:
+                a[...] = 0
+            return a
+
+        logger.debug(
+            f"output buffer of type {type(out)} can not be written directly, "
+            f"the result is copied into it"
+        )
+
+    return np.zeros(shape, dtype=np.float32)
+
+
+def _get_back_output_buffer(
+    out: None | Array, img_shape: tuple[int, int, int], accumulate: bool
+) -> np.ndarray:
+    """output buffer for back projections using the C or hybrid CUDA lib
+
+    if accumulate is True, a directly writeable out is not set to 0 such that
+    the C lib adds to its content. The hybrid CUDA lib sums the image over all
+    devices, which is why it always starts from a new image of zeros in this case.
+    """
+    if accumulate and num_visible_cuda_devices > 0:
+        return np.zeros(img_shape, dtype=np.float32)
+
+    return _get_output_buffer(out, img_shape, fill_zero=not accumulate)
+
+
+def _finalize_output(
+    xp: ModuleType,
+    res: Array,
+    out: None | Array,
+    x: Array,
+    accumulate: bool = False,
+) -> Array:
+    """convert the result of a projection to the array type, device and dtype of x
+    or copy (add if accumulate is True) it into the output buffer out
+    (if it was not written directly)"""
+    if out is None:
+        return _to_result(xp, res, x)
+
+    if not (isinstance(res, np.ndarray) and _shares_memory(res, out)):
+        if accumulate:
+            out += _to_result(xp, res, x)
+        else:
+            out[...] = _to_result(xp, res, x)
+
+    return out
+
+
+def _shares_memory(a: np.ndarray, out: Array) -> bool:
+    """whether the numpy array a is a view of the output buffer out"""
+    if is_cuda_array(out):
+        return False
+    try:
+        return np.shares_memory(a, np.asarray(out))
+    except (RuntimeError, TypeError, ValueError):
+        return False
+
+
+def _result_dtype(xp: ModuleType, x: Array):
+    """floating point dtype of the result of a projection of x
+
+    float16 and float32 inputs keep their dtype, all other dtypes (e.g. integer
+    sinograms) result in float32. float64 inputs raise a warning since the
+    projections are always computed in float32.
+    """
+    if xp.isdtype(x.dtype, "real floating"):
+        if x.dtype != xp.float64:
+            return x.dtype
+        warn("float64 inputs are projected in float32 and give float32 results")
+    return xp.float32
+
+
+def _to_result(xp: ModuleType, res: Array, x: Array) -> Array:
+    """convert the (float32) result of a projection to the array type,
+    device and result dtype (see _result_dtype) of the input x"""
+    res = xp.asarray(res, device=array_api_compat.device(x))
+
+    dtype = _result_dtype(xp, x)
+    if res.dtype != dtype:
+        res = xp.astype(res, dtype)
+
+    return res
+
+
+def _is_float16(xp: ModuleType, x: Array) -> bool:
+    """whether x is stored in float16 (not available in all array namespaces)"""
+    return hasattr(xp, "float16") and x.dtype == xp.float16
+
+
+def _float16_chunks(nLORs: int) -> list[int]:
+    """chunks used to convert float16 sinograms to / from float32 such that
+    only float32 buffers of at most _float16_chunk_size LORs are needed"""
+    return calc_chunks(nLORs, max(1, math.ceil(nLORs / _float16_chunk_size)))
+
+
+def _lor_weights_buffer(lor_weights: None | Array, nLORs: int) -> None | np.ndarray:
+    """flat float32 buffer of the LOR weights that can be passed to the C lib
+    (None if lor_weights is None)"""
+    if lor_weights is None:
+        return None
+
+    w = _as_float32_buffer(lor_weights, "lor_weights")
+
+    if w.shape[0] != nLORs:
+        raise ValueError(f"lor_weights must have {nLORs} elements")
+
+    return w
+
+
+def _lor_weighted(x: Array, lor_weights: Array, tof: bool = False) -> Array:
+    """x multiplied with LOR weights (broadcasted over the TOF bins if tof is True)
+
+    used by the code paths where the weights are not applied in the kernels
+    """
+    xp = array_api_compat.get_namespace(x)
+    shape = x.shape[:-1] if tof else x.shape
+
+    w = xp.reshape(
+        xp.asarray(lor_weights, device=array_api_compat.device(x)), shape
+    )
+
+    if tof:
+        w = xp.expand_dims(w, axis=-1)
+
+    return x * w
+
+
+def _lor_buffers(xstart: Array, xend: Array) -> tuple[np.ndarray, np.ndarray]:
+    """flat float32 buffers of the LOR start and end coordinates for the C lib"""
+    return _as_float32_buffer(xstart, "xstart"), _as_float32_buffer(xend, "xend")
+
+
+def _check_lor_indices(
+    lor_endpoints: Array, start_index: Array, end_index: Array
+) -> None:
+    """raise a ValueError if an LOR endpoint index is not in [0, num_lor_endpoints)
+
+    the kernels do not check the indices, such that invalid indices would
+    read outside of lor_endpoints
+    """
+    num_endpoints = array_api_compat.size(lor_endpoints) // 3
+
+    for name, idx in (("start_index", start_index), ("end_index", end_index)):
+        if array_api_compat.size(idx) == 0:
+            continue
+        xp = array_api_compat.get_namespace(idx)
+        if int(xp.min(idx)) < 0 or int(xp.max(idx)) >= num_endpoints:
+            raise ValueError(
+                f"{name} must be in [0, {num_endpoints}) (number of LOR endpoints)"
+            )
+
+
+def _lor_index_buffers(
+    lor_endpoints: Array, start_index: Array, end_index: Array
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """buffers of the LOR endpoint coordinates and (checked) indices for the C lib"""
+    _check_lor_indices(lor_endpoints, start_index, end_index)
+    return (
+        _as_float32_buffer(lor_endpoints, "lor_endpoints"),
+        np.asarray(start_index, dtype=np.int32).ravel(),
+        np.asarray(end_index, dtype=np.int32).ravel(),
+    )
+
+
+def _sym_lor_buffers(
+    xstart_2d: Array, xend_2d: Array, zstart: Array, zend: Array
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """buffers of the plane 0 LOR coordinates and the plane coordinates
+    for the C lib"""
+    return (
+        _as_float32_buffer(xstart_2d, "xstart_2d"),
+        _as_float32_buffer(xend_2d, "xend_2d"),
+        np.asarray(zstart, dtype=np.float32).ravel(),
+        np.asarray(zend, dtype=np.float32).ravel(),
+    )
+
+
+def _tof_args(
+    nLORs: int,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    tof: int | Array,
+) -> tuple:
+    """TOF arguments of the functions of the C and the hybrid CUDA lib
+
+    tof is the number of TOF bins (sinogram projectors) or the array
+    containing the TOF bins of all events (listmode projectors)
+    """
+    return (
+        np.float32(tofbin_width),
+        np.asarray(sigma_tof, dtype=np.float32).ravel(),
+        np.asarray(tofcenter_offset, dtype=np.float32).ravel(),
+        np.float32(nsigmas),
+        np.int16(tof) if np.ndim(tof) == 0 else np.asarray(tof, dtype=np.int16).ravel(),
+        np.uint8(sigma_tof.shape[0] == nLORs),
+        np.uint8(tofcenter_offset.shape[0] == nLORs),
+    )
+
+
+def _tof_args_chunk(tof_args: tuple, i0: int, i1: int) -> tuple:
+    """TOF arguments (see _tof_args) of the LORs i0 to i1"""
+    (
+        tofbin_width,
+        sigma_tof,
+        tofcenter_offset,
+        nsigmas,
+        tof,
+        lor_dependent_sigma_tof,
+        lor_dependent_tofcenter_offset,
+    ) = tof_args
+
+    return (
+        tofbin_width,
+        sigma_tof[i0:i1] if lor_dependent_sigma_tof else sigma_tof,
+        tofcenter_offset[i0:i1] if lor_dependent_tofcenter_offset else tofcenter_offset,
+        nsigmas,
+        tof if tof.ndim == 0 else tof[i0:i1],
+        lor_dependent_sigma_tof,
+        lor_dependent_tofcenter_offset,
+    )
+
+
+def _omp_fwd(
+    c_func: Callable,
+    geometry: tuple,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    out_shape: tuple[int, ...],
+    size_args: tuple,
+    extra_args: tuple = (),
+    out: None | Array = None,
+    batch: bool = False,
+) -> Array:
+    """forward projection of a CPU array using a function of the OpenMP lib
+
+    c_func is called as
+    c_func(*geometry, img, img_origin, voxsize, img_fwd, *size_args, img_dim,
+    *extra_args) where img_dim is the shape of a single image
+    (img.shape[1:] if batch is True)
+    """
+    xp = array_api_compat.get_namespace(img)
+    img_fwd = _get_output_buffer(out, out_shape)
+
+    c_func(
+        *geometry,
+        _as_float32_buffer(img, "img"),
+        np.asarray(img_origin, dtype=np.float32),
+        np.asarray(voxsize, dtype=np.float32),
+        img_fwd.ravel(),
+        *size_args,
+        np.asarray(img.shape[1:] if batch else img.shape, dtype=np.int32),
+        *extra_args,
+    )
+
+    return _finalize_output(xp, img_fwd, out, img)
+
+
+def _omp_back(
+    c_func: Callable,
+    geometry: tuple,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    size_args: tuple,
+    extra_args: tuple = (),
+    out: None | Array = None,
+    accumulate: bool = False,
+    nbatch: None | int = None,
+) -> Array:
+    """back projection of a CPU array using a function of the OpenMP lib
+
+    c_func is called as
+    c_func(*geometry, back_img, img_origin, voxsize, img_fwd, *size_args,
+    img_shape, *extra_args) where back_img contains nbatch images if nbatch
+    is not None. A non-zero return value (allocation failure) raises a
+    MemoryError.
+    """
+    xp = array_api_compat.get_namespace(img_fwd)
+    back_shape = tuple(img_shape) if nbatch is None else (nbatch,) + tuple(img_shape)
+    back_img = _get_back_output_buffer(out, back_shape, accumulate)
+
+    status = c_func(
+        *geometry,
+        back_img.ravel(),
+        np.asarray(img_origin, dtype=np.float32),
+        np.asarray(voxsize, dtype=np.float32),
+        _as_float32_buffer(img_fwd, "img_fwd"),
+        *size_args,
+        np.asarray(img_shape, dtype=np.int32),
+        *extra_args,
+    )
+
+    if status:
+        raise MemoryError(f"could not allocate the buffers of {c_func.__name__}")
+
+    return _finalize_output(xp, back_img, out, img_fwd, accumulate)
+
+
+def _hybrid_fwd(
+    cuda_func: Callable,
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: np.ndarray,
+    num_chunks: int,
+    threadsperblock: int,
+    tof_args: None | tuple = None,
+    values_per_lor: int = 1,
+    d_img: None | ctypes._Pointer = None,
+) -> None:
+    """forward projection of a CPU array into the float32 buffer img_fwd
+    using a function of the hybrid CUDA lib
+
+    The image is copied to all devices (unless d_img, the device arrays
+    returned by copy_float_array_to_all_devices, is given) and the LORs are
+    projected in num_chunks chunks. For every chunk cuda_func is called as
+    cuda_func(xstart, xend, d_img, img_origin, voxsize, img_fwd, nLORs,
+    img_dim, *tof_args, threadsperblock).
+    """
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+
+    # send image to all devices
+    free_d_img = d_img is None
+    if free_d_img:
+        d_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
+            _as_float32_buffer(img, "img"),
+            ctypes.c_longlong(array_api_compat.size(img)),
+        )
+
+    xstart_2d = np.asarray(xstart, dtype=np.float32).reshape(-1, 3)
+    xend_2d = np.asarray(xend, dtype=np.float32).reshape(-1, 3)
+    img_fwd_flat = img_fwd.ravel()
+
+    # split call to GPU lib into chunks (useful for systems with
+    # limited memory)
+    ic = calc_chunks(nLORs, num_chunks)
+
+    for i in range(num_chunks):
+        cuda_func(
+            xstart_2d[ic[i] : ic[i + 1], :].ravel(),
+            xend_2d[ic[i] : ic[i + 1], :].ravel(),
+            d_img,
+            np.asarray(img_origin, dtype=np.float32),
+            np.asarray(voxsize, dtype=np.float32),
+            img_fwd_flat[values_per_lor * ic[i] : values_per_lor * ic[i + 1]],
+            ic[i + 1] - ic[i],
+            np.asarray(img.shape, dtype=np.int32),
+            *(() if tof_args is None else _tof_args_chunk(tof_args, ic[i], ic[i + 1])),
+            threadsperblock,
+        )
+
+    # free image device arrays
+    if free_d_img:
+        lib_parallelproj_cuda.free_float_array_on_all_devices(d_img)
+
+
+def _hybrid_back(
+    cuda_func: Callable,
+    xstart: Array,
+    xend: Array,
+    back_img: np.ndarray,
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    num_chunks: int,
+    threadsperblock: int,
+    tof_args: None | tuple = None,
+    values_per_lor: int = 1,
+) -> None:
+    """back projection of a CPU array into the float32 buffer back_img
+    using a function of the hybrid CUDA lib
+
+    The LORs are back projected in num_chunks chunks (see _hybrid_fwd) and
+    the back projections of all devices are summed into back_img.
+    """
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    num_voxel = ctypes.c_longlong(array_api_compat.size(back_img))
+
+    # send image to all devices
+    d_back_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
+        back_img.ravel(), num_voxel
+    )
+
+    xstart_2d = np.asarray(xstart, dtype=np.float32).reshape(-1, 3)
+    xend_2d = np.asarray(xend, dtype=np.float32).reshape(-1, 3)
+    img_fwd_flat = _as_float32_buffer(img_fwd, "img_fwd")
+
+    # split call to GPU lib into chunks (useful for systems with
+    # limited memory)
+    ic = calc_chunks(nLORs, num_chunks)
+
+    for i in range(num_chunks):
+        cuda_func(
+            xstart_2d[ic[i] : ic[i + 1], :].ravel(),
+            xend_2d[ic[i] : ic[i + 1], :].ravel(),
+            d_back_img,
+            np.asarray(img_origin, dtype=np.float32),
+            np.asarray(voxsize, dtype=np.float32),
+            img_fwd_flat[values_per_lor * ic[i] : values_per_lor * ic[i + 1]],
+            ic[i + 1] - ic[i],
+            np.asarray(back_img.shape, dtype=np.int32),
+            *(() if tof_args is None else _tof_args_chunk(tof_args, ic[i], ic[i + 1])),
+            threadsperblock,
+        )
+
+    # sum all device arrays in the first device
+    lib_parallelproj_cuda.sum_float_arrays_on_first_device(d_back_img, num_voxel)
+
+    # copy summed image back from first device
+    lib_parallelproj_cuda.get_float_array_from_device(
+        d_back_img, num_voxel, 0, back_img.ravel()
+    )
+
+    # free image device arrays
+    lib_parallelproj_cuda.free_float_array_on_all_devices(d_back_img)
+
+
+def _cupy_fwd(
+    kernel: Callable,
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    out_shape: tuple[int, ...],
+    threadsperblock: int,
+    extra_args: tuple = (),
+) -> Array:
+    """forward projection of a GPU array (cupy or torch) using a cupy raw kernel
+
+    kernel is called with the arguments
+    (xstart, xend, img, img_origin, voxsize, img_fwd, nLORs, img_dim, *extra_args)
+    """
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    img_fwd = cp.zeros(out_shape, dtype=cp.float32)
+
+    kernel(
+        (math.ceil(nLORs / threadsperblock),),
+        (threadsperblock,),
+        (
+            cp.asarray(xstart, dtype=cp.float32).ravel(),
+            cp.asarray(xend, dtype=cp.float32).ravel(),
+            cp.asarray(img, dtype=cp.float32).ravel(),
+            cp.asarray(img_origin, dtype=cp.float32),
+            cp.asarray(voxsize, dtype=cp.float32),
+            img_fwd.ravel(),
+            nLORs,
+            cp.asarray(img.shape, dtype=cp.int32),
+            *extra_args,
+        ),
+    )
+    cp.cuda.Device().synchronize()
+
+    return img_fwd
+
+
+def _cupy_back(
+    kernel: Callable,
+    xstart: Array,
+    xend: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    threadsperblock: int,
+    extra_args: tuple = (),
+) -> Array:
+    """back projection of a GPU array (cupy or torch) using a cupy raw kernel
+
+    kernel is called with the arguments
+    (xstart, xend, back_img, img_origin, voxsize, img_fwd, nLORs, img_dim,
+    *extra_args)
+    """
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    back_img = cp.zeros(img_shape, dtype=cp.float32)
+
+    kernel(
+        (math.ceil(nLORs / threadsperblock),),
+        (threadsperblock,),
+        (
+            cp.asarray(xstart, dtype=cp.float32).ravel(),
+            cp.asarray(xend, dtype=cp.float32).ravel(),
+            back_img.ravel(),
+            cp.asarray(img_origin, dtype=cp.float32),
+            cp.asarray(voxsize, dtype=cp.float32),
+            cp.asarray(img_fwd, dtype=cp.float32).ravel(),
+            nLORs,
+            cp.asarray(back_img.shape, dtype=cp.int32),
+            *extra_args,
+        ),
+    )
+    cp.cuda.Device().synchronize()
+
+    return back_img
+
+
+def _cupy_tof_args(
+    nLORs: int,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    tof: int | Array,
+) -> tuple:
+    """TOF arguments of the cupy raw kernels
+
+    tof is the number of TOF bins (sinogram kernels, where it is the
+    first TOF argument) or the array containing the TOF bins of all events
+    (listmode kernels)
+    """
+    tof_args = (
+        np.float32(tofbin_width),
+        cp.asarray(sigma_tof, dtype=cp.float32).ravel(),
+        cp.asarray(tofcenter_offset, dtype=cp.float32).ravel(),
+        np.float32(nsigmas),
+    )
+    lor_dependent = (
+        np.uint8(sigma_tof.shape[0] == nLORs),
+        np.uint8(tofcenter_offset.shape[0] == nLORs),
+    )
+
+    if np.ndim(tof) == 0:
+        return (np.int16(tof),) + tof_args + lor_dependent
+
+    return tof_args + (cp.asarray(tof, dtype=cp.int16).ravel(),) + lor_dependent
+
+
+def joseph3d_fwd(
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    lor_weights: None | Array = None,
+) -> Array:
+    """Non-TOF Joseph 3D forward projector
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the LORs, shape (nLORs, 3)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1], by default None
+        applied on the fly in the kernels of the OpenMP lib
+    """
+
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    xp = array_api_compat.get_namespace(img)
+
+    if not is_cuda_array(img) and num_visible_cuda_devices == 0:
+        # projection of numpy or torch CPU array using the openmp parallelproj lib
+        if lor_weights is None:
+            c_func = lib_parallelproj_c.joseph3d_fwd
+            extra_args = ()
+        else:
+            # the LOR weights are applied in the kernels of the OpenMP lib
+            c_func = lib_parallelproj_c.joseph3d_fwd_batch
+            extra_args = (np.int64(1), _lor_weights_buffer(lor_weights, nLORs))
+
+        return _omp_fwd(
+            c_func,
+            _lor_buffers(xstart, xend),
+            img,
+            img_origin,
+            voxsize,
+            xstart.shape[:-1],
+            (nLORs,),
+            extra_args,
+            out=out,
+        )
+
+    if is_cuda_array(img):
+        # projection of cupy or torch GPU array using the cupy raw kernel
+        img_fwd = _cupy_fwd(
+            _joseph3d_fwd_cuda_kernel,
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            xstart.shape[:-1],
+            threadsperblock,
+        )
+    else:
+        # projection of numpy or torch CPU array using the cuda parallelproj lib
+        img_fwd = _get_output_buffer(out, xstart.shape[:-1])
+        _hybrid_fwd(
+            lib_parallelproj_cuda.joseph3d_fwd_cuda,
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            img_fwd,
+            num_chunks,
+            threadsperblock,
+        )
+
+    if lor_weights is not None:
+        img_fwd = _lor_weighted(img_fwd, lor_weights, tof=False)
+
+    return _finalize_output(xp, img_fwd, out, img)
+
+
+def joseph3d_back(
+    xstart: Array,
+    xend: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    accumulation: str = "atomic",
+    out: None | Array = None,
+    accumulate: bool = False,
+    lor_weights: None | Array = None,
+) -> Array:
+    """Non-TOF Joseph 3D back projector
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the LORs, shape (nLORs, 3)
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        array of length nLORs containing the values to be back projected
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the back projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    accumulation : str, optional
+        strategy used by the OpenMP lib to accumulate the back projections
+        of all threads into the output image, by default "atomic"
+
+        - "atomic": all threads update one image using atomic adds
+        - "private": every thread updates its own image, followed by a
+          parallel reduction (needs memory for one image per thread)
+        - "slab": LORs are sorted by their dominant axis and every thread
+          exclusively updates a slab of image planes perpendicular to it
+
+        ignored by the CUDA libs which always use atomic adds
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the values before
+        back projection, by default None
+        applied on the fly in the kernels of the OpenMP lib
+    """
+
+    if accumulation not in _back_accumulation_funcs:
+        raise ValueError(
+            f"accumulation must be one of {list(_back_accumulation_funcs.keys())}"
+        )
+
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    xp = array_api_compat.get_namespace(img_fwd)
+
+    # the LOR weights are applied in the kernels of the OpenMP lib
+    fused_weights = (
+        lor_weights is not None
+        and not is_cuda_array(img_fwd)
+        and num_visible_cuda_devices == 0
+        and accumulation == "atomic"
+    )
+
+    if lor_weights is not None and not fused_weights:
+        img_fwd = _lor_weighted(img_fwd, lor_weights, tof=False)
+
+    if not is_cuda_array(img_fwd) and num_visible_cuda_devices == 0:
+        # back projection of numpy or torch CPU array using the openmp lib
+        if fused_weights:
+            c_func = lib_parallelproj_c.joseph3d_back_batch
+            extra_args = (np.int64(1), _lor_weights_buffer(lor_weights, nLORs))
+        else:
+            c_func = _back_accumulation_funcs[accumulation]
+            extra_args = ()
+
+        return _omp_back(
+            c_func,
+            _lor_buffers(xstart, xend),
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            (nLORs,),
+            extra_args,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    if is_cuda_array(img_fwd):
+        # back projection of cupy or torch GPU array using the cupy raw kernel
+        back_img = _cupy_back(
+            _joseph3d_back_cuda_kernel,
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            threadsperblock,
+        )
+    else:
+        # back projection of numpy or torch CPU array using the cuda lib
+        back_img = _get_back_output_buffer(out, img_shape, accumulate)
+        _hybrid_back(
+            lib_parallelproj_cuda.joseph3d_back_cuda,
+            xstart,
+            xend,
+            back_img,
+            img_origin,
+            voxsize,
+            img_fwd,
+            num_chunks,
+            threadsperblock,
+        )
+
+    return _finalize_output(xp, back_img, out, img_fwd, accumulate)
+
+
+def joseph3d_fwd_back_ratio(
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    data: Array,
+    contamination: float | Array = 0.0,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """Non-TOF Joseph 3D "ratio" back projection A^T (data / (A img + contamination))
+
+    Using the OpenMP lib, the forward projection, division and back projection
+    are fused into a single pass over all LORs such that the
+    geometry of every LOR is only calculated once and the forward projection
+    is never stored. LORs where data is 0 are skipped.
+    Using the CUDA libs, separate forward and back projections are used.
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the LORs, shape (nLORs, 3)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    data : Array
+        array of length nLORs containing the data (numerator)
+    contamination : float | Array, optional
+        additive contamination (scalar or array of length nLORs)
+        added to the forward projection, by default 0.0
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projections in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+    """
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    xp = array_api_compat.get_namespace(img)
+
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        img_fwd = joseph3d_fwd(
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+        )
+
+        return joseph3d_back(
+            xstart,
+            xend,
+            img.shape,
+            img_origin,
+            voxsize,
+            data / (img_fwd + contamination),
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    back_img = _get_back_output_buffer(out, img.shape, accumulate)
+    contamination = np.asarray(contamination, dtype=np.float32).ravel()
+
+    # projection of numpy array using the openmp parallelproj lib
+    lib_parallelproj_c.joseph3d_fwd_back_ratio(
+        _as_float32_buffer(xstart, "xstart"),
+        _as_float32_buffer(xend, "xend"),
+        _as_float32_buffer(img, "img"),
+        back_img.ravel(),
+        np.asarray(img_origin, dtype=np.float32),
+        np.asarray(voxsize, dtype=np.float32),
+        _as_float32_buffer(data, "data"),
+        contamination,
+        nLORs,
+        np.asarray(img.shape, dtype=np.int32),
+        np.uint8(contamination.size > 1),
+    )
+
+    return _finalize_output(xp, back_img, out, img, accumulate)
+
+
+def joseph3d_fwd_tof_sino(
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    ntofbins: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    lor_weights: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D sinogram forward projector
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the LORs, shape (nLORs, 3)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as xstart)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units (same units as xstart)
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units (same units as xstart)
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length nLORs -> LOR dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    ntofbins: int
+        total number of TOF bins
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1], by default None
+        applied on the fly in the kernels of the OpenMP lib
+
+    Returns
+    -------
+    Array
+    """
+
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    xp = array_api_compat.get_namespace(img)
+    sino_shape = tuple(xstart.shape[:-1]) + (ntofbins,)
+
+    if is_cuda_array(img):
+        # projection of cupy or torch GPU array using the cupy raw kernel
+        img_fwd = _cupy_fwd(
+            _joseph3d_fwd_tof_sino_cuda_kernel,
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            sino_shape,
+            threadsperblock,
+            _cupy_tof_args(
+                nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+            ),
+        )
+    else:
+        tof_args = _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+        )
+
+        if num_visible_cuda_devices > 0:
+            # projection of numpy or torch CPU array using the cuda lib
+            img_fwd = _get_output_buffer(out, sino_shape)
+            _hybrid_fwd(
+                lib_parallelproj_cuda.joseph3d_fwd_tof_sino_cuda,
+                xstart,
+                xend,
+                img,
+                img_origin,
+                voxsize,
+                img_fwd,
+                num_chunks,
+                threadsperblock,
+                tof_args,
+                values_per_lor=ntofbins,
+            )
+        elif _is_float16(xp, img):
+            # float16 storage of the TOF sinogram: project chunks of LORs into
+            # a float32 buffer to avoid a float32 copy of the whole sinogram
+            img_fwd = np.zeros(sino_shape, dtype=np.float16)
+            img_fwd_2d = img_fwd.reshape(-1, ntofbins)
+
+            xstart_buf, xend_buf = _lor_buffers(xstart, xend)
+            xstart_2d = xstart_buf.reshape(-1, 3)
+            xend_2d = xend_buf.reshape(-1, 3)
+            img32 = _as_float32_buffer(img, "img")
+
+            ic = _float16_chunks(nLORs)
+
+            for i in range(len(ic) - 1):
+                tmp = np.zeros((ic[i + 1] - ic[i], ntofbins), dtype=np.float32)
+
+                lib_parallelproj_c.joseph3d_fwd_tof_sino(
+                    xstart_2d[ic[i] : ic[i + 1], :].ravel(),
+                    xend_2d[ic[i] : ic[i + 1], :].ravel(),
+                    img32,
+                    np.asarray(img_origin, dtype=np.float32),
+                    np.asarray(voxsize, dtype=np.float32),
+                    tmp.ravel(),
+                    np.int64(ic[i + 1] - ic[i]),
+                    np.asarray(img.shape, dtype=np.int32),
+                    *_tof_args_chunk(tof_args, ic[i], ic[i + 1]),
+                )
+
+                img_fwd_2d[ic[i] : ic[i + 1], :] = tmp
+        else:
+            # projection of numpy or torch CPU array using the openmp lib
+            if lor_weights is None:
+                c_func = lib_parallelproj_c.joseph3d_fwd_tof_sino
+                extra_args = tof_args
+            else:
+                # the LOR weights are applied in the kernels of the OpenMP lib
+                c_func = lib_parallelproj_c.joseph3d_fwd_tof_sino_batch
+                extra_args = (
+                    (np.int64(1),)
+                    + tof_args
+                    + (_lor_weights_buffer(lor_weights, nLORs),)
+                )
+
+            return _omp_fwd(
+                c_func,
+                _lor_buffers(xstart, xend),
+                img,
+                img_origin,
+                voxsize,
+                sino_shape,
+                (nLORs,),
+                extra_args,
+                out=out,
+            )
+
+    if lor_weights is not None:
+        img_fwd = _lor_weighted(img_fwd, lor_weights, tof=True)
+
+    return _finalize_output(xp, img_fwd, out, img)
+
+
+def joseph3d_back_tof_sino(
+    xstart: Array,
+    xend: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    ntofbins: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+    lor_weights: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D sinogram back projector
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the LORs, shape (nLORs, 3)
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        array of size nLOR*ntofbins containing the values to be back projected
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as xstart)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units (same units as xstart)
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units (same units as xstart)
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length nLORs -> LOR dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    ntofbins: int
+        total number of TOF bins
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the values before
+        back projection, by default None
+        applied on the fly in the kernels of the OpenMP lib
+
+    Returns
+    -------
+    Array
+    """
+
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    xp = array_api_compat.get_namespace(img_fwd)
+
+    # the LOR weights are applied in the kernels of the OpenMP lib
+    fused_weights = (
+        lor_weights is not None
+        and not is_cuda_array(img_fwd)
+        and num_visible_cuda_devices == 0
+        and not _is_float16(xp, img_fwd)
+    )
+
+    if lor_weights is not None and not fused_weights:
+        img_fwd = _lor_weighted(img_fwd, lor_weights, tof=True)
+
+    if is_cuda_array(img_fwd):
+        # back projection of cupy or torch GPU array using the cupy raw kernel
+        back_img = _cupy_back(
+            _joseph3d_back_tof_sino_cuda_kernel,
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            threadsperblock,
+            _cupy_tof_args(
+                nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+            ),
+        )
+    else:
+        tof_args = _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+        )
+
+        if num_visible_cuda_devices > 0:
+            # back projection of numpy or torch CPU array using the cuda lib
+            back_img = _get_back_output_buffer(out, img_shape, accumulate)
+            _hybrid_back(
+                lib_parallelproj_cuda.joseph3d_back_tof_sino_cuda,
+                xstart,
+                xend,
+                back_img,
+                img_origin,
+                voxsize,
+                img_fwd,
+                num_chunks,
+                threadsperblock,
+                tof_args,
+                values_per_lor=ntofbins,
+            )
+        elif _is_float16(xp, img_fwd):
+            # float16 storage of the TOF sinogram: convert chunks of LORs
+            # to float32 and accumulate their back projections
+            back_img = _get_back_output_buffer(out, img_shape, accumulate)
+            img_fwd_2d = np.asarray(img_fwd).reshape(-1, ntofbins)
+
+            xstart_buf, xend_buf = _lor_buffers(xstart, xend)
+            xstart_2d = xstart_buf.reshape(-1, 3)
+            xend_2d = xend_buf.reshape(-1, 3)
+
+            ic = _float16_chunks(nLORs)
+
+            for i in range(len(ic) - 1):
+                lib_parallelproj_c.joseph3d_back_tof_sino(
+                    xstart_2d[ic[i] : ic[i + 1], :].ravel(),
+                    xend_2d[ic[i] : ic[i + 1], :].ravel(),
+                    back_img.ravel(),
+                    np.asarray(img_origin, dtype=np.float32),
+                    np.asarray(voxsize, dtype=np.float32),
+                    img_fwd_2d[ic[i] : ic[i + 1], :].astype(np.float32).ravel(),
+                    np.int64(ic[i + 1] - ic[i]),
+                    np.asarray(back_img.shape, dtype=np.int32),
+                    *_tof_args_chunk(tof_args, ic[i], ic[i + 1]),
+                )
+        else:
+            # back projection of numpy or torch CPU array using the openmp lib
+            if fused_weights:
+                c_func = lib_parallelproj_c.joseph3d_back_tof_sino_batch
+                extra_args = (
+                    (np.int64(1),)
+                    + tof_args
+                    + (_lor_weights_buffer(lor_weights, nLORs),)
+                )
+            else:
+                c_func = lib_parallelproj_c.joseph3d_back_tof_sino
+                extra_args = tof_args
+
+            return _omp_back(
+                c_func,
+                _lor_buffers(xstart, xend),
+                img_shape,
+                img_origin,
+                voxsize,
+                img_fwd,
+                (nLORs,),
+                extra_args,
+                out=out,
+                accumulate=accumulate,
+            )
+
+    return _finalize_output(xp, back_img, out, img_fwd, accumulate)
+
+
+def joseph3d_fwd_tof_lm(
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    tofbin: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    lor_weights: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D listmode forward projector
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the event LORs, shape (num_events, 3)
+    xend : Array
+        end world coordinates of the event LORs, shape (num_events, 3)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as xstart)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units (same units as xstart)
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units (same units as xstart)
+        can be an array of length 1 -> same offset for all events
+        or an array of length num_events -> event dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    tofbin: Array
+        signed integer array with the tofbin of the events
+        the center of TOF bin 0 is assumed to be at the center of the LOR
+        (shifted by the tofcenter_offset)
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1], by default None
+        applied on the fly in the kernels of the OpenMP lib
+
+    Returns
+    -------
+    Array
+    """
+
+    nLORs = np.int64(xstart.shape[0])
+    xp = array_api_compat.get_namespace(img)
+
+    if not xp.isdtype(tofbin.dtype, "integral"):
+        raise TypeError("tofbin must be an int array")
+
+    if not is_cuda_array(img) and num_visible_cuda_devices == 0:
+        # projection of numpy or torch CPU array using the openmp parallelproj lib
+        tof_args = _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin
+        )
+
+        if lor_weights is None:
+            c_func = lib_parallelproj_c.joseph3d_fwd_tof_lm
+            extra_args = tof_args
+        else:
+            # the LOR weights are applied in the kernels of the OpenMP lib
+            c_func = lib_parallelproj_c.joseph3d_fwd_tof_lm_batch
+            extra_args = (
+                (np.int64(1),) + tof_args + (_lor_weights_buffer(lor_weights, nLORs),)
+            )
+
+        return _omp_fwd(
+            c_func,
+            _lor_buffers(xstart, xend),
+            img,
+            img_origin,
+            voxsize,
+            (nLORs,),
+            (nLORs,),
+            extra_args,
+            out=out,
+        )
+
+    if is_cuda_array(img):
+        # projection of cupy or torch GPU array using the cupy raw kernel
+        img_fwd = _cupy_fwd(
+            _joseph3d_fwd_tof_lm_cuda_kernel,
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            (nLORs,),
+            threadsperblock,
+            _cupy_tof_args(
+                nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin
+            ),
+        )
+    else:
+        # projection of numpy or torch CPU array using the cuda parallelproj lib
+        img_fwd = _get_output_buffer(out, (nLORs,))
+        _hybrid_fwd(
+            lib_parallelproj_cuda.joseph3d_fwd_tof_lm_cuda,
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            img_fwd,
+            num_chunks,
+            threadsperblock,
+            _tof_args(
+                nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin
+            ),
+        )
+
+    if lor_weights is not None:
+        img_fwd = _lor_weighted(img_fwd, lor_weights, tof=False)
+
+    return _finalize_output(xp, img_fwd, out, img)
+
+
+def joseph3d_back_tof_lm(
+    xstart: Array,
+    xend: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    tofbin: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+    lor_weights: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D listmode back projector
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the event LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the event LORs, shape (nLORs, 3)
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        array of size num_events containing the values to be back projected
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as xstart)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units (same units as xstart)
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length num_events -> event dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units (same units as xstart)
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length num_events -> event dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    tofbin: Array
+        signed integer array with the tofbin of the events
+        the center of TOF bin 0 is assumed to be at the center of the LOR
+        (shifted by the tofcenter_offset)
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the values before
+        back projection, by default None
+        applied on the fly in the kernels of the OpenMP lib
+
+    Returns
+    -------
+    Array
+    """
+
+    nLORs = np.int64(xstart.shape[0])
+    xp = array_api_compat.get_namespace(img_fwd)
+
+    if not xp.isdtype(tofbin.dtype, "integral"):
+        raise TypeError("tofbin must be an int array")
+
+    # the LOR weights are applied in the kernels of the OpenMP lib
+    fused_weights = (
+        lor_weights is not None
+        and not is_cuda_array(img_fwd)
+        and num_visible_cuda_devices == 0
+    )
+
+    if lor_weights is not None and not fused_weights:
+        img_fwd = _lor_weighted(img_fwd, lor_weights, tof=False)
+
+    if not is_cuda_array(img_fwd) and num_visible_cuda_devices == 0:
+        # back projection of numpy or torch CPU array using the openmp lib
+        tof_args = _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin
+        )
+
+        if fused_weights:
+            c_func = lib_parallelproj_c.joseph3d_back_tof_lm_batch
+            extra_args = (
+                (np.int64(1),) + tof_args + (_lor_weights_buffer(lor_weights, nLORs),)
+            )
+        else:
+            c_func = lib_parallelproj_c.joseph3d_back_tof_lm
+            extra_args = tof_args
+
+        return _omp_back(
+            c_func,
+            _lor_buffers(xstart, xend),
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            (nLORs,),
+            extra_args,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    if is_cuda_array(img_fwd):
+        # back projection of cupy or torch GPU array using the cupy raw kernel
+        back_img = _cupy_back(
+            _joseph3d_back_tof_lm_cuda_kernel,
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            threadsperblock,
+            _cupy_tof_args(
+                nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin
+            ),
+        )
+    else:
+        # back projection of numpy or torch CPU array using the cuda lib
+        back_img = _get_back_output_buffer(out, img_shape, accumulate)
+        _hybrid_back(
+            lib_parallelproj_cuda.joseph3d_back_tof_lm_cuda,
+            xstart,
+            xend,
+            back_img,
+            img_origin,
+            voxsize,
+            img_fwd,
+            num_chunks,
+            threadsperblock,
+            _tof_args(
+                nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin
+            ),
+        )
+
+    return _finalize_output(xp, back_img, out, img_fwd, accumulate)
+
+
+def _gather_lor_endpoints(
+    lor_endpoints: Array, start_index: Array, end_index: Array
+) -> tuple[Array, Array]:
+    """gather the start and end coordinates of LORs given by endpoint indices"""
+    _check_lor_indices(lor_endpoints, start_index, end_index)
+    xp = array_api_compat.get_namespace(lor_endpoints)
+
+    xstart = xp.take(lor_endpoints, xp.reshape(start_index, (-1,)), axis=0)
+    xend = xp.take(lor_endpoints, xp.reshape(end_index, (-1,)), axis=0)
+
+    return (
+        xp.reshape(xstart, tuple(start_index.shape) + (3,)),
+        xp.reshape(xend, tuple(end_index.shape) + (3,)),
+    )
+
+
+def joseph3d_fwd_idx(
+    lor_endpoints: Array,
+    start_index: Array,
+    end_index: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+) -> Array:
+    """Non-TOF Joseph 3D forward projector using LOR endpoint indices
+
+    Instead of passing the world coordinates of the start and end points of
+    all LORs, only the coordinates of all possible LOR endpoints and
+    two integer index arrays are passed such that the LOR coordinates never
+    need to be materialized.
+    Using the CUDA libs, the LOR coordinates are gathered and
+    joseph3d_fwd is used.
+
+    Parameters
+    ----------
+    lor_endpoints : Array
+        world coordinates of all LOR endpoints, shape (num_lor_endpoints, 3)
+    start_index : Array
+        integer array with the index of the start point of every LOR
+        in lor_endpoints, e.g. shape (nLORs,)
+    end_index : Array
+        integer array with the index of the end point of every LOR
+        in lor_endpoints, same shape as start_index
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+
+    Returns
+    -------
+    Array
+        of shape start_index.shape
+    """
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        xstart, xend = _gather_lor_endpoints(lor_endpoints, start_index, end_index)
+        return joseph3d_fwd(
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+        )
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_idx,
+        _lor_index_buffers(lor_endpoints, start_index, end_index),
+        img,
+        img_origin,
+        voxsize,
+        tuple(start_index.shape),
+        (np.int64(array_api_compat.size(start_index)),),
+        out=out,
+    )
+
+
+def joseph3d_back_idx(
+    lor_endpoints: Array,
+    start_index: Array,
+    end_index: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """Non-TOF Joseph 3D back projector using LOR endpoint indices
+
+    Parameters
+    ----------
+    lor_endpoints : Array
+        world coordinates of all LOR endpoints, shape (num_lor_endpoints, 3)
+    start_index : Array
+        integer array with the index of the start point of every LOR
+        in lor_endpoints, e.g. shape (nLORs,)
+    end_index : Array
+        integer array with the index of the end point of every LOR
+        in lor_endpoints, same shape as start_index
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        array of shape start_index.shape containing the values to be back projected
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the back projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    Returns
+    -------
+    Array
+    """
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        xstart, xend = _gather_lor_endpoints(lor_endpoints, start_index, end_index)
+        return joseph3d_back(
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_idx,
+        _lor_index_buffers(lor_endpoints, start_index, end_index),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        (np.int64(array_api_compat.size(start_index)),),
+        out=out,
+        accumulate=accumulate,
+    )
+
+
+def joseph3d_fwd_tof_sino_idx(
+    lor_endpoints: Array,
+    start_index: Array,
+    end_index: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    ntofbins: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D sinogram forward projector using LOR endpoint indices
+
+    Parameters
+    ----------
+    lor_endpoints : Array
+        world coordinates of all LOR endpoints, shape (num_lor_endpoints, 3)
+    start_index : Array
+        integer array with the index of the start point of every LOR
+        in lor_endpoints, e.g. shape (nLORs,)
+    end_index : Array
+        integer array with the index of the end point of every LOR
+        in lor_endpoints, same shape as start_index
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as lor_endpoints)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length nLORs -> LOR dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    ntofbins: int
+        total number of TOF bins
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+
+    Returns
+    -------
+    Array
+        of shape start_index.shape + (ntofbins,)
+    """
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        xstart, xend = _gather_lor_endpoints(lor_endpoints, start_index, end_index)
+        return joseph3d_fwd_tof_sino(
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            tofbin_width,
+            sigma_tof,
+            tofcenter_offset,
+            nsigmas,
+            ntofbins,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+        )
+
+    nLORs = np.int64(array_api_compat.size(start_index))
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_tof_sino_idx,
+        _lor_index_buffers(lor_endpoints, start_index, end_index),
+        img,
+        img_origin,
+        voxsize,
+        tuple(start_index.shape) + (ntofbins,),
+        (nLORs,),
+        _tof_args(nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins),
+        out=out,
+    )
+
+
+def joseph3d_back_tof_sino_idx(
+    lor_endpoints: Array,
+    start_index: Array,
+    end_index: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    ntofbins: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """TOF Joseph 3D sinogram back projector using LOR endpoint indices
+
+    Parameters
+    ----------
+    lor_endpoints : Array
+        world coordinates of all LOR endpoints, shape (num_lor_endpoints, 3)
+    start_index : Array
+        integer array with the index of the start point of every LOR
+        in lor_endpoints, e.g. shape (nLORs,)
+    end_index : Array
+        integer array with the index of the end point of every LOR
+        in lor_endpoints, same shape as start_index
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        array of shape start_index.shape + (ntofbins,)
+        containing the values to be back projected
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as lor_endpoints)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length nLORs -> LOR dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    ntofbins: int
+        total number of TOF bins
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    Returns
+    -------
+    Array
+    """
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        xstart, xend = _gather_lor_endpoints(lor_endpoints, start_index, end_index)
+        return joseph3d_back_tof_sino(
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            tofbin_width,
+            sigma_tof,
+            tofcenter_offset,
+            nsigmas,
+            ntofbins,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    nLORs = np.int64(array_api_compat.size(start_index))
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_tof_sino_idx,
+        _lor_index_buffers(lor_endpoints, start_index, end_index),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        (nLORs,),
+        _tof_args(nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins),
+        out=out,
+        accumulate=accumulate,
+    )
+
+
+def joseph3d_fwd_tof_lm_idx(
+    lor_endpoints: Array,
+    start_index: Array,
+    end_index: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    tofbin: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D listmode forward projector using LOR endpoint indices
+
+    Parameters
+    ----------
+    lor_endpoints : Array
+        world coordinates of all LOR endpoints, shape (num_lor_endpoints, 3)
+    start_index : Array
+        integer array with the index of the start point of every event LOR
+        in lor_endpoints, shape (num_events,)
+    end_index : Array
+        integer array with the index of the end point of every event LOR
+        in lor_endpoints, shape (num_events,)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as lor_endpoints)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units
+        can be an array of length 1 -> same sigma for all events
+        or an array of length num_events -> event dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units
+        can be an array of length 1 -> same offset for all events
+        or an array of length num_events -> event dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    tofbin: Array
+        signed integer array with the tofbin of the events
+        the center of TOF bin 0 is assumed to be at the center of the LOR
+        (shifted by the tofcenter_offset)
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+
+    Returns
+    -------
+    Array
+    """
+    xp = array_api_compat.get_namespace(img)
+
+    if not xp.isdtype(tofbin.dtype, "integral"):
+        raise TypeError("tofbin must be an int array")
+
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        xstart, xend = _gather_lor_endpoints(lor_endpoints, start_index, end_index)
+        return joseph3d_fwd_tof_lm(
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            tofbin_width,
+            sigma_tof,
+            tofcenter_offset,
+            nsigmas,
+            tofbin,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+        )
+
+    nLORs = np.int64(start_index.shape[0])
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_tof_lm_idx,
+        _lor_index_buffers(lor_endpoints, start_index, end_index),
+        img,
+        img_origin,
+        voxsize,
+        (nLORs,),
+        (nLORs,),
+        _tof_args(nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin),
+        out=out,
+    )
+
+
+def joseph3d_back_tof_lm_idx(
+    lor_endpoints: Array,
+    start_index: Array,
+    end_index: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    tofbin: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """TOF Joseph 3D listmode back projector using LOR endpoint indices
+
+    Parameters
+    ----------
+    lor_endpoints : Array
+        world coordinates of all LOR endpoints, shape (num_lor_endpoints, 3)
+    start_index : Array
+        integer array with the index of the start point of every event LOR
+        in lor_endpoints, shape (num_events,)
+    end_index : Array
+        integer array with the index of the end point of every event LOR
+        in lor_endpoints, shape (num_events,)
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        array of size num_events containing the values to be back projected
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as lor_endpoints)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units
+        can be an array of length 1 -> same sigma for all events
+        or an array of length num_events -> event dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units
+        can be an array of length 1 -> same offset for all events
+        or an array of length num_events -> event dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    tofbin: Array
+        signed integer array with the tofbin of the events
+        the center of TOF bin 0 is assumed to be at the center of the LOR
+        (shifted by the tofcenter_offset)
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    Returns
+    -------
+    Array
+    """
+    xp = array_api_compat.get_namespace(img_fwd)
+
+    if not xp.isdtype(tofbin.dtype, "integral"):
+        raise TypeError("tofbin must be an int array")
+
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        xstart, xend = _gather_lor_endpoints(lor_endpoints, start_index, end_index)
+        return joseph3d_back_tof_lm(
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            tofbin_width,
+            sigma_tof,
+            tofcenter_offset,
+            nsigmas,
+            tofbin,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    nLORs = np.int64(start_index.shape[0])
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_tof_lm_idx,
+        _lor_index_buffers(lor_endpoints, start_index, end_index),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        (nLORs,),
+        _tof_args(nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin),
+        out=out,
+        accumulate=accumulate,
+    )
+
+
+def _sym_sinogram_shape(
+    xstart_2d: Array, zstart: Array, plane_axis_num: int
+) -> tuple[tuple[int, ...], tuple[np.int64, np.int64, np.int64]]:
+    """spatial sinogram shape and the size arguments of the symmetric projectors
+    of the C lib (number of plane 0 LORs, number of planes and number of
+    plane 0 LORs stored after the plane axis)"""
+    shape_2d = list(xstart_2d.shape[:-1])
+    n_inner = int(np.prod(shape_2d[plane_axis_num:], dtype=np.int64))
+    shape_2d.insert(plane_axis_num, zstart.shape[0])
+
+    size_args = (
+        np.int64(array_api_compat.size(xstart_2d) // 3),
+        np.int64(zstart.shape[0]),
+        np.int64(n_inner),
+    )
+
+    return tuple(shape_2d), size_args
+
+
+def joseph3d_fwd_sym(
+    xstart_2d: Array,
+    xend_2d: Array,
+    zstart: Array,
+    zend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    plane_axis_num: int,
+    symmetry_axis: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+) -> Array:
+    """Non-TOF Joseph 3D sinogram forward projector for scanners with axial symmetry
+
+    The LORs of all sinogram planes are assembled inside the kernel from the
+    LORs of plane 0 and the plane coordinates along the symmetry axis such that
+    the memory needed for the LOR geometry scales with (num LORs per plane + num planes)
+    instead of (num LORs per plane x num planes).
+    Using the CUDA libs, the LOR coordinates are assembled and
+    joseph3d_fwd is used.
+
+    Parameters
+    ----------
+    xstart_2d : Array
+        start world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    xend_2d : Array
+        end world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    zstart : Array
+        start coordinates of all planes along the symmetry axis, shape (num_planes,)
+    zend : Array
+        end coordinates of all planes along the symmetry axis, shape (num_planes,)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    plane_axis_num : int
+        position of the plane axis in the output sinogram
+    symmetry_axis : int
+        axis (0, 1, 2) of the axial symmetry
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+
+    Returns
+    -------
+    Array
+        spatial sinogram where num_planes was inserted into xstart_2d.shape[:-1]
+        at plane_axis_num
+    """
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        xstart, xend = expand_sym_lor_coordinates(
+            xstart_2d, xend_2d, zstart, zend, plane_axis_num, symmetry_axis
+        )
+        return joseph3d_fwd(
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+        )
+
+    sino_shape, size_args = _sym_sinogram_shape(xstart_2d, zstart, plane_axis_num)
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_sym,
+        _sym_lor_buffers(xstart_2d, xend_2d, zstart, zend),
+        img,
+        img_origin,
+        voxsize,
+        sino_shape,
+        size_args,
+        (symmetry_axis,),
+        out=out,
+    )
+
+
+def joseph3d_back_sym(
+    xstart_2d: Array,
+    xend_2d: Array,
+    zstart: Array,
+    zend: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    plane_axis_num: int,
+    symmetry_axis: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """Non-TOF Joseph 3D sinogram back projector for scanners with axial symmetry
+
+    Parameters
+    ----------
+    xstart_2d : Array
+        start world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    xend_2d : Array
+        end world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    zstart : Array
+        start coordinates of all planes along the symmetry axis, shape (num_planes,)
+    zend : Array
+        end coordinates of all planes along the symmetry axis, shape (num_planes,)
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        spatial sinogram containing the values to be back projected
+    plane_axis_num : int
+        position of the plane axis in the sinogram
+    symmetry_axis : int
+        axis (0, 1, 2) of the axial symmetry
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the back projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    Returns
+    -------
+    Array
+    """
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        xstart, xend = expand_sym_lor_coordinates(
+            xstart_2d, xend_2d, zstart, zend, plane_axis_num, symmetry_axis
+        )
+        return joseph3d_back(
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    _, size_args = _sym_sinogram_shape(xstart_2d, zstart, plane_axis_num)
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_sym,
+        _sym_lor_buffers(xstart_2d, xend_2d, zstart, zend),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        size_args,
+        (symmetry_axis,),
+        out=out,
+        accumulate=accumulate,
+    )
+
+
+def joseph3d_fwd_tof_sino_sym(
+    xstart_2d: Array,
+    xend_2d: Array,
+    zstart: Array,
+    zend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    plane_axis_num: int,
+    symmetry_axis: int,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    ntofbins: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+) -> Array:
+    """TOF Joseph 3D sinogram forward projector for scanners with axial symmetry
+
+    Parameters
+    ----------
+    xstart_2d : Array
+        start world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    xend_2d : Array
+        end world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    zstart : Array
+        start coordinates of all planes along the symmetry axis, shape (num_planes,)
+    zend : Array
+        end coordinates of all planes along the symmetry axis, shape (num_planes,)
+    img : Array
+        containing the 3D image to be projected
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    plane_axis_num : int
+        position of the plane axis in the output sinogram
+    symmetry_axis : int
+        axis (0, 1, 2) of the axial symmetry
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as xstart_2d)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length nLORs -> LOR dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    ntofbins: int
+        total number of TOF bins
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+
+    Returns
+    -------
+    Array
+        TOF sinogram where num_planes was inserted into xstart_2d.shape[:-1]
+        at plane_axis_num and ntofbins was appended
+    """
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        xstart, xend = expand_sym_lor_coordinates(
+            xstart_2d, xend_2d, zstart, zend, plane_axis_num, symmetry_axis
+        )
+        return joseph3d_fwd_tof_sino(
+            xstart,
+            xend,
+            img,
+            img_origin,
+            voxsize,
+            tofbin_width,
+            sigma_tof,
+            tofcenter_offset,
+            nsigmas,
+            ntofbins,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+        )
+
+    sino_shape, size_args = _sym_sinogram_shape(xstart_2d, zstart, plane_axis_num)
+    nLORs = np.int64(np.prod(sino_shape, dtype=np.int64))
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_tof_sino_sym,
+        _sym_lor_buffers(xstart_2d, xend_2d, zstart, zend),
+        img,
+        img_origin,
+        voxsize,
+        sino_shape + (ntofbins,),
+        size_args,
+        (symmetry_axis,)
+        + _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+        ),
+        out=out,
+    )
+
+
+def joseph3d_back_tof_sino_sym(
+    xstart_2d: Array,
+    xend_2d: Array,
+    zstart: Array,
+    zend: Array,
+    img_shape: tuple[int, int, int],
+    img_origin: Array,
+    voxsize: Array,
+    img_fwd: Array,
+    plane_axis_num: int,
+    symmetry_axis: int,
+    tofbin_width: float,
+    sigma_tof: Array,
+    tofcenter_offset: Array,
+    nsigmas: float,
+    ntofbins: int,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """TOF Joseph 3D sinogram back projector for scanners with axial symmetry
+
+    Parameters
+    ----------
+    xstart_2d : Array
+        start world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    xend_2d : Array
+        end world coordinates of the LORs in plane 0, shape (n_a, n_b, 3)
+        the coordinates along the symmetry axis are ignored
+    zstart : Array
+        start coordinates of all planes along the symmetry axis, shape (num_planes,)
+    zend : Array
+        end coordinates of all planes along the symmetry axis, shape (num_planes,)
+    img_shape : tuple[int, int, int]
+        the shape of the back projected image
+    img_origin : Array
+        containing the world coordinates of the image origin (voxel [0,0,0])
+    voxsize : Array
+        array containing the voxel size
+    img_fwd : Array
+        TOF sinogram containing the values to be back projected
+    plane_axis_num : int
+        position of the plane axis in the sinogram
+    symmetry_axis : int
+        axis (0, 1, 2) of the axial symmetry
+    tofbin_width : float
+        width of the TOF bin in spatial units (same units as xstart_2d)
+    sigma_tof : Array
+        sigma of Gaussian TOF kernel in spatial units
+        can be an array of length 1 -> same sigma for all LORs
+        or an array of length nLORs -> LOR dependent sigma
+    tofcenter_offset: Array
+        center offset of the central TOF bin in spatial units
+        can be an array of length 1 -> same offset for all LORs
+        or an array of length nLORs -> LOR dependent offset
+    nsigmas: float
+        number of sigmas to consider when Gaussian kernel is evaluated (truncated)
+    ntofbins: int
+        total number of TOF bins
+    threadsperblock : int, optional
+        by default 32
+    num_chunks : int, optional
+        break down the projection in hybrid mode into chunks to
+        save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+
+    Returns
+    -------
+    Array
+    """
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        xstart, xend = expand_sym_lor_coordinates(
+            xstart_2d, xend_2d, zstart, zend, plane_axis_num, symmetry_axis
+        )
+        return joseph3d_back_tof_sino(
+            xstart,
+            xend,
+            img_shape,
+            img_origin,
+            voxsize,
+            img_fwd,
+            tofbin_width,
+            sigma_tof,
+            tofcenter_offset,
+            nsigmas,
+            ntofbins,
+            threadsperblock=threadsperblock,
+            num_chunks=num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    sino_shape, size_args = _sym_sinogram_shape(xstart_2d, zstart, plane_axis_num)
+    nLORs = np.int64(np.prod(sino_shape, dtype=np.int64))
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_tof_sino_sym,
+        _sym_lor_buffers(xstart_2d, xend_2d, zstart, zend),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        size_args,
+        (symmetry_axis,)
+        + _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+        ),
+        out=out,
+        accumulate=accumulate,
+    )
+
+
+def _batch_loop(
+    func: Callable[[Array, None | Array], Array], x: Array, out: None | Array
+) -> Array:
+    """apply a (single image) projection function to every element of a batch
+
+    Used for the CUDA libs that have no batched kernels.
+    func(x[b, ...], out[b, ...]) must return the projection of x[b, ...].
+    """
+    if out is None:
+        xp = array_api_compat.get_namespace(x)
+        return xp.stack([func(x[b, ...], None) for b in range(x.shape[0])])
+
+    for b in range(x.shape[0]):
+        func(x[b, ...], out[b, ...])
+
+    return out
+
+
+def _check_batch_ndim(x: Array, ndim: int, name: str) -> None:
+    """check the number of dimensions of a batched input"""
+    if x.ndim != ndim:
+        raise ValueError(f"{name} must have {ndim} dimensions (leading batch axis)")
+
+
+def joseph3d_fwd_batch(
+    xstart: Array,
+    xend: Array,
+    img: Array,
+    img_origin: Array,
+    voxsize: Array,
+    threadsperblock: int = 32,
+    num_chunks: int = 1,
+    out: None | Array = None,
+    lor_weights: None | Array = None,
+) -> Array:
+    """Non-TOF Joseph 3D forward projector of a batch of images
+
+    All images are projected along every LOR in a single traversal of the LOR
+    such that the ray geometry and the interpolation weights are calculated
+    only once for all images.
+    Using the CUDA libs, the images are projected one after the other with
+    joseph3d_fwd.
+
+    Parameters
+    ----------
+    xstart : Array
         start world coordinates of the LORs, shape (nLORs, 3)
     xend : Array
         end world coordinates of the LORs, shape (nLORs, 3)
     img : Array
-        containing the 3D image to be projected
+        containing the batch of 3D images to be projected,
+        shape (nbatch, n0, n1, n2)
     img_origin : Array
         containing the world coordinates of the image origin (voxel [0,0,0])
     voxsize : Array
@@ -450,83 +3428,59 @@ def joseph3d_fwd(
     num_chunks : int, optional
         break down the projection in hybrid mode into chunks to
         save memory on the GPU, by default 1
-    """
-    nLORs = np.int64(array_api_compat.size(xstart) // 3)
-    xp = array_api_compat.get_namespace(img)
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the projections of all
+        images, by default None
 
-    if is_cuda_array(img):
-        # projection of GPU array (cupy to torch GPU array) using the cupy raw
-        # kernel
-        img_fwd = cp.zeros(xstart.shape[:-1], dtype=cp.float32)
-
-        _joseph3d_fwd_cuda_kernel(
-            (math.ceil(nLORs / threadsperblock),),
-            (threadsperblock,),
-            (
-                cp.asarray(xstart, dtype=cp.float32).ravel(),
-                cp.asarray(xend, dtype=cp.float32).ravel(),
-                cp.asarray(img, dtype=cp.float32).ravel(),
-                cp.asarray(img_origin, dtype=cp.float32),
-                cp.asarray(voxsize, dtype=cp.float32),
-                img_fwd.ravel(),
-                nLORs,
-                cp.asarray(img.shape, dtype=cp.int32),
+    Returns
+    -------
+    Array
+        of shape (nbatch,) + xstart.shape[:-1]
+    """
+    _check_batch_ndim(img, 4, "img")
+
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        return _batch_loop(
+            lambda x, o: joseph3d_fwd(
+                xstart,
+                xend,
+                x,
+                img_origin,
+                voxsize,
+                threadsperblock=threadsperblock,
+                num_chunks=num_chunks,
+                out=o,
+                lor_weights=lor_weights,
             ),
+            img,
+            out,
         )
-        cp.cuda.Device().synchronize()
-    else:
-        img_fwd = np.zeros(xstart.shape[:-1], dtype=np.float32)
-
-        # projection of CPU array (numpy to torch CPU array)
-        if num_visible_cuda_devices > 0:
-            # projection of numpy array using the cuda parallelproj lib
-            num_voxel = ctypes.c_longlong(array_api_compat.size(img))
-
-            # send image to all devices
-            d_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
-                np.asarray(img, dtype=np.float32).ravel(), num_voxel
-            )
-
-            # split call to GPU lib into chunks (useful for systems with
-            # limited memory)
-            ic = calc_chunks(nLORs, num_chunks)
-
-            for i in range(num_chunks):
-                lib_parallelproj_cuda.joseph3d_fwd_cuda(
-                    np.asarray(xstart, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    np.asarray(xend, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    d_img,
-                    np.asarray(img_origin, dtype=np.float32),
-                    np.asarray(voxsize, dtype=np.float32),
-                    img_fwd.ravel()[ic[i] : ic[i + 1]],
-                    ic[i + 1] - ic[i],
-                    np.asarray(img.shape, dtype=np.int32),
-                    threadsperblock,
-                )
-
-            # free image device arrays
-            lib_parallelproj_cuda.free_float_array_on_all_devices(d_img)
-        else:
-            # projection of numpy array using the openmp parallelproj lib
-            lib_parallelproj_c.joseph3d_fwd(
-                np.asarray(xstart, dtype=np.float32).ravel(),
-                np.asarray(xend, dtype=np.float32).ravel(),
-                np.asarray(img, dtype=np.float32).ravel(),
-                np.asarray(img_origin, dtype=np.float32),
-                np.asarray(voxsize, dtype=np.float32),
-                img_fwd.ravel(),
-                nLORs,
-                np.asarray(img.shape, dtype=np.int32),
-            )
 
-    return xp.asarray(img_fwd, device=array_api_compat.device(img))
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    nbatch = img.shape[0]
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_batch,
+        _lor_buffers(xstart, xend),
+        img,
+        img_origin,
+        voxsize,
+        (nbatch,) + tuple(xstart.shape[:-1]),
+        (nLORs,),
+        (
+            np.int64(nbatch),
+            _lor_weights_buffer(lor_weights, nLORs),
+        ),
+        out=out,
+        batch=True,
+    )
 
 
-def joseph3d_back(
+def joseph3d_back_batch(
     xstart: Array,
     xend: Array,
     img_shape: tuple[int, int, int],
@@ -535,8 +3489,11 @@ def joseph3d_back(
     img_fwd: Array,
     threadsperblock: int = 32,
     num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+    lor_weights: None | Array = None,
 ) -> Array:
-    """Non-TOF Joseph 3D back projector
+    """Non-TOF Joseph 3D back projector of a batch of sinograms
 
     Parameters
     ----------
@@ -545,103 +3502,78 @@ def joseph3d_back(
     xend : Array
         end world coordinates of the LORs, shape (nLORs, 3)
     img_shape : tuple[int, int, int]
-        the shape of the back projected image
+        the shape of a single back projected image
     img_origin : Array
         containing the world coordinates of the image origin (voxel [0,0,0])
     voxsize : Array
         array containing the voxel size
     img_fwd : Array
-        array of length nLORs containing the values to be back projected
+        array of shape (nbatch,) + xstart.shape[:-1] containing the values
+        to be back projected
     threadsperblock : int, optional
         by default 32
     num_chunks : int, optional
         break down the back projection in hybrid mode into chunks to
         save memory on the GPU, by default 1
-    """
-    nLORs = np.int64(array_api_compat.size(xstart) // 3)
-    xp = array_api_compat.get_namespace(img_fwd)
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the values of all
+        batch elements before back projection, by default None
 
-    if is_cuda_array(img_fwd):
-        # back projection of cupy or torch GPU array using the cupy raw kernel
-        back_img = cp.zeros(img_shape, dtype=cp.float32)
-
-        _joseph3d_back_cuda_kernel(
-            (math.ceil(nLORs / threadsperblock),),
-            (threadsperblock,),
-            (
-                cp.asarray(xstart, dtype=cp.float32).ravel(),
-                cp.asarray(xend, dtype=cp.float32).ravel(),
-                back_img.ravel(),
-                cp.asarray(img_origin, dtype=cp.float32),
-                cp.asarray(voxsize, dtype=cp.float32),
-                cp.asarray(img_fwd, dtype=cp.float32).ravel(),
-                nLORs,
-                cp.asarray(back_img.shape, dtype=cp.int32),
+    Returns
+    -------
+    Array
+        of shape (nbatch,) + img_shape
+    """
+    _check_batch_ndim(img_fwd, xstart.ndim, "img_fwd")
+
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        return _batch_loop(
+            lambda y, o: joseph3d_back(
+                xstart,
+                xend,
+                img_shape,
+                img_origin,
+                voxsize,
+                y,
+                threadsperblock=threadsperblock,
+                num_chunks=num_chunks,
+                out=o,
+                accumulate=accumulate,
+                lor_weights=lor_weights,
             ),
+            img_fwd,
+            out,
         )
-        cp.cuda.Device().synchronize()
-    else:
-        # back projection of numpy or torch CPU array
-        back_img = np.zeros(img_shape, dtype=np.float32)
-
-        if num_visible_cuda_devices > 0:
-            # back projection of numpy array using the cuda parallelproj lib
-            num_voxel = ctypes.c_longlong(array_api_compat.size(back_img))
-            # send image to all devices
-            d_back_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
-                back_img.ravel(), num_voxel
-            )
-
-            # split call to GPU lib into chunks (useful for systems with
-            # limited memory)
-            ic = calc_chunks(nLORs, num_chunks)
-
-            for i in range(num_chunks):
-                lib_parallelproj_cuda.joseph3d_back_cuda(
-                    np.asarray(xstart, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    np.asarray(xend, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    d_back_img,
-                    np.asarray(img_origin, dtype=np.float32),
-                    np.asarray(voxsize, dtype=np.float32),
-                    np.asarray(img_fwd, dtype=np.float32).ravel()[ic[i] : ic[i + 1]],
-                    ic[i + 1] - ic[i],
-                    np.asarray(back_img.shape, dtype=np.int32),
-                    threadsperblock,
-                )
-
-            # sum all device arrays in the first device
-            lib_parallelproj_cuda.sum_float_arrays_on_first_device(
-                d_back_img, num_voxel
-            )
-
-            # copy summed image back from first device
-            lib_parallelproj_cuda.get_float_array_from_device(
-                d_back_img, num_voxel, 0, back_img.ravel()
-            )
-
-            # free image device arrays
-            lib_parallelproj_cuda.free_float_array_on_all_devices(d_back_img)
-        else:
-            # back projection of numpy array using the openmp parallelproj lib
-            lib_parallelproj_c.joseph3d_back(
-                np.asarray(xstart, dtype=np.float32).ravel(),
-                np.asarray(xend, dtype=np.float32).ravel(),
-                back_img.ravel(),
-                np.asarray(img_origin, dtype=np.float32),
-                np.asarray(voxsize, dtype=np.float32),
-                np.asarray(img_fwd, dtype=np.float32).ravel(),
-                nLORs,
-                np.asarray(back_img.shape, dtype=np.int32),
-            )
 
-    return xp.asarray(back_img, device=array_api_compat.device(img_fwd))
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    nbatch = img_fwd.shape[0]
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_batch,
+        _lor_buffers(xstart, xend),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        (nLORs,),
+        (
+            np.int64(nbatch),
+            _lor_weights_buffer(lor_weights, nLORs),
+        ),
+        out=out,
+        accumulate=accumulate,
+        nbatch=nbatch,
+    )
 
 
-def joseph3d_fwd_tof_sino(
+def joseph3d_fwd_tof_sino_batch(
     xstart: Array,
     xend: Array,
     img: Array,
@@ -654,8 +3586,16 @@ def joseph3d_fwd_tof_sino(
     ntofbins: int,
     threadsperblock: int = 32,
     num_chunks: int = 1,
+    out: None | Array = None,
+    lor_weights: None | Array = None,
 ) -> Array:
-    """TOF Joseph 3D sinogram forward projector
+    """TOF Joseph 3D sinogram forward projector of a batch of images
+
+    All images are projected along every LOR in a single traversal of the LOR
+    such that the ray geometry, the interpolation and the TOF weights are
+    calculated only once for all images.
+    Using the CUDA libs, the images are projected one after the other with
+    joseph3d_fwd_tof_sino.
 
     Parameters
     ----------
@@ -664,7 +3604,8 @@ def joseph3d_fwd_tof_sino(
     xend : Array
         end world coordinates of the LORs, shape (nLORs, 3)
     img : Array
-        containing the 3D image to be projected
+        containing the batch of 3D images to be projected,
+        shape (nbatch, n0, n1, n2)
     img_origin : Array
         containing the world coordinates of the image origin (voxel [0,0,0])
     voxsize : Array
@@ -688,125 +3629,65 @@ def joseph3d_fwd_tof_sino(
     num_chunks : int, optional
         break down the projection in hybrid mode into chunks to
         save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the projections of all
+        images, by default None
 
     Returns
     -------
     Array
+        of shape (nbatch,) + xstart.shape[:-1] + (ntofbins,)
     """
-
-    nLORs = np.int64(array_api_compat.size(xstart) // 3)
-    xp = array_api_compat.get_namespace(img)
-
-    lor_dependent_sigma_tof = np.uint8(sigma_tof.shape[0] == nLORs)
-    lor_dependent_tofcenter_offset = np.uint8(tofcenter_offset.shape[0] == nLORs)
-
-    if is_cuda_array(img):
-        # projection of cupy or torch GPU array using the cupy raw kernel
-        img_fwd = cp.zeros(xstart.shape[:-1] + (ntofbins,), dtype=cp.float32)
-
-        _joseph3d_fwd_tof_sino_cuda_kernel(
-            (math.ceil(nLORs / threadsperblock),),
-            (threadsperblock,),
-            (
-                cp.asarray(xstart, dtype=cp.float32).ravel(),
-                cp.asarray(xend, dtype=cp.float32).ravel(),
-                cp.asarray(img, dtype=cp.float32).ravel(),
-                cp.asarray(img_origin, dtype=cp.float32),
-                cp.asarray(voxsize, dtype=cp.float32),
-                img_fwd.ravel(),
-                nLORs,
-                cp.asarray(img.shape, dtype=cp.int32),
-                np.int16(ntofbins),
-                np.float32(tofbin_width),
-                cp.asarray(sigma_tof, dtype=cp.float32).ravel(),
-                cp.asarray(tofcenter_offset, dtype=cp.float32).ravel(),
-                np.float32(nsigmas),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
+    _check_batch_ndim(img, 4, "img")
+
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        return _batch_loop(
+            lambda x, o: joseph3d_fwd_tof_sino(
+                xstart,
+                xend,
+                x,
+                img_origin,
+                voxsize,
+                tofbin_width,
+                sigma_tof,
+                tofcenter_offset,
+                nsigmas,
+                ntofbins,
+                threadsperblock=threadsperblock,
+                num_chunks=num_chunks,
+                out=o,
+                lor_weights=lor_weights,
             ),
+            img,
+            out,
         )
-        cp.cuda.Device().synchronize()
-    else:
-        # projection of numpy or torch CPU array
-        img_fwd = np.zeros(xstart.shape[:-1] + (ntofbins,), dtype=np.float32)
-
-        if num_visible_cuda_devices > 0:
-            # projection using libparallelproj_cuda
-            num_voxel = ctypes.c_longlong(array_api_compat.size(img))
 
-            # send image to all devices
-            d_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
-                np.asarray(img, dtype=np.float32).ravel(), num_voxel
-            )
-
-            # split call to GPU lib into chunks (useful for systems with
-            # limited memory)
-            ic = calc_chunks(nLORs, num_chunks)
-
-            for i in range(num_chunks):
-                if lor_dependent_sigma_tof:
-                    isig0 = ic[i]
-                    isig1 = ic[i + 1]
-                else:
-                    isig0 = 0
-                    isig1 = 1
-
-                if lor_dependent_tofcenter_offset:
-                    ioff0 = ic[i]
-                    ioff1 = ic[i + 1]
-                else:
-                    ioff0 = 0
-                    ioff1 = 1
-
-                lib_parallelproj_cuda.joseph3d_fwd_tof_sino_cuda(
-                    np.asarray(xstart, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    np.asarray(xend, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    d_img,
-                    np.asarray(img_origin, dtype=np.float32),
-                    np.asarray(voxsize, dtype=np.float32),
-                    img_fwd.ravel()[ntofbins * ic[i] : ntofbins * (ic[i + 1])],
-                    ic[i + 1] - ic[i],
-                    np.asarray(img.shape, dtype=np.int32),
-                    np.float32(tofbin_width),
-                    np.asarray(sigma_tof, dtype=np.float32).ravel()[isig0:isig1],
-                    np.asarray(tofcenter_offset, dtype=np.float32).ravel()[ioff0:ioff1],
-                    np.float32(nsigmas),
-                    np.int16(ntofbins),
-                    lor_dependent_sigma_tof,
-                    lor_dependent_tofcenter_offset,
-                    threadsperblock,
-                )
-
-            # free image device arrays
-            lib_parallelproj_cuda.free_float_array_on_all_devices(d_img)
-        else:
-            # projection the openmp libparallelproj_c
-            lib_parallelproj_c.joseph3d_fwd_tof_sino(
-                np.asarray(xstart, dtype=np.float32).ravel(),
-                np.asarray(xend, dtype=np.float32).ravel(),
-                np.asarray(img, dtype=np.float32).ravel(),
-                np.asarray(img_origin, dtype=np.float32),
-                np.asarray(voxsize, dtype=np.float32),
-                img_fwd.ravel(),
-                np.int64(nLORs),
-                np.asarray(img.shape, dtype=np.int32),
-                np.float32(tofbin_width),
-                np.asarray(sigma_tof, dtype=np.float32).ravel(),
-                np.asarray(tofcenter_offset, dtype=np.float32).ravel(),
-                np.float32(nsigmas),
-                np.int16(ntofbins),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
-            )
-
-    return xp.asarray(img_fwd, device=array_api_compat.device(img))
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    nbatch = img.shape[0]
+
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_tof_sino_batch,
+        _lor_buffers(xstart, xend),
+        img,
+        img_origin,
+        voxsize,
+        (nbatch,) + tuple(xstart.shape[:-1]) + (ntofbins,),
+        (nLORs,),
+        (np.int64(nbatch),)
+        + _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+        )
+        + (_lor_weights_buffer(lor_weights, nLORs),),
+        out=out,
+        batch=True,
+    )
 
 
-def joseph3d_back_tof_sino(
+def joseph3d_back_tof_sino_batch(
     xstart: Array,
     xend: Array,
     img_shape: tuple[int, int, int],
@@ -820,8 +3701,11 @@ def joseph3d_back_tof_sino(
     ntofbins: int,
     threadsperblock: int = 32,
     num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+    lor_weights: None | Array = None,
 ) -> Array:
-    """TOF Joseph 3D sinogram back projector
+    """TOF Joseph 3D sinogram back projector of a batch of TOF sinograms
 
     Parameters
     ----------
@@ -830,13 +3714,14 @@ def joseph3d_back_tof_sino(
     xend : Array
         end world coordinates of the LORs, shape (nLORs, 3)
     img_shape : tuple[int, int, int]
-        the shape of the back projected image
+        the shape of a single back projected image
     img_origin : Array
         containing the world coordinates of the image origin (voxel [0,0,0])
     voxsize : Array
         array containing the voxel size
     img_fwd : Array
-        array of size nLOR*ntofbins containing the values to be back projected
+        array of shape (nbatch,) + xstart.shape[:-1] + (ntofbins,) containing
+        the values to be back projected
     tofbin_width : float
         width of the TOF bin in spatial units (same units as xstart)
     sigma_tof : Array
@@ -854,138 +3739,73 @@ def joseph3d_back_tof_sino(
     threadsperblock : int, optional
         by default 32
     num_chunks : int, optional
-        break down the projection in hybrid mode into chunks to
+        break down the back projection in hybrid mode into chunks to
         save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the values of all
+        batch elements before back projection, by default None
 
     Returns
     -------
     Array
+        of shape (nbatch,) + img_shape
     """
-
-    nLORs = np.int64(array_api_compat.size(xstart) // 3)
-    xp = array_api_compat.get_namespace(img_fwd)
-
-    lor_dependent_sigma_tof = np.uint8(sigma_tof.shape[0] == nLORs)
-    lor_dependent_tofcenter_offset = np.uint8(tofcenter_offset.shape[0] == nLORs)
-
-    if is_cuda_array(img_fwd):
-        # back projection of cupy or torch GPU array using the cupy raw kernel
-        back_img = cp.zeros(img_shape, dtype=cp.float32)
-
-        _joseph3d_back_tof_sino_cuda_kernel(
-            (math.ceil(nLORs / threadsperblock),),
-            (threadsperblock,),
-            (
-                cp.asarray(xstart, dtype=cp.float32).ravel(),
-                cp.asarray(xend, dtype=cp.float32).ravel(),
-                back_img.ravel(),
-                cp.asarray(img_origin, dtype=cp.float32),
-                cp.asarray(voxsize, dtype=cp.float32),
-                cp.asarray(img_fwd, dtype=cp.float32).ravel(),
-                nLORs,
-                cp.asarray(back_img.shape, dtype=cp.int32),
-                np.int16(ntofbins),
-                np.float32(tofbin_width),
-                cp.asarray(sigma_tof, dtype=cp.float32).ravel(),
-                cp.asarray(tofcenter_offset, dtype=cp.float32).ravel(),
-                np.float32(nsigmas),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
+    _check_batch_ndim(img_fwd, xstart.ndim + 1, "img_fwd")
+
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        return _batch_loop(
+            lambda y, o: joseph3d_back_tof_sino(
+                xstart,
+                xend,
+                img_shape,
+                img_origin,
+                voxsize,
+                y,
+                tofbin_width,
+                sigma_tof,
+                tofcenter_offset,
+                nsigmas,
+                ntofbins,
+                threadsperblock=threadsperblock,
+                num_chunks=num_chunks,
+                out=o,
+                accumulate=accumulate,
+                lor_weights=lor_weights,
             ),
+            img_fwd,
+            out,
         )
-        cp.cuda.Device().synchronize()
-    else:
-        # back projection of numpy or torch CPU array
-        back_img = np.zeros(img_shape, dtype=np.float32)
-
-        if num_visible_cuda_devices > 0:
-            # back projection of numpy array using the cuda parallelproj lib
-            num_voxel = ctypes.c_longlong(array_api_compat.size(back_img))
-            # send image to all devices
-            d_back_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
-                back_img.ravel(), num_voxel
-            )
-
-            # split call to GPU lib into chunks (useful for systems with
-            # limited memory)
-            ic = calc_chunks(nLORs, num_chunks)
-
-            for i in range(num_chunks):
-                if lor_dependent_sigma_tof:
-                    isig0 = ic[i]
-                    isig1 = ic[i + 1]
-                else:
-                    isig0 = 0
-                    isig1 = 1
-
-                if lor_dependent_tofcenter_offset:
-                    ioff0 = ic[i]
-                    ioff1 = ic[i + 1]
-                else:
-                    ioff0 = 0
-                    ioff1 = 1
-
-                lib_parallelproj_cuda.joseph3d_back_tof_sino_cuda(
-                    np.asarray(xstart, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    np.asarray(xend, dtype=np.float32)
-                    .reshape(-1, 3)[ic[i] : (ic[i + 1]), :]
-                    .ravel(),
-                    d_back_img,
-                    np.asarray(img_origin, dtype=np.float32),
-                    np.asarray(voxsize, dtype=np.float32),
-                    np.asarray(img_fwd, dtype=np.float32).ravel()[
-                        ntofbins * ic[i] : ntofbins * ic[i + 1]
-                    ],
-                    ic[i + 1] - ic[i],
-                    np.asarray(back_img.shape, dtype=np.int32),
-                    np.float32(tofbin_width),
-                    np.asarray(sigma_tof, dtype=np.float32).ravel()[isig0:isig1],
-                    np.asarray(tofcenter_offset, dtype=np.float32).ravel()[ioff0:ioff1],
-                    np.float32(nsigmas),
-                    np.int16(ntofbins),
-                    lor_dependent_sigma_tof,
-                    lor_dependent_tofcenter_offset,
-                    threadsperblock,
-                )
-
-            # sum all device arrays in the first device
-            lib_parallelproj_cuda.sum_float_arrays_on_first_device(
-                d_back_img, num_voxel
-            )
-
-            # copy summed image back from first device
-            lib_parallelproj_cuda.get_float_array_from_device(
-                d_back_img, num_voxel, 0, back_img.ravel()
-            )
-
-            # free image device arrays
-            lib_parallelproj_cuda.free_float_array_on_all_devices(d_back_img)
-        else:
-            # back projection of numpy array using the openmp parallelproj lib
-            lib_parallelproj_c.joseph3d_back_tof_sino(
-                np.asarray(xstart, dtype=np.float32).ravel(),
-                np.asarray(xend, dtype=np.float32).ravel(),
-                back_img.ravel(),
-                np.asarray(img_origin, dtype=np.float32),
-                np.asarray(voxsize, dtype=np.float32),
-                np.asarray(img_fwd, dtype=np.float32).ravel(),
-                nLORs,
-                np.asarray(back_img.shape, dtype=np.int32),
-                np.float32(tofbin_width),
-                np.asarray(sigma_tof, dtype=np.float32).ravel(),
-                np.asarray(tofcenter_offset, dtype=np.float32).ravel(),
-                np.float32(nsigmas),
-                np.int16(ntofbins),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
-            )
 
-    return xp.asarray(back_img, device=array_api_compat.device(img_fwd))
+    nLORs = np.int64(array_api_compat.size(xstart) // 3)
+    nbatch = img_fwd.shape[0]
+
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_tof_sino_batch,
+        _lor_buffers(xstart, xend),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        (nLORs,),
+        (np.int64(nbatch),)
+        + _tof_args(
+            nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, ntofbins
+        )
+        + (_lor_weights_buffer(lor_weights, nLORs),),
+        out=out,
+        accumulate=accumulate,
+        nbatch=nbatch,
+    )
 
 
-def joseph3d_fwd_tof_lm(
+def joseph3d_fwd_tof_lm_batch(
     xstart: Array,
     xend: Array,
     img: Array,
@@ -998,8 +3818,16 @@ def joseph3d_fwd_tof_lm(
     tofbin: Array,
     threadsperblock: int = 32,
     num_chunks: int = 1,
+    out: None | Array = None,
+    lor_weights: None | Array = None,
 ) -> Array:
-    """TOF Joseph 3D listmode forward projector
+    """TOF Joseph 3D listmode forward projector of a batch of images
+
+    All images are projected along every event LOR in a single traversal of
+    the LOR such that the ray geometry, the interpolation and the TOF weights
+    are calculated only once for all images.
+    Using the CUDA libs, the images are projected one after the other with
+    joseph3d_fwd_tof_lm.
 
     Parameters
     ----------
@@ -1008,7 +3836,8 @@ def joseph3d_fwd_tof_lm(
     xend : Array
         end world coordinates of the event LORs, shape (num_events, 3)
     img : Array
-        containing the 3D image to be projected
+        containing the batch of 3D images to be projected,
+        shape (nbatch, n0, n1, n2)
     img_origin : Array
         containing the world coordinates of the image origin (voxel [0,0,0])
     voxsize : Array
@@ -1034,126 +3863,67 @@ def joseph3d_fwd_tof_lm(
     num_chunks : int, optional
         break down the projection in hybrid mode into chunks to
         save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the projections of all
+        images, by default None
 
     Returns
     -------
     Array
+        of shape (nbatch, num_events)
     """
+    _check_batch_ndim(img, 4, "img")
+
+    if is_cuda_array(img) or num_visible_cuda_devices > 0:
+        return _batch_loop(
+            lambda x, o: joseph3d_fwd_tof_lm(
+                xstart,
+                xend,
+                x,
+                img_origin,
+                voxsize,
+                tofbin_width,
+                sigma_tof,
+                tofcenter_offset,
+                nsigmas,
+                tofbin,
+                threadsperblock=threadsperblock,
+                num_chunks=num_chunks,
+                out=o,
+                lor_weights=lor_weights,
+            ),
+            img,
+            out,
+        )
 
     nLORs = np.int64(xstart.shape[0])
+    nbatch = img.shape[0]
     xp = array_api_compat.get_namespace(img)
 
     if not xp.isdtype(tofbin.dtype, "integral"):
         raise TypeError("tofbin must be an int array")
 
-    lor_dependent_sigma_tof = np.uint8(sigma_tof.shape[0] == nLORs)
-    lor_dependent_tofcenter_offset = np.uint8(tofcenter_offset.shape[0] == nLORs)
-
-    if is_cuda_array(img):
-        # projection of cupy or torch GPU array using the cupy raw kernel
-        img_fwd = cp.zeros(nLORs, dtype=cp.float32)
-
-        _joseph3d_fwd_tof_lm_cuda_kernel(
-            (math.ceil(nLORs / threadsperblock),),
-            (threadsperblock,),
-            (
-                cp.asarray(xstart, dtype=cp.float32).ravel(),
-                cp.asarray(xend, dtype=cp.float32).ravel(),
-                cp.asarray(img, dtype=cp.float32).ravel(),
-                cp.asarray(img_origin, dtype=cp.float32),
-                cp.asarray(voxsize, dtype=cp.float32),
-                img_fwd,
-                nLORs,
-                cp.asarray(img.shape, dtype=cp.int32),
-                np.float32(tofbin_width),
-                cp.asarray(sigma_tof, dtype=cp.float32),
-                cp.asarray(tofcenter_offset, dtype=cp.float32),
-                np.float32(nsigmas),
-                cp.asarray(tofbin, dtype=cp.int16),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
-            ),
-        )
-        cp.cuda.Device().synchronize()
-    else:
-        # projection of numpy or torch CPU array
-        img_fwd = np.zeros(nLORs, dtype=np.float32)
-
-        if num_visible_cuda_devices > 0:
-            # projection using libparallelproj_cuda
-            num_voxel = ctypes.c_longlong(array_api_compat.size(img))
-
-            # send image to all devices
-            d_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
-                np.asarray(img, dtype=np.float32).ravel(), num_voxel
-            )
-
-            # split call to GPU lib into chunks (useful for systems with
-            # limited memory)
-            ic = calc_chunks(nLORs, num_chunks)
-
-            for i in range(num_chunks):
-                if lor_dependent_sigma_tof:
-                    isig0 = ic[i]
-                    isig1 = ic[i + 1]
-                else:
-                    isig0 = 0
-                    isig1 = 1
-
-                if lor_dependent_tofcenter_offset:
-                    ioff0 = ic[i]
-                    ioff1 = ic[i + 1]
-                else:
-                    ioff0 = 0
-                    ioff1 = 1
-
-                lib_parallelproj_cuda.joseph3d_fwd_tof_lm_cuda(
-                    np.asarray(xstart, dtype=np.float32)[
-                        ic[i] : (ic[i + 1]), :
-                    ].ravel(),
-                    np.asarray(xend, dtype=np.float32)[ic[i] : (ic[i + 1]), :].ravel(),
-                    d_img,
-                    np.asarray(img_origin, dtype=np.float32),
-                    np.asarray(voxsize, dtype=np.float32),
-                    img_fwd[ic[i] : (ic[i + 1])],
-                    ic[i + 1] - ic[i],
-                    np.asarray(img.shape, dtype=np.int32),
-                    np.float32(tofbin_width),
-                    np.asarray(sigma_tof, dtype=np.float32)[isig0:isig1],
-                    np.asarray(tofcenter_offset, dtype=np.float32)[ioff0:ioff1],
-                    np.float32(nsigmas),
-                    np.asarray(tofbin, dtype=np.int16)[ic[i] : (ic[i + 1])],
-                    lor_dependent_sigma_tof,
-                    lor_dependent_tofcenter_offset,
-                    threadsperblock,
-                )
-
-            # free image device arrays
-            lib_parallelproj_cuda.free_float_array_on_all_devices(d_img)
-        else:
-            # projection the openmp libparallelproj_c
-            lib_parallelproj_c.joseph3d_fwd_tof_lm(
-                np.asarray(xstart, dtype=np.float32).ravel(),
-                np.asarray(xend, dtype=np.float32).ravel(),
-                np.asarray(img, dtype=np.float32).ravel(),
-                np.asarray(img_origin, dtype=np.float32),
-                np.asarray(voxsize, dtype=np.float32),
-                img_fwd,
-                np.int64(nLORs),
-                np.asarray(img.shape, dtype=np.int32),
-                np.float32(tofbin_width),
-                np.asarray(sigma_tof, dtype=np.float32),
-                np.asarray(tofcenter_offset, dtype=np.float32),
-                np.float32(nsigmas),
-                np.asarray(tofbin, dtype=np.int16),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
-            )
-
-    return xp.asarray(img_fwd, device=array_api_compat.device(img))
+    return _omp_fwd(
+        lib_parallelproj_c.joseph3d_fwd_tof_lm_batch,
+        _lor_buffers(xstart, xend),
+        img,
+        img_origin,
+        voxsize,
+        (nbatch, nLORs),
+        (nLORs,),
+        (np.int64(nbatch),)
+        + _tof_args(nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin)
+        + (_lor_weights_buffer(lor_weights, nLORs),),
+        out=out,
+        batch=True,
+    )
 
 
-def joseph3d_back_tof_lm(
+def joseph3d_back_tof_lm_batch(
     xstart: Array,
     xend: Array,
     img_shape: tuple[int, int, int],
@@ -1167,32 +3937,36 @@ def joseph3d_back_tof_lm(
     tofbin: Array,
     threadsperblock: int = 32,
     num_chunks: int = 1,
+    out: None | Array = None,
+    accumulate: bool = False,
+    lor_weights: None | Array = None,
 ) -> Array:
-    """TOF Joseph 3D listmode back projector
+    """TOF Joseph 3D listmode back projector of a batch of event values
 
     Parameters
     ----------
     xstart : Array
-        start world coordinates of the event LORs, shape (nLORs, 3)
+        start world coordinates of the event LORs, shape (num_events, 3)
     xend : Array
-        end world coordinates of the event LORs, shape (nLORs, 3)
+        end world coordinates of the event LORs, shape (num_events, 3)
     img_shape : tuple[int, int, int]
-        the shape of the back projected image
+        the shape of a single back projected image
     img_origin : Array
         containing the world coordinates of the image origin (voxel [0,0,0])
     voxsize : Array
         array containing the voxel size
     img_fwd : Array
-        array of size num_events containing the values to be back projected
+        array of shape (nbatch, num_events) containing the values to be
+        back projected
     tofbin_width : float
         width of the TOF bin in spatial units (same units as xstart)
     sigma_tof : Array
         sigma of Gaussian TOF kernel in spatial units (same units as xstart)
         can be an array of length 1 -> same sigma for all LORs
-        or an array of length num_events -> event dependent sigma
+        or an array of length nLORs -> LOR dependent sigma
     tofcenter_offset: Array
         center offset of the central TOF bin in spatial units (same units as xstart)
-        can be an array of length 1 -> same offset for all LORs
+        can be an array of length 1 -> same offset for all events
         or an array of length num_events -> event dependent offset
     nsigmas: float
         number of sigmas to consider when Gaussian kernel is evaluated (truncated)
@@ -1203,131 +3977,69 @@ def joseph3d_back_tof_lm(
     threadsperblock : int, optional
         by default 32
     num_chunks : int, optional
-        break down the projection in hybrid mode into chunks to
+        break down the back projection in hybrid mode into chunks to
         save memory on the GPU, by default 1
+    out : None | Array, optional
+        output array the result is written to, by default None
+        C-contiguous float32 CPU arrays are directly written to by the C lib
+    accumulate : bool, optional
+        add the back projection to the content of out instead of
+        overwriting it, by default False
+    lor_weights : None | Array, optional
+        multiplicative weights of all LORs (e.g. attenuation or normalization
+        factors) of shape xstart.shape[:-1] applied to the values of all
+        batch elements before back projection, by default None
 
     Returns
     -------
     Array
+        of shape (nbatch,) + img_shape
     """
+    _check_batch_ndim(img_fwd, 2, "img_fwd")
+
+    if is_cuda_array(img_fwd) or num_visible_cuda_devices > 0:
+        return _batch_loop(
+            lambda y, o: joseph3d_back_tof_lm(
+                xstart,
+                xend,
+                img_shape,
+                img_origin,
+                voxsize,
+                y,
+                tofbin_width,
+                sigma_tof,
+                tofcenter_offset,
+                nsigmas,
+                tofbin,
+                threadsperblock=threadsperblock,
+                num_chunks=num_chunks,
+                out=o,
+                accumulate=accumulate,
+                lor_weights=lor_weights,
+            ),
+            img_fwd,
+            out,
+        )
 
     nLORs = np.int64(xstart.shape[0])
+    nbatch = img_fwd.shape[0]
     xp = array_api_compat.get_namespace(img_fwd)
 
     if not xp.isdtype(tofbin.dtype, "integral"):
         raise TypeError("tofbin must be an int array")
 
-    lor_dependent_sigma_tof = np.uint8(sigma_tof.shape[0] == nLORs)
-    lor_dependent_tofcenter_offset = np.uint8(tofcenter_offset.shape[0] == nLORs)
-
-    if is_cuda_array(img_fwd):
-        # back projection of cupy or torch GPU array using the cupy raw kernel
-        back_img = cp.zeros(img_shape, dtype=cp.float32)
-
-        _joseph3d_back_tof_lm_cuda_kernel(
-            (math.ceil(nLORs / threadsperblock),),
-            (threadsperblock,),
-            (
-                cp.asarray(xstart, dtype=cp.float32).ravel(),
-                cp.asarray(xend, dtype=cp.float32).ravel(),
-                back_img.ravel(),
-                cp.asarray(img_origin, dtype=cp.float32),
-                cp.asarray(voxsize, dtype=cp.float32),
-                cp.asarray(img_fwd, dtype=cp.float32),
-                nLORs,
-                cp.asarray(back_img.shape, dtype=cp.int32),
-                np.float32(tofbin_width),
-                cp.asarray(sigma_tof, dtype=cp.float32),
-                cp.asarray(tofcenter_offset, dtype=cp.float32),
-                np.float32(nsigmas),
-                cp.asarray(tofbin, dtype=cp.int16),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
-            ),
-        )
-        cp.cuda.Device().synchronize()
-    else:
-        # back projection of numpy or torch CPU array
-        back_img = np.zeros(img_shape, dtype=np.float32)
-
-        if num_visible_cuda_devices > 0:
-            # back projection of numpy array using the cuda parallelproj lib
-            num_voxel = ctypes.c_longlong(array_api_compat.size(back_img))
-            # send image to all devices
-            d_back_img = lib_parallelproj_cuda.copy_float_array_to_all_devices(
-                back_img.ravel(), num_voxel
-            )
-
-            # split call to GPU lib into chunks (useful for systems with
-            # limited memory)
-            ic = calc_chunks(nLORs, num_chunks)
-
-            for i in range(num_chunks):
-                if lor_dependent_sigma_tof:
-                    isig0 = ic[i]
-                    isig1 = ic[i + 1]
-                else:
-                    isig0 = 0
-                    isig1 = 1
-
-                if lor_dependent_tofcenter_offset:
-                    ioff0 = ic[i]
-                    ioff1 = ic[i + 1]
-                else:
-                    ioff0 = 0
-                    ioff1 = 1
-
-                lib_parallelproj_cuda.joseph3d_back_tof_lm_cuda(
-                    np.asarray(xstart, dtype=np.float32)[
-                        ic[i] : (ic[i + 1]), :
-                    ].ravel(),
-                    np.asarray(xend, dtype=np.float32)[ic[i] : (ic[i + 1]), :].ravel(),
-                    d_back_img,
-                    np.asarray(img_origin, dtype=np.float32),
-                    np.asarray(voxsize, dtype=np.float32),
-                    np.asarray(img_fwd, dtype=np.float32)[ic[i] : ic[i + 1]],
-                    ic[i + 1] - ic[i],
-                    np.asarray(back_img.shape, dtype=np.int32),
-                    np.float32(tofbin_width),
-                    np.asarray(sigma_tof, dtype=np.float32)[isig0:isig1],
-                    np.asarray(tofcenter_offset, dtype=np.float32)[ioff0:ioff1],
-                    np.float32(nsigmas),
-                    np.asarray(tofbin, dtype=np.int16)[ic[i] : (ic[i + 1])],
-                    lor_dependent_sigma_tof,
-                    lor_dependent_tofcenter_offset,
-                    threadsperblock,
-                )
-
-            # sum all device arrays in the first device
-            lib_parallelproj_cuda.sum_float_arrays_on_first_device(
-                d_back_img, num_voxel
-            )
-
-            # copy summed image back from first device
-            lib_parallelproj_cuda.get_float_array_from_device(
-                d_back_img, num_voxel, 0, back_img.ravel()
-            )
-
-            # free image device arrays
-            lib_parallelproj_cuda.free_float_array_on_all_devices(d_back_img)
-        else:
-            # back projection of numpy array using the openmp parallelproj lib
-            lib_parallelproj_c.joseph3d_back_tof_lm(
-                np.asarray(xstart, dtype=np.float32).ravel(),
-                np.asarray(xend, dtype=np.float32).ravel(),
-                back_img.ravel(),
-                np.asarray(img_origin, dtype=np.float32),
-                np.asarray(voxsize, dtype=np.float32),
-                np.asarray(img_fwd, dtype=np.float32),
-                nLORs,
-                np.asarray(back_img.shape, dtype=np.int32),
-                np.float32(tofbin_width),
-                np.asarray(sigma_tof, dtype=np.float32),
-                np.asarray(tofcenter_offset, dtype=np.float32),
-                np.float32(nsigmas),
-                np.asarray(tofbin, dtype=np.int16),
-                lor_dependent_sigma_tof,
-                lor_dependent_tofcenter_offset,
-            )
-
-    return xp.asarray(back_img, device=array_api_compat.device(img_fwd))
+    return _omp_back(
+        lib_parallelproj_c.joseph3d_back_tof_lm_batch,
+        _lor_buffers(xstart, xend),
+        img_shape,
+        img_origin,
+        voxsize,
+        img_fwd,
+        (nLORs,),
+        (np.int64(nbatch),)
+        + _tof_args(nLORs, tofbin_width, sigma_tof, tofcenter_offset, nsigmas, tofbin)
+        + (_lor_weights_buffer(lor_weights, nLORs),),
+        out=out,
+        accumulate=accumulate,
+        nbatch=nbatch,
+    )
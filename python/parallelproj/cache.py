@@ -0,0 +1,361 @@
+"""geometry fingerprints and on-disk caching of sensitivity images"""
+from __future__ import annotations
+
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+from numpy.array_api._array_object import Array
+from types import ModuleType
+from collections.abc import Callable
+from array_api_compat import to_device, is_array_api_obj
+
+from .pet_lors import RegularPolygonPETLORDescriptor
+from .projectors import RegularPolygonPETProjector
+
+
+def _hash_update(h, value) -> None:
+    """update a hash with a canonical representation of value"""
+    if value is None or isinstance(value, (bool, int, str)):
+        h.update(repr(value).encode())
+    elif isinstance(value, float):
+        # float32 precision to be independent of float32 / float64 inputs
+        h.update(repr(float(np.float32(value))).encode())
+    elif isinstance(value, enum.Enum):
+        h.update(f"{type(value).__name__}.{value.name}".encode())
+    elif dataclasses.is_dataclass(value):
+        h.update(type(value).__name__.encode())
+        _hash_update(h, dataclasses.asdict(value))
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value):
+            _hash_update(h, k)
+            _hash_update(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (tuple, list)):
+        h.update(b"(")
+        for v in value:
+            _hash_update(h, v)
+        h.update(b")")
+    elif is_array_api_obj(value):
+        x = np.asarray(to_device(value, "cpu"))
+        if np.issubdtype(x.dtype, np.floating):
+            x = x.astype(np.float32)
+        elif np.issubdtype(x.dtype, np.integer):
+            x = x.astype(np.int64)
+        x = np.ascontiguousarray(x)
+        h.update(f"array{x.shape}{x.dtype.str}".encode())
+        h.update(x.tobytes())
+    else:
+        raise TypeError(f"can not fingerprint objects of type {type(value)}")
+
+
+def fingerprint(*values) -> str:
+    """stable hex digest of (nested) python scalars, enums, dataclasses,
+    dicts, tuples, lists and arrays
+
+    Floating point values and arrays are hashed with float32 precision and
+    integer arrays as int64, such that the fingerprint does not depend on
+    the array module, device or input precision.
+
+    Returns
+    -------
+    str
+        sha256 hex digest
+    """
+    h = hashlib.sha256()
+    _hash_update(h, values)
+    return h.hexdigest()
+
+
+def lor_descriptor_fingerprint(lor_descriptor: RegularPolygonPETLORDescriptor) -> str:
+    """stable fingerprint of a regular polygon LOR descriptor including its scanner
+
+    Parameters
+    ----------
+    lor_descriptor : RegularPolygonPETLORDescriptor
+
+    Returns
+    -------
+    str
+        sha256 hex digest
+    """
+    scanner = lor_descriptor.scanner
+
+    return fingerprint(
+        type(scanner).__name__,
+        scanner.all_lor_endpoints,
+        scanner.num_lor_endpoints_per_ring,
+        scanner.ring_positions,
+        scanner.symmetry_axis,
+        type(lor_descriptor).__name__,
+        lor_descriptor.radial_trim,
+        lor_descriptor.max_ring_difference,
+        lor_descriptor.sinogram_order,
+    )
+
+
+def projector_fingerprint(projector: RegularPolygonPETProjector, *extra) -> str:
+    """stable fingerprint of a regular polygon PET projector configuration
+
+    The fingerprint includes the LOR descriptor, the image grid, the projected
+    views, the TOF setting and the LOR weights. Additional inputs that affect the quantity to
+    be cached (e.g. attenuation or normalization sinograms, subset numbers or
+    resolution model parameters) can be passed as extra values.
+
+    Parameters
+    ----------
+    projector : RegularPolygonPETProjector
+    *extra
+        additional values included in the fingerprint
+
+    Returns
+    -------
+    str
+        sha256 hex digest
+    """
+    return fingerprint(
+        lor_descriptor_fingerprint(projector.lor_descriptor),
+        type(projector).__name__,
+        projector.in_shape,
+        projector.voxel_size,
+        projector.img_origin,
+        projector.views,
+        projector.tof,
+        projector.tof_parameters if projector.tof else None,
+        projector.lor_weights,
+        extra,
+    )
+
+
+class SensitivityImageCache:
+    """on-disk cache of sensitivity images (back projections of ones) keyed
+    by a fingerprint (e.g. from :func:`projector_fingerprint`)
+
+    Every entry is stored as ``<key>.npy`` plus a ``<key>.json`` metadata file.
+    The total size of the cached images is bounded by max_bytes by evicting
+    the least recently used entries.
+
+    Examples
+    --------
+    >>> cache = SensitivityImageCache("~/.cache/parallelproj")  # doctest: +SKIP
+    >>> key = projector_fingerprint(proj, att_sino)  # doctest: +SKIP
+    >>> sens_img = cache.get_or_compute(
+    ...     key, lambda: op.adjoint(xp.ones(op.out_shape)), xp, dev
+    ... )  # doctest: +SKIP
+    """
+
+    def __init__(self, cache_dir: str | os.PathLike, max_bytes: int = 2**30) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir : str | os.PathLike
+            directory of the cache, created if it does not exist
+        max_bytes : int, optional
+            maximum total size of the cached images, by default 2**30
+        """
+        self._cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def cache_dir(self) -> str:
+        """directory of the cache"""
+        return self._cache_dir
+
+    @property
+    def max_bytes(self) -> int:
+        """maximum total size of the cached images"""
+        return self._max_bytes
+
+    @property
+    def hits(self) -> int:
+        """number of cache hits"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """number of cache misses"""
+        return self._misses
+
+    @property
+    def size_bytes(self) -> int:
+        """total size of the cached images"""
+        return sum(os.path.getsize(self._npy_path(k)) for k in self.keys())
+
+    def _npy_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.npy")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.json")
+
+    def keys(self) -> list[str]:
+        """keys of all cached images"""
+        return [
+            f[:-5]
+            for f in sorted(os.listdir(self._cache_dir))
+            if f.endswith(".json") and os.path.exists(self._npy_path(f[:-5]))
+        ]
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._meta_path(key)) and os.path.exists(
+            self._npy_path(key)
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def metadata(self, key: str) -> dict:
+        """metadata of a cached image"""
+        with open(self._meta_path(key), "r") as f:
+            return json.load(f)
+
+    def get(
+        self, key: str, xp: None | ModuleType = None, dev: None | str = None
+    ) -> None | Array:
+        """cached image, None if the key is not in the cache
+
+        Parameters
+        ----------
+        key : str
+            fingerprint of the image
+        xp : None | ModuleType, optional
+            array module of the returned image, by default None means numpy
+        dev : None | str, optional
+            device of the returned image, by default None
+
+        Returns
+        -------
+        None | Array
+        """
+        try:
+            img = np.load(self._npy_path(key))
+            # the modification time of the metadata file is the last access time
+            os.utime(self._meta_path(key))
+        except FileNotFoundError:
+            # not cached or removed by a concurrent eviction
+            self._misses += 1
+            return None
+
+        self._hits += 1
+
+        if xp is None:
+            return img
+
+        return xp.asarray(img, device=dev)
+
+    def put(self, key: str, img: Array, metadata: None | dict = None) -> None:
+        """store an image in the cache and evict least recently used images
+
+        Parameters
+        ----------
+        key : str
+            fingerprint of the image
+        img : Array
+            image to be cached
+        metadata : None | dict, optional
+            additional JSON serializable metadata, by default None
+        """
+        img = np.asarray(to_device(img, "cpu"))
+
+        meta = {
+            "shape": list(img.shape),
+            "dtype": img.dtype.str,
+            "created": time.time(),
+        }
+        if metadata is not None:
+            meta.update(metadata)
+
+        # write to temporary files first such that concurrent readers never
+        # see incomplete entries
+        tmp = f".{uuid.uuid4().hex}"
+        np.save(self._npy_path(key + tmp), img)
+        with open(self._meta_path(key + tmp), "w") as f:
+            json.dump(meta, f)
+        os.replace(self._npy_path(key + tmp), self._npy_path(key))
+        os.replace(self._meta_path(key + tmp), self._meta_path(key))
+
+        self._evict(keep=key)
+
+    def _evict(self, keep: None | str = None) -> None:
+        """remove least recently used images until the cache size is below max_bytes"""
+        entries = []
+        for k in self.keys():
+            try:
+                entries.append(
+                    (
+                        os.stat(self._meta_path(k)).st_mtime_ns,
+                        os.path.getsize(self._npy_path(k)),
+                        k,
+                    )
+                )
+            except FileNotFoundError:
+                # removed by a concurrent eviction
+                pass
+        total = sum(e[1] for e in entries)
+
+        for _, nbytes, key in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total -= nbytes
+
+    def remove(self, key: str) -> None:
+        """remove an image from the cache"""
+        for path in (self._meta_path(key), self._npy_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # already removed (e.g. by a concurrent eviction)
+                pass
+
+    def clear(self) -> None:
+        """remove all images from the cache"""
+        for key in self.keys():
+            self.remove(key)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Array],
+        xp: ModuleType,
+        dev: str,
+        metadata: None | dict = None,
+    ) -> Array:
+        """cached image or the result of compute() which is added to the cache
+
+        Parameters
+        ----------
+        key : str
+            fingerprint of the image
+        compute : Callable[[], Array]
+            function computing the image (e.g. back projection of ones)
+            only called if the key is not in the cache
+        xp : ModuleType
+            array module of the returned image
+        dev : str
+            device of the returned image
+        metadata : None | dict, optional
+            additional JSON serializable metadata, by default None
+
+        Returns
+        -------
+        Array
+        """
+        img = self.get(key, xp, dev)
+
+        if img is None:
+            img = compute()
+            self.put(key, img, metadata)
+
+        return img
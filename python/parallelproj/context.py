@@ -0,0 +1,357 @@
+"""projection sessions keeping the image and the LOR geometry resident"""
+from __future__ import annotations
+
+import ctypes
+import contextlib
+import numpy as np
+import array_api_compat
+from array_api_compat import device
+from numpy.array_api._array_object import Array
+from collections.abc import Iterator
+
+from . import backend
+from .tof import TOFParameters
+
+
+class ProjectionContext:
+    """session for repeated (TOF) Joseph 3D projections along a fixed set of LORs
+
+    The LOR endpoints and TOF parameters are converted once into the buffers
+    passed to the projection libs and kept for the lifetime of the session.
+    The image to be forward projected is kept resident until it is replaced
+    (via :meth:`set_image` or by passing a new image to :meth:`fwd`):
+
+    - using the hybrid CUDA lib, the image is uploaded to all visible devices
+      only once instead of in every forward projection
+    - using the OpenMP lib, the image is only converted to float32 once
+      (C-contiguous float32 images are used without copying)
+    - using CUDA arrays (cupy or torch), all arrays already live on the GPU
+      and the projection functions of the backend are used directly
+
+    The number of OpenMP threads of the session is only set during its
+    projections (and restored afterwards).
+
+    The session can be used as context manager that releases the device memory
+    on exit.
+    """
+
+    def __init__(
+        self,
+        xstart: Array,
+        xend: Array,
+        img_shape: tuple[int, int, int],
+        img_origin: Array,
+        voxsize: Array,
+        tof_parameters: None | TOFParameters = None,
+        tofbin: None | Array = None,
+        num_threads: None | int = None,
+        threadsperblock: int = 32,
+        num_chunks: int = 1,
+    ) -> None:
+        """init method
+
+        Parameters
+        ----------
+        xstart : Array
+            start world coordinates of the LORs, shape (nLORs, 3)
+        xend : Array
+            end world coordinates of the LORs, shape (nLORs, 3)
+        img_shape : tuple[int, int, int]
+            shape of the image
+        img_origin : Array
+            containing the world coordinates of the image origin (voxel [0,0,0])
+        voxsize : Array
+            array containing the voxel size
+        tof_parameters : None | TOFParameters, optional
+            TOF parameters, by default None which means non-TOF projections
+        tofbin : None | Array, optional
+            TOF bin of every LOR (event) for TOF listmode projections,
+            by default None which means TOF sinogram projections
+            (ignored for non-TOF projections)
+        num_threads : None | int, optional
+            number of OpenMP threads used in the projections of the session,
+            by default None which means that the current setting is used
+        threadsperblock : int, optional
+            by default 32
+        num_chunks : int, optional
+            break down the projections in hybrid mode into chunks to
+            save memory on the GPU, by default 1
+        """
+        self._xp = array_api_compat.get_namespace(xstart)
+        self._dev = device(xstart)
+        self._on_cuda = backend.is_cuda_array(xstart)
+
+        self._img_shape = tuple(img_shape)
+        self._tof_parameters = tof_parameters
+        self._num_threads = num_threads
+        self._threadsperblock = threadsperblock
+        self._num_chunks = num_chunks
+
+        self._nLORs = int(array_api_compat.size(xstart) // 3)
+        self._lor_shape = tuple(xstart.shape[:-1])
+
+        if self._on_cuda:
+            # all arrays already live on the GPU
+            self._xstart = xstart
+            self._xend = xend
+            self._img_origin = img_origin
+            self._voxsize = voxsize
+        else:
+            self._xstart = backend._as_float32_buffer(xstart, "xstart").reshape(
+                self._lor_shape + (3,)
+            )
+            self._xend = backend._as_float32_buffer(xend, "xend").reshape(
+                self._lor_shape + (3,)
+            )
+            self._img_origin = np.asarray(img_origin, dtype=np.float32)
+            self._voxsize = np.asarray(voxsize, dtype=np.float32)
+
+        if tof_parameters is not None:
+            self._sigma_tof = self._xp.asarray(
+                [tof_parameters.sigma_tof], dtype=self._xp.float32, device=self._dev
+            )
+            self._tofcenter_offset = self._xp.asarray(
+                [tof_parameters.tofcenter_offset],
+                dtype=self._xp.float32,
+                device=self._dev,
+            )
+            if not self._on_cuda:
+                self._sigma_tof = np.asarray(self._sigma_tof, dtype=np.float32)
+                self._tofcenter_offset = np.asarray(
+                    self._tofcenter_offset, dtype=np.float32
+                )
+
+        if tofbin is None or self._on_cuda:
+            self._tofbin = tofbin
+        else:
+            self._tofbin = np.asarray(tofbin, dtype=np.int16).ravel()
+
+        # float32 CPU buffer of the image to be forward projected
+        self._img = None
+        # image passed to set_image (determines the type, device and dtype of
+        # the output of the forward projections)
+        self._img_ref = None
+        # image on all visible CUDA devices (hybrid mode)
+        self._d_img = None
+
+    def __enter__(self) -> ProjectionContext:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self._free_device_image()
+
+    @property
+    def img_shape(self) -> tuple[int, int, int]:
+        """shape of the image"""
+        return self._img_shape
+
+    @property
+    def out_shape(self) -> tuple[int, ...]:
+        """shape of the forward projection"""
+        if self.tof and self._tofbin is None:
+            return self._lor_shape + (self._tof_parameters.num_tofbins,)
+        return self._lor_shape
+
+    @property
+    def tof(self) -> bool:
+        """whether TOF projections are used"""
+        return self._tof_parameters is not None
+
+    @property
+    def tof_parameters(self) -> None | TOFParameters:
+        """TOF parameters"""
+        return self._tof_parameters
+
+    def close(self) -> None:
+        """release the resident image"""
+        self._free_device_image()
+        self._img = None
+        self._img_ref = None
+
+    @contextlib.contextmanager
+    def _session_threads(self) -> Iterator[None]:
+        """set the number of OpenMP threads of the session during a projection"""
+        if self._num_threads is None:
+            yield
+            return
+
+        num_threads_before = backend.get_num_threads()
+        backend.set_num_threads(self._num_threads)
+        try:
+            yield
+        finally:
+            backend.set_num_threads(num_threads_before)
+
+    def _free_device_image(self) -> None:
+        if getattr(self, "_d_img", None) is not None:
+            backend.lib_parallelproj_cuda.free_float_array_on_all_devices(self._d_img)
+            self._d_img = None
+
+    def set_image(self, img: Array) -> None:
+        """set the (resident) image used in all following forward projections
+
+        Parameters
+        ----------
+        img : Array
+            image of shape img_shape
+        """
+        if tuple(img.shape) != self._img_shape:
+            raise ValueError(f"image shape must be {self._img_shape}")
+
+        self._img_ref = img
+
+        if self._on_cuda:
+            return
+
+        self._img = backend._as_float32_buffer(img, "img").reshape(self._img_shape)
+
+        if backend.num_visible_cuda_devices > 0:
+            self._free_device_image()
+            self._d_img = backend.lib_parallelproj_cuda.copy_float_array_to_all_devices(
+                self._img.ravel(), ctypes.c_longlong(self._img.size)
+            )
+
+    def _tof_args(self) -> tuple:
+        """TOF arguments passed to the projection functions of the backend"""
+        return (
+            self._tof_parameters.tofbin_width,
+            self._sigma_tof,
+            self._tofcenter_offset,
+            self._tof_parameters.num_sigmas,
+            self._tof_parameters.num_tofbins
+            if self._tofbin is None
+            else self._tofbin,
+        )
+
+    def fwd(self, img: None | Array = None, out: None | Array = None) -> Array:
+        """forward projection of the resident image
+
+        Parameters
+        ----------
+        img : None | Array, optional
+            new image that replaces the resident image before projecting,
+            by default None
+        out : None | Array, optional
+            output array the result is written to, by default None
+
+        Returns
+        -------
+        Array
+        """
+        if img is not None:
+            self.set_image(img)
+
+        if self._img_ref is None:
+            raise ValueError("no image set, call set_image first")
+
+        if self._on_cuda:
+            return self._fwd(self._img_ref, out)
+
+        # the projection libs write into a float32 CPU buffer (out if possible)
+        # which is converted to the type, device and dtype of the image
+        img_fwd = backend._get_output_buffer(out, self.out_shape)
+
+        if backend.num_visible_cuda_devices > 0:
+            self._fwd_hybrid(img_fwd)
+        else:
+            self._fwd(self._img, img_fwd)
+
+        return backend._finalize_output(
+            array_api_compat.get_namespace(self._img_ref),
+            img_fwd,
+            out,
+            self._img_ref,
+        )
+
+    def _fwd(self, img: Array, out: None | Array) -> Array:
+        """forward projection of img using the projection functions of the backend"""
+        geom = (self._xstart, self._xend, img, self._img_origin, self._voxsize)
+        kwargs = dict(
+            threadsperblock=self._threadsperblock, num_chunks=self._num_chunks, out=out
+        )
+
+        with self._session_threads():
+            if not self.tof:
+                return backend.joseph3d_fwd(*geom, **kwargs)
+            elif self._tofbin is None:
+                return backend.joseph3d_fwd_tof_sino(*geom, *self._tof_args(), **kwargs)
+            else:
+                return backend.joseph3d_fwd_tof_lm(*geom, *self._tof_args(), **kwargs)
+
+    def _fwd_hybrid(self, img_fwd: np.ndarray) -> None:
+        """forward projection of the resident device image using the hybrid CUDA lib"""
+        lib = backend.lib_parallelproj_cuda
+        tof_args = None
+        values_per_lor = 1
+
+        if not self.tof:
+            cuda_func = lib.joseph3d_fwd_cuda
+        else:
+            tof_args = backend._tof_args(self._nLORs, *self._tof_args())
+            if self._tofbin is None:
+                cuda_func = lib.joseph3d_fwd_tof_sino_cuda
+                values_per_lor = self._tof_parameters.num_tofbins
+            else:
+                cuda_func = lib.joseph3d_fwd_tof_lm_cuda
+
+        backend._hybrid_fwd(
+            cuda_func,
+            self._xstart,
+            self._xend,
+            self._img,
+            self._img_origin,
+            self._voxsize,
+            img_fwd,
+            self._num_chunks,
+            self._threadsperblock,
+            tof_args,
+            values_per_lor=values_per_lor,
+            d_img=self._d_img,
+        )
+
+    def back(
+        self, y: Array, out: None | Array = None, accumulate: bool = False
+    ) -> Array:
+        """back projection along the LORs of the session
+
+        Parameters
+        ----------
+        y : Array
+            array of shape out_shape to be back projected
+        out : None | Array, optional
+            output array the result is written to, by default None
+        accumulate : bool, optional
+            add the back projection to the content of out instead of
+            overwriting it, by default False
+
+        Returns
+        -------
+        Array
+        """
+        geom = (
+            self._xstart,
+            self._xend,
+            self._img_shape,
+            self._img_origin,
+            self._voxsize,
+            y,
+        )
+        kwargs = dict(
+            threadsperblock=self._threadsperblock,
+            num_chunks=self._num_chunks,
+            out=out,
+            accumulate=accumulate,
+        )
+
+        with self._session_threads():
+            if not self.tof:
+                return backend.joseph3d_back(*geom, **kwargs)
+            elif self._tofbin is None:
+                return backend.joseph3d_back_tof_sino(
+                    *geom, *self._tof_args(), **kwargs
+                )
+            else:
+                return backend.joseph3d_back_tof_lm(*geom, *self._tof_args(), **kwargs)
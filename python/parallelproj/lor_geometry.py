@@ -0,0 +1,66 @@
+"""PET LOR geometry helpers shared by the backend and the LOR descriptors"""
+from __future__ import annotations
+
+import array_api_compat
+from numpy.array_api._array_object import Array
+
+
+def expand_sym_lor_coordinates(
+    xstart_2d: Array,
+    xend_2d: Array,
+    zstart: Array,
+    zend: Array,
+    plane_axis_num: int,
+    symmetry_axis: int,
+) -> tuple[Array, Array]:
+    """assemble the coordinates of all sinogram LORs from the LORs of plane 0
+    and the plane coordinates
+
+    Parameters
+    ----------
+    xstart_2d, xend_2d : Array
+        start / end world coordinates of the LORs of plane 0,
+        shape (spatial sinogram shape without the plane axis) + (3,)
+    zstart, zend : Array
+        start / end coordinates of all planes along the symmetry axis
+    plane_axis_num : int
+        position of the plane axis in the sinogram
+    symmetry_axis : int
+        axis (0, 1, 2) of the world coordinates that is the symmetry axis
+
+    Returns
+    -------
+    xstart, xend : Array
+        start / end world coordinates of all LORs,
+        shape (spatial sinogram shape) + (3,)
+    """
+    xp = array_api_compat.get_namespace(xstart_2d)
+
+    sino_shape = list(xstart_2d.shape[:-1])
+    sino_shape.insert(plane_axis_num, zstart.shape[0])
+    sino_shape = tuple(sino_shape)
+
+    plane_shape = len(sino_shape) * [1]
+    plane_shape[plane_axis_num] = zstart.shape[0]
+    plane_shape = tuple(plane_shape)
+
+    xstart = []
+    xend = []
+
+    for k in range(3):
+        if k == symmetry_axis:
+            xstart.append(xp.broadcast_to(xp.reshape(zstart, plane_shape), sino_shape))
+            xend.append(xp.broadcast_to(xp.reshape(zend, plane_shape), sino_shape))
+        else:
+            xstart.append(
+                xp.broadcast_to(
+                    xp.expand_dims(xstart_2d[..., k], axis=plane_axis_num), sino_shape
+                )
+            )
+            xend.append(
+                xp.broadcast_to(
+                    xp.expand_dims(xend_2d[..., k], axis=plane_axis_num), sino_shape
+                )
+            )
+
+    return xp.stack(xstart, axis=-1), xp.stack(xend, axis=-1)
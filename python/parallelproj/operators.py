@@ -3,18 +3,36 @@ from __future__ import annotations
 
 from types import ModuleType
 import abc
+import math
+import os
+import functools
+import threading
 import numpy as np
 import array_api_compat
 from array_api_compat import device
 from numpy.array_api._array_object import Array
-from collections.abc import Sequence
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 
 import parallelproj
 
+# maximum number of norms memoized per operator by LinearOperator.norm
+_NORM_CACHE_SIZE = 4
+
+# maximum number of persistent thread pools kept by _thread_pool
+_THREAD_POOL_CACHE_SIZE = 4
+
 
 class LinearOperator(abc.ABC):
     """abstract base class for linear operators"""
 
+    # whether inputs with an additional leading batch axis can be projected
+    # in a single call
+    _supports_batches: bool = False
+
+    # attributes ignored by _fingerprint (e.g. caches)
+    _fingerprint_exclude: tuple[str, ...] = ()
+
     def __init__(self) -> None:
         self._scale = 1
 
@@ -51,42 +69,150 @@ class LinearOperator(abc.ABC):
         """adjoint step :math:`x = A^H y`"""
         raise NotImplementedError
 
-    def apply(self, x: Array) -> Array:
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        """unscaled forward step :math:`y = Ax` written into out
+
+        Operators that can write their result directly into out (without
+        allocating a temporary array) should override this method.
+        """
+        out[...] = self._apply(x)
+        return out
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        """unscaled adjoint step :math:`x = A^H y` written into (or added to) out
+
+        Operators that can write their result directly into out (without
+        allocating a temporary array) should override this method.
+        """
+        if accumulate:
+            out += self._adjoint(y)
+        else:
+            out[...] = self._adjoint(y)
+        return out
+
+    def apply(self, x: Array, out: None | Array = None) -> Array:
         """(scaled) forward step :math:`y = \\alpha A x`
 
         Parameters
         ----------
         x : Array
+        out : None | Array, optional
+            preallocated array of shape out_shape the result is written into,
+            by default None
 
         Returns
         -------
         Array
+            out if given, otherwise a new array
         """
+        if out is None:
+            if self._scale == 1:
+                return self._apply(x)
+            else:
+                return self._scale * self._apply(x)
+
         if self._scale == 1:
-            return self._apply(x)
-        else:
-            return self._scale * self._apply(x)
+            return self._apply_out(x, out)
+
+        out[...] = self._scale * self._apply(x)
+        return out
 
     def __call__(self, x: Array) -> Array:
         """alias to apply(x)"""
         return self.apply(x)
 
-    def adjoint(self, y: Array) -> Array:
+    def adjoint(
+        self, y: Array, out: None | Array = None, accumulate: bool = False
+    ) -> Array:
         """(scaled) adjoint step :math:`x = \\overline{\\alpha} A^H y`
 
         Parameters
         ----------
         y : Array
+        out : None | Array, optional
+            preallocated array of shape in_shape the result is written into,
+            by default None
+        accumulate : bool, optional
+            add the result to the content of out instead of overwriting it,
+            by default False (requires out)
 
         Returns
         -------
         Array
+            out if given, otherwise a new array
+        """
+
+        if out is None:
+            if accumulate:
+                raise ValueError("accumulate=True requires an output array out")
+            if self._scale == 1:
+                return self._adjoint(y)
+            else:
+                return self._scale.conjugate() * self._adjoint(y)
+
+        if self._scale == 1:
+            return self._adjoint_out(y, out, accumulate)
+
+        if accumulate:
+            out += self._scale.conjugate() * self._adjoint(y)
+        else:
+            out[...] = self._scale.conjugate() * self._adjoint(y)
+        return out
+
+    def _apply_ratio_adjoint(
+        self, x: Array, data: Array, contamination: float | Array
+    ) -> Array:
+        """unscaled "ratio" adjoint step :math:`A^H (d / (Ax + s))`
+
+        Operators that can compute this quantity more efficiently than a
+        separate forward and adjoint step should override this method.
+        """
+        return self._adjoint(data / (self._apply(x) + contamination))
+
+    def _with_lor_weights(self, weights: Array) -> None | LinearOperator:
+        """unscaled operator :math:`W A` applying the elementwise multiplication
+        with weights (diagonal matrix :math:`W`) internally, e.g. in the projection
+        kernels of PET projectors
+
+        Used by CompositeLinearOperator to fuse elementwise multiplications into
+        the next operator. Returns None if not supported (default).
+        """
+        return None
+
+    def _fill_caches(self) -> None:
+        """compute all lazily cached data (e.g. the LORs of PET projectors)
+
+        Called before the operator is evaluated by several worker threads
+        (see VstackOperator and LinearOperatorSequence) such that the workers
+        only read the caches. Does nothing by default.
         """
 
+    def apply_ratio_adjoint(
+        self, x: Array, data: Array, contamination: float | Array = 0.0
+    ) -> Array:
+        """(scaled) "ratio" adjoint step :math:`\\overline{\\alpha} A^H (d / (\\alpha A x + s))`
+
+        This is the key step of MLEM / OSEM updates. Operators that support it
+        (e.g. the non-TOF PET projectors using the OpenMP backend) calculate it
+        in a single pass without storing :math:`Ax`.
+
+        Parameters
+        ----------
+        x : Array
+            input to the forward step
+        data : Array
+            data :math:`d` (numerator)
+        contamination : float | Array, optional
+            additive contamination :math:`s`, by default 0.0
+
+        Returns
+        -------
+        Array
+        """
         if self._scale == 1:
-            return self._adjoint(y)
+            return self._apply_ratio_adjoint(x, data, contamination)
         else:
-            return self._scale.conjugate() * self._adjoint(y)
+            return self.adjoint(data / (self.apply(x) + contamination))
 
     def adjointness_test(
         self,
@@ -117,10 +243,10 @@ class LinearOperator(abc.ABC):
             whether the adjoint is correctly implemented
         """
 
-        if iscomplex:
-            dtype = xp.complex128
-        else:
-            dtype = xp.float64
+        # the operator is applied in its native dtype (e.g. float32 for the
+        # projectors), the inner products are computed in double precision
+        dtype = self._native_dtype(xp, iscomplex)
+        dtype64 = xp.complex128 if iscomplex else xp.float64
 
         x = xp.asarray(np.random.rand(*self.in_shape), device=dev, dtype=dtype)
         y = xp.asarray(np.random.rand(*self.out_shape), device=dev, dtype=dtype)
@@ -135,8 +261,10 @@ class LinearOperator(abc.ABC):
                 np.random.rand(*self.out_shape), device=dev, dtype=dtype
             )
 
-        x_fwd = self.apply(x)
-        y_adj = self.adjoint(y)
+        x_fwd = xp.astype(self.apply(x), dtype64)
+        y_adj = xp.astype(self.adjoint(y), dtype64)
+        x = xp.astype(x, dtype64)
+        y = xp.astype(y, dtype64)
 
         if iscomplex:
             ip1 = complex(xp.sum(xp.conj(x_fwd) * y))
@@ -150,6 +278,42 @@ class LinearOperator(abc.ABC):
 
         return np.isclose(ip1, ip2, **kwargs)
 
+    def _fingerprint(self, refs: list) -> tuple:
+        """hashable fingerprint of the operator used to memoize its norm
+
+        Arrays are identified by their id, shape and dtype (in place changes
+        of arrays are not detected) and appended to refs, which the cache
+        keeps alive such that their ids can not be reused. Attributes listed
+        in _fingerprint_exclude (e.g. caches) are ignored.
+        """
+        return (type(self),) + tuple(
+            (k, _fingerprint(v, refs))
+            for k, v in sorted(vars(self).items())
+            if k != "_norm_cache" and k not in self._fingerprint_exclude
+        )
+
+    def _native_dtype(self, xp: ModuleType, iscomplex: bool = False):
+        """float32 (complex64) promoted with the floating point dtypes of
+        the arrays defining the operator"""
+        dtype = xp.complex64 if iscomplex else xp.float32
+        for x in _arrays(self):
+            try:
+                if xp.isdtype(x.dtype, ("real floating", "complex floating")):
+                    dtype = xp.result_type(dtype, x.dtype)
+            except (TypeError, ValueError):
+                # arrays of other array modules
+                pass
+        return dtype
+
+    def _normal_apply(self, x: Array) -> Array:
+        """:math:`A^H A x` for a block of inputs of shape (block_size,) + in_shape"""
+        if self._supports_batches:
+            return self.adjoint(self.apply(x))
+        xp = array_api_compat.get_namespace(x)
+        return xp.stack(
+            [self.adjoint(self.apply(x[i, ...])) for i in range(x.shape[0])]
+        )
+
     def norm(
         self,
         xp: ModuleType,
@@ -157,8 +321,16 @@ class LinearOperator(abc.ABC):
         num_iter: int = 30,
         iscomplex: bool = False,
         verbose: bool = False,
+        dtype=None,
+        rtol: float = 1e-4,
+        block_size: int = 1,
+        use_cache: bool = False,
     ) -> float:
-        """estimate norm of the linear operator using power iterations
+        """estimate norm of the linear operator using (block) power iterations
+
+        The iterations stop early if the relative change of the estimate
+        drops below rtol. With use_cache=True, the result is memoized on a
+        fingerprint of the operator and the arguments.
 
         Parameters
         ----------
@@ -167,11 +339,32 @@ class LinearOperator(abc.ABC):
         dev : str
             device (cpu or cuda)
         num_iter : int, optional
-            number of power iterations
+            maximum number of power iterations
         iscomplex : bool, optional
             use complex arrays
         verbose : bool, optional
             verbose output
+        dtype : None | dtype, optional
+            dtype of the iterates, by default None means the dtype of the
+            operator, i.e. float32 (complex64 if iscomplex is True) promoted
+            with the floating point dtypes of the arrays defining the operator
+        rtol : float, optional
+            relative change of the estimate to stop the iterations, by default 1e-4
+            use 0 to always run num_iter iterations
+        block_size : int, optional
+            number of vectors iterated simultaneously (subspace iteration),
+            by default 1
+            operators supporting batches (e.g. the PET projectors) project
+            all vectors in a single call
+        use_cache : bool, optional
+            memoize the norm and return the memoized norm if available,
+            by default False
+            The memoized norm is only recomputed if the scale, a (scalar)
+            parameter or one of the arrays of the operator (or its sub
+            operators) is replaced. Changing the content of an array in place
+            is not detected and returns a stale norm.
+            The cache keeps the arrays of the last few (at most 4) memoized
+            norms alive and is not saved by :func:`parallelproj.save`.
 
         Returns
         -------
@@ -179,27 +372,151 @@ class LinearOperator(abc.ABC):
             the norm of the linear operator
         """
 
-        if iscomplex:
-            dtype = xp.complex128
+        if dtype is None:
+            dtype = self._native_dtype(xp, iscomplex)
+
+        block_size = max(1, min(block_size, math.prod(self.in_shape)))
+
+        if not use_cache:
+            return self._estimate_norm(
+                xp, dev, num_iter, iscomplex, verbose, dtype, rtol, block_size
+            )
+
+        refs = []
+        key = (
+            self._fingerprint(refs),
+            xp.__name__,
+            str(dev),
+            str(dtype),
+            num_iter,
+            iscomplex,
+            rtol,
+            block_size,
+        )
+        # (loaded operators have a _norm_cache of None)
+        if getattr(self, "_norm_cache", None) is None:
+            self._norm_cache = {}
+        cache = self._norm_cache
+
+        if key in cache:
+            # most recently used entries are last
+            cache[key] = cache.pop(key)
         else:
-            dtype = xp.float64
+            norm = self._estimate_norm(
+                xp, dev, num_iter, iscomplex, verbose, dtype, rtol, block_size
+            )
+            cache[key] = (norm, refs)
 
-        x = xp.asarray(np.random.rand(*self.in_shape), device=dev, dtype=dtype)
+            # drop the least recently used entries and the arrays they keep alive
+            while len(cache) > _NORM_CACHE_SIZE:
+                del cache[next(iter(cache))]
+
+        return cache[key][0]
 
+    def _estimate_norm(
+        self,
+        xp: ModuleType,
+        dev: str,
+        num_iter: int,
+        iscomplex: bool,
+        verbose: bool,
+        dtype,
+        rtol: float,
+        block_size: int,
+    ) -> float:
+        """(block) power iterations of :meth:`norm`"""
+        # fixed seed such that the estimate is reproducible
+        rng = np.random.default_rng(0)
+        shape = (block_size,) + tuple(self.in_shape)
+        x0 = rng.random(shape)
         if iscomplex:
-            x = x + 1j * xp.asarray(
-                np.random.rand(*self.in_shape), device=dev, dtype=dtype
-            )
+            x0 = x0 + 1j * rng.random(shape)
+
+        x = _orthonormalize(xp, xp.asarray(x0, device=dev, dtype=dtype), iscomplex)
+
+        norm = 0.0
 
         for i in range(num_iter):
-            x = self.adjoint(self.apply(x))
-            norm_squared = xp.sqrt(xp.sum(xp.abs(x) ** 2))
-            x /= float(norm_squared)
+            z = self._normal_apply(x)
+
+            # largest eigenvalue of the Rayleigh-Ritz matrix X^H A^H A X
+            h = np.zeros((block_size, block_size), dtype=np.complex128)
+            for k in range(block_size):
+                for j in range(block_size):
+                    h[k, j] = complex(_vdot(xp, x[k, ...], z[j, ...], iscomplex))
+            new_norm = math.sqrt(max(float(np.linalg.eigvalsh(h)[-1]), 0.0))
 
             if verbose:
-                print(f"{(i+1):03} {xp.sqrt(norm_squared):.2E}")
+                print(f"{(i+1):03} {new_norm:.2E}")
+
+            converged = abs(new_norm - norm) <= rtol * new_norm
+            norm = new_norm
+
+            if converged or new_norm == 0:
+                break
+
+            x = _orthonormalize(xp, z, iscomplex)
+
+        return norm
+
+
+def _fingerprint(value, refs: list) -> object:
+    """hashable fingerprint of (operator) attributes
 
-        return float(xp.sqrt(norm_squared))
+    objects identified by their id are appended to refs
+    """
+    if isinstance(value, LinearOperator):
+        return value._fingerprint(refs)
+    if isinstance(value, (list, tuple)):
+        return tuple(_fingerprint(v, refs) for v in value)
+    if isinstance(value, dict):
+        return tuple((k, _fingerprint(v, refs)) for k, v in sorted(value.items()))
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        refs.append(value)
+        return ("array", id(value), tuple(value.shape), str(value.dtype))
+    try:
+        hash(value)
+    except TypeError:
+        # unhashable objects (e.g. dataclasses like TOFParameters) by value
+        if hasattr(value, "__dict__"):
+            return (type(value), _fingerprint(vars(value), refs))
+        refs.append(value)
+        return ("object", id(value))
+    return value
+
+
+def _arrays(value) -> Iterator[Array]:
+    """all arrays defining an operator (or stored in containers)"""
+    if isinstance(value, LinearOperator):
+        for k, v in vars(value).items():
+            if k != "_norm_cache" and k not in value._fingerprint_exclude:
+                yield from _arrays(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _arrays(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _arrays(v)
+    elif hasattr(value, "shape") and hasattr(value, "dtype"):
+        yield value
+
+
+def _vdot(xp: ModuleType, x: Array, y: Array, iscomplex: bool) -> Array:
+    """inner product :math:`x^H y`"""
+    if iscomplex:
+        return xp.sum(xp.conj(x) * y)
+    return xp.sum(x * y)
+
+
+def _orthonormalize(xp: ModuleType, x: Array, iscomplex: bool) -> Array:
+    """orthonormalize the vectors x[i, ...] (in place, modified Gram-Schmidt)"""
+    for i in range(x.shape[0]):
+        for j in range(i):
+            x[i, ...] -= _vdot(xp, x[j, ...], x[i, ...], iscomplex) * x[j, ...]
+        n = math.sqrt(abs(complex(_vdot(xp, x[i, ...], x[i, ...], iscomplex))))
+        if n > 0:
+            x[i, ...] /= n
+    return x
 
 
 class MatrixOperator(LinearOperator):
@@ -256,6 +573,21 @@ class MatrixOperator(LinearOperator):
             return self.xp.matmul(self._A.T, y)
 
 
+def _absorb_factors(
+    xp: ModuleType, m: Array, data: Array, contamination: float | Array
+) -> tuple[Array, Array]:
+    """absorb (real) factors m of a ratio :math:`m d / (m z + s)` into the data
+    and contamination using :math:`m d / (m z + s) = d / (z + s/m)` for
+    :math:`m \\neq 0` (and 0 for :math:`m = 0`)"""
+    nonzero = m != 0
+    m_safe = xp.where(nonzero, m, xp.ones_like(m))
+
+    data = xp.where(nonzero, data, xp.zeros_like(data))
+    contamination = xp.where(nonzero, contamination / m_safe, xp.ones_like(m))
+
+    return data, contamination
+
+
 class CompositeLinearOperator(LinearOperator):
     """Composite Linear Operator defined by a sequence of Linear Operators
 
@@ -274,6 +606,9 @@ class CompositeLinearOperator(LinearOperator):
     .. minigallery:: parallelproj.CompositeLinearOperator
     """
 
+    # cached fused operators
+    _fingerprint_exclude = ("_fused",)
+
     def __init__(self, operators: Sequence[LinearOperator]):
         """init method
 
@@ -284,6 +619,7 @@ class CompositeLinearOperator(LinearOperator):
         """
         super().__init__()
         self._operators = operators
+        self._fused = None
 
     @property
     def in_shape(self) -> tuple[int, ...]:
@@ -298,18 +634,136 @@ class CompositeLinearOperator(LinearOperator):
         """tuple of linear operators"""
         return self._operators
 
+    def _fill_caches(self) -> None:
+        for op in self._operators:
+            op._fill_caches()
+        self._fused_operators()
+
+    def _fusion_key(self) -> tuple:
+        """state of the operators the fused operators depend on"""
+        return tuple(
+            (
+                op,
+                getattr(op, "_values", None),
+                getattr(op, "_lor_weights", None),
+                op.scale,
+                getattr(op, "tof", None),
+                op.out_shape,
+            )
+            for op in self._operators
+        )
+
+    def _fused_operators(self) -> list[LinearOperator]:
+        """operators where (real) elementwise multiplications are fused into
+        the next operator if it can apply them internally
+
+        E.g. a multiplication with attenuation / sensitivity factors followed
+        by a PET projector is replaced by a projector applying the factors
+        as LOR weights in the projection kernels, such that no intermediate
+        sinogram needs to be allocated and multiplied.
+
+        The fused operators are cached and only rebuilt if an operator,
+        its scale, its values / LOR weights (replaced, not modified in place),
+        its TOF mode or its output shape changes.
+        """
+        key = self._fusion_key()
+
+        if self._fused is not None:
+            cached_key, fused = self._fused
+            if len(cached_key) == len(key) and all(
+                a[0] is b[0] and a[1] is b[1] and a[2] is b[2] and a[3:] == b[3:]
+                for a, b in zip(cached_key, key)
+            ):
+                return fused
+
+        operators = list(self._operators)
+        fused = []
+
+        i = 0
+        while i < len(operators):
+            op = operators[i]
+            if (
+                i < len(operators) - 1
+                and isinstance(
+                    op,
+                    (
+                        ElementwiseMultiplicationOperator,
+                        TOFNonTOFElementwiseMultiplicationOperator,
+                    ),
+                )
+                and op.scale == 1
+                and not op.iscomplex()
+            ):
+                fused_op = operators[i + 1]._with_lor_weights(op.values)
+                if fused_op is not None:
+                    # _with_lor_weights returns an unscaled operator
+                    fused_op.scale = operators[i + 1].scale
+                    fused.append(fused_op)
+                    i += 2
+                    continue
+            fused.append(op)
+            i += 1
+
+        self._fused = (key, fused)
+
+        return fused
+
     def _apply(self, x: Array) -> Array:
         y = x
-        for op in self[::-1]:
+        for op in self._fused_operators()[::-1]:
             y = op(y)
         return y
 
     def _adjoint(self, y: Array) -> Array:
         x = y
-        for op in self:
+        for op in self._fused_operators():
             x = op.adjoint(x)
         return x
 
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        operators = self._fused_operators()
+        y = x
+        for op in operators[:0:-1]:
+            y = op(y)
+        return operators[0].apply(y, out=out)
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        operators = self._fused_operators()
+        x = y
+        for op in operators[:-1]:
+            x = op.adjoint(x)
+        return operators[-1].adjoint(x, out=out, accumulate=accumulate)
+
+    def _apply_ratio_adjoint(
+        self, x: Array, data: Array, contamination: float | Array
+    ) -> Array:
+        operators = list(self._fused_operators())
+
+        # leading (real) elementwise multiplications that could not be fused
+        # into the next operator are absorbed into the data and contamination
+        # such that the ratio adjoint of the next operator can be used
+        while (
+            len(operators) > 1
+            and isinstance(operators[0], ElementwiseMultiplicationOperator)
+            and operators[0].scale == 1
+            and not operators[0].iscomplex()
+        ):
+            data, contamination = _absorb_factors(
+                operators[0].xp, operators[0].values, data, contamination
+            )
+            operators = operators[1:]
+
+        z = x
+        for op in operators[:0:-1]:
+            z = op(z)
+
+        x_back = operators[0].apply_ratio_adjoint(z, data, contamination)
+
+        for op in operators[1:]:
+            x_back = op.adjoint(x_back)
+
+        return x_back
+
     def __getitem__(self, i: int) -> LinearOperator:
         """get the i-th operator :math:`A_i`"""
         return self._operators[i]
@@ -368,6 +822,11 @@ class ElementwiseMultiplicationOperator(LinearOperator):
         ) or self.xp.isdtype(self._values.dtype, self.xp.complex128)
 
 
+def _requires_grad(*arrays: Array) -> bool:
+    """whether any of the arrays (torch tensors) requires grad"""
+    return any(getattr(a, "requires_grad", False) for a in arrays)
+
+
 class TOFNonTOFElementwiseMultiplicationOperator(LinearOperator):
     """Element-wise multiplication operator between a non-TOF and TOF sinogram
 
@@ -408,23 +867,80 @@ class TOFNonTOFElementwiseMultiplicationOperator(LinearOperator):
         """values that get multiplied"""
         return self._values
 
-    def _apply(self, x: Array) -> Array:
-        y = 1 * x  # suboptimal to copy array, but bug in torch asarray with copy = True
+    def _multiply(
+        self, x: Array, values: Array, out: Array, accumulate: bool = False
+    ) -> Array:
+        """write (or add) the product of the TOF array x and the non-TOF values
+        into out in a single pass without temporaries of the size of x
+
+        out can be x itself (in place multiplication)
+        """
+        if not accumulate:
+            if array_api_compat.is_numpy_array(out) or array_api_compat.is_cupy_array(
+                out
+            ):
+                xp = array_api_compat.get_namespace(out)
+                xp.multiply(x, values[..., None], out=out)
+                return out
+            # torch does not support out= for inputs that require grad
+            if array_api_compat.is_torch_array(out) and not _requires_grad(
+                x, values
+            ):
+                xp = array_api_compat.get_namespace(out)
+                xp.mul(x, values[..., None], out=out)
+                return out
+
+        # namespaces without out= (and accumulation), TOF bin by TOF bin
         for i in range(x.shape[-1]):
-            y[..., i] *= self._values
+            if accumulate:
+                out[..., i] += x[..., i] * values
+            else:
+                out[..., i] = x[..., i] * values
+
+        return out
+
+    def _result_dtype(self, x: Array):
+        """dtype of the product (dtype of x unless complex values are multiplied
+        with a real x)"""
+        if self.iscomplex() and not self.xp.isdtype(x.dtype, "complex floating"):
+            return self.xp.result_type(x, self._values)
+        return x.dtype
+
+    def _product(self, x: Array, values: Array) -> Array:
+        """product of x and values (for inputs that require grad)"""
+        y = x * values[..., None]
+        if y.dtype != self._result_dtype(x):
+            y = self.xp.astype(y, self._result_dtype(x))
         return y
 
-    def _adjoint(self, y: Array) -> Array:
-        x = 1 * y  # suboptimal to copy array
+    def _empty_like(self, x: Array) -> Array:
+        """uninitialized array of the shape of x and the dtype of the product"""
+        return self.xp.empty(
+            x.shape,
+            dtype=self._result_dtype(x),
+            device=array_api_compat.device(x),
+        )
+
+    def _conj_values(self) -> Array:
         if self.iscomplex():
-            tmp = self.xp.conj(self._values)
-        else:
-            tmp = self._values
+            return self.xp.conj(self._values)
+        return self._values
 
-        for i in range(x.shape[-1]):
-            x[..., i] *= tmp
+    def _apply(self, x: Array) -> Array:
+        if _requires_grad(x, self._values):
+            return self._product(x, self._values)
+        return self._multiply(x, self._values, self._empty_like(x))
 
-        return x
+    def _adjoint(self, y: Array) -> Array:
+        if _requires_grad(y, self._values):
+            return self._product(y, self._conj_values())
+        return self._multiply(y, self._conj_values(), self._empty_like(y))
+
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        return self._multiply(x, self._values, out)
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        return self._multiply(y, self._conj_values(), out, accumulate=accumulate)
 
     def iscomplex(self) -> bool:
         """bool whether the operator is complex"""
@@ -433,15 +949,206 @@ class TOFNonTOFElementwiseMultiplicationOperator(LinearOperator):
         ) or self.xp.isdtype(self._values.dtype, self.xp.complex128)
 
 
+# keyword arguments of scipy.ndimage.gaussian_filter supported by the
+# multithreaded separable implementation of GaussianFilterOperator
+_GAUSSIAN_FILTER_KWARGS = {"mode", "cval", "truncate", "radius"}
+
+# scipy.ndimage boundary modes and the corresponding numpy.pad modes used
+# by the FFT based filtering
+_FFT_PAD_MODES = {
+    "reflect": "symmetric",
+    "grid-mirror": "symmetric",
+    "mirror": "reflect",
+    "nearest": "edge",
+    "constant": "constant",
+    "grid-constant": "constant",
+    "grid-wrap": "wrap",
+}
+
+# minimum number of array elements per thread for multithreaded filtering
+_MIN_ELEMENTS_PER_THREAD = 2**15
+
+
+@functools.lru_cache(maxsize=64)
+def _gaussian_kernel1d(sigma: float, radius: int) -> np.ndarray:
+    """normalized, truncated 1D Gaussian kernel (as used by scipy.ndimage)"""
+    x = np.arange(-radius, radius + 1, dtype=np.float64)
+    w = np.exp(-0.5 / (sigma * sigma) * x**2)
+    w /= w.sum()
+    w.flags.writeable = False
+    return w
+
+
+def _correlate_axis(
+    src: np.ndarray,
+    dst: np.ndarray,
+    w: np.ndarray,
+    axis: int,
+    mode: str,
+    cval: float,
+    num_threads: int,
+) -> None:
+    """1D correlation of src along an axis written into dst (can be src)
+    using multiple threads working on slabs along another axis"""
+    import scipy.ndimage as ndimage
+
+    num_slabs = min(num_threads, max(1, src.size // _MIN_ELEMENTS_PER_THREAD))
+
+    if src.ndim > 1 and num_slabs > 1:
+        # split along the largest axis that is not filtered
+        slab_axis = max(
+            (i for i in range(src.ndim) if i != axis), key=lambda i: src.shape[i]
+        )
+        num_slabs = min(num_slabs, src.shape[slab_axis])
+
+    if src.ndim == 1 or num_slabs <= 1:
+        ndimage.correlate1d(src, w, axis=axis, output=dst, mode=mode, cval=cval)
+        return
+
+    bounds = np.linspace(0, src.shape[slab_axis], num_slabs + 1).astype(int)
+
+    def _correlate_slab(i: int) -> None:
+        sl = (slice(None),) * slab_axis + (slice(bounds[i], bounds[i + 1]),)
+        ndimage.correlate1d(
+            src[sl], w, axis=axis, output=dst[sl], mode=mode, cval=cval
+        )
+
+    # scipy.ndimage releases the GIL such that the slabs are filtered in parallel,
+    # the pool is keyed by num_threads (not num_slabs) to be reused for all axes
+    _parallel_map(_correlate_slab, range(num_slabs), num_threads, None)
+
+
+def _fft_correlate_axis(
+    src: np.ndarray,
+    dst: np.ndarray,
+    w: np.ndarray,
+    axis: int,
+    mode: str,
+    cval: float,
+    num_threads: int,
+) -> None:
+    """1D correlation of src with a symmetric kernel along an axis via FFT
+    written into dst (can be src)"""
+    import scipy.fft
+
+    radius = (w.size - 1) // 2
+    pad_width = [(0, 0)] * src.ndim
+    pad_width[axis] = (radius, radius)
+
+    pad_mode = _FFT_PAD_MODES[mode]
+    pad_kwargs = {"constant_values": cval} if pad_mode == "constant" else {}
+    padded = np.pad(src.astype(np.float64), pad_width, mode=pad_mode, **pad_kwargs)
+
+    # circular convolution of length >= padded size is exact in the valid region
+    n = padded.shape[axis]
+    nfft = scipy.fft.next_fast_len(n, real=True)
+
+    kernel_shape = [1] * src.ndim
+    kernel_shape[axis] = -1
+
+    f = scipy.fft.rfft(padded, nfft, axis=axis, workers=num_threads)
+    f *= np.reshape(scipy.fft.rfft(w, nfft), kernel_shape)
+    res = scipy.fft.irfft(f, nfft, axis=axis, workers=num_threads)
+
+    sl = [slice(None)] * src.ndim
+    sl[axis] = slice(w.size - 1, n)
+    dst[...] = res[tuple(sl)]
+
+
+@functools.lru_cache(maxsize=64)
+def _padded_indices(mode: str, n: int, radius: int) -> np.ndarray:
+    """indices of the samples of an axis of length n extended by radius samples
+    on both sides according to a (non constant) scipy.ndimage boundary mode"""
+    i = np.arange(-radius, n + radius)
+
+    if mode in ("reflect", "grid-mirror"):
+        i = i % (2 * n)
+        i = np.where(i >= n, 2 * n - 1 - i, i)
+    elif mode == "mirror":
+        if n == 1:
+            i = np.zeros_like(i)
+        else:
+            i = i % (2 * n - 2)
+            i = np.where(i >= n, 2 * n - 2 - i, i)
+    elif mode == "nearest":
+        i = np.clip(i, 0, n - 1)
+    elif mode in ("wrap", "grid-wrap"):
+        i = i % n
+    else:
+        raise ValueError(f"unsupported boundary mode {mode}")
+
+    i.flags.writeable = False
+    return i
+
+
+@functools.lru_cache(maxsize=64)
+def _torch_padded_indices(mode: str, n: int, radius: int, dev) -> Array:
+    import torch
+
+    return torch.as_tensor(_padded_indices(mode, n, radius), device=dev)
+
+
+@functools.lru_cache(maxsize=64)
+def _torch_gaussian_kernel1d(sigma: float, radius: int, dtype, dev) -> Array:
+    """cached 1D Gaussian kernel of shape (1, 1, 2 * radius + 1) for conv1d"""
+    import torch
+
+    w = _gaussian_kernel1d(sigma, radius)
+    return torch.as_tensor(w, dtype=dtype, device=dev).reshape(1, 1, -1)
+
+
+def _torch_correlate_axis(
+    x: Array, w: Array, axis: int, mode: str, cval: float
+) -> Array:
+    """1D correlation of a torch tensor with a symmetric kernel along an axis
+    using conv1d"""
+    import torch
+
+    radius = (w.shape[-1] - 1) // 2
+
+    xt = torch.movedim(x, axis, -1)
+    shape = xt.shape
+    xt = xt.reshape(-1, 1, shape[-1])
+
+    if mode in ("constant", "grid-constant"):
+        xt = torch.nn.functional.pad(xt, (radius, radius), value=cval)
+    else:
+        xt = torch.index_select(
+            xt, -1, _torch_padded_indices(mode, shape[-1], radius, x.device)
+        )
+
+    res = torch.nn.functional.conv1d(xt, w).reshape(shape)
+
+    return torch.movedim(res, -1, axis)
+
+
 class GaussianFilterOperator(LinearOperator):
     """Gaussian filter operator
 
+    On the CPU, the filter is implemented as a sequence of separable 1D
+    correlations with cached truncated Gaussian kernels that are executed by
+    multiple threads working on slabs of the image. Results match
+    :func:`scipy.ndimage.gaussian_filter`. Optionally, axes with large
+    standard deviations are filtered via FFTs.
+
+    torch tensors are filtered on their device using separable
+    :func:`torch.nn.functional.conv1d` calls such that the result stays in
+    the autograd graph. Arrays with an additional leading dimension are
+    treated as stacks of arrays of shape in_shape.
+
     Examples
     --------
     .. minigallery:: parallelproj.GaussianFilterOperator
     """
 
-    def __init__(self, in_shape: tuple[int, ...], sigma: float | Array, **kwargs):
+    def __init__(
+        self,
+        in_shape: tuple[int, ...],
+        sigma: float | Array,
+        num_threads: None | int = None,
+        fft_min_sigma: None | float = None,
+        **kwargs,
+    ):
         """init method
 
         Parameters
@@ -450,12 +1157,20 @@ class GaussianFilterOperator(LinearOperator):
             shape of the input array
         sigma: float | array
             standard deviation of the gaussian filter
+        num_threads : None | int, optional
+            number of threads used for filtering on the CPU,
+            by default None means os.cpu_count()
+        fft_min_sigma : None | float, optional
+            axes with a standard deviation >= fft_min_sigma are filtered via
+            FFTs (CPU only), by default None means never
         **kwargs : sometype
             passed to the ndimage gaussian_filter function
         """
         super().__init__()
         self._in_shape = in_shape
         self._sigma = sigma
+        self._num_threads = num_threads
+        self._fft_min_sigma = fft_min_sigma
         self._kwargs = kwargs
 
     @property
@@ -466,7 +1181,168 @@ class GaussianFilterOperator(LinearOperator):
     def out_shape(self) -> tuple[int, ...]:
         return self._in_shape
 
+    @property
+    def num_threads(self) -> int:
+        """number of threads used for filtering on the CPU"""
+        if self._num_threads is None:
+            return os.cpu_count() or 1
+        return self._num_threads
+
+    @num_threads.setter
+    def num_threads(self, value: None | int) -> None:
+        self._num_threads = value
+
+    @property
+    def fft_min_sigma(self) -> None | float:
+        """minimum standard deviation of axes filtered via FFTs"""
+        return self._fft_min_sigma
+
+    @fft_min_sigma.setter
+    def fft_min_sigma(self, value: None | float) -> None:
+        self._fft_min_sigma = value
+
+    def _cpu_sigma(self) -> float | np.ndarray:
+        if array_api_compat.is_array_api_obj(self._sigma):
+            return np.asarray(array_api_compat.to_device(self._sigma, "cpu"))
+        return self._sigma
+
+    def _separable_kernels(
+        self, ndim: int
+    ) -> list[tuple[int, float, int, str]]:
+        """axis, sigma, kernel radius and boundary mode of all filtered axes
+
+        Arrays with more dimensions than in_shape are stacks of arrays
+        of shape in_shape that are filtered along their trailing axes.
+        """
+        n = len(self._in_shape)
+        offset = ndim - n
+
+        sigmas = np.broadcast_to(np.asarray(self._cpu_sigma(), dtype=float), (n,))
+        modes = self._kwargs.get("mode", "reflect")
+        if isinstance(modes, str):
+            modes = (modes,) * n
+        truncate = self._kwargs.get("truncate", 4.0)
+        radii = np.broadcast_to(np.asarray(self._kwargs.get("radius", None)), (n,))
+
+        kernels = []
+
+        for i in range(n):
+            sigma = float(sigmas[i])
+            # same as scipy: axes with (almost) zero sigma are not filtered
+            if sigma <= 1e-15:
+                continue
+
+            r = radii[i]
+            r = int(truncate * sigma + 0.5) if r is None else int(r)
+            kernels.append((offset + i, sigma, r, modes[i]))
+
+        return kernels
+
+    def _filter_cpu(self, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """separable Gaussian filtering of x written into out"""
+        cval = self._kwargs.get("cval", 0.0)
+
+        src = x
+
+        for axis, sigma, radius, mode in self._separable_kernels(x.ndim):
+            w = _gaussian_kernel1d(sigma, radius)
+
+            if (
+                self._fft_min_sigma is not None
+                and sigma >= self._fft_min_sigma
+                and mode in _FFT_PAD_MODES
+            ):
+                _fft_correlate_axis(src, out, w, axis, mode, cval, self.num_threads)
+            else:
+                _correlate_axis(src, out, w, axis, mode, cval, self.num_threads)
+
+            src = out
+
+        if src is x:
+            out[...] = x
+
+        return out
+
+    def _filter_torch(self, x: Array) -> Array:
+        """separable Gaussian filtering of a torch tensor using conv1d
+        (on the device of x and differentiable)"""
+        cval = self._kwargs.get("cval", 0.0)
+
+        for axis, sigma, radius, mode in self._separable_kernels(x.ndim):
+            w = _torch_gaussian_kernel1d(sigma, radius, x.dtype, x.device)
+            x = _torch_correlate_axis(x, w, axis, mode, cval)
+
+        return x
+
+    def _use_separable_filter(self) -> bool:
+        return set(self._kwargs) <= _GAUSSIAN_FILTER_KWARGS | {"order"} and np.all(
+            np.asarray(self._kwargs.get("order", 0)) == 0
+        )
+
+    def _apply_out(self, x: Array, out: None | Array) -> Array:
+        xp = array_api_compat.get_namespace(x)
+
+        if (
+            array_api_compat.is_torch_array(x)
+            and self._use_separable_filter()
+            and x.dtype in (xp.float32, xp.float64)
+        ):
+            res = self._filter_torch(x)
+            if out is None:
+                return res
+            out[...] = res
+            return out
+
+        if (
+            parallelproj.is_cuda_array(x)
+            or not self._use_separable_filter()
+            or np.asarray(x).dtype not in (np.float32, np.float64)
+        ):
+            if out is None:
+                return self._apply_ndimage(x)
+            out[...] = self._apply_ndimage(x)
+            return out
+
+        x_np = np.asarray(x)
+
+        # write directly into out if possible
+        buf = None
+        if out is not None:
+            try:
+                buf = np.asarray(out)
+            except (RuntimeError, TypeError, ValueError):
+                buf = None
+            if buf is not None and (
+                not buf.flags.writeable
+                or buf.dtype != x_np.dtype
+                or buf.shape != x_np.shape
+                or np.may_share_memory(buf, x_np)
+            ):
+                buf = None
+
+        if buf is not None:
+            self._filter_cpu(x_np, buf)
+            return out
+
+        res = self._filter_cpu(x_np, np.empty_like(x_np))
+
+        if out is None:
+            return xp.asarray(res, device=device(x))
+
+        out[...] = xp.asarray(res, device=device(out))
+        return out
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        if accumulate:
+            out += self._apply(y)
+            return out
+        return self._apply_out(y, out)
+
     def _apply(self, x: Array) -> Array:
+        return self._apply_out(x, None)
+
+    def _apply_ndimage(self, x: Array) -> Array:
+        """filtering using (cupyx.)scipy.ndimage.gaussian_filter"""
         xp = array_api_compat.get_namespace(x)
 
         if parallelproj.is_cuda_array(x):
@@ -485,13 +1361,10 @@ class GaussianFilterOperator(LinearOperator):
         else:
             import scipy.ndimage as ndimage
 
-            if array_api_compat.is_array_api_obj(self._sigma):
-                sigma = np.asarray(self._sigma)
-            else:
-                sigma = self._sigma
-
             return xp.asarray(
-                ndimage.gaussian_filter(np.asarray(x), sigma=sigma, **self._kwargs),
+                ndimage.gaussian_filter(
+                    np.asarray(x), sigma=self._cpu_sigma(), **self._kwargs
+                ),
                 device=device(x),
             )
 
@@ -499,19 +1372,162 @@ class GaussianFilterOperator(LinearOperator):
         return self._apply(y)
 
 
+# state of the threads of the pools returned by _thread_pool
+_worker_state = threading.local()
+
+# persistent thread pools keyed by (num_workers, threads_per_worker)
+# in the order of their last use
+_thread_pools: dict[tuple[int, None | int], ThreadPoolExecutor] = {}
+_thread_pools_lock = threading.RLock()
+
+
+def _init_worker(threads_per_worker: None | int) -> None:
+    """initializer of the threads of the pools returned by _thread_pool"""
+    _worker_state.in_pool = True
+    if threads_per_worker is not None:
+        parallelproj.set_num_threads(threads_per_worker)
+
+
+def _thread_pool(
+    num_workers: int, threads_per_worker: None | int = None
+) -> ThreadPoolExecutor:
+    """persistent pool of num_workers threads shared by all operators
+
+    The number of OpenMP threads of every thread is set to threads_per_worker
+    once when the thread is started (not changed if None).
+    At most _THREAD_POOL_CACHE_SIZE pools are kept, the least recently used
+    pool is shut down (its threads exit after finishing the submitted work).
+    """
+    key = (num_workers, threads_per_worker)
+
+    with _thread_pools_lock:
+        pool = _thread_pools.pop(key, None)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=num_workers,
+                initializer=_init_worker,
+                initargs=(threads_per_worker,),
+            )
+        _thread_pools[key] = pool
+
+        while len(_thread_pools) > _THREAD_POOL_CACHE_SIZE:
+            _thread_pools.pop(next(iter(_thread_pools))).shutdown(wait=False)
+
+    return pool
+
+
+def _parallel_map(
+    func: Callable,
+    items: Sequence,
+    num_workers: int,
+    threads_per_worker: None | int,
+) -> list:
+    """apply func to all items using a pool of num_workers threads
+
+    The projection kernels of the C lib (and scipy.ndimage) release the GIL
+    such that the items are processed concurrently. Every worker uses
+    threads_per_worker OpenMP threads (unchanged if None). Nested calls from
+    a worker thread are processed serially since waiting for the pool of the
+    worker could dead lock.
+    """
+    if min(num_workers, len(items)) <= 1 or getattr(_worker_state, "in_pool", False):
+        return [func(item) for item in items]
+
+    # submit while holding the lock such that the pool is not shut down
+    # (evicted by a concurrent call) before all items are submitted
+    with _thread_pools_lock:
+        pool = _thread_pool(num_workers, threads_per_worker)
+        futures = [pool.submit(func, item) for item in items]
+
+    return [future.result() for future in futures]
+
+
+def _fill_operator_caches(
+    operators: Sequence[LinearOperator], num_workers: int
+) -> None:
+    """fill the caches of all operators before they are evaluated by
+    num_workers threads (the same instance can appear several times)"""
+    if num_workers > 1:
+        for op in operators:
+            op._fill_caches()
+
+
+def _parallel_adjoint_sum(
+    operators: Sequence[LinearOperator],
+    ys: Sequence[Array],
+    num_workers: int,
+    threads_per_worker: int,
+    out: None | Array = None,
+    accumulate: bool = False,
+) -> Array:
+    """:math:`\\sum_i (A^i)^H y^i` using a pool of num_workers threads
+
+    Every worker accumulates the adjoints of its operators into a single
+    buffer (the first worker into out), the buffers are summed at the end.
+    """
+    num_workers = max(1, min(num_workers, len(operators)))
+    _fill_operator_caches(operators, num_workers)
+
+    def _worker(k: int) -> Array:
+        buf = out if k == 0 else None
+        acc = accumulate if k == 0 else False
+
+        for i in range(k, len(operators), num_workers):
+            if buf is None:
+                buf = operators[i].adjoint(ys[i])
+            else:
+                operators[i].adjoint(ys[i], out=buf, accumulate=acc)
+            acc = True
+
+        return buf
+
+    bufs = _parallel_map(_worker, range(num_workers), num_workers, threads_per_worker)
+
+    res = bufs[0]
+    for buf in bufs[1:]:
+        res += buf
+
+    return res
+
+
+def _threads_per_worker(num_workers: int, threads_per_worker: None | int) -> int:
+    """number of OpenMP threads of every worker (all threads split evenly
+    if threads_per_worker is None)"""
+    if threads_per_worker is None:
+        return max(1, parallelproj.get_num_threads() // max(1, num_workers))
+    return threads_per_worker
+
+
 class VstackOperator(LinearOperator):
     """Stacking operator for stacking multiple linear operators vertically"""
 
-    def __init__(self, operators: tuple[LinearOperator, ...]) -> None:
+    def __init__(
+        self,
+        operators: tuple[LinearOperator, ...],
+        num_workers: int = 1,
+        threads_per_worker: None | int = None,
+    ) -> None:
         """init method
 
         Parameters
         ----------
         operators : tuple[LinearOperator, ...]
             tuple of linear operators
+        num_workers : int, optional
+            number of threads evaluating the operators concurrently, by default 1
+            the threads are taken from a persistent pool shared by all operators,
+            lazily computed caches of the operators are filled before they are
+            evaluated concurrently, the operators must not be modified while
+            they are evaluated
+        threads_per_worker : None | int, optional
+            number of OpenMP threads used by the projection kernels of every
+            worker, by default None means that all threads are split evenly
+            between the workers
         """
         super().__init__()
         self._operators = operators
+        self._num_workers = num_workers
+        self._threads_per_worker = threads_per_worker
         self._in_shape = self._operators[0].in_shape
         self._out_shapes = tuple([x.out_shape for x in operators])
         self._raveled_out_shapes = tuple([np.prod(x) for x in self._out_shapes])
@@ -534,12 +1550,43 @@ class VstackOperator(LinearOperator):
     def out_shape(self) -> tuple[int, ...]:
         return self._out_shape
 
+    @property
+    def num_workers(self) -> int:
+        """number of threads evaluating the operators concurrently"""
+        return self._num_workers
+
+    @num_workers.setter
+    def num_workers(self, value: int) -> None:
+        self._num_workers = value
+
+    @property
+    def threads_per_worker(self) -> int:
+        """number of OpenMP threads used by every worker"""
+        return _threads_per_worker(self._num_workers, self._threads_per_worker)
+
+    @threads_per_worker.setter
+    def threads_per_worker(self, value: None | int) -> None:
+        self._threads_per_worker = value
+
+    def _fill_caches(self) -> None:
+        for op in self._operators:
+            op._fill_caches()
+
     def _apply(self, x: Array) -> Array:
         xp = array_api_compat.get_namespace(x)
         y = xp.zeros(self._out_shape, dtype=x.dtype, device=device(x))
+        _fill_operator_caches(self._operators, self._num_workers)
+
+        # the operators write into disjoint slices of y
+        def _apply_op(i: int) -> None:
+            y[self._slices[i]] = xp.reshape(self._operators[i](x), (-1,))
 
-        for i, op in enumerate(self._operators):
-            y[self._slices[i]] = xp.reshape(op(x), (-1,))
+        _parallel_map(
+            _apply_op,
+            range(len(self._operators)),
+            self._num_workers,
+            self.threads_per_worker,
+        )
 
         return y
 
@@ -547,10 +1594,24 @@ class VstackOperator(LinearOperator):
         xp = array_api_compat.get_namespace(y)
         x = xp.zeros(self._in_shape, dtype=y.dtype, device=device(y))
 
-        for i, op in enumerate(self._operators):
-            x += op.adjoint(xp.reshape(y[self._slices[i]], self._out_shapes[i]))
+        return self._adjoint_out(y, x, accumulate=True)
 
-        return x
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        xp = array_api_compat.get_namespace(y)
+
+        ys = [
+            xp.reshape(y[self._slices[i]], self._out_shapes[i])
+            for i in range(len(self._operators))
+        ]
+
+        return _parallel_adjoint_sum(
+            self._operators,
+            ys,
+            self._num_workers,
+            self.threads_per_worker,
+            out=out,
+            accumulate=accumulate,
+        )
 
 
 class LinearOperatorSequence(Sequence[LinearOperator]):
@@ -567,18 +1628,36 @@ class LinearOperatorSequence(Sequence[LinearOperator]):
     .. minigallery:: parallelproj.LinearOperatorSequence
     """
 
-    def __init__(self, operators: Sequence[LinearOperator]) -> None:
+    def __init__(
+        self,
+        operators: Sequence[LinearOperator],
+        num_workers: int = 1,
+        threads_per_worker: None | int = None,
+    ) -> None:
         """init method
 
         Parameters
         ----------
         operators : Sequence[LinearOperator, ...]
             Sequence of linear operators
+        num_workers : int, optional
+            number of threads evaluating the operators concurrently in apply
+            and adjoint, by default 1
+            the threads are taken from a persistent pool shared by all operators,
+            lazily computed caches of the operators are filled before they are
+            evaluated concurrently, the operators must not be modified while
+            they are evaluated
+        threads_per_worker : None | int, optional
+            number of OpenMP threads used by the projection kernels of every
+            worker, by default None means that all threads are split evenly
+            between the workers
         """
         self._operators = operators
         self._in_shape = self._operators[0].in_shape
         self._out_shapes = [x.out_shape for x in operators]
         self._len = len(operators)
+        self._num_workers = num_workers
+        self._threads_per_worker = threads_per_worker
 
     @property
     def in_shape(self) -> tuple[int, ...]:
@@ -595,6 +1674,24 @@ class LinearOperatorSequence(Sequence[LinearOperator]):
         """all subset operators"""
         return self._operators
 
+    @property
+    def num_workers(self) -> int:
+        """number of threads evaluating the operators concurrently"""
+        return self._num_workers
+
+    @num_workers.setter
+    def num_workers(self, value: int) -> None:
+        self._num_workers = value
+
+    @property
+    def threads_per_worker(self) -> int:
+        """number of OpenMP threads used by every worker"""
+        return _threads_per_worker(self._num_workers, self._threads_per_worker)
+
+    @threads_per_worker.setter
+    def threads_per_worker(self, value: None | int) -> None:
+        self._threads_per_worker = value
+
     def __len__(self) -> int:
         """length of operator sequence"""
         return self._len
@@ -606,21 +1703,66 @@ class LinearOperatorSequence(Sequence[LinearOperator]):
     def apply(self, x: Array) -> list[Array]:
         """:math:`(A^0(x), A^1(x), \\ldots, A^{n-1}(x))`"""
 
-        y = [op(x) for op in self]
+        _fill_operator_caches(self._operators, self._num_workers)
+
+        y = _parallel_map(
+            lambda op: op(x),
+            self._operators,
+            self._num_workers,
+            self.threads_per_worker,
+        )
 
         return y
 
     def __call__(self, x: Array) -> list[Array]:
         return self.apply(x)
 
-    def adjoint(self, y: list[Array]) -> Array:
-        """:math:`\\sum_i (A^i)^H y^i` for all :math:`i`"""
+    def adjoint(
+        self, y: list[Array], out: None | Array = None, accumulate: bool = False
+    ) -> Array:
+        """:math:`\\sum_i (A^i)^H y^i` for all :math:`i`
+
+        The adjoints of all operators are accumulated into a single
+        array (out if given) such that no temporary images are needed
+        for operators that support adjoints with an output array
+        (e.g. PET projectors using the OpenMP lib).
+        With num_workers > 1, every worker accumulates into its own array
+        (the first one into out) and these arrays are summed at the end.
+
+        Parameters
+        ----------
+        y : list[Array]
+            list of inputs :math:`y^i`
+        out : None | Array, optional
+            preallocated array of shape in_shape the result is written into,
+            by default None
+        accumulate : bool, optional
+            add the result to the content of out instead of overwriting it,
+            by default False (requires out)
+
+        Returns
+        -------
+        Array
+        """
+
+        if out is None and accumulate:
+            raise ValueError("accumulate=True requires an output array out")
 
-        return sum([op.adjoint(y[i]) for (i, op) in enumerate(self)])
+        return _parallel_adjoint_sum(
+            self._operators,
+            y,
+            self._num_workers,
+            self.threads_per_worker,
+            out=out,
+            accumulate=accumulate,
+        )
+
+    def norms(self, xp: ModuleType, dev: str, **kwargs) -> list[float]:
+        """:math:`\\text{norm}(A^i)` for all :math:`i`
 
-    def norms(self, xp: ModuleType, dev: str) -> list[float]:
-        """:math:`\\text{norm}(A^i)` for all :math:`i`"""
-        return [op.norm(xp, dev) for op in self]
+        kwargs are passed to :meth:`LinearOperator.norm`
+        """
+        return [op.norm(xp, dev, **kwargs) for op in self]
 
 
 class FiniteForwardDifference(LinearOperator):
@@ -15,6 +15,15 @@ from .pet_scanners import (
     ModularizedPETScannerGeometry,
     RegularPolygonPETScannerGeometry,
 )
+from .lor_geometry import expand_sym_lor_coordinates
+
+
+def _as_index_array(x: Array, upper: int, name: str) -> np.ndarray:
+    """convert x to an int32 numpy cpu array and check that 0 <= x < upper"""
+    x = np.asarray(to_device(x, "cpu")).astype(np.int32, copy=False)
+    if x.size > 0 and (int(np.min(x)) < 0 or int(np.max(x)) >= upper):
+        raise ValueError(f"{name} must be in [0, {upper})")
+    return x
 
 
 class SinogramSpatialAxisOrder(enum.Enum):
@@ -124,6 +133,9 @@ class RegularPolygonPETLORDescriptor(PETLORDescriptor):
         self._setup_plane_indices()
         self._setup_view_indices()
 
+        # lookup tables for histogramming events, setup on first use
+        self._histogram_luts = None
+
     @property
     def radial_trim(self) -> int:
         """number of geometrial LORs to disregard in the radial direction"""
@@ -275,11 +287,14 @@ class RegularPolygonPETLORDescriptor(PETLORDescriptor):
             self._end_in_ring_index + n,
         )
 
-    def get_lor_coordinates(
+    def get_plane_lor_coordinates(
         self,
         views: None | Array = None,
     ) -> tuple[Array, Array]:
-        """return the start and end coordinates of all LORs / or a subset of views
+        """return the start and end coordinates of all LORs / or a subset of views in plane 0
+
+        All other planes only differ in the coordinates along the symmetry axis
+        (see get_plane_axial_coordinates).
 
         Parameters
         ----------
@@ -289,14 +304,12 @@ class RegularPolygonPETLORDescriptor(PETLORDescriptor):
         Returns
         -------
         xstart, xend : Array
-           2 dimensional floating point arrays containing the start and end coordinates of all LORs
+           arrays with the spatial sinogram shape without the plane axis + (3,)
         """
 
         if views is None:
             views = self.xp.arange(self.num_views, device=self.dev)
 
-        # --- (1) setup the LOR start / end points for all views of plane 0
-
         start_in_ring_index = self.xp.take(self.start_in_ring_index, views, axis=0)
         end_in_ring_index = self.xp.take(self.end_in_ring_index, views, axis=0)
 
@@ -322,32 +335,313 @@ class RegularPolygonPETLORDescriptor(PETLORDescriptor):
             shape_2d + (3,),
         )
 
-        xstart_3d = []
-        xend_3d = []
+        return xstart_2d, xend_2d
+
+    def get_plane_axial_coordinates(self) -> tuple[Array, Array]:
+        """return the coordinates of the LOR start and end points of all planes along the symmetry axis
+
+        Returns
+        -------
+        zstart, zend : Array
+           arrays of shape (num_planes,)
+        """
+
+        zstart = self.xp.take(self.scanner.ring_positions, self.start_plane_index, axis=0)
+        zend = self.xp.take(self.scanner.ring_positions, self.end_plane_index, axis=0)
+
+        return zstart, zend
+
+    def get_lor_coordinates(
+        self,
+        views: None | Array = None,
+    ) -> tuple[Array, Array]:
+        """return the start and end coordinates of all LORs / or a subset of views
+
+        Parameters
+        ----------
+        views : None | Array, optional
+            the views to consider, by default None means all views
+
+        Returns
+        -------
+        xstart, xend : Array
+           2 dimensional floating point arrays containing the start and end coordinates of all LORs
+        """
+
+        # --- (1) setup the LOR start / end points for all views of plane 0
+        xstart_2d, xend_2d = self.get_plane_lor_coordinates(views=views)
+
+        # --- (2) broadcast the plane 0 LOR start / end points to all planes
+        # and replace the "z" coordinates with the ring positions of the planes
+        zstart, zend = self.get_plane_axial_coordinates()
+
+        return expand_sym_lor_coordinates(
+            xstart_2d,
+            xend_2d,
+            zstart,
+            zend,
+            self.plane_axis_num,
+            self.scanner.symmetry_axis,
+        )
+
+    def get_lor_indices(
+        self,
+        views: None | Array = None,
+    ) -> tuple[Array, Array]:
+        """return the linear indices of the start and end points of all LORs / or a subset of views
+        into the scanner's all_lor_endpoints
+
+        Parameters
+        ----------
+        views : None | Array, optional
+            the views to consider, by default None means all views
+
+        Returns
+        -------
+        start_index, end_index : Array
+           int32 arrays with the spatial sinogram shape (for the subset of views)
+           such that take(all_lor_endpoints, start_index) equals the LOR start coordinates
+        """
+
+        if views is None:
+            views = self.xp.arange(self.num_views, device=self.dev)
+
+        start_in_ring_index = self.xp.take(self.start_in_ring_index, views, axis=0)
+        end_in_ring_index = self.xp.take(self.end_in_ring_index, views, axis=0)
+
+        if self.view_axis_num > self.radial_axis_num:
+            start_in_ring_index = start_in_ring_index.T
+            end_in_ring_index = end_in_ring_index.T
+
+        # shape to broadcast the plane dependent index offsets
+        plane_shape = [1, 1, 1]
+        plane_shape[self.plane_axis_num] = self.num_planes
+        plane_shape = tuple(plane_shape)
+
+        # the modules of a regular polygon scanner are its rings
+        start_offset = self.xp.reshape(
+            self.xp.take(
+                self.scanner.all_lor_endpoints_index_offset,
+                self.start_plane_index,
+                axis=0,
+            ),
+            plane_shape,
+        )
+        end_offset = self.xp.reshape(
+            self.xp.take(
+                self.scanner.all_lor_endpoints_index_offset,
+                self.end_plane_index,
+                axis=0,
+            ),
+            plane_shape,
+        )
+
+        start_index = self.xp.astype(
+            start_offset
+            + self.xp.expand_dims(start_in_ring_index, axis=self.plane_axis_num),
+            self.xp.int32,
+        )
+        end_index = self.xp.astype(
+            end_offset + self.xp.expand_dims(end_in_ring_index, axis=self.plane_axis_num),
+            self.xp.int32,
+        )
 
-        # --- (2) stack copies of the plane 0 LOR start / end points for all planes with updated "z" coordinates
+        return start_index, end_index
 
-        for i in range(self.num_planes):
-            # make a copy of the 2D coordinates
-            # stupid way of adding 0, since asarray with torch and cuda does
-            # not seem to work
-            xstart = xstart_2d + 0
-            xend = xend_2d + 0
+    def _get_histogram_luts(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """lookup tables mapping detector pairs to (flat) spatial sinogram bins
 
-            xstart[..., self.scanner.symmetry_axis] = float(
-                self.scanner.ring_positions[self.start_plane_index[i]]
+        Returns
+        -------
+        in_ring_lut, reversed_lut, plane_lut : np.ndarray
+            in_ring_lut maps start_in_ring * n + end_in_ring (n = number of LOR
+            endpoints per ring) to the view / radial offset of the flat spatial
+            sinogram index (-1 for pairs not in the sinogram), reversed_lut
+            is 1 for pairs stored with swapped endpoints (0 otherwise) and
+            plane_lut maps reversed * num_rings**2 + start_ring * num_rings + end_ring
+            to the plane offset (-1 for ring differences not in the sinogram)
+        """
+        if self._histogram_luts is None:
+            n = self.scanner.num_lor_endpoints_per_ring
+            num_rings = self.scanner.num_rings
+
+            # strides of the plane, view and radial axis in the flat spatial sinogram
+            strides = [1, 1, 1]
+            for i in range(1, -1, -1):
+                strides[i] = strides[i + 1] * self.spatial_sinogram_shape[i + 1]
+
+            start = np.asarray(
+                to_device(self.start_in_ring_index, "cpu"), dtype=np.int32
+            )
+            end = np.asarray(to_device(self.end_in_ring_index, "cpu"), dtype=np.int32)
+            view, rad = np.meshgrid(
+                np.arange(self.num_views), np.arange(self.num_rad), indexing="ij"
             )
-            xend[..., self.scanner.symmetry_axis] = float(
-                self.scanner.ring_positions[self.end_plane_index[i]]
+            offset = (
+                view * strides[self.view_axis_num] + rad * strides[self.radial_axis_num]
             )
 
-            xstart_3d.append(xstart)
-            xend_3d.append(xend)
+            in_ring_lut = np.full(n * n, -1, dtype=np.int32)
+            reversed_lut = np.zeros(n * n, dtype=np.int32)
+            # pairs stored in the sinogram take precedence over reversed pairs
+            in_ring_lut[end * n + start] = offset
+            reversed_lut[end * n + start] = 1
+            in_ring_lut[start * n + end] = offset
+            reversed_lut[start * n + end] = 0
+
+            start_plane = np.asarray(
+                to_device(self.start_plane_index, "cpu"), dtype=np.int32
+            )
+            end_plane = np.asarray(
+                to_device(self.end_plane_index, "cpu"), dtype=np.int32
+            )
+            plane_offset = np.arange(self.num_planes) * strides[self.plane_axis_num]
+
+            plane_lut = np.full(2 * num_rings * num_rings, -1, dtype=np.int32)
+            plane_lut[start_plane * num_rings + end_plane] = plane_offset
+            # planes of events with swapped endpoints
+            plane_lut[
+                num_rings * num_rings + end_plane * num_rings + start_plane
+            ] = plane_offset
+
+            self._histogram_luts = (in_ring_lut, reversed_lut, plane_lut)
+
+        return self._histogram_luts
+
+    def get_sinogram_bin_indices(
+        self,
+        start_ring: Array,
+        start_in_ring: Array,
+        end_ring: Array,
+        end_in_ring: Array,
+        tofbin: None | Array = None,
+        num_tofbins: int = 1,
+    ) -> np.ndarray:
+        """flat (numpy cpu) sinogram bin indices of events given by detector pairs
+
+        Events with swapped endpoints are mapped to the sinogram bin of the
+        LOR with the sign of their TOF bin inverted.
+
+        Parameters
+        ----------
+        start_ring, start_in_ring : Array
+            ring and index within ring of the start detector of all events
+        end_ring, end_in_ring : Array
+            ring and index within ring of the end detector of all events
+        tofbin : None | Array, optional
+            TOF bin of all events (0 is the central TOF bin), by default None
+        num_tofbins : int, optional
+            number of TOF bins of the sinogram (1 for non-TOF), by default 1
+
+        Returns
+        -------
+        np.ndarray
+            indices into the flattened sinogram of shape
+            spatial_sinogram_shape (+ (num_tofbins,) for TOF),
+            -1 for events not contained in the sinogram
+        """
+        in_ring_lut, reversed_lut, plane_lut = self._get_histogram_luts()
+        n = self.scanner.num_lor_endpoints_per_ring
+        num_rings = self.scanner.num_rings
+
+        start_ring = _as_index_array(start_ring, num_rings, "start_ring")
+        start_in_ring = _as_index_array(start_in_ring, n, "start_in_ring")
+        end_ring = _as_index_array(end_ring, num_rings, "end_ring")
+        end_in_ring = _as_index_array(end_in_ring, n, "end_in_ring")
+
+        in_ring_pair = start_in_ring * n + end_in_ring
+        rev = reversed_lut[in_ring_pair]
+
+        in_ring_offset = in_ring_lut[in_ring_pair]
+        plane_offset = plane_lut[
+            rev * (num_rings * num_rings) + start_ring * num_rings + end_ring
+        ]
+        valid = (in_ring_offset >= 0) & (plane_offset >= 0)
+
+        num_bins = int(np.prod(self.spatial_sinogram_shape)) * num_tofbins
+        index = in_ring_offset.astype(np.int32 if num_bins < 2**31 else np.int64)
+        index += plane_offset
+        index *= num_tofbins
+
+        if tofbin is not None and num_tofbins > 1:
+            tofbin = np.asarray(to_device(tofbin, "cpu")).astype(np.int32)
+            # invert the TOF bin of events with swapped endpoints
+            tofbin *= 1 - 2 * rev
+            tofbin += num_tofbins // 2
+            valid &= (tofbin >= 0) & (tofbin < num_tofbins)
+            index += tofbin
+
+        index[~valid] = -1
+
+        return index
+
+    def histogram_events(
+        self,
+        start_ring: Array,
+        start_in_ring: Array,
+        end_ring: Array,
+        end_in_ring: Array,
+        tofbin: None | Array = None,
+        num_tofbins: int = 1,
+        chunk_size: int = 2**20,
+    ) -> Array:
+        """histogram listmode events given by detector pairs into a sinogram
+
+        This is the reverse of RegularPolygonPETProjector.convert_sinogram_to_listmode.
+        The events are mapped to sinogram bins in chunks using precomputed
+        lookup tables (see get_sinogram_bin_indices) and counted with bincount
+        (or unique for sinograms much bigger than a chunk).
+        Events not contained in the sinogram (e.g. radially trimmed LORs,
+        ring differences > max_ring_difference or TOF bins out of range)
+        are discarded.
+
+        Parameters
+        ----------
+        start_ring, start_in_ring : Array
+            ring and index within ring of the start detector of all events
+        end_ring, end_in_ring : Array
+            ring and index within ring of the end detector of all events
+        tofbin : None | Array, optional
+            TOF bin of all events (0 is the central TOF bin), by default None
+        num_tofbins : int, optional
+            number of TOF bins of the sinogram (1 for non-TOF), by default 1
+        chunk_size : int, optional
+            number of events processed at once, by default 2**20
+
+        Returns
+        -------
+        Array
+            int32 sinogram of shape spatial_sinogram_shape
+            (+ (num_tofbins,) if tofbin is not None) on the device of the scanner
+        """
+        shape = self.spatial_sinogram_shape
+        if tofbin is not None:
+            shape = shape + (num_tofbins,)
+
+        num_bins = int(np.prod(shape))
+        hist = np.zeros(num_bins, dtype=np.int32)
+
+        for i0 in range(0, start_ring.shape[0], chunk_size):
+            i1 = min(i0 + chunk_size, start_ring.shape[0])
+            index = self.get_sinogram_bin_indices(
+                start_ring[i0:i1],
+                start_in_ring[i0:i1],
+                end_ring[i0:i1],
+                end_in_ring[i0:i1],
+                None if tofbin is None else tofbin[i0:i1],
+                num_tofbins,
+            )
+            index = index[index >= 0]
 
-        xstart_3d = self.xp.stack(xstart_3d, axis=self.plane_axis_num)
-        xend_3d = self.xp.stack(xend_3d, axis=self.plane_axis_num)
+            if num_bins <= 8 * index.shape[0]:
+                hist += np.bincount(index, minlength=num_bins).astype(np.int32)
+            else:
+                # avoid the allocation of a temporary histogram for sinograms
+                # that are much bigger than a chunk of events
+                bins, counts = np.unique(index, return_counts=True)
+                hist[bins] += counts.astype(np.int32)
 
-        return xstart_3d, xend_3d
+        return self.xp.asarray(np.reshape(hist, shape), device=self.dev)
 
     def show_views(
         self, ax: plt.Axes, views: Array, planes: Array, lw: float = 0.2, **kwargs
@@ -7,15 +7,29 @@ import array_api_compat
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 from types import ModuleType
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import math
+import os
 from array_api_compat import device, to_device, get_namespace, size
 import parallelproj
 
-from .operators import LinearOperator
+from .operators import LinearOperator, _absorb_factors
 from .pet_lors import RegularPolygonPETLORDescriptor
 from .tof import TOFParameters
 from .backend import is_cuda_array, empty_cuda_cache
 
 
+def _repeat(xp: ModuleType, x: Array, counts: Array) -> Array:
+    """repeat every element of the 1D array x counts times"""
+    if hasattr(xp, "repeat"):
+        return xp.repeat(x, counts)
+
+    # array API implementations without repeat (e.g. numpy.array_api) live
+    # on the CPU, so we can use numpy's repeat without a device transfer
+    return xp.asarray(np.repeat(np.asarray(x), np.asarray(counts)), device=device(x))
+
+
 class ParallelViewProjector2D(LinearOperator):
     """2D non-TOF parallel view projector"""
 
@@ -466,6 +480,77 @@ class ParallelViewProjector3D(LinearOperator):
         return x
 
 
+class _LORWeightedProjector(LinearOperator):
+    """PET projector applying (additional) LOR weights in the projection kernels
+
+    Lightweight view of a projector sharing its (cached) LORs, created by
+    the projector's _with_lor_weights.
+    """
+
+    _supports_batches = True
+
+    def __init__(
+        self,
+        projector: LinearOperator,
+        lor_weights: Array,
+        factors: None | Array = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        projector : LinearOperator
+            the projector
+        lor_weights : Array
+            (combined) LOR weights passed to the projection kernels
+        factors : None | Array, optional
+            factors (shape of the output) the projector output is multiplied
+            with if the LOR weights are made of them alone, by default None.
+            Used to absorb them into the data in the ratio adjoint step.
+        """
+        super().__init__()
+        self._projector = projector
+        self._lor_weights = lor_weights
+        self._factors = factors
+
+    @property
+    def in_shape(self) -> tuple[int, ...]:
+        return self._projector.in_shape
+
+    @property
+    def out_shape(self) -> tuple[int, ...]:
+        return self._projector.out_shape
+
+    def _fill_caches(self) -> None:
+        self._projector._fill_caches()
+
+    def _apply(self, x: Array) -> Array:
+        return self._projector._fwd(x, self._lor_weights)
+
+    def _adjoint(self, y: Array) -> Array:
+        return self._projector._back(y, self._lor_weights)
+
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        return self._projector._fwd(x, self._lor_weights, out=out)
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        return self._projector._back(
+            y, self._lor_weights, out=out, accumulate=accumulate
+        )
+
+    def _apply_ratio_adjoint(
+        self, x: Array, data: Array, contamination: float | Array
+    ) -> Array:
+        # absorb the factors into data and contamination to use the
+        # (fused) ratio adjoint of the unweighted projector
+        if self._factors is None:
+            return super()._apply_ratio_adjoint(x, data, contamination)
+
+        data, contamination = _absorb_factors(
+            self._projector.xp, self._factors, data, contamination
+        )
+        return self._projector._apply_ratio_adjoint(x, data, contamination)
+
+
 class RegularPolygonPETProjector(LinearOperator):
     """geometric non-TOF and TOF sinogram projector for regular polygon PET scanners
 
@@ -474,6 +559,20 @@ class RegularPolygonPETProjector(LinearOperator):
     .. minigallery:: parallelproj.RegularPolygonPETProjector
     """
 
+    _supports_batches = True
+
+    # cached LORs
+    _fingerprint_exclude = (
+        "_xstart",
+        "_xend",
+        "_start_index",
+        "_end_index",
+        "_xstart_2d",
+        "_xend_2d",
+        "_zstart",
+        "_zend",
+    )
+
     def __init__(
         self,
         lor_descriptor: RegularPolygonPETLORDescriptor,
@@ -482,6 +581,8 @@ class RegularPolygonPETProjector(LinearOperator):
         img_origin: None | Array = None,
         views: None | Array = None,
         cache_lor_endpoints: bool = True,
+        use_lor_endpoint_indices: bool = False,
+        use_axial_symmetry: bool = False,
     ) -> None:
         """
         Parameters
@@ -501,8 +602,26 @@ class RegularPolygonPETProjector(LinearOperator):
         cache_lor_endpoints : bool, optional
             whether to cache the LOR endpoints, by default True
             setting it to False will save memory but will slow down computations
+        use_lor_endpoint_indices : bool, optional
+            whether to pass the scanner's LOR endpoints and int32 LOR endpoint
+            indices to the projection kernels instead of the LOR coordinates,
+            by default False
+            this reduces the memory needed for (cached) LORs from 24 bytes
+            (two float32 coordinate triples) to 8 bytes (two int32 indices)
+            per LOR, i.e. by a factor of 3
+        use_axial_symmetry : bool, optional
+            whether to pass only the LOR coordinates of plane 0 and the
+            plane coordinates along the symmetry axis to the projection kernels,
+            by default False
+            this reduces the memory needed for (cached) LORs from
+            O(num_planes x num_views x num_rad) to O(num_views x num_rad + num_planes)
         """
 
+        if use_lor_endpoint_indices and use_axial_symmetry:
+            raise ValueError(
+                "use_lor_endpoint_indices and use_axial_symmetry can not be combined"
+            )
+
         super().__init__()
         self._dev = lor_descriptor.dev
 
@@ -538,10 +657,22 @@ class RegularPolygonPETProjector(LinearOperator):
         self._tof = False
 
         self._cache_lor_endpoints = cache_lor_endpoints
+        self._use_lor_endpoint_indices = use_lor_endpoint_indices
+        self._use_axial_symmetry = use_axial_symmetry
 
         self._xstart = None
         self._xend = None
 
+        self._start_index = None
+        self._end_index = None
+
+        self._xstart_2d = None
+        self._xend_2d = None
+        self._zstart = None
+        self._zend = None
+
+        self._lor_weights = None
+
     @property
     def in_shape(self) -> tuple[int, int, int]:
         return self._img_shape
@@ -599,6 +730,26 @@ class RegularPolygonPETProjector(LinearOperator):
         """image origin - world coordinates of the [0,0,0] voxel"""
         return self._img_origin
 
+    @property
+    def lor_weights(self) -> None | Array:
+        """weights of all LORs multiplied with the projections, by default None
+
+        shape of a non-TOF sinogram, applied to all TOF bins in TOF mode
+        """
+        return self._lor_weights
+
+    @lor_weights.setter
+    def lor_weights(self, value: None | Array) -> None:
+        if value is not None and tuple(value.shape) != self._lor_weights_shape():
+            raise ValueError(
+                f"lor_weights must have shape {self._lor_weights_shape()}"
+            )
+        self._lor_weights = value
+
+    def _lor_weights_shape(self) -> tuple[int, ...]:
+        """shape of the LOR weights (non-TOF sinogram shape)"""
+        return self.out_shape[:-1] if self.tof else self.out_shape
+
     @property
     def views(self) -> Array:
         """view numbers to be projected"""
@@ -626,6 +777,16 @@ class RegularPolygonPETProjector(LinearOperator):
         """voxel size"""
         return self._voxel_size
 
+    @property
+    def use_lor_endpoint_indices(self) -> bool:
+        """whether LOR endpoint indices are passed to the projection kernels"""
+        return self._use_lor_endpoint_indices
+
+    @property
+    def use_axial_symmetry(self) -> bool:
+        """whether only the plane 0 LORs and plane coordinates are passed to the projection kernels"""
+        return self._use_axial_symmetry
+
     def clear_cached_lor_endpoints(self) -> None:
         """clear cached LOR endpoints"""
         was_cuda_start = False
@@ -634,9 +795,21 @@ class RegularPolygonPETProjector(LinearOperator):
             was_cuda_start = is_cuda_array(self._xstart)
         if self._xend is not None:
             was_cuda_end = is_cuda_array(self._xend)
+        if self._start_index is not None:
+            was_cuda_start = was_cuda_start or is_cuda_array(self._start_index)
+        if self._end_index is not None:
+            was_cuda_end = was_cuda_end or is_cuda_array(self._end_index)
+        if self._xstart_2d is not None:
+            was_cuda_start = was_cuda_start or is_cuda_array(self._xstart_2d)
 
         self._xstart = None
         self._xend = None
+        self._start_index = None
+        self._end_index = None
+        self._xstart_2d = None
+        self._xend_2d = None
+        self._zstart = None
+        self._zend = None
 
         if was_cuda_start or was_cuda_end:
             empty_cuda_cache(self.xp)
@@ -662,10 +835,8 @@ class RegularPolygonPETProjector(LinearOperator):
 
         return st
 
-    def _apply(self, x):
-        """nonTOF forward projection of input image x including image based resolution model"""
-
-        dev = array_api_compat.device(x)
+    def _get_lor_endpoints(self) -> tuple[Array, Array]:
+        """get the (cached) start and end points of all LORs to be projected"""
 
         # calculate LOR endpoints if not done yet
         if (self.xstart is None) or (self.xend is None):
@@ -681,17 +852,162 @@ class RegularPolygonPETProjector(LinearOperator):
             self._xstart = xstart
             self._xend = xend
 
+        return xstart, xend
+
+    def _get_lor_endpoint_indices(self) -> tuple[Array, Array]:
+        """get the (cached) LOR endpoint indices of all LORs to be projected"""
+
+        if (self._start_index is None) or (self._end_index is None):
+            start_index, end_index = self._lor_descriptor.get_lor_indices(
+                views=self._views
+            )
+        else:
+            start_index = self._start_index
+            end_index = self._end_index
+
+        if self._cache_lor_endpoints:
+            self._start_index = start_index
+            self._end_index = end_index
+
+        return start_index, end_index
+
+    def _get_plane_lor_coordinates(self) -> tuple[Array, Array, Array, Array]:
+        """get the (cached) plane 0 LOR coordinates and axial plane coordinates"""
+
+        if self._xstart_2d is None:
+            xstart_2d, xend_2d = self._lor_descriptor.get_plane_lor_coordinates(
+                views=self._views
+            )
+            zstart, zend = self._lor_descriptor.get_plane_axial_coordinates()
+        else:
+            xstart_2d, xend_2d, zstart, zend = (
+                self._xstart_2d,
+                self._xend_2d,
+                self._zstart,
+                self._zend,
+            )
+
+        if self._cache_lor_endpoints:
+            self._xstart_2d = xstart_2d
+            self._xend_2d = xend_2d
+            self._zstart = zstart
+            self._zend = zend
+
+        return xstart_2d, xend_2d, zstart, zend
+
+    def _fill_caches(self) -> None:
+        if self._cache_lor_endpoints:
+            self._get_lor_args()
+
+    def _get_lor_args(self) -> tuple[tuple[Array, ...], tuple[int, ...]]:
+        """get the LOR arguments for the projection kernels
+
+        Returns
+        -------
+        tuple[tuple[Array, ...], tuple[int, ...]]
+            arguments describing the LORs passed before the image and
+            arguments passed after the voxel size
+        """
+        if self._use_axial_symmetry:
+            return self._get_plane_lor_coordinates(), (
+                self._lor_descriptor.plane_axis_num,
+                self._lor_descriptor.scanner.symmetry_axis,
+            )
+
+        if self._use_lor_endpoint_indices:
+            return (
+                self._lor_descriptor.scanner.all_lor_endpoints,
+            ) + self._get_lor_endpoint_indices(), ()
+
+        return self._get_lor_endpoints(), ()
+
+    def _get_projection_funcs(self, batch: bool = False) -> tuple[Callable, Callable]:
+        """get the forward and back projection functions for the current mode
+
+        batch=True returns the functions projecting a batch of images which
+        are only available if the LOR coordinates are passed to the kernels
+        """
+        if batch:
+            if self.tof:
+                return (
+                    parallelproj.joseph3d_fwd_tof_sino_batch,
+                    parallelproj.joseph3d_back_tof_sino_batch,
+                )
+            return parallelproj.joseph3d_fwd_batch, parallelproj.joseph3d_back_batch
+
+        if self._use_axial_symmetry:
+            if self.tof:
+                return (
+                    parallelproj.joseph3d_fwd_tof_sino_sym,
+                    parallelproj.joseph3d_back_tof_sino_sym,
+                )
+            return parallelproj.joseph3d_fwd_sym, parallelproj.joseph3d_back_sym
+
+        if self._use_lor_endpoint_indices:
+            if self.tof:
+                return (
+                    parallelproj.joseph3d_fwd_tof_sino_idx,
+                    parallelproj.joseph3d_back_tof_sino_idx,
+                )
+            return parallelproj.joseph3d_fwd_idx, parallelproj.joseph3d_back_idx
+
+        if self.tof:
+            return parallelproj.joseph3d_fwd_tof_sino, parallelproj.joseph3d_back_tof_sino
+        return parallelproj.joseph3d_fwd, parallelproj.joseph3d_back
+
+    def _has_batch_kernels(self) -> bool:
+        """whether batches of images can be projected in a single pass over the LORs"""
+        return not (self._use_axial_symmetry or self._use_lor_endpoint_indices)
+
+    def _lor_weights_kwargs(self, lor_weights: None | Array) -> dict:
+        """keyword arguments passing the LOR weights to the projection kernels"""
+        if lor_weights is None or not self._has_batch_kernels():
+            return {}
+        return {"lor_weights": lor_weights}
+
+    def _apply(self, x: Array, out: None | Array = None) -> Array:
+        """forward projection of input image x
+
+        x can be a single image of shape in_shape or a batch of images
+        of shape (nbatch,) + in_shape
+        """
+        return self._fwd(x, self._lor_weights, out=out)
+
+    def _fwd(
+        self, x: Array, lor_weights: None | Array, out: None | Array = None
+    ) -> Array:
+        """forward projection of x with LOR weights"""
+
+        dev = array_api_compat.device(x)
+
+        batch = x.ndim == len(self.in_shape) + 1
+
+        if batch and not self._has_batch_kernels():
+            return parallelproj.backend._batch_loop(
+                lambda x_b, out_b: self._fwd(x_b, lor_weights, out_b), x, out
+            )
+
+        lor_args, geom_args = self._get_lor_args()
+        fwd, _ = self._get_projection_funcs(batch)
+        kwargs = self._lor_weights_kwargs(lor_weights)
+
         if not self.tof:
-            x_fwd = parallelproj.joseph3d_fwd(
-                xstart, xend, x, self._img_origin, self._voxel_size
+            x_fwd = fwd(
+                *lor_args,
+                x,
+                self._img_origin,
+                self._voxel_size,
+                *geom_args,
+                out=out,
+                **kwargs,
             )
         else:
-            x_fwd = parallelproj.joseph3d_fwd_tof_sino(
-                xstart,
-                xend,
+            x_fwd = fwd(
+                *lor_args,
                 x,
                 self._img_origin,
                 self._voxel_size,
+                *geom_args,
                 self._tof_parameters.tofbin_width,
                 self.xp.asarray(
                     [self._tof_parameters.sigma_tof], dtype=self.xp.float32, device=dev
@@ -703,45 +1019,75 @@ class RegularPolygonPETProjector(LinearOperator):
                 ),
                 self.tof_parameters.num_sigmas,
                 self.tof_parameters.num_tofbins,
+                out=out,
+                **kwargs,
+            )
+
+        # the kernels using LOR endpoint indices or the axial symmetry
+        # do not support LOR weights
+        if lor_weights is not None and not kwargs:
+            x_fwd[...] = parallelproj.backend._lor_weighted(
+                x_fwd, lor_weights, self.tof
             )
 
         return x_fwd
 
-    def _adjoint(self, y):
-        """nonTOF back projection of sinogram y"""
+    def _adjoint(
+        self, y: Array, out: None | Array = None, accumulate: bool = False
+    ) -> Array:
+        """back projection of sinogram y
+
+        y can be a single sinogram of shape out_shape or a batch of sinograms
+        of shape (nbatch,) + out_shape
+        """
+        return self._back(y, self._lor_weights, out=out, accumulate=accumulate)
+
+    def _back(
+        self,
+        y: Array,
+        lor_weights: None | Array,
+        out: None | Array = None,
+        accumulate: bool = False,
+    ) -> Array:
+        """back projection of y with LOR weights"""
         dev = array_api_compat.device(y)
 
-        # calculate LOR endpoints if not done yet
-        if (self.xstart is None) or (self.xend is None):
-            xstart, xend = self._lor_descriptor.get_lor_coordinates(views=self._views)
-            if is_cuda_array(xstart):
-                empty_cuda_cache(self.xp)
-        else:
-            xstart = self.xstart
-            xend = self.xend
+        batch = y.ndim == len(self.out_shape) + 1
 
-        # cache LOR endpoints if requested
-        if self._cache_lor_endpoints and ((self.xstart is None) or (self.xend is None)):
-            self._xstart = xstart
-            self._xend = xend
+        if batch and not self._has_batch_kernels():
+            return parallelproj.backend._batch_loop(
+                lambda y_b, out_b: self._back(y_b, lor_weights, out_b, accumulate),
+                y,
+                out,
+            )
+
+        lor_args, geom_args = self._get_lor_args()
+        _, back = self._get_projection_funcs(batch)
+        kwargs = self._lor_weights_kwargs(lor_weights)
+
+        if lor_weights is not None and not kwargs:
+            y = parallelproj.backend._lor_weighted(y, lor_weights, self.tof)
 
         if not self.tof:
-            y_back = parallelproj.joseph3d_back(
-                xstart,
-                xend,
+            y_back = back(
+                *lor_args,
                 self._img_shape,
                 self._img_origin,
                 self._voxel_size,
                 y,
+                *geom_args,
+                out=out,
+                accumulate=accumulate,
+                **kwargs,
             )
         else:
-            y_back = parallelproj.joseph3d_back_tof_sino(
-                xstart,
-                xend,
+            y_back = back(
+                *lor_args,
                 self._img_shape,
                 self._img_origin,
                 self._voxel_size,
                 y,
+                *geom_args,
                 self._tof_parameters.tofbin_width,
                 self.xp.asarray(
                     [self._tof_parameters.sigma_tof], dtype=self.xp.float32, device=dev
@@ -753,10 +1099,55 @@ class RegularPolygonPETProjector(LinearOperator):
                 ),
                 self.tof_parameters.num_sigmas,
                 self.tof_parameters.num_tofbins,
+                out=out,
+                accumulate=accumulate,
+                **kwargs,
             )
 
         return y_back
 
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        return self._apply(x, out=out)
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        return self._adjoint(y, out=out, accumulate=accumulate)
+
+    def _with_lor_weights(self, weights: Array) -> None | LinearOperator:
+        """projector applying weights (shape of a non-TOF sinogram) in the
+        projection kernels (in addition to lor_weights)"""
+        if tuple(weights.shape) != self._lor_weights_shape():
+            return None
+        if self._lor_weights is not None:
+            return _LORWeightedProjector(self, weights * self._lor_weights)
+        return _LORWeightedProjector(
+            self, weights, factors=None if self.tof else weights
+        )
+
+    def _apply_ratio_adjoint(
+        self, x: Array, data: Array, contamination: float | Array
+    ) -> Array:
+        """fused non-TOF forward projection, division and back projection"""
+        if (
+            self.tof
+            or self._lor_weights is not None
+            or self._use_lor_endpoint_indices
+            or self._use_axial_symmetry
+            or x.ndim > len(self.in_shape)
+        ):
+            return super()._apply_ratio_adjoint(x, data, contamination)
+
+        xstart, xend = self._get_lor_endpoints()
+
+        return parallelproj.joseph3d_fwd_back_ratio(
+            xstart,
+            xend,
+            x,
+            self._img_origin,
+            self._voxel_size,
+            data,
+            contamination,
+        )
+
     def show_geometry(
         self,
         ax: plt.Axes,
@@ -814,14 +1205,24 @@ class RegularPolygonPETProjector(LinearOperator):
         self.lor_descriptor.scanner.show_lor_endpoints(ax)
 
     def convert_sinogram_to_listmode(
-        self, sinogram: Array
+        self, sinogram: Array, shuffle: bool = False, seed: None | int = None
     ) -> tuple[Array, Array, Array | None]:
         """convert a non-TOF or TOF emission sinogram to listmode events
 
+        The LOR endpoint indices of all sinogram bins are repeated according
+        to the sinogram counts in a single vectorized pass (in blocks of views)
+        and the LOR coordinates of all events are gathered once from the
+        LOR endpoints of the scanner. Without shuffling, the events are ordered
+        by view, TOF bin and the remaining (spatial) sinogram axes.
+
         Parameters
         ----------
         sinogram : Array
             an integer (TOF or non-TOF) emission sinogram
+        shuffle : bool, optional
+            randomly shuffle the order of the events, by default False
+        seed : None | int, optional
+            seed of the random generator used for shuffling, by default None
 
         Returns
         -------
@@ -830,6 +1231,19 @@ class RegularPolygonPETProjector(LinearOperator):
             in case of non-TOF, event_tofbin is None
         """
 
+        ld = self.lor_descriptor
+
+        if self.tof:
+            num_tofbins = self.tof_parameters.num_tofbins
+        else:
+            num_tofbins = 1
+            sinogram = self.xp.expand_dims(sinogram, axis=-1)
+
+        # reorder the sinogram axes to (view, TOF, other spatial axes)
+        other_axes = tuple(i for i in range(3) if i != ld.view_axis_num)
+        sinogram = self.xp.permute_dims(sinogram, (ld.view_axis_num, 3) + other_axes)
+        shape = sinogram.shape
+
         num_events = int(self.xp.sum(sinogram))
 
         event_start_coords = self.xp.empty(
@@ -838,74 +1252,130 @@ class RegularPolygonPETProjector(LinearOperator):
         event_end_coords = self.xp.empty(
             (num_events, 3), device=self._dev, dtype=self.xp.float32
         )
+        event_tofbins = (
+            self.xp.empty((num_events,), device=self._dev, dtype=self.xp.int16)
+            if self.tof
+            else None
+        )
 
-        if self.tof:
-            num_tofbins = self.tof_parameters.num_tofbins
-            event_tofbins = self.xp.empty(
-                (num_events,), device=self._dev, dtype=self.xp.int16
+        # LOR endpoint indices of all (view, other spatial axes) bins
+        start_index, end_index = ld.get_lor_indices(views=self.views)
+        start_index = self.xp.reshape(
+            self.xp.permute_dims(start_index, (ld.view_axis_num,) + other_axes), (-1,)
+        )
+        end_index = self.xp.reshape(
+            self.xp.permute_dims(end_index, (ld.view_axis_num,) + other_axes), (-1,)
+        )
+        num_other = shape[2] * shape[3]
+
+        # we process blocks of views such that all temporary arrays stay small
+        views_per_block = max(1, 2**22 // math.prod(shape[1:]))
+        block_bins = self.xp.arange(
+            views_per_block * math.prod(shape[1:]),
+            dtype=self.xp.int64,
+            device=self._dev,
+        )
+        event_offset = 0
+
+        for v0 in range(0, shape[0], views_per_block):
+            v1 = min(v0 + views_per_block, shape[0])
+
+            counts = self.xp.astype(
+                self.xp.reshape(sinogram[v0:v1, ...], (-1,)), self.xp.int64
             )
-        else:
-            num_tofbins = 1
-            event_tofbins = None
+            n = int(self.xp.sum(counts))
+            sl = slice(event_offset, event_offset + n)
 
-        event_offset = 0
+            # index of the sinogram bin (within the block) of every event
+            event_bins = _repeat(self.xp, block_bins[: counts.shape[0]], counts)
 
-        # we convert view by view and tofbin by tofbin to save memory
-        for view in range(self.lor_descriptor.num_views):
-            xstart, xend = self.lor_descriptor.get_lor_coordinates(
-                views=self.xp.asarray([view], device=self._dev)
+            # LOR index (view, other spatial axes) of every event
+            event_lor = (event_bins // (num_tofbins * num_other) + v0) * num_other + (
+                event_bins % num_other
             )
-            xstart = self.xp.reshape(xstart, (-1, 3))
-            xend = self.xp.reshape(xend, (-1, 3))
 
-            sino_view = self.xp.take(
-                sinogram,
-                self.xp.asarray([view], device=self._dev),
-                axis=self.lor_descriptor.view_axis_num,
+            event_start_coords[sl, :] = self.xp.take(
+                ld.scanner.all_lor_endpoints,
+                self.xp.take(start_index, event_lor),
+                axis=0,
             )
-            sino_view = self.xp.squeeze(
-                sino_view, axis=self.lor_descriptor.view_axis_num
+            event_end_coords[sl, :] = self.xp.take(
+                ld.scanner.all_lor_endpoints,
+                self.xp.take(end_index, event_lor),
+                axis=0,
             )
 
-            for it in range(num_tofbins):
-                if self.tof:
-                    ss = sino_view[..., it]
-                else:
-                    ss = sino_view
-
-                ss = self.xp.reshape(ss, (size(ss),))
-
-                # currently there is no "repeat" function in array-api, so
-                # we convert back and forth to numpy cpu array
-                event_sino_inds = self.xp.asarray(
-                    np.repeat(np.arange(ss.shape[0]), to_device(ss, "cpu")),
-                    device=self._dev,
+            if self.tof:
+                event_tofbins[sl] = self.xp.astype(
+                    (event_bins // num_other) % num_tofbins - num_tofbins // 2,
+                    self.xp.int16,
                 )
 
-                num_events_ss = int(self.xp.sum(ss))
-
-                event_start_coords[
-                    event_offset : (event_offset + num_events_ss), :
-                ] = self.xp.take(xstart, event_sino_inds, axis=0)
-                event_end_coords[
-                    event_offset : (event_offset + num_events_ss), :
-                ] = self.xp.take(xend, event_sino_inds, axis=0)
-
-                if self.tof:
-                    event_tofbins[
-                        event_offset : (event_offset + num_events_ss)
-                    ] = self.xp.full(
-                        num_events_ss,
-                        it - num_tofbins // 2,
-                        device=self._dev,
-                        dtype=self.xp.int16,
-                    )
+            event_offset += n
 
-                event_offset += num_events_ss
+        if shuffle:
+            perm = self.xp.asarray(
+                np.random.default_rng(seed).permutation(num_events), device=self._dev
+            )
+            event_start_coords = self.xp.take(event_start_coords, perm, axis=0)
+            event_end_coords = self.xp.take(event_end_coords, perm, axis=0)
+            if self.tof:
+                event_tofbins = self.xp.take(event_tofbins, perm)
 
         return event_start_coords, event_end_coords, event_tofbins
 
 
+def _part1by2(v: Array) -> Array:
+    """spread the lower 10 bits of an int64 array such that there are
+    two zero bits between all bits (used for 3D Morton codes)"""
+    v = v & 0x3FF
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+def lor_sort_permutation(xstart: Array, xend: Array) -> Array:
+    """permutation that sorts LORs by their dominant direction and the
+    Morton code of their mid point
+
+    Projecting LORs in this order means that consecutive LORs (processed by the
+    same thread) step through neighboring image regions, which improves the
+    cache hit rate and reduces atomic conflicts in back projections.
+
+    Parameters
+    ----------
+    xstart : Array
+        start world coordinates of the LORs, shape (nLORs, 3)
+    xend : Array
+        end world coordinates of the LORs, shape (nLORs, 3)
+
+    Returns
+    -------
+    Array
+        int64 array of length nLORs with the indices of the sorted LORs
+    """
+    xp = get_namespace(xstart)
+
+    # dominant direction bucket (0, 1, 2) of every LOR
+    direction = xp.argmax(xp.abs(xend - xstart), axis=1)
+
+    # mid points quantized to 10 bits per axis in their bounding box
+    mid = 0.5 * (xstart + xend)
+    mid_min = xp.min(mid, axis=0)
+    extent = xp.max(mid, axis=0) - mid_min
+    extent = xp.where(extent > 0, extent, xp.ones_like(extent))
+    q = xp.astype(1023 * ((mid - mid_min) / extent), xp.int64)
+    q = xp.where(q > 1023, xp.full_like(q, 1023), q)
+
+    key = xp.astype(direction, xp.int64) << 30
+    for i in range(3):
+        key = key | (_part1by2(q[:, i]) << (2 - i))
+
+    return xp.astype(xp.argsort(key, stable=True), xp.int64)
+
+
 class ListmodePETProjector(LinearOperator):
     """non-TOF and TOF listmode projector for regular polygon PET scanners
 
@@ -914,6 +1384,8 @@ class ListmodePETProjector(LinearOperator):
     .. minigallery:: parallelproj.ListmodePETProjector
     """
 
+    _supports_batches = True
+
     def __init__(
         self,
         event_start_coordinates: Array,
@@ -921,14 +1393,20 @@ class ListmodePETProjector(LinearOperator):
         img_shape: tuple[int, int, int],
         voxel_size: tuple[float, float, float],
         img_origin: None | Array = None,
+        lor_endpoints: None | Array = None,
+        sort_events: bool = False,
     ) -> None:
         """
         Parameters
         ----------
         event_start_coordinates : Array
             float world coordinates of event LOR start points, shape (num_events, 3)
+            or integer indices into lor_endpoints, shape (num_events,)
+            if lor_endpoints is not None
         event_end_coordinates : Array
             float world coordinates of event LOR end points, shape (num_events, 3)
+            or integer indices into lor_endpoints, shape (num_events,)
+            if lor_endpoints is not None
         img_shape : tuple[int, int, int]
             shape of the image to be projected
         voxel_size : tuple[float, float, float]
@@ -936,14 +1414,36 @@ class ListmodePETProjector(LinearOperator):
         img_origin : None | Array, optional
             the origin of the image to be projected, by default None
             means that the center of the image is at world coordinate (0,0,0)
+        lor_endpoints : None | Array, optional
+            world coordinates of all possible LOR endpoints, shape (num_lor_endpoints, 3),
+            e.g. the all_lor_endpoints of a scanner geometry, by default None
+            if given, the events are defined by the integer indices of their
+            start and end point in lor_endpoints which are passed to the
+            projection kernels such that the event coordinates are never stored
+        sort_events : bool, optional
+            internally project the events sorted by their dominant direction and
+            the Morton code of their mid point (see lor_sort_permutation)
+            to improve the memory access pattern of the projections,
+            by default False.
+            The projector still takes and returns data in the original event order.
         """
 
         super().__init__()
 
-        self._xstart = event_start_coordinates
-        self._xend = event_end_coordinates
+        self._lor_endpoints = lor_endpoints
+
+        if lor_endpoints is None:
+            self._xstart = event_start_coordinates
+            self._xend = event_end_coordinates
+            self._start_index = None
+            self._end_index = None
+        else:
+            self._xstart = None
+            self._xend = None
+            self._start_index = event_start_coordinates
+            self._end_index = event_end_coordinates
 
-        self._xp = get_namespace(self._xstart)
+        self._xp = get_namespace(event_start_coordinates)
 
         self._dev = device(event_start_coordinates)
 
@@ -971,18 +1471,62 @@ class ListmodePETProjector(LinearOperator):
         self._tof = False
         self._tofbin = None
 
+        # permutation (and its inverse) of the events used internally
+        self._perm = None
+        self._inv_perm = None
+
+        # LOR weights of the events (in the internal event order)
+        self._lor_weights = None
+
+        if sort_events:
+            self._sort_events()
+
+    def _sort_events(self) -> None:
+        """sort the events (start / end coordinates or indices) internally"""
+        self._perm = lor_sort_permutation(
+            self.event_start_coordinates, self.event_end_coordinates
+        )
+        self._inv_perm = self.xp.argsort(self._perm)
+
+        if self._lor_endpoints is None:
+            self._xstart = self.xp.take(self._xstart, self._perm, axis=0)
+            self._xend = self.xp.take(self._xend, self._perm, axis=0)
+        else:
+            self._start_index = self.xp.take(self._start_index, self._perm, axis=0)
+            self._end_index = self.xp.take(self._end_index, self._perm, axis=0)
+
+    def _to_event_order(self, x: None | Array, axis: int = 0) -> None | Array:
+        """convert an internally sorted event array to the original event order"""
+        if x is None or self._perm is None:
+            return x
+        return self.xp.take(x, self._inv_perm, axis=axis)
+
+    def _to_sorted_order(self, x: None | Array, axis: int = 0) -> None | Array:
+        """convert an event array in the original event order to the internal order"""
+        if x is None or self._perm is None:
+            return x
+        return self.xp.take(x, self._perm, axis=axis)
+
+    @property
+    def event_permutation(self) -> None | Array:
+        """permutation of the events used internally (None if the events are not sorted)"""
+        return self._perm
+
     @property
     def in_shape(self) -> tuple[int, int, int]:
         return self._img_shape
 
     @property
     def out_shape(self) -> tuple[int]:
-        return (self._xstart.shape[0],)
+        return (self.num_events,)
 
     @property
     def num_events(self) -> int:
         """number of events"""
-        return self._xstart.shape[0]
+        if self._lor_endpoints is None:
+            return self._xstart.shape[0]
+        else:
+            return self._start_index.shape[0]
 
     @property
     def xp(self) -> ModuleType:
@@ -1020,7 +1564,7 @@ class ListmodePETProjector(LinearOperator):
     @property
     def event_tofbins(self) -> None | Array:
         """TOF bin of each event"""
-        return self._tofbin
+        return self._to_event_order(self._tofbin)
 
     @event_tofbins.setter
     def event_tofbins(self, value: None | Array) -> None:
@@ -1032,34 +1576,128 @@ class ListmodePETProjector(LinearOperator):
                 raise ValueError(
                     "tofbin must have the same number of elements as events"
                 )
-            self._tofbin = value
+            self._tofbin = self._to_sorted_order(value)
+
+    @property
+    def lor_weights(self) -> None | Array:
+        """weights of all events multiplied with the projections, by default None"""
+        return self._to_event_order(self._lor_weights)
+
+    @lor_weights.setter
+    def lor_weights(self, value: None | Array) -> None:
+        if value is not None and tuple(value.shape) != self.out_shape:
+            raise ValueError(f"lor_weights must have shape {self.out_shape}")
+        self._lor_weights = self._to_sorted_order(value)
 
     @property
     def event_start_coordinates(self) -> Array:
         """coordinates of LOR start points"""
-        return self._xstart
+        if self._lor_endpoints is None:
+            return self._to_event_order(self._xstart)
+        else:
+            return self.xp.take(
+                self._lor_endpoints, self.event_start_indices, axis=0
+            )
 
     @property
     def event_end_coordinates(self) -> Array:
         """coordinates of LOR end points"""
-        return self._xend
+        if self._lor_endpoints is None:
+            return self._to_event_order(self._xend)
+        else:
+            return self.xp.take(self._lor_endpoints, self.event_end_indices, axis=0)
+
+    @property
+    def lor_endpoints(self) -> None | Array:
+        """coordinates of all LOR endpoints (None if events are given by coordinates)"""
+        return self._lor_endpoints
+
+    @property
+    def event_start_indices(self) -> None | Array:
+        """indices of the LOR start points in lor_endpoints"""
+        return self._to_event_order(self._start_index)
+
+    @property
+    def event_end_indices(self) -> None | Array:
+        """indices of the LOR end points in lor_endpoints"""
+        return self._to_event_order(self._end_index)
 
     @property
     def voxel_size(self) -> Array:
         """voxel size"""
         return self._voxel_size
 
-    def _apply(self, x: Array) -> Array:
+    @property
+    def img_origin(self) -> Array:
+        """image origin - world coordinates of the [0,0,0] voxel"""
+        return self._img_origin
+
+    def _get_lor_args(self) -> tuple[Array, ...]:
+        """get the LOR arguments (coordinates or endpoints + indices) for the projection kernels"""
+        if self._lor_endpoints is None:
+            return (self._xstart, self._xend)
+
+        return (self._lor_endpoints, self._start_index, self._end_index)
+
+    def _lor_weights_kwargs(self, lor_weights: None | Array) -> dict:
+        """keyword arguments passing the LOR weights to the projection kernels"""
+        if lor_weights is None or self._lor_endpoints is not None:
+            return {}
+        return {"lor_weights": lor_weights}
+
+    def _apply(self, x: Array, out: None | Array = None) -> Array:
+        """forward projection of image x (or a batch of images of shape
+        (nbatch,) + in_shape) along the event LORs"""
+        return self._fwd(x, self._lor_weights, out=out)
+
+    def _fwd(
+        self, x: Array, lor_weights: None | Array, out: None | Array = None
+    ) -> Array:
+        """forward projection of x with LOR weights (in the internal event order)"""
         dev = array_api_compat.device(x)
 
+        use_idx = self._lor_endpoints is not None
+        batch = x.ndim == len(self.in_shape) + 1
+
+        # there are no batched kernels using LOR endpoint indices
+        if batch and use_idx:
+            return parallelproj.backend._batch_loop(
+                lambda x_b, out_b: self._fwd(x_b, lor_weights, out_b), x, out
+            )
+
+        kwargs = self._lor_weights_kwargs(lor_weights)
+
+        # for sorted events the projection has to be permuted before writing to out
+        out_sorted = out if self._perm is None else None
+
         if not self.tof:
-            x_fwd = parallelproj.joseph3d_fwd(
-                self._xstart, self._xend, x, self._img_origin, self._voxel_size
+            if batch:
+                fwd = parallelproj.joseph3d_fwd_batch
+            else:
+                fwd = (
+                    parallelproj.joseph3d_fwd_idx
+                    if use_idx
+                    else parallelproj.joseph3d_fwd
+                )
+            x_fwd = fwd(
+                *self._get_lor_args(),
+                x,
+                self._img_origin,
+                self._voxel_size,
+                out=out_sorted,
+                **kwargs,
             )
         else:
-            x_fwd = parallelproj.joseph3d_fwd_tof_lm(
-                self._xstart,
-                self._xend,
+            if batch:
+                fwd = parallelproj.joseph3d_fwd_tof_lm_batch
+            else:
+                fwd = (
+                    parallelproj.joseph3d_fwd_tof_lm_idx
+                    if use_idx
+                    else parallelproj.joseph3d_fwd_tof_lm
+                )
+            x_fwd = fwd(
+                *self._get_lor_args(),
                 x,
                 self._img_origin,
                 self._voxel_size,
@@ -1074,26 +1712,86 @@ class ListmodePETProjector(LinearOperator):
                 ),
                 self.tof_parameters.num_sigmas,
                 self._tofbin,
+                out=out_sorted,
+                **kwargs,
             )
 
+        # the kernels using LOR endpoint indices do not support LOR weights
+        if lor_weights is not None and not kwargs:
+            x_fwd[...] = x_fwd * lor_weights
+
+        if self._perm is not None:
+            x_fwd = self._to_event_order(x_fwd, axis=x_fwd.ndim - 1)
+            if out is not None:
+                out[...] = x_fwd
+                x_fwd = out
+
         return x_fwd
 
-    def _adjoint(self, y: Array) -> Array:
+    def _adjoint(
+        self, y: Array, out: None | Array = None, accumulate: bool = False
+    ) -> Array:
+        """back projection of event values y (or a batch of event values of
+        shape (nbatch, num_events)) along the event LORs"""
+        return self._back(y, self._lor_weights, out=out, accumulate=accumulate)
+
+    def _back(
+        self,
+        y: Array,
+        lor_weights: None | Array,
+        out: None | Array = None,
+        accumulate: bool = False,
+    ) -> Array:
+        """back projection of y with LOR weights (in the internal event order)"""
         dev = array_api_compat.device(y)
 
+        use_idx = self._lor_endpoints is not None
+        batch = y.ndim == 2
+
+        if batch and use_idx:
+            return parallelproj.backend._batch_loop(
+                lambda y_b, out_b: self._back(y_b, lor_weights, out_b, accumulate),
+                y,
+                out,
+            )
+
+        y = self._to_sorted_order(y, axis=y.ndim - 1)
+
+        kwargs = self._lor_weights_kwargs(lor_weights)
+
+        if lor_weights is not None and not kwargs:
+            y = y * lor_weights
+
         if not self.tof:
-            y_back = parallelproj.joseph3d_back(
-                self._xstart,
-                self._xend,
+            if batch:
+                back = parallelproj.joseph3d_back_batch
+            else:
+                back = (
+                    parallelproj.joseph3d_back_idx
+                    if use_idx
+                    else parallelproj.joseph3d_back
+                )
+            y_back = back(
+                *self._get_lor_args(),
                 self._img_shape,
                 self._img_origin,
                 self._voxel_size,
                 y,
+                out=out,
+                accumulate=accumulate,
+                **kwargs,
             )
         else:
-            y_back = parallelproj.joseph3d_back_tof_lm(
-                self._xstart,
-                self._xend,
+            if batch:
+                back = parallelproj.joseph3d_back_tof_lm_batch
+            else:
+                back = (
+                    parallelproj.joseph3d_back_tof_lm_idx
+                    if use_idx
+                    else parallelproj.joseph3d_back_tof_lm
+                )
+            y_back = back(
+                *self._get_lor_args(),
                 self._img_shape,
                 self._img_origin,
                 self._voxel_size,
@@ -1109,6 +1807,574 @@ class ListmodePETProjector(LinearOperator):
                 ),
                 self.tof_parameters.num_sigmas,
                 self._tofbin,
+                out=out,
+                accumulate=accumulate,
+                **kwargs,
             )
 
         return y_back
+
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        return self._apply(x, out=out)
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        return self._adjoint(y, out=out, accumulate=accumulate)
+
+    def _with_lor_weights(self, weights: Array) -> None | LinearOperator:
+        """projector applying event weights in the projection kernels
+        (in addition to lor_weights)"""
+        if tuple(weights.shape) != self.out_shape:
+            return None
+        if self._lor_weights is not None:
+            return _LORWeightedProjector(
+                self, self._to_sorted_order(weights) * self._lor_weights
+            )
+        return _LORWeightedProjector(
+            self, self._to_sorted_order(weights), factors=weights
+        )
+
+    def _apply_ratio_adjoint(
+        self, x: Array, data: Array, contamination: float | Array
+    ) -> Array:
+        """fused non-TOF forward projection, division and back projection"""
+        if (
+            self.tof
+            or (self._lor_weights is not None)
+            or (self._lor_endpoints is not None)
+            or x.ndim > len(self.in_shape)
+        ):
+            return super()._apply_ratio_adjoint(x, data, contamination)
+
+        data = self._to_sorted_order(data)
+        if getattr(contamination, "ndim", 0) > 0 and size(contamination) > 1:
+            contamination = self._to_sorted_order(contamination)
+
+        return parallelproj.joseph3d_fwd_back_ratio(
+            self._xstart,
+            self._xend,
+            x,
+            self._img_origin,
+            self._voxel_size,
+            data,
+            contamination,
+        )
+
+
+def listmode_event_dtype(tofbin_dtype: str | np.dtype = "int16") -> np.dtype:
+    """structured numpy dtype of compact listmode events
+
+    Every event consists of the int32 start and end index into a table of
+    LOR endpoints (e.g. the all_lor_endpoints of a scanner geometry) and
+    a TOF bin, which needs 9 (int8 TOF bins) or 10 (int16 TOF bins)
+    bytes per event.
+
+    Parameters
+    ----------
+    tofbin_dtype : str | np.dtype, optional
+        dtype of the TOF bin, "int8" or "int16", by default "int16"
+
+    Returns
+    -------
+    np.dtype
+        with the fields "start", "end" and "tofbin"
+    """
+    if np.dtype(tofbin_dtype) not in (np.dtype(np.int8), np.dtype(np.int16)):
+        raise ValueError("tofbin_dtype must be int8 or int16")
+
+    return np.dtype(
+        [("start", np.int32), ("end", np.int32), ("tofbin", np.dtype(tofbin_dtype))]
+    )
+
+
+def make_listmode_events(
+    start_index: Array,
+    end_index: Array,
+    tofbin: None | Array = None,
+    tofbin_dtype: str | np.dtype = "int16",
+) -> np.ndarray:
+    """create a compact structured numpy array of listmode events
+
+    Parameters
+    ----------
+    start_index : Array
+        index of the LOR start point of all events in the table of LOR endpoints
+    end_index : Array
+        index of the LOR end point of all events in the table of LOR endpoints
+    tofbin : None | Array, optional
+        TOF bin of all events, by default None (all TOF bins set to 0)
+    tofbin_dtype : str | np.dtype, optional
+        dtype of the TOF bin, "int8" or "int16", by default "int16"
+
+    Returns
+    -------
+    np.ndarray
+        structured array with dtype listmode_event_dtype(tofbin_dtype)
+    """
+    num_events = start_index.shape[0]
+
+    events = np.zeros(num_events, dtype=listmode_event_dtype(tofbin_dtype))
+    events["start"] = np.asarray(to_device(start_index, "cpu"))
+    events["end"] = np.asarray(to_device(end_index, "cpu"))
+
+    if tofbin is not None:
+        tofbin = np.asarray(to_device(tofbin, "cpu"))
+        info = np.iinfo(events.dtype["tofbin"])
+        if tofbin.size > 0 and (tofbin.min() < info.min or tofbin.max() > info.max):
+            raise ValueError(f"TOF bins do not fit into {events.dtype['tofbin']}")
+        events["tofbin"] = tofbin
+
+    return events
+
+
+class CompactListmodePETProjector(LinearOperator):
+    """non-TOF and TOF listmode projector for compact index based events
+
+    The events are stored in a structured numpy array (see
+    :func:`listmode_event_dtype` and :func:`make_listmode_events`) containing
+    the indices of the start and end point of every event in a table
+    of LOR endpoints and the TOF bin, which needs 9-10 bytes per event instead
+    of 24 (+2) bytes for the LOR coordinates (+ TOF bin) of every event.
+
+    The events are projected in chunks of at most chunk_size events using
+    the joseph3d_*_idx projectors such that, on top of the events, only
+    memory for one chunk of indices (and coordinates using the CUDA libs)
+    is needed. The events can also be a numpy memmap.
+    """
+
+    def __init__(
+        self,
+        events: np.ndarray,
+        lor_endpoints: Array,
+        img_shape: tuple[int, int, int],
+        voxel_size: tuple[float, float, float],
+        img_origin: None | Array = None,
+        chunk_size: int = 2**20,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        events : np.ndarray
+            structured numpy array of events with the fields "start", "end"
+            and "tofbin", see listmode_event_dtype
+        lor_endpoints : Array
+            world coordinates of all possible LOR endpoints, shape (num_lor_endpoints, 3),
+            e.g. the all_lor_endpoints of a scanner geometry
+        img_shape : tuple[int, int, int]
+            shape of the image to be projected
+        voxel_size : tuple[float, float, float]
+            the voxel size of the image to be projected
+        img_origin : None | Array, optional
+            the origin of the image to be projected, by default None
+            means that the center of the image is at world coordinate (0,0,0)
+        chunk_size : int, optional
+            maximum number of events projected at once, by default 2**20
+        """
+        super().__init__()
+
+        if events.dtype.names is None or not {"start", "end", "tofbin"} <= set(
+            events.dtype.names
+        ):
+            raise ValueError(
+                "events must be a structured array with fields start, end and tofbin"
+            )
+
+        self._events = events
+        self._lor_endpoints = lor_endpoints
+        self._chunk_size = chunk_size
+
+        self._xp = get_namespace(lor_endpoints)
+        self._dev = device(lor_endpoints)
+
+        self._img_shape = img_shape
+        self._voxel_size = self.xp.asarray(
+            voxel_size, dtype=self.xp.float32, device=self._dev
+        )
+
+        if img_origin is None:
+            self._img_origin = (
+                -(
+                    self.xp.asarray(
+                        self._img_shape, dtype=self.xp.float32, device=self._dev
+                    )
+                    / 2
+                )
+                + 0.5
+            ) * self._voxel_size
+        else:
+            self._img_origin = self.xp.asarray(
+                img_origin, dtype=self.xp.float32, device=self._dev
+            )
+
+        self._tof_parameters = None
+        self._tof = False
+
+        self._check_events()
+
+    def _check_events(self) -> None:
+        """raise a ValueError if an event has an LOR endpoint index outside of
+        lor_endpoints (the projection kernels do not check the indices)
+
+        all events are read once (in chunks) when the projector is created
+        """
+        num_endpoints = size(self._lor_endpoints) // 3
+
+        for i0 in range(0, self.num_events, self._chunk_size):
+            chunk = self._events[i0 : i0 + self._chunk_size]
+            for name in ("start", "end"):
+                idx = chunk[name]
+                if idx.min() < 0 or idx.max() >= num_endpoints:
+                    raise ValueError(
+                        f"{name} index of events {i0} to {i0 + chunk.shape[0] - 1} "
+                        f"must be in [0, {num_endpoints}) (number of LOR endpoints)"
+                    )
+
+    @property
+    def in_shape(self) -> tuple[int, int, int]:
+        return self._img_shape
+
+    @property
+    def out_shape(self) -> tuple[int]:
+        return (self.num_events,)
+
+    @property
+    def num_events(self) -> int:
+        """number of events"""
+        return self._events.shape[0]
+
+    @property
+    def events(self) -> np.ndarray:
+        """structured array of events"""
+        return self._events
+
+    @property
+    def lor_endpoints(self) -> Array:
+        """coordinates of all LOR endpoints"""
+        return self._lor_endpoints
+
+    @property
+    def chunk_size(self) -> int:
+        """maximum number of events projected at once"""
+        return self._chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value: int) -> None:
+        if value < 1:
+            raise ValueError("chunk_size must be positive")
+        self._chunk_size = value
+
+    @property
+    def xp(self) -> ModuleType:
+        """array module"""
+        return self._xp
+
+    @property
+    def voxel_size(self) -> Array:
+        """voxel size"""
+        return self._voxel_size
+
+    @property
+    def img_origin(self) -> Array:
+        """image origin - world coordinates of the [0,0,0] voxel"""
+        return self._img_origin
+
+    @property
+    def tof(self) -> bool:
+        """bool indicating whether to use TOF projections or not"""
+        return self._tof
+
+    @tof.setter
+    def tof(self, value: bool) -> None:
+        if (value) and (self.tof_parameters is None):
+            raise ValueError("must set tof_parameters first")
+        self._tof = value
+
+    @property
+    def tof_parameters(self) -> TOFParameters | None:
+        """TOF parameters"""
+        return self._tof_parameters
+
+    @tof_parameters.setter
+    def tof_parameters(self, value: TOFParameters | None) -> None:
+        if not (isinstance(value, TOFParameters) or value is None):
+            raise ValueError("tof_parameters must be a TOFParameters object or None")
+        self._tof_parameters = value
+
+        if value is None:
+            self._tof = False
+
+    def _load_chunk(self, i0: int, i1: int, y: None | Array = None) -> tuple:
+        """start index, end index, TOF bin (and data y) of the events [i0, i1)"""
+        chunk = self._events[i0:i1]
+
+        start = self.xp.asarray(
+            np.ascontiguousarray(chunk["start"], dtype=np.int32), device=self._dev
+        )
+        end = self.xp.asarray(
+            np.ascontiguousarray(chunk["end"], dtype=np.int32), device=self._dev
+        )
+
+        if self.tof:
+            tofbin = self.xp.asarray(
+                np.ascontiguousarray(chunk["tofbin"], dtype=np.int16),
+                device=self._dev,
+            )
+        else:
+            tofbin = None
+
+        return start, end, tofbin, None if y is None else y[i0:i1]
+
+    def _event_chunks(self, y: None | Array = None):
+        """generator of (first event, last event + 1, start index, end index,
+        TOF bin, data) of all chunks of events"""
+        for i0 in range(0, self.num_events, self._chunk_size):
+            i1 = min(i0 + self._chunk_size, self.num_events)
+            yield (i0, i1, *self._load_chunk(i0, i1, y))
+
+    def _tof_args(self, tofbin: Array) -> tuple:
+        return (
+            self._tof_parameters.tofbin_width,
+            self.xp.asarray(
+                [self._tof_parameters.sigma_tof], dtype=self.xp.float32, device=self._dev
+            ),
+            self.xp.asarray(
+                [self._tof_parameters.tofcenter_offset],
+                dtype=self.xp.float32,
+                device=self._dev,
+            ),
+            self._tof_parameters.num_sigmas,
+            tofbin,
+        )
+
+    def _fwd_chunk(
+        self,
+        x: Array,
+        start: Array,
+        end: Array,
+        tofbin: None | Array,
+        out: None | Array = None,
+    ) -> Array:
+        args = (self._lor_endpoints, start, end, x, self._img_origin, self._voxel_size)
+
+        if not self.tof:
+            return parallelproj.joseph3d_fwd_idx(*args, out=out)
+        else:
+            return parallelproj.joseph3d_fwd_tof_lm_idx(
+                *args, *self._tof_args(tofbin), out=out
+            )
+
+    def _back_chunk(
+        self,
+        y: Array,
+        start: Array,
+        end: Array,
+        tofbin: None | Array,
+        out: Array,
+    ) -> Array:
+        args = (
+            self._lor_endpoints,
+            start,
+            end,
+            self._img_shape,
+            self._img_origin,
+            self._voxel_size,
+            y,
+        )
+
+        if not self.tof:
+            return parallelproj.joseph3d_back_idx(*args, out=out, accumulate=True)
+        else:
+            return parallelproj.joseph3d_back_tof_lm_idx(
+                *args, *self._tof_args(tofbin), out=out, accumulate=True
+            )
+
+    def _apply(self, x: Array, out: None | Array = None) -> Array:
+        if out is None:
+            out = self.xp.zeros(
+                self.out_shape,
+                dtype=parallelproj.backend._result_dtype(self.xp, x),
+                device=device(x),
+            )
+
+        for i0, i1, start, end, tofbin, _ in self._event_chunks():
+            self._fwd_chunk(x, start, end, tofbin, out=out[i0:i1])
+
+        return out
+
+    def _adjoint(
+        self, y: Array, out: None | Array = None, accumulate: bool = False
+    ) -> Array:
+        if out is None:
+            out = self.xp.zeros(
+                self.in_shape,
+                dtype=parallelproj.backend._result_dtype(self.xp, y),
+                device=device(y),
+            )
+        elif not accumulate:
+            out[...] = 0
+
+        # the back projections of all chunks are accumulated in out
+        for _, _, start, end, tofbin, y_chunk in self._event_chunks(y):
+            self._back_chunk(y_chunk, start, end, tofbin, out)
+
+        return out
+
+    def _apply_out(self, x: Array, out: Array) -> Array:
+        return self._apply(x, out=out)
+
+    def _adjoint_out(self, y: Array, out: Array, accumulate: bool = False) -> Array:
+        return self._adjoint(y, out=out, accumulate=accumulate)
+
+
+class MemmapListmodePETProjector(CompactListmodePETProjector):
+    """streaming listmode projector for compact events stored in a (large) file
+
+    The events are memory mapped (see :class:`numpy.memmap`) and streamed
+    in chunks of chunk_size events such that listmode files larger than
+    the available memory can be projected. While a chunk is projected, the
+    next chunk (and the corresponding part of the data to be back projected)
+    is read in a background thread (read-ahead).
+
+    Forward projections can be written chunk by chunk to an output file
+    via :meth:`apply_to_memmap`. Back projections of memory mapped data are
+    accumulated over all chunks.
+    """
+
+    def __init__(
+        self,
+        events: str | os.PathLike | np.memmap,
+        lor_endpoints: Array,
+        img_shape: tuple[int, int, int],
+        voxel_size: tuple[float, float, float],
+        img_origin: None | Array = None,
+        chunk_size: int = 2**20,
+        event_dtype: None | np.dtype = None,
+        offset: int = 0,
+        read_ahead: bool = True,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        events : str | os.PathLike | np.memmap
+            memory mapped structured array of events, or path of a raw file
+            containing the events (see listmode_event_dtype)
+        lor_endpoints : Array
+            world coordinates of all possible LOR endpoints, shape (num_lor_endpoints, 3)
+        img_shape : tuple[int, int, int]
+            shape of the image to be projected
+        voxel_size : tuple[float, float, float]
+            the voxel size of the image to be projected
+        img_origin : None | Array, optional
+            the origin of the image to be projected, by default None
+            means that the center of the image is at world coordinate (0,0,0)
+        chunk_size : int, optional
+            number of events projected at once, by default 2**20
+        event_dtype : None | np.dtype, optional
+            dtype of the events in the file, by default None
+            means listmode_event_dtype("int16") (ignored if events is a memmap)
+        offset : int, optional
+            offset of the first event in the file in bytes, by default 0
+            (ignored if events is a memmap)
+        read_ahead : bool, optional
+            read the next chunk in a background thread while the current chunk
+            is projected, by default True
+        """
+        if not isinstance(events, np.memmap):
+            if event_dtype is None:
+                event_dtype = listmode_event_dtype()
+            events = np.memmap(events, dtype=event_dtype, mode="r", offset=offset)
+
+        super().__init__(
+            events,
+            lor_endpoints,
+            img_shape,
+            voxel_size,
+            img_origin=img_origin,
+            chunk_size=chunk_size,
+        )
+
+        self._read_ahead = read_ahead
+
+    @property
+    def read_ahead(self) -> bool:
+        """whether the next chunk is read in a background thread"""
+        return self._read_ahead
+
+    @read_ahead.setter
+    def read_ahead(self, value: bool) -> None:
+        self._read_ahead = value
+
+    def _load_chunk(self, i0: int, i1: int, y: None | Array = None) -> tuple:
+        if isinstance(y, np.memmap):
+            # read the data of the chunk from disk into an array of the
+            # array module and device of the projector
+            y = self.xp.asarray(
+                np.ascontiguousarray(y[i0:i1], dtype=np.float32), device=self._dev
+            )
+            return super()._load_chunk(i0, i1)[:3] + (y,)
+
+        return super()._load_chunk(i0, i1, y)
+
+    def _event_chunks(self, y: None | Array = None):
+        if not self._read_ahead:
+            yield from super()._event_chunks(y)
+            return
+
+        bounds = [
+            (i0, min(i0 + self._chunk_size, self.num_events))
+            for i0 in range(0, self.num_events, self._chunk_size)
+        ]
+
+        # the projection functions release the GIL such that reading the
+        # next chunk overlaps with the projection of the current chunk
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = None
+            for k, (i0, i1) in enumerate(bounds):
+                chunk = (
+                    future.result() if future is not None else self._load_chunk(i0, i1, y)
+                )
+                if k + 1 < len(bounds):
+                    future = executor.submit(self._load_chunk, *bounds[k + 1], y)
+                yield (i0, i1, *chunk)
+
+    def _adjoint(
+        self, y: Array, out: None | Array = None, accumulate: bool = False
+    ) -> Array:
+        if out is None and isinstance(y, np.memmap):
+            out = self.xp.zeros(self.in_shape, dtype=self.xp.float32, device=self._dev)
+            accumulate = True
+
+        return super()._adjoint(y, out=out, accumulate=accumulate)
+
+    def apply_to_memmap(
+        self, x: Array, out: str | os.PathLike | np.memmap
+    ) -> np.memmap:
+        """forward projection written chunk by chunk to a memory mapped file
+
+        Parameters
+        ----------
+        x : Array
+            image to be forward projected
+        out : str | os.PathLike | np.memmap
+            float32 memmap of shape out_shape, or path of the (raw float32)
+            file to be created
+
+        Returns
+        -------
+        np.memmap
+            the memory mapped forward projection
+        """
+        if not isinstance(out, np.memmap):
+            out = np.memmap(out, dtype=np.float32, mode="w+", shape=self.out_shape)
+
+        if tuple(out.shape) != self.out_shape:
+            raise ValueError(f"out must have shape {self.out_shape}")
+
+        for i0, i1, start, end, tofbin, _ in self._event_chunks():
+            res = self._fwd_chunk(x, start, end, tofbin)
+            if self.scale != 1:
+                res = self.scale * res
+            out[i0:i1] = np.asarray(to_device(res, "cpu"))
+
+        out.flush()
+
+        return out
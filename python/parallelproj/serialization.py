@@ -0,0 +1,225 @@
+"""saving and loading of scanners, LOR descriptors and projectors
+
+The state of an object (and all parallelproj objects it refers to) is stored
+in a directory containing a ``state.json`` file and one ``.npy`` file per
+array, including cached arrays such as the LOR endpoints of projectors.
+Loading does not recompute any geometry. Using numpy arrays, the arrays are
+memory mapped read-only such that multiple (worker) processes loading the same
+directory share the pages of the arrays.
+"""
+from __future__ import annotations
+
+import dataclasses
+import enum
+import importlib
+import json
+import os
+
+import numpy as np
+from types import ModuleType
+from array_api_compat import to_device, is_array_api_obj, get_namespace
+
+_FORMAT_VERSION = 1
+
+# lazily computed attributes that are not saved
+_TRANSIENT_ATTRIBUTES = {"_histogram_luts", "_norm_cache", "_fused"}
+
+
+def _qualname(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _import(qualname: str):
+    module, name = qualname.rsplit(".", 1)
+
+    if not (module == "parallelproj" or module.startswith("parallelproj.")):
+        raise ValueError(f"can only load parallelproj objects, got {qualname}")
+
+    return getattr(importlib.import_module(module), name)
+
+
+class _Saver:
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+        self._memo: dict[int, str] = {}
+
+    def encode(self, value, path: str):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        elif isinstance(value, np.generic):
+            return value.item()
+        elif isinstance(value, ModuleType):
+            return {"__module__": value.__name__}
+        elif isinstance(value, enum.Enum):
+            return {"__enum__": _qualname(type(value)), "name": value.name}
+        elif isinstance(value, (tuple, list)):
+            items = [self.encode(v, f"{path}.{i}") for i, v in enumerate(value)]
+            return {"__tuple__": items} if isinstance(value, tuple) else items
+        elif isinstance(value, dict):
+            if not all(isinstance(k, str) for k in value):
+                raise TypeError(f"{path}: only dicts with str keys can be saved")
+            return {
+                "__dict__": {k: self.encode(v, f"{path}.{k}") for k, v in value.items()}
+            }
+        elif is_array_api_obj(value):
+            if id(value) in self._memo:
+                return {"__ref__": self._memo[id(value)]}
+            self._memo[id(value)] = path
+            fname = f"{path}.npy"
+            np.save(
+                os.path.join(self._directory, fname),
+                np.asarray(to_device(value, "cpu")),
+            )
+            return {"__array__": fname, "namespace": get_namespace(value).__name__}
+        elif dataclasses.is_dataclass(value):
+            return {
+                "__dataclass__": _qualname(type(value)),
+                "fields": {
+                    f.name: self.encode(getattr(value, f.name), f"{path}.{f.name}")
+                    for f in dataclasses.fields(value)
+                },
+            }
+        elif type(value).__module__.startswith("parallelproj"):
+            if id(value) in self._memo:
+                return {"__ref__": self._memo[id(value)]}
+            self._memo[id(value)] = path
+
+            state = {}
+            for k, v in vars(value).items():
+                if k in _TRANSIENT_ATTRIBUTES:
+                    v = None
+                elif k == "_dev":
+                    # devices are set when loading
+                    state[k] = {"__device__": str(v)}
+                    continue
+                state[k] = self.encode(v, f"{path}.{k}")
+
+            return {"__object__": _qualname(type(value)), "state": state}
+        else:
+            raise TypeError(f"{path}: can not save objects of type {type(value)}")
+
+
+class _Loader:
+    def __init__(
+        self,
+        directory: str,
+        xp: None | ModuleType,
+        dev: None | str,
+        mmap_mode: None | str,
+    ) -> None:
+        self._directory = directory
+        self._xp = xp
+        self._dev = dev
+        self._mmap_mode = mmap_mode
+        self._memo: dict[str, object] = {}
+
+    def decode(self, value, path: str):
+        if not isinstance(value, (dict, list)):
+            return value
+        elif isinstance(value, list):
+            return [self.decode(v, f"{path}.{i}") for i, v in enumerate(value)]
+        elif "__ref__" in value:
+            return self._memo[value["__ref__"]]
+        elif "__tuple__" in value:
+            return tuple(
+                self.decode(v, f"{path}.{i}") for i, v in enumerate(value["__tuple__"])
+            )
+        elif "__dict__" in value:
+            return {
+                k: self.decode(v, f"{path}.{k}") for k, v in value["__dict__"].items()
+            }
+        elif "__module__" in value:
+            if self._xp is not None:
+                return self._xp
+            return importlib.import_module(value["__module__"])
+        elif "__device__" in value:
+            return value["__device__"] if self._dev is None else self._dev
+        elif "__enum__" in value:
+            return _import(value["__enum__"])[value["name"]]
+        elif "__array__" in value:
+            x = np.load(
+                os.path.join(self._directory, value["__array__"]),
+                mmap_mode=self._mmap_mode,
+            )
+            xp = self._xp
+            if xp is None:
+                xp = importlib.import_module(value["namespace"])
+            if xp.__name__ != "array_api_compat.numpy":
+                x = xp.asarray(x, device="cpu" if self._dev is None else self._dev)
+            self._memo[path] = x
+            return x
+        elif "__dataclass__" in value:
+            cls = _import(value["__dataclass__"])
+            return cls(
+                **{
+                    k: self.decode(v, f"{path}.{k}")
+                    for k, v in value["fields"].items()
+                }
+            )
+        elif "__object__" in value:
+            cls = _import(value["__object__"])
+            obj = cls.__new__(cls)
+            self._memo[path] = obj
+            for k, v in value["state"].items():
+                setattr(obj, k, self.decode(v, f"{path}.{k}"))
+            return obj
+        else:
+            raise ValueError(f"{path}: invalid state")
+
+
+def save(obj, directory: str | os.PathLike) -> None:
+    """save a scanner, LOR descriptor or projector (including cached arrays)
+
+    Parameters
+    ----------
+    obj : object
+        e.g. a ModularizedPETScannerGeometry, RegularPolygonPETLORDescriptor,
+        RegularPolygonPETProjector or ListmodePETProjector
+    directory : str | os.PathLike
+        output directory, created if it does not exist
+    """
+    directory = os.fspath(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    state = _Saver(directory).encode(obj, "obj")
+
+    with open(os.path.join(directory, "state.json"), "w") as f:
+        json.dump({"version": _FORMAT_VERSION, "obj": state}, f)
+
+
+def load(
+    directory: str | os.PathLike,
+    xp: None | ModuleType = None,
+    dev: None | str = None,
+    mmap_mode: None | str = "r",
+):
+    """load a scanner, LOR descriptor or projector saved with :func:`save`
+
+    Parameters
+    ----------
+    directory : str | os.PathLike
+        directory written by save
+    xp : None | ModuleType, optional
+        array module of the loaded object, by default None
+        means the array module of the saved object
+    dev : None | str, optional
+        device of the loaded object, by default None
+        means the (string representation of the) device of the saved object
+    mmap_mode : None | str, optional
+        memory map mode of the arrays, by default "r" (read-only, shared
+        between processes), only used for numpy (array_api_compat.numpy)
+
+    Returns
+    -------
+    object
+        the loaded object
+    """
+    directory = os.fspath(directory)
+
+    with open(os.path.join(directory, "state.json"), "r") as f:
+        state = json.load(f)
+
+    if state["version"] != _FORMAT_VERSION:
+        raise ValueError(f"unsupported format version {state['version']}")
+
+    return _Loader(directory, xp, dev, mmap_mode).decode(state["obj"], "obj")
@@ -0,0 +1,625 @@
+"""projectors that distribute the LORs over multiple (NUMA pinned) worker processes"""
+from __future__ import annotations
+
+import os
+import glob
+import inspect
+import time
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+import array_api_compat
+from numpy.array_api._array_object import Array
+
+from . import backend
+from .operators import LinearOperator
+from .projectors import RegularPolygonPETProjector, ListmodePETProjector
+
+
+def _parse_cpulist(cpulist: str) -> list[int]:
+    """parse a linux cpulist string like '0-3,8-11' into a list of CPU numbers"""
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if part == "":
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def get_numa_node_cpus() -> list[list[int]]:
+    """CPUs of all NUMA nodes of the system
+
+    Returns
+    -------
+    list[list[int]]
+        CPU numbers of every NUMA node, a single node containing all CPUs
+        available to this process if the NUMA topology is not available
+        (e.g. on non-linux systems)
+    """
+    nodes = []
+
+    for fname in sorted(
+        glob.glob("/sys/devices/system/node/node[0-9]*/cpulist"),
+        key=lambda f: int(os.path.basename(os.path.dirname(f))[4:]),
+    ):
+        with open(fname, "r") as f:
+            cpus = _parse_cpulist(f.read())
+        if len(cpus) > 0:
+            nodes.append(cpus)
+
+    if len(nodes) == 0:
+        if hasattr(os, "sched_getaffinity"):
+            nodes = [sorted(os.sched_getaffinity(0))]
+        else:
+            nodes = [list(range(os.cpu_count() or 1))]
+
+    return nodes
+
+
+def _attach(name: str, shape: tuple[int, ...], dtype) -> tuple:
+    """attach to an existing shared memory block and view it as numpy array"""
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _setup_shard(spec: dict) -> tuple:
+    """pin a worker process, copy the LOR arguments of its shard and attach to
+    the shared arrays"""
+    cpus = spec["cpus"]
+    if cpus is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    if spec["num_threads"] is not None:
+        backend.set_num_threads(spec["num_threads"])
+
+    i0, i1 = spec["unit_range"]
+    num_units = spec["num_units"]
+    unit_size = int(np.prod(spec["unit_out_shape"], dtype=np.int64))
+
+    shms = []
+
+    # copy the LOR arguments of this shard (sliced along their first axis) or
+    # the LOR arguments shared by all shards from the staging buffers into
+    # memory of the worker (first touch after pinning -> local NUMA node)
+    lor_args = []
+    for name, shape, dtype, split in spec["lor_args"]:
+        shm, tmp = _attach(name, shape, dtype)
+        lor_args.append(np.array(tmp[i0:i1] if split else tmp))
+        del tmp
+        shm.close()
+
+    tofbin = None
+    if spec["tofbin"] is not None:
+        shm, tmp = _attach(spec["tofbin"], (num_units,), np.int16)
+        tofbin = np.array(tmp[i0:i1])
+        del tmp
+        shm.close()
+
+    lor_weights = None
+    if spec["lor_weights"] is not None:
+        shm, tmp = _attach(spec["lor_weights"], spec["lor_weights_shape"], np.float32)
+        lor_weights = np.array(tmp[i0:i1])
+        del tmp
+        shm.close()
+
+    shm, img = _attach(spec["img"], spec["img_shape"], np.float32)
+    shms.append(shm)
+    shm, sino = _attach(spec["sino"], (num_units * unit_size,), np.float32)
+    shms.append(shm)
+    shm, back_imgs = _attach(
+        spec["back_imgs"], (spec["num_shards"],) + spec["img_shape"], np.float32
+    )
+    shms.append(shm)
+
+    sino = sino[unit_size * i0 : unit_size * i1].reshape(
+        (i1 - i0,) + spec["unit_out_shape"]
+    )
+    back_img = back_imgs[spec["shard"]]
+
+    tof_args = spec["tof_args"]
+    if tofbin is not None:
+        tof_args = tof_args + (tofbin,)
+
+    return img, sino, back_img, shms, (lor_args, tof_args, lor_weights)
+
+
+def _shard_worker(conn, spec: dict) -> None:
+    """main loop of a worker process projecting a contiguous range of LORs"""
+    try:
+        img, sino, back_img, shms, shard_args = _setup_shard(spec)
+    except Exception:
+        conn.send((None, traceback.format_exc()))
+        conn.close()
+        return
+
+    lor_args, tof_args, lor_weights = shard_args
+    fwd = spec["fwd"]
+    back = spec["back"]
+    geom_args = spec["geom_args"]
+    img_origin = spec["img_origin"]
+    voxsize = spec["voxsize"]
+
+    # the kernels using LOR endpoint indices or the axial symmetry
+    # do not support LOR weights, such that they are multiplied here
+    weights_in_kernels = "lor_weights" in inspect.signature(fwd).parameters
+    multiply_weights = lor_weights is not None and not weights_in_kernels
+    if lor_weights is not None and weights_in_kernels:
+        kwargs = {"lor_weights": lor_weights.ravel()}
+    else:
+        kwargs = {}
+
+    def _weighted(y: np.ndarray) -> np.ndarray:
+        """y (a view of the shard sinogram) multiplied with the LOR weights"""
+        w = lor_weights.reshape(lor_weights.shape + (1,))
+        return (y.reshape(lor_weights.shape + (-1,)) * w).reshape(y.shape)
+
+    conn.send((0.0, None))
+
+    while True:
+        cmd = conn.recv()
+        if cmd == "close":
+            break
+
+        try:
+            t0 = time.perf_counter()
+            if cmd == "fwd":
+                fwd(
+                    *lor_args,
+                    img,
+                    img_origin,
+                    voxsize,
+                    *geom_args,
+                    *tof_args,
+                    out=sino,
+                    **kwargs,
+                )
+                if multiply_weights:
+                    sino[...] = _weighted(sino)
+            elif cmd == "back":
+                back(
+                    *lor_args,
+                    spec["img_shape"],
+                    img_origin,
+                    voxsize,
+                    _weighted(sino) if multiply_weights else sino,
+                    *geom_args,
+                    *tof_args,
+                    out=back_img,
+                    **kwargs,
+                )
+            else:
+                raise ValueError(f"unknown command {cmd}")
+            conn.send((time.perf_counter() - t0, None))
+        except Exception:
+            conn.send((None, traceback.format_exc()))
+
+    del img, sino, back_img
+    for shm in shms:
+        shm.close()
+    conn.close()
+
+
+def _polygon_shard_layout(projector: RegularPolygonPETProjector) -> dict:
+    """LOR arguments, kernels and sinogram layout of a sinogram projector split
+    along the first axis of its LOR arguments"""
+    lor_args, geom_args = projector._get_lor_args()
+    lor_args = [np.asarray(a) for a in lor_args]
+    fwd, back = projector._get_projection_funcs()
+
+    out_shape = tuple(projector.out_shape)
+    spatial_shape = out_shape[:-1] if projector.tof else out_shape
+
+    if projector._use_axial_symmetry:
+        # split the planes if they are the first sinogram axis,
+        # otherwise the first axis of the plane 0 LORs
+        plane_axis_num = geom_args[0]
+        split = [plane_axis_num != 0] * 2 + [plane_axis_num == 0] * 2
+        num_units = out_shape[0]
+        unit_out_shape = out_shape[1:]
+    else:
+        if projector._use_lor_endpoint_indices:
+            # the LOR endpoints are shared by all shards
+            lor_args = lor_args[:1] + [a.reshape(-1) for a in lor_args[1:]]
+            split = [False, True, True]
+        else:
+            lor_args = [a.reshape(-1, 3) for a in lor_args]
+            split = [True, True]
+        num_units = int(np.prod(spatial_shape, dtype=np.int64))
+        unit_out_shape = out_shape[len(spatial_shape) :]
+
+    lor_weights = projector.lor_weights
+    if lor_weights is not None:
+        lor_weights = np.asarray(lor_weights, dtype=np.float32).reshape(num_units, -1)
+
+    tof_args = ()
+    if projector.tof:
+        tof_args = (projector.tof_parameters.num_tofbins,)
+
+    return dict(
+        lor_args=list(zip(lor_args, split)),
+        geom_args=tuple(geom_args),
+        fwd=fwd,
+        back=back,
+        num_units=num_units,
+        unit_out_shape=unit_out_shape,
+        lor_weights=lor_weights,
+        tofbin=None,
+        tof_args=tof_args,
+        perm=None,
+    )
+
+
+def _listmode_shard_layout(projector: ListmodePETProjector) -> dict:
+    """LOR arguments, kernels and event layout of a listmode projector split
+    along its (internally ordered) events"""
+    use_idx = projector._lor_endpoints is not None
+    lor_args = [np.asarray(a) for a in projector._get_lor_args()]
+
+    if projector.tof:
+        if use_idx:
+            fwd = backend.joseph3d_fwd_tof_lm_idx
+            back = backend.joseph3d_back_tof_lm_idx
+        else:
+            fwd, back = backend.joseph3d_fwd_tof_lm, backend.joseph3d_back_tof_lm
+    else:
+        if use_idx:
+            fwd, back = backend.joseph3d_fwd_idx, backend.joseph3d_back_idx
+        else:
+            fwd, back = backend.joseph3d_fwd, backend.joseph3d_back
+
+    num_units = int(projector.out_shape[0])
+
+    lor_weights = projector._lor_weights
+    if lor_weights is not None:
+        lor_weights = np.asarray(lor_weights, dtype=np.float32).reshape(num_units, 1)
+
+    perm = projector.event_permutation
+
+    return dict(
+        lor_args=list(zip(lor_args, [False, True, True] if use_idx else [True, True])),
+        geom_args=(),
+        fwd=fwd,
+        back=back,
+        num_units=num_units,
+        unit_out_shape=(),
+        lor_weights=lor_weights,
+        tofbin=projector._tofbin if projector.tof else None,
+        tof_args=(),
+        perm=None if perm is None else np.asarray(perm),
+    )
+
+
+class ShardedProjector(LinearOperator):
+    """PET projector that distributes the LORs over multiple worker processes
+
+    The LORs of a RegularPolygonPETProjector or ListmodePETProjector
+    are split into contiguous shards that are projected by persistent worker
+    processes using the OpenMP lib. Every worker can be pinned to the CPUs of
+    one NUMA node such that its OpenMP threads only access local memory.
+    The image, the projections and the back projections of all shards are
+    exchanged via shared memory and the back projections of all shards are
+    summed into the output image.
+
+    The LOR arguments of the projector in its current mode (LOR coordinates,
+    LOR endpoint indices or the plane 0 LORs and plane coordinates of the
+    axial symmetry) are split along their first axis such that no shard
+    stores more LOR data than the projector itself. They are copied together
+    with the LOR weights and TOF settings when the sharded projector is created.
+    The wall time of every shard in the last projection is available in
+    :attr:`shard_timings`.
+
+    The worker processes are stopped by :meth:`close` (or when
+    used as context manager).
+    """
+
+    def __init__(
+        self,
+        projector: RegularPolygonPETProjector | ListmodePETProjector,
+        num_shards: None | int = None,
+        pin_to_numa_nodes: bool = True,
+        num_threads_per_shard: None | int = None,
+    ) -> None:
+        """init method
+
+        Parameters
+        ----------
+        projector : RegularPolygonPETProjector | ListmodePETProjector
+            projector defining the LORs, LOR weights, image geometry and
+            TOF settings
+        num_shards : None | int, optional
+            number of worker processes, by default None
+            means one worker per NUMA node
+        pin_to_numa_nodes : bool, optional
+            pin shard i to the CPUs of NUMA node i % num_numa_nodes,
+            by default True (ignored if CPU affinity is not supported)
+        num_threads_per_shard : None | int, optional
+            number of OpenMP threads of every worker, by default None
+            means the number of CPUs of the NUMA node the worker is pinned to
+        """
+        super().__init__()
+
+        self._projector = projector
+        self._xp = projector.xp
+        self._in_shape = tuple(projector.in_shape)
+        self._out_shape = tuple(projector.out_shape)
+
+        numa_nodes = get_numa_node_cpus()
+
+        if num_shards is None:
+            num_shards = len(numa_nodes)
+
+        if isinstance(projector, RegularPolygonPETProjector):
+            layout = _polygon_shard_layout(projector)
+        elif isinstance(projector, ListmodePETProjector):
+            layout = _listmode_shard_layout(projector)
+        else:
+            raise TypeError(
+                "projector must be a RegularPolygonPETProjector or ListmodePETProjector"
+            )
+
+        if projector.tof:
+            tof_parameters = projector.tof_parameters
+            tof_args = (
+                tof_parameters.tofbin_width,
+                np.asarray([tof_parameters.sigma_tof], dtype=np.float32),
+                np.asarray([tof_parameters.tofcenter_offset], dtype=np.float32),
+                tof_parameters.num_sigmas,
+            ) + layout["tof_args"]
+        else:
+            tof_args = ()
+
+        num_units = layout["num_units"]
+        unit_size = int(np.prod(layout["unit_out_shape"], dtype=np.int64))
+
+        self._num_shards = num_shards
+        self._shard_timings = tuple(0.0 for _ in range(num_shards))
+        self._shms = []
+        self._workers = []
+        self._conns = []
+
+        # (inverse) permutation of the internally sorted listmode events
+        self._perm = layout["perm"]
+        self._inv_perm = None if self._perm is None else np.argsort(self._perm)
+
+        # staging buffers of the LOR arguments of the projector that every
+        # worker copies its shard from, freed once all workers are initialized
+        staging = []
+        lor_args = []
+        for arr, split in layout["lor_args"]:
+            shm, tmp = self._create_shared_array(arr.shape, arr.dtype)
+            tmp[...] = arr
+            staging.append(shm)
+            lor_args.append((shm.name, arr.shape, arr.dtype.str, split))
+            del tmp
+
+        tofbin_shm = None
+        if layout["tofbin"] is not None:
+            tofbin_shm, tmp = self._create_shared_array((num_units,), np.int16)
+            tmp[...] = np.asarray(layout["tofbin"], dtype=np.int16).ravel()
+            staging.append(tofbin_shm)
+            del tmp
+
+        # weights of all LORs (applied to all TOF bins of a sinogram LOR)
+        weights_shm = None
+        lor_weights_shape = None
+        if layout["lor_weights"] is not None:
+            lor_weights_shape = layout["lor_weights"].shape
+            weights_shm, tmp = self._create_shared_array(
+                lor_weights_shape, np.float32
+            )
+            tmp[...] = layout["lor_weights"]
+            staging.append(weights_shm)
+            del tmp
+
+        img_shm, self._img = self._create_shared_array(self._in_shape, np.float32)
+        sino_shm, self._sino = self._create_shared_array(
+            (num_units * unit_size,), np.float32
+        )
+        back_shm, self._back_imgs = self._create_shared_array(
+            (num_shards,) + self._in_shape, np.float32
+        )
+
+        ctx = multiprocessing.get_context("spawn")
+        ic = backend.calc_chunks(num_units, num_shards)
+
+        for i in range(num_shards):
+            cpus = numa_nodes[i % len(numa_nodes)] if pin_to_numa_nodes else None
+
+            if num_threads_per_shard is not None:
+                num_threads = num_threads_per_shard
+            elif cpus is not None:
+                num_threads = len(cpus)
+            else:
+                num_threads = None
+
+            spec = dict(
+                shard=i,
+                num_shards=num_shards,
+                cpus=cpus,
+                num_threads=num_threads,
+                unit_range=(ic[i], ic[i + 1]),
+                num_units=num_units,
+                unit_out_shape=layout["unit_out_shape"],
+                lor_args=lor_args,
+                geom_args=layout["geom_args"],
+                fwd=layout["fwd"],
+                back=layout["back"],
+                tofbin=None if tofbin_shm is None else tofbin_shm.name,
+                lor_weights=None if weights_shm is None else weights_shm.name,
+                lor_weights_shape=lor_weights_shape,
+                img=img_shm.name,
+                img_shape=self._in_shape,
+                sino=sino_shm.name,
+                back_imgs=back_shm.name,
+                img_origin=np.asarray(projector.img_origin, dtype=np.float32),
+                voxsize=np.asarray(projector.voxel_size, dtype=np.float32),
+                tof_args=tof_args,
+            )
+
+            parent_conn, child_conn = ctx.Pipe()
+            worker = ctx.Process(
+                target=_shard_worker, args=(child_conn, spec), daemon=True
+            )
+            worker.start()
+            child_conn.close()
+
+            self._workers.append(worker)
+            self._conns.append(parent_conn)
+
+        # wait until all workers copied their LORs before freeing the staging buffers
+        try:
+            self._wait_for_workers()
+        except RuntimeError:
+            self.close()
+            raise
+
+        for shm in staging:
+            self._free_shared_array(shm)
+
+    def _create_shared_array(
+        self, shape: tuple[int, ...], dtype
+    ) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        )
+        self._shms.append(shm)
+        return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def _free_shared_array(self, shm: shared_memory.SharedMemory) -> None:
+        self._shms.remove(shm)
+        shm.close()
+        shm.unlink()
+
+    def __enter__(self) -> ShardedProjector:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+    @property
+    def in_shape(self) -> tuple[int, ...]:
+        return self._in_shape
+
+    @property
+    def out_shape(self) -> tuple[int, ...]:
+        return self._out_shape
+
+    @property
+    def xp(self):
+        """array module"""
+        return self._xp
+
+    @property
+    def projector(self) -> RegularPolygonPETProjector | ListmodePETProjector:
+        """the sharded projector"""
+        return self._projector
+
+    @property
+    def num_shards(self) -> int:
+        """number of shards (worker processes)"""
+        return self._num_shards
+
+    @property
+    def shard_timings(self) -> tuple[float, ...]:
+        """wall time (s) of every shard in the last forward or back projection"""
+        return self._shard_timings
+
+    def close(self) -> None:
+        """stop all worker processes and free the shared memory"""
+        for conn in getattr(self, "_conns", []):
+            try:
+                conn.send("close")
+                conn.close()
+            except (OSError, ValueError):
+                pass
+        for worker in getattr(self, "_workers", []):
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+
+        self._conns = []
+        self._workers = []
+
+        # views of the shared memory have to be deleted before it is closed
+        self._img = None
+        self._sino = None
+        self._back_imgs = None
+
+        for shm in getattr(self, "_shms", []):
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def _run(self, cmd: str) -> None:
+        """send a command to all workers and wait for them to finish"""
+        if len(self._workers) == 0:
+            raise RuntimeError("the worker processes of the projector are closed")
+
+        for conn in self._conns:
+            conn.send(cmd)
+
+        self._wait_for_workers()
+
+    def _wait_for_workers(self) -> None:
+        """collect the timings (or errors) of all workers"""
+        timings = []
+        errors = []
+        for conn in self._conns:
+            t, err = conn.recv()
+            timings.append(t)
+            if err is not None:
+                errors.append(err)
+
+        if len(errors) > 0:
+            raise RuntimeError("projection of shard failed:\n" + errors[0])
+
+        self._shard_timings = tuple(timings)
+
+    def _apply(self, x: Array) -> Array:
+        return self._apply_out(x, None)
+
+    def _adjoint(self, y: Array) -> Array:
+        return self._adjoint_out(y, None)
+
+    def _apply_out(self, x: Array, out: None | Array) -> Array:
+        xp = array_api_compat.get_namespace(x)
+
+        np.copyto(self._img, np.asarray(x), casting="unsafe")
+        self._run("fwd")
+
+        img_fwd = backend._get_output_buffer(out, self._out_shape)
+        if self._perm is None:
+            img_fwd[...] = self._sino.reshape(self._out_shape)
+        else:
+            img_fwd[...] = self._sino[self._inv_perm]
+
+        return backend._finalize_output(xp, img_fwd, out, x)
+
+    def _adjoint_out(
+        self, y: Array, out: None | Array, accumulate: bool = False
+    ) -> Array:
+        xp = array_api_compat.get_namespace(y)
+
+        if self._perm is None:
+            np.copyto(self._sino, np.asarray(y).reshape(-1), casting="unsafe")
+        else:
+            np.copyto(self._sino, np.asarray(y)[self._perm], casting="unsafe")
+        self._run("back")
+
+        # reduce the back projections of all shards
+        back_img = backend._get_output_buffer(
+            out, self._in_shape, fill_zero=not accumulate
+        )
+        for shard_back_img in self._back_imgs:
+            back_img += shard_back_img
+
+        return backend._finalize_output(xp, back_img, out, y, accumulate)
@@ -0,0 +1,286 @@
+"""pytorch autograd functions and custom ops for parallelproj linear operators
+
+The functions in this module apply a :class:`.LinearOperator` (e.g. a PET
+projector) to a (mini batch of) torch tensors such that the result can be
+used with pytorch's autograd engine. The gradient of :math:`Ax` is
+calculated using the adjoint :math:`A^H` and vice versa.
+
+Using torch >= 2.4, the projections are registered as the custom op
+``torch.ops.parallelproj.linear_operator`` (via :mod:`torch.library`) such
+that :func:`torch.compile` treats them as opaque ops without graph breaks.
+
+Inputs can have arbitrary leading (batch / channel) dimensions in front of
+the input shape of the operator, e.g. ``(batch_size, 1) + operator.in_shape``.
+Projectors supporting batches (:class:`.RegularPolygonPETProjector` and
+:class:`.ListmodePETProjector`) project all samples in a single call, all
+other operators are applied sample by sample writing directly into the
+preallocated output tensor.
+
+Examples
+--------
+>>> import parallelproj.torch as pptorch  # doctest: +SKIP
+>>> x = torch.rand((4, 1) + proj.in_shape, requires_grad=True)  # doctest: +SKIP
+>>> y = pptorch.apply(proj, x)  # shape (4, 1) + proj.out_shape  # doctest: +SKIP
+>>> y.sum().backward()  # doctest: +SKIP
+"""
+from __future__ import annotations
+
+import itertools
+import weakref
+
+import torch
+
+from .operators import LinearOperator
+
+# operators registered for the use in the custom ops (that only accept
+# tensors and scalars as arguments) and their integer handles
+_operators: weakref.WeakValueDictionary[int, LinearOperator] = (
+    weakref.WeakValueDictionary()
+)
+_handles: weakref.WeakKeyDictionary[LinearOperator, int] = (
+    weakref.WeakKeyDictionary()
+)
+_handle_counter = itertools.count()
+
+_custom_op_available = hasattr(torch.library, "custom_op")
+
+
+def register_operator(operator: LinearOperator) -> int:
+    """register an operator such that it can be used in the custom op
+
+    Operators are registered automatically by :func:`apply` and :func:`adjoint`.
+    The registry only keeps weak references to the operators.
+
+    Parameters
+    ----------
+    operator : LinearOperator
+
+    Returns
+    -------
+    int
+        handle of the operator passed to ``torch.ops.parallelproj.linear_operator``
+    """
+    handle = _handles.get(operator)
+
+    if handle is None:
+        handle = next(_handle_counter)
+        _handles[operator] = handle
+        _operators[handle] = operator
+
+    return handle
+
+
+def _shapes(
+    operator: LinearOperator, adjoint: bool
+) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """input and output shape of the operator (or its adjoint)"""
+    if adjoint:
+        return tuple(operator.out_shape), tuple(operator.in_shape)
+    return tuple(operator.in_shape), tuple(operator.out_shape)
+
+
+def _batch_shape(
+    operator: LinearOperator, x: torch.Tensor, adjoint: bool
+) -> tuple[int, ...]:
+    """leading (batch) dimensions of x in front of the input shape"""
+    in_shape, _ = _shapes(operator, adjoint)
+    n = x.ndim - len(in_shape)
+
+    if n < 0 or tuple(x.shape[n:]) != in_shape:
+        raise ValueError(
+            f"input of shape {tuple(x.shape)} does not end with the "
+            f"{'output' if adjoint else 'input'} shape {in_shape} of the operator"
+        )
+
+    return tuple(x.shape[:n])
+
+
+def _apply_operator(
+    operator: LinearOperator,
+    x: torch.Tensor,
+    adjoint: bool = False,
+    out: None | torch.Tensor = None,
+) -> torch.Tensor:
+    """apply an operator (or its adjoint) to all samples of a batch"""
+    in_shape, out_shape = _shapes(operator, adjoint)
+    batch_shape = _batch_shape(operator, x, adjoint)
+
+    if out is None:
+        out = torch.empty(batch_shape + out_shape, dtype=x.dtype, device=x.device)
+    elif tuple(out.shape) != batch_shape + out_shape:
+        raise ValueError(f"out must have shape {batch_shape + out_shape}")
+
+    func = operator.adjoint if adjoint else operator.apply
+
+    x_b = x.detach().reshape((-1,) + in_shape)
+    # a view of out (if possible) such that the result is written directly
+    out_b = out.view((-1,) + out_shape) if out.is_contiguous() else None
+
+    if out_b is None:
+        out[...] = _apply_operator(operator, x, adjoint=adjoint)
+    elif operator._supports_batches and x_b.shape[0] > 1:
+        func(x_b, out=out_b)
+    else:
+        for i in range(x_b.shape[0]):
+            func(x_b[i, ...], out=out_b[i, ...])
+
+    return out
+
+
+class LinearOperatorFunction(torch.autograd.Function):
+    """autograd function :math:`y = Ax` of a linear operator
+
+    Use ``LinearOperatorFunction.apply(x, operator)`` or :func:`apply`.
+    """
+
+    @staticmethod
+    def forward(ctx, x: torch.Tensor, operator: LinearOperator) -> torch.Tensor:
+        ctx.set_materialize_grads(False)
+        ctx.operator = operator
+        return _apply_operator(operator, x)
+
+    @staticmethod
+    def backward(ctx, grad_output: torch.Tensor) -> tuple[torch.Tensor, None]:
+        if grad_output is None:
+            return None, None
+        return AdjointLinearOperatorFunction.apply(grad_output, ctx.operator), None
+
+
+class AdjointLinearOperatorFunction(torch.autograd.Function):
+    """autograd function :math:`x = A^H y` of the adjoint of a linear operator
+
+    Use ``AdjointLinearOperatorFunction.apply(y, operator)`` or :func:`adjoint`.
+    """
+
+    @staticmethod
+    def forward(ctx, y: torch.Tensor, operator: LinearOperator) -> torch.Tensor:
+        ctx.set_materialize_grads(False)
+        ctx.operator = operator
+        return _apply_operator(operator, y, adjoint=True)
+
+    @staticmethod
+    def backward(ctx, grad_output: torch.Tensor) -> tuple[torch.Tensor, None]:
+        if grad_output is None:
+            return None, None
+        return LinearOperatorFunction.apply(grad_output, ctx.operator), None
+
+
+if _custom_op_available:
+
+    @torch.library.custom_op("parallelproj::linear_operator", mutates_args=())
+    def _linear_operator_op(
+        x: torch.Tensor, handle: int, adjoint: bool
+    ) -> torch.Tensor:
+        operator = _operators.get(handle)
+        if operator is None:
+            raise RuntimeError(f"no operator registered for handle {handle}")
+        return _apply_operator(operator, x, adjoint=adjoint)
+
+    @_linear_operator_op.register_fake
+    def _(x: torch.Tensor, handle: int, adjoint: bool) -> torch.Tensor:
+        operator = _operators[handle]
+        _, out_shape = _shapes(operator, adjoint)
+        return x.new_empty(_batch_shape(operator, x, adjoint) + out_shape)
+
+    def _setup_context(ctx, inputs, output) -> None:
+        _, ctx.handle, ctx.adjoint = inputs
+
+    def _backward(ctx, grad_output: torch.Tensor) -> tuple[torch.Tensor, None, None]:
+        grad_input = _linear_operator_op(grad_output, ctx.handle, not ctx.adjoint)
+        return grad_input, None, None
+
+    _linear_operator_op.register_autograd(_backward, setup_context=_setup_context)
+
+
+def _apply(
+    operator: LinearOperator,
+    x: torch.Tensor,
+    adjoint: bool,
+    out: None | torch.Tensor,
+) -> torch.Tensor:
+    if out is not None:
+        if torch.is_grad_enabled() and x.requires_grad:
+            raise RuntimeError("out is not supported for inputs requiring gradients")
+        return _apply_operator(operator, x, adjoint=adjoint, out=out)
+
+    if _custom_op_available:
+        return torch.ops.parallelproj.linear_operator(
+            x, register_operator(operator), adjoint
+        )
+
+    if adjoint:
+        return AdjointLinearOperatorFunction.apply(x, operator)
+    return LinearOperatorFunction.apply(x, operator)
+
+
+def apply(
+    operator: LinearOperator, x: torch.Tensor, out: None | torch.Tensor = None
+) -> torch.Tensor:
+    """differentiable :math:`y = Ax` of a (batch of) torch tensors
+
+    Parameters
+    ----------
+    operator : LinearOperator
+        e.g. a PET projector using torch arrays
+    x : torch.Tensor
+        tensor of shape batch_shape + operator.in_shape
+    out : None | torch.Tensor, optional
+        preallocated tensor of shape batch_shape + operator.out_shape the result
+        is written into, by default None
+        only supported for inputs that do not require gradients
+
+    Returns
+    -------
+    torch.Tensor
+        of shape batch_shape + operator.out_shape
+    """
+    return _apply(operator, x, False, out)
+
+
+def adjoint(
+    operator: LinearOperator, y: torch.Tensor, out: None | torch.Tensor = None
+) -> torch.Tensor:
+    """differentiable :math:`x = A^H y` of a (batch of) torch tensors
+
+    Parameters
+    ----------
+    operator : LinearOperator
+        e.g. a PET projector using torch arrays
+    y : torch.Tensor
+        tensor of shape batch_shape + operator.out_shape
+    out : None | torch.Tensor, optional
+        preallocated tensor of shape batch_shape + operator.in_shape the result
+        is written into, by default None
+        only supported for inputs that do not require gradients
+
+    Returns
+    -------
+    torch.Tensor
+        of shape batch_shape + operator.in_shape
+    """
+    return _apply(operator, y, True, out)
+
+
+class LinearOperatorLayer(torch.nn.Module):
+    """torch module applying a linear operator (or its adjoint) to its input"""
+
+    def __init__(self, operator: LinearOperator, adjoint: bool = False) -> None:
+        """
+        Parameters
+        ----------
+        operator : LinearOperator
+            e.g. a PET projector using torch arrays
+        adjoint : bool, optional
+            apply the adjoint of the operator, by default False
+        """
+        super().__init__()
+        self._operator = operator
+        self._adjoint = adjoint
+
+    @property
+    def operator(self) -> LinearOperator:
+        """the linear operator"""
+        return self._operator
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return _apply(self._operator, x, self._adjoint, None)
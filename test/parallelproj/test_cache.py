@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import pytest
+import parallelproj
+import array_api_compat.numpy as np
+
+from types import ModuleType
+
+from config import pytestmark
+
+
+def setup_projector(xp: ModuleType, dev: str, **kwargs):
+    scanner = parallelproj.RegularPolygonPETScannerGeometry(
+        xp,
+        dev,
+        radius=65.0,
+        num_sides=12,
+        num_lor_endpoints_per_side=5,
+        lor_spacing=4.0,
+        ring_positions=xp.linspace(-4, 4, 2),
+        symmetry_axis=2,
+    )
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(scanner, radial_trim=10)
+
+    return parallelproj.RegularPolygonPETProjector(
+        lor_desc, kwargs.pop("img_shape", (10, 10, 2)), (2.0, 2.0, 4.0), **kwargs
+    )
+
+
+def test_fingerprint(xp: ModuleType, dev: str) -> None:
+    proj = setup_projector(xp, dev)
+    key = parallelproj.projector_fingerprint(proj)
+
+    # the fingerprint is stable for identical configurations and independent
+    # of the array module
+    assert parallelproj.projector_fingerprint(setup_projector(xp, dev)) == key
+    assert parallelproj.projector_fingerprint(setup_projector(np, "cpu")) == key
+
+    # and changes with the image grid, views, TOF and extra inputs
+    assert parallelproj.projector_fingerprint(
+        setup_projector(xp, dev, img_shape=(12, 10, 2))
+    ) != key
+    assert parallelproj.projector_fingerprint(
+        setup_projector(xp, dev, views=xp.arange(0, 30, 2, device=dev))
+    ) != key
+    assert parallelproj.projector_fingerprint(proj, 1) != key
+
+    att = xp.ones(proj.out_shape, dtype=xp.float32, device=dev)
+    assert parallelproj.projector_fingerprint(
+        proj, att
+    ) != parallelproj.projector_fingerprint(proj, 0.5 * att)
+
+    # the LOR weights change the projections (and the sensitivity image)
+    proj.lor_weights = xp.zeros(proj.out_shape, dtype=xp.float32, device=dev)
+    key_weights = parallelproj.projector_fingerprint(proj)
+    assert key_weights != key
+    proj.lor_weights = 0.5 * att
+    assert parallelproj.projector_fingerprint(proj) != key_weights
+    proj.lor_weights = None
+    assert parallelproj.projector_fingerprint(proj) == key
+
+    proj.tof_parameters = parallelproj.TOFParameters(num_tofbins=11)
+    assert parallelproj.projector_fingerprint(proj) != key
+
+    with pytest.raises(TypeError):
+        parallelproj.fingerprint(object())
+
+
+def test_sensitivity_image_cache(
+    xp: ModuleType, dev: str, tmp_path, monkeypatch
+) -> None:
+    proj = setup_projector(xp, dev)
+    key = parallelproj.projector_fingerprint(proj)
+    cache = parallelproj.SensitivityImageCache(tmp_path)
+
+    num_calls = 0
+
+    def compute():
+        nonlocal num_calls
+        num_calls += 1
+        return proj.adjoint(xp.ones(proj.out_shape, dtype=xp.float32, device=dev))
+
+    sens1 = cache.get_or_compute(key, compute, xp, dev, metadata={"subset": 0})
+    sens2 = cache.get_or_compute(key, compute, xp, dev)
+
+    # the second call is a cache hit that skips the back projection
+    assert num_calls == 1
+    assert cache.hits == 1 and cache.misses == 1
+    assert bool(xp.all(sens1 == sens2))
+    assert cache.metadata(key)["subset"] == 0
+    assert key in cache and len(cache) == 1
+
+    # a new cache on the same directory sees the stored images
+    cache = parallelproj.SensitivityImageCache(tmp_path, max_bytes=3 * 800 + 500)
+    assert cache.get(key).shape == proj.in_shape
+
+    # least recently used images are evicted if the cache is full
+    for i in range(3):
+        cache.put(f"img{i}", np.full(proj.in_shape, float(i), dtype=np.float32))
+        cache.get(key)
+
+    assert len(cache) == 3
+    assert key in cache
+    assert "img0" not in cache
+    assert cache.size_bytes <= cache.max_bytes
+
+    # images removed by a concurrent eviction between the lookup and the
+    # loading are cache misses
+    misses = cache.misses
+    load = np.load
+
+    def load_evicted(path, *args, **kwargs):
+        cache.remove(key)
+        return load(path, *args, **kwargs)
+
+    monkeypatch.setattr(parallelproj.cache.np, "load", load_evicted)
+    assert cache.get(key) is None
+    assert cache.misses == misses + 1
+    monkeypatch.undo()
+
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import pytest
+import parallelproj
+import array_api_compat
+import array_api_compat.numpy as np
+
+from types import ModuleType
+
+from config import pytestmark
+
+
+def allclose(x, y, atol: float = 1e-6, rtol: float = 1e-5) -> bool:
+    """check if two arrays are close to each other, given absolute and relative error
+    inspired by numpy.allclose
+    """
+    xp = array_api_compat.array_namespace(x)
+    return bool(xp.all(xp.less_equal(xp.abs(x - y), atol + rtol * xp.abs(y))))
+
+
+def setup_geometry(xp: ModuleType, dev: str, nLORs: int = 2000, seed: int = 1):
+    np.random.seed(seed)
+    img_shape = (16, 15, 17)
+    voxsize = xp.asarray([0.7, 0.8, 0.6], dtype=xp.float32, device=dev)
+    img_origin = (
+        -xp.asarray(img_shape, dtype=xp.float32, device=dev) / 2 + 0.5
+    ) * voxsize
+
+    R = 0.8 * xp.max((xp.asarray(img_shape, dtype=xp.float32, device=dev) * voxsize))
+    xstart = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+    xend = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+
+    return xstart, xend, img_shape, img_origin, voxsize
+
+
+def test_context(xp: ModuleType, dev: str) -> None:
+    xstart, xend, img_shape, img_origin, voxsize = setup_geometry(xp, dev)
+    img = xp.asarray(np.random.rand(*img_shape), dtype=xp.float32, device=dev)
+    img2 = 2 * img
+
+    tof_params = parallelproj.TOFParameters(
+        num_tofbins=11, tofbin_width=0.8, sigma_tof=1.5
+    )
+    sigma_tof = xp.asarray([tof_params.sigma_tof], dtype=xp.float32, device=dev)
+    tofcenter_offset = xp.asarray(
+        [tof_params.tofcenter_offset], dtype=xp.float32, device=dev
+    )
+    tofbin = xp.asarray(
+        np.random.randint(-5, 6, size=xstart.shape[0]), dtype=xp.int16, device=dev
+    )
+
+    geom = (xstart, xend, img_shape, img_origin, voxsize)
+    tof_args = (tof_params.tofbin_width, sigma_tof, tofcenter_offset, 3.0)
+
+    # non-TOF, TOF sinogram and TOF listmode sessions and the corresponding
+    # projection functions
+    cases = [
+        (
+            dict(),
+            lambda x: parallelproj.joseph3d_fwd(xstart, xend, x, img_origin, voxsize),
+            lambda y: parallelproj.joseph3d_back(*geom, y),
+        ),
+        (
+            dict(tof_parameters=tof_params),
+            lambda x: parallelproj.joseph3d_fwd_tof_sino(
+                xstart, xend, x, img_origin, voxsize, *tof_args, 11
+            ),
+            lambda y: parallelproj.joseph3d_back_tof_sino(*geom, y, *tof_args, 11),
+        ),
+        (
+            dict(tof_parameters=tof_params, tofbin=tofbin),
+            lambda x: parallelproj.joseph3d_fwd_tof_lm(
+                xstart, xend, x, img_origin, voxsize, *tof_args, tofbin
+            ),
+            lambda y: parallelproj.joseph3d_back_tof_lm(*geom, y, *tof_args, tofbin),
+        ),
+    ]
+
+    for kwargs, fwd, back in cases:
+        with parallelproj.ProjectionContext(*geom, **kwargs) as ctx:
+            with pytest.raises(ValueError):
+                ctx.fwd()
+
+            ctx.set_image(img)
+            if xp.__name__ == "array_api_compat.numpy":
+                # C-contiguous float32 images are not copied
+                assert np.shares_memory(ctx._img, img)
+            img_fwd = ctx.fwd()
+            assert img_fwd.shape == ctx.out_shape
+            assert allclose(img_fwd, fwd(img))
+            # the resident image is reused
+            assert allclose(ctx.fwd(), img_fwd)
+            # replace the resident image
+            assert allclose(ctx.fwd(img2), fwd(img2))
+            assert allclose(ctx.fwd(), fwd(img2))
+
+            out = xp.zeros(ctx.out_shape, dtype=xp.float32, device=dev)
+            assert ctx.fwd(out=out) is out
+            assert allclose(out, fwd(img2))
+
+            img_back = ctx.back(img_fwd)
+            assert allclose(img_back, back(img_fwd))
+
+            out = xp.zeros(img_shape, dtype=xp.float32, device=dev)
+            ctx.back(img_fwd, out=out)
+            ctx.back(img_fwd, out=out, accumulate=True)
+            assert allclose(out, 2 * img_back)
+
+    # float64 images give float32 projections (computed in float32)
+    with parallelproj.ProjectionContext(*geom) as ctx:
+        with pytest.warns(UserWarning, match="float64"):
+            assert ctx.fwd(xp.astype(img, xp.float64)).dtype == xp.float32
+
+
+def test_context_num_threads(xp: ModuleType, dev: str, monkeypatch) -> None:
+    xstart, xend, img_shape, img_origin, voxsize = setup_geometry(xp, dev)
+    img = xp.asarray(np.random.rand(*img_shape), dtype=xp.float32, device=dev)
+
+    num_threads = parallelproj.get_num_threads()
+
+    # record the number of threads set during the projections
+    set_threads = []
+    set_num_threads = parallelproj.backend.set_num_threads
+
+    def record_set_num_threads(n: int) -> None:
+        set_threads.append(n)
+        set_num_threads(n)
+
+    monkeypatch.setattr(parallelproj.backend, "set_num_threads", record_set_num_threads)
+
+    with parallelproj.ProjectionContext(
+        xstart, xend, img_shape, img_origin, voxsize, num_threads=2
+    ) as ctx:
+        # the number of threads is only changed during the projections
+        assert parallelproj.get_num_threads() == num_threads
+        img_fwd = ctx.fwd(img)
+        assert parallelproj.get_num_threads() == num_threads
+        ctx.back(img_fwd)
+        assert parallelproj.get_num_threads() == num_threads
+
+    if parallelproj.num_visible_cuda_devices == 0:
+        assert set_threads == [2, num_threads, 2, num_threads]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import pytest
 import parallelproj
 import array_api_compat.numpy as np
 
@@ -175,3 +176,303 @@ def test_adjointness(
     isclose = abs(ip_a - ip_b) <= atol + rtol * abs(ip_b)
 
     assert isclose
+
+
+# --------------------------------------------------------------------------
+
+
+def test_fwd_back_ratio(
+    xp: ModuleType,
+    dev: str,
+    nLORs: int = 100000,
+    seed: int = 1,
+    rtol: float = 1e-4,
+    atol: float = 1e-5,
+) -> None:
+    """test whether the fused forward / ratio / back projection equals
+    separate forward and back projections"""
+
+    np.random.seed(seed)
+    n0, n1, n2 = (16, 15, 17)
+
+    img_dim = (n0, n1, n2)
+    voxel_size = xp.asarray([0.7, 0.8, 0.6], dtype=xp.float32, device=dev)
+    img_origin = (
+        -xp.asarray(img_dim, dtype=xp.float32, device=dev) / 2 + 0.5
+    ) * voxel_size
+
+    img = xp.asarray(np.random.rand(n0, n1, n2), dtype=xp.float32, device=dev)
+
+    R = 0.8 * xp.max((xp.asarray(img_dim, dtype=xp.float32, device=dev) * voxel_size))
+
+    xstart = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+    xend = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+
+    # data with some zeros that are skipped in the fused projection
+    data = xp.asarray(
+        np.random.poisson(2.0, size=nLORs), dtype=xp.float32, device=dev
+    )
+
+    for contamination in [
+        0.5,
+        xp.asarray(np.random.rand(nLORs) + 0.1, dtype=xp.float32, device=dev),
+    ]:
+        img_fwd = parallelproj.joseph3d_fwd(xstart, xend, img, img_origin, voxel_size)
+        ref = parallelproj.joseph3d_back(
+            xstart,
+            xend,
+            img.shape,
+            img_origin,
+            voxel_size,
+            data / (img_fwd + contamination),
+        )
+
+        res = parallelproj.joseph3d_fwd_back_ratio(
+            xstart, xend, img, img_origin, voxel_size, data, contamination
+        )
+
+        assert res.shape == img.shape
+        assert bool(xp.all(xp.abs(res - ref) <= atol + rtol * xp.abs(ref)))
+
+
+# --------------------------------------------------------------------------
+
+
+# thin images have fewer planes than threads along some directions
+@pytest.mark.parametrize("img_dim", [(16, 15, 17), (2, 15, 3)])
+def test_back_accumulation(
+    xp: ModuleType,
+    dev: str,
+    img_dim: tuple[int, int, int],
+    nLORs: int = 100000,
+    seed: int = 1,
+    rtol: float = 1e-4,
+    atol: float = 1e-5,
+) -> None:
+    """test whether all accumulation strategies of the back projection give
+    the same result"""
+
+    np.random.seed(seed)
+    voxel_size = xp.asarray([0.7, 0.8, 0.6], dtype=xp.float32, device=dev)
+    img_origin = (
+        -xp.asarray(img_dim, dtype=xp.float32, device=dev) / 2 + 0.5
+    ) * voxel_size
+
+    R = 0.8 * xp.max((xp.asarray(img_dim, dtype=xp.float32, device=dev) * voxel_size))
+
+    xstart = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+    xend = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+
+    sino = xp.asarray(np.random.rand(nLORs), dtype=xp.float32, device=dev)
+
+    ref = parallelproj.joseph3d_back(
+        xstart, xend, img_dim, img_origin, voxel_size, sino, accumulation="atomic"
+    )
+
+    for accumulation in ["private", "slab"]:
+        res = parallelproj.joseph3d_back(
+            xstart,
+            xend,
+            img_dim,
+            img_origin,
+            voxel_size,
+            sino,
+            accumulation=accumulation,
+        )
+        assert bool(xp.all(xp.abs(res - ref) <= atol + rtol * xp.abs(ref)))
+
+    with pytest.raises(ValueError):
+        parallelproj.joseph3d_back(
+            xstart, xend, img_dim, img_origin, voxel_size, sino, accumulation="lock"
+        )
+
+
+# --------------------------------------------------------------------------
+
+
+def test_out(
+    xp: ModuleType,
+    dev: str,
+    nLORs: int = 10000,
+    seed: int = 1,
+) -> None:
+    """test whether the projections can be written into preallocated output arrays"""
+
+    np.random.seed(seed)
+    n0, n1, n2 = (16, 15, 17)
+
+    img_dim = (n0, n1, n2)
+    voxel_size = xp.asarray([0.7, 0.8, 0.6], dtype=xp.float32, device=dev)
+    img_origin = (
+        -xp.asarray(img_dim, dtype=xp.float32, device=dev) / 2 + 0.5
+    ) * voxel_size
+
+    img = xp.asarray(np.random.rand(n0, n1, n2), dtype=xp.float32, device=dev)
+
+    R = 0.8 * xp.max((xp.asarray(img_dim, dtype=xp.float32, device=dev) * voxel_size))
+
+    xstart = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+    xend = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+
+    img_fwd = parallelproj.joseph3d_fwd(xstart, xend, img, img_origin, voxel_size)
+    back_img = parallelproj.joseph3d_back(
+        xstart, xend, img_dim, img_origin, voxel_size, img_fwd
+    )
+
+    # float32 and float64 output arrays, filled with non-zero values
+    for dtype in [xp.float32, xp.float64]:
+        out_fwd = xp.full(img_fwd.shape, 3.0, dtype=dtype, device=dev)
+        res = parallelproj.joseph3d_fwd(
+            xstart, xend, img, img_origin, voxel_size, out=out_fwd
+        )
+        assert res is out_fwd
+        assert bool(xp.all(out_fwd == xp.astype(img_fwd, dtype)))
+
+        out_back = xp.full(img_dim, 3.0, dtype=dtype, device=dev)
+        res = parallelproj.joseph3d_back(
+            xstart, xend, img_dim, img_origin, voxel_size, img_fwd, out=out_back
+        )
+        assert res is out_back
+        # the order of the atomic adds of the threads is not deterministic
+        assert bool(
+            xp.all(
+                xp.abs(out_back - xp.astype(back_img, dtype))
+                <= 1e-5 + 1e-5 * xp.abs(xp.astype(back_img, dtype))
+            )
+        )
+
+        # accumulate the back projection into the content of out
+        res = parallelproj.joseph3d_back(
+            xstart,
+            xend,
+            img_dim,
+            img_origin,
+            voxel_size,
+            img_fwd,
+            out=out_back,
+            accumulate=True,
+        )
+        assert res is out_back
+        assert bool(
+            xp.all(
+                xp.abs(out_back - 2 * xp.astype(back_img, dtype))
+                <= 1e-5 + 1e-5 * xp.abs(xp.astype(back_img, dtype))
+            )
+        )
+
+
+# --------------------------------------------------------------------------
+
+
+def test_lor_weights(
+    xp: ModuleType,
+    dev: str,
+    nLORs: int = 10000,
+    seed: int = 1,
+    rtol: float = 1e-4,
+    atol: float = 1e-5,
+) -> None:
+    """test whether LOR weights applied in the kernels match an explicit
+    multiplication"""
+
+    np.random.seed(seed)
+    img_dim = (16, 15, 17)
+    voxel_size = xp.asarray([0.7, 0.8, 0.6], dtype=xp.float32, device=dev)
+    img_origin = (
+        -xp.asarray(img_dim, dtype=xp.float32, device=dev) / 2 + 0.5
+    ) * voxel_size
+
+    img = xp.asarray(np.random.rand(*img_dim), dtype=xp.float32, device=dev)
+
+    R = 0.8 * xp.max((xp.asarray(img_dim, dtype=xp.float32, device=dev) * voxel_size))
+
+    xstart = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+    xend = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+
+    weights = xp.asarray(np.random.rand(nLORs), dtype=xp.float32, device=dev)
+    weights[::5] = 0
+    sino = xp.asarray(np.random.rand(nLORs), dtype=xp.float32, device=dev)
+
+    img_fwd = parallelproj.joseph3d_fwd(
+        xstart, xend, img, img_origin, voxel_size, lor_weights=weights
+    )
+    ref = weights * parallelproj.joseph3d_fwd(xstart, xend, img, img_origin, voxel_size)
+    assert bool(xp.all(xp.abs(img_fwd - ref) <= atol + rtol * xp.abs(ref)))
+
+    ref = parallelproj.joseph3d_back(
+        xstart, xend, img_dim, img_origin, voxel_size, weights * sino
+    )
+    for accumulation in ["atomic", "slab"]:
+        back_img = parallelproj.joseph3d_back(
+            xstart,
+            xend,
+            img_dim,
+            img_origin,
+            voxel_size,
+            sino,
+            accumulation=accumulation,
+            lor_weights=weights,
+        )
+        assert bool(xp.all(xp.abs(back_img - ref) <= atol + rtol * xp.abs(ref)))
+
+    with pytest.raises(ValueError):
+        parallelproj.joseph3d_fwd(
+            xstart, xend, img, img_origin, voxel_size, lor_weights=weights[1:]
+        )
+
+
+def test_lor_index_range(xp: ModuleType, dev: str) -> None:
+    """test that LOR endpoint indices outside of lor_endpoints are rejected"""
+
+    img_dim = (4, 5, 6)
+    voxel_size = xp.asarray([1.0, 1.0, 1.0], dtype=xp.float32, device=dev)
+    img_origin = xp.asarray([-1.5, -2.0, -2.5], dtype=xp.float32, device=dev)
+    img = xp.ones(img_dim, dtype=xp.float32, device=dev)
+
+    lor_endpoints = xp.asarray(
+        [[-10.0, 0.0, 0.0], [10.0, 0.0, 0.0], [0.0, -10.0, 0.0], [0.0, 10.0, 0.0]],
+        dtype=xp.float32,
+        device=dev,
+    )
+    start_index = xp.asarray([0, 2], dtype=xp.int32, device=dev)
+    end_index = xp.asarray([1, 3], dtype=xp.int32, device=dev)
+
+    img_fwd = parallelproj.joseph3d_fwd_idx(
+        lor_endpoints, start_index, end_index, img, img_origin, voxel_size
+    )
+    assert bool(xp.all(xp.abs(img_fwd - xp.asarray([4.0, 5.0], device=dev)) < 1e-5))
+
+    for bad_end_index in [
+        xp.asarray([1, 4], dtype=xp.int32, device=dev),
+        xp.asarray([-1, 3], dtype=xp.int32, device=dev),
+    ]:
+        with pytest.raises(ValueError):
+            parallelproj.joseph3d_fwd_idx(
+                lor_endpoints, start_index, bad_end_index, img, img_origin, voxel_size
+            )
+        with pytest.raises(ValueError):
+            parallelproj.joseph3d_back_idx(
+                lor_endpoints,
+                start_index,
+                bad_end_index,
+                img_dim,
+                img_origin,
+                voxel_size,
+                img_fwd,
+            )
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import pytest
 import parallelproj
+import parallelproj.operators as opf
 import array_api_compat
 import array_api_compat.numpy as np
 
@@ -47,6 +48,58 @@ def test_matrix(xp: ModuleType, dev: str):
     assert allclose(scale_fac * (A @ x), op(x))
 
 
+def test_norm(xp: ModuleType, dev: str):
+    np.random.seed(0)
+
+    A = np.random.randn(7, 5)
+    ref = np.linalg.norm(A, 2)
+
+    op = parallelproj.MatrixOperator(xp.asarray(A, device=dev))
+
+    for block_size in [1, 3]:
+        n = op.norm(xp, dev, num_iter=200, rtol=1e-8, block_size=block_size)
+        assert np.isclose(n, ref, rtol=1e-5)
+
+    # the norm is only memoized on request
+    assert not hasattr(op, "_norm_cache")
+    kwargs = dict(num_iter=200, rtol=1e-8, use_cache=True)
+    assert np.isclose(op.norm(xp, dev, **kwargs), ref, rtol=1e-5)
+    assert len(op._norm_cache) == 1
+    assert np.isclose(op.norm(xp, dev, **kwargs), ref, rtol=1e-5)
+    assert len(op._norm_cache) == 1
+    op.scale = 2.0
+    assert np.isclose(op.norm(xp, dev, **kwargs), 2 * ref, rtol=1e-5)
+
+    # the cache (and the arrays it keeps alive) is bounded
+    for scale in range(3, 3 + opf._NORM_CACHE_SIZE):
+        op.scale = float(scale)
+        op.norm(xp, dev, **kwargs)
+    assert len(op._norm_cache) == opf._NORM_CACHE_SIZE
+
+    # in place changes are detected without the cache
+    v = xp.asarray([3.0, -1.0], device=dev)
+    op = parallelproj.ElementwiseMultiplicationOperator(v)
+    assert np.isclose(op.norm(xp, dev), 3.0, rtol=1e-3)
+    v[...] = 10.0
+    assert np.isclose(op.norm(xp, dev), 10.0, rtol=1e-3)
+
+    # TOF parameters are compared by value
+    p1 = parallelproj.TOFParameters(num_tofbins=5)
+    p2 = parallelproj.TOFParameters(num_tofbins=7)
+    refs = []
+    assert opf._fingerprint(p1, refs) == opf._fingerprint(
+        parallelproj.TOFParameters(num_tofbins=5), refs
+    )
+    assert opf._fingerprint(p1, refs) != opf._fingerprint(p2, refs)
+    assert len(refs) == 0
+
+    # the default dtype follows the dtype of the operator
+    op = parallelproj.MatrixOperator(xp.asarray(A, device=dev, dtype=xp.float32))
+    assert op._native_dtype(xp) == xp.float32
+    assert op._native_dtype(xp, iscomplex=True) == xp.complex64
+    assert np.isclose(op.norm(xp, dev, num_iter=200, rtol=1e-6), ref, rtol=1e-4)
+
+
 def test_complex_matrix(xp: ModuleType, dev: str):
     np.random.seed(0)
 
@@ -94,6 +147,29 @@ def test_tofnontofelemenwise(xp: ModuleType, dev: str):
     assert allclose(v * x[..., 0], op(x)[..., 0])
     assert allclose(v * x[..., 1], op(x)[..., 1])
 
+    y = op(x)
+    x_back = op.adjoint(y)
+
+    # write into preallocated arrays, accumulate and multiply in place
+    out = xp.zeros(x.shape, dtype=xp.float32, device=dev)
+    assert op.apply(x, out=out) is out
+    assert allclose(out, y)
+    assert op.adjoint(y, out=out, accumulate=True) is out
+    assert allclose(out, y + x_back)
+
+    x_copy = 1 * x
+    assert op.apply(x_copy, out=x_copy) is x_copy
+    assert allclose(x_copy, y)
+
+    # the product has the dtype of x (also for values of higher precision)
+    op64 = parallelproj.TOFNonTOFElementwiseMultiplicationOperator(
+        x.shape, xp.astype(v, xp.float64)
+    )
+    y64 = op64(x)
+    assert y64.dtype == xp.float32
+    assert allclose(y64, y)
+    assert op64.adjoint(y).dtype == xp.float32
+
 
 def test_elemenwise_complex(xp: ModuleType, dev: str):
     np.random.seed(0)
@@ -140,6 +216,44 @@ def test_gaussian(xp: ModuleType, dev: str):
     assert op.adjointness_test(xp, dev)
 
 
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"mode": "constant", "cval": 0.5}, {"mode": "mirror", "truncate": 3.0}],
+)
+@pytest.mark.parametrize("fft_min_sigma", [None, 2.0])
+def test_gaussian_scipy(
+    xp: ModuleType, dev: str, kwargs: dict, fft_min_sigma: None | float
+):
+    import scipy.ndimage as ndimage
+
+    np.random.seed(0)
+    in_shape = (40, 33, 7)
+    sigma = (2.3, 0.0, 1.2)
+
+    x_np = np.random.rand(*in_shape).astype(np.float32)
+    x = xp.asarray(x_np, device=dev)
+    x_ref = xp.asarray(ndimage.gaussian_filter(x_np, sigma, **kwargs), device=dev)
+
+    op = parallelproj.GaussianFilterOperator(
+        in_shape, sigma=sigma, num_threads=3, fft_min_sigma=fft_min_sigma, **kwargs
+    )
+
+    assert allclose(op(x), x_ref, atol=1e-6)
+
+    # in place filtering using a preallocated output array
+    out = xp.zeros(in_shape, dtype=xp.float32, device=dev)
+    assert op.apply(x, out=out) is out
+    assert allclose(out, x_ref, atol=1e-6)
+    op.adjoint(out, out=out)
+    assert allclose(out, op(x_ref), atol=1e-6)
+
+    # stacks of arrays are filtered along their trailing axes
+    x_stack = xp.stack([xp.zeros_like(x), x])
+    x_stack_fwd = op(x_stack)
+    assert x_stack_fwd.shape == (2,) + in_shape
+    assert allclose(x_stack_fwd[1, ...], x_ref, atol=1e-6)
+
+
 def test_composite(xp: ModuleType, dev: str):
     np.random.seed(0)
 
@@ -162,6 +276,29 @@ def test_composite(xp: ModuleType, dev: str):
     assert [x.out_shape for x in op] == [op1.out_shape, op2.out_shape]
 
 
+def test_ratio_adjoint(xp: ModuleType, dev: str):
+    np.random.seed(0)
+
+    A = xp.asarray(np.random.rand(4, 3), device=dev)
+    x = xp.asarray(np.random.rand(3), device=dev)
+    v = xp.asarray([3.0, 0.0, -1.0, 2.0], device=dev)
+    d = xp.asarray([1.0, 4.0, 0.0, 2.0], device=dev)
+    s = xp.asarray([0.5, 0.1, 0.3, 0.2], device=dev)
+
+    op1 = parallelproj.ElementwiseMultiplicationOperator(v)
+    op2 = parallelproj.MatrixOperator(A)
+
+    assert allclose(op2.apply_ratio_adjoint(x, d, s), A.T @ (d / (A @ x + s)))
+    assert allclose(op2.apply_ratio_adjoint(x, d), A.T @ (d / (A @ x)))
+
+    op = parallelproj.CompositeLinearOperator([op1, op2])
+    assert allclose(op.apply_ratio_adjoint(x, d, s), op.adjoint(d / (op(x) + s)))
+    assert allclose(op.apply_ratio_adjoint(x, d, 0.5), op.adjoint(d / (op(x) + 0.5)))
+
+    op.scale = -2.0
+    assert allclose(op.apply_ratio_adjoint(x, d, s), op.adjoint(d / (op(x) + s)))
+
+
 def test_vstack(xp: ModuleType, dev: str):
     np.random.seed(0)
     in_shape = (16, 11)
@@ -228,6 +365,140 @@ def test_operator_sequence(xp: ModuleType, dev: str):
     assert A.operators == [A1, A2, A3]
 
 
+def test_parallel_operator_sequence(xp: ModuleType, dev: str):
+    np.random.seed(0)
+
+    scanner = parallelproj.DemoPETScannerGeometry(
+        xp, dev, num_rings=3, num_sides=12, radius=120, symmetry_axis=2
+    )
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(scanner, radial_trim=60)
+
+    img_shape = (20, 20, 5)
+    num_subsets = 5
+    views = xp.arange(lor_desc.num_views, device=dev)
+
+    subset_projs = [
+        parallelproj.RegularPolygonPETProjector(
+            lor_desc, img_shape, (4.0, 4.0, 4.0), views=views[i::num_subsets]
+        )
+        for i in range(num_subsets)
+    ]
+
+    x = xp.asarray(np.random.rand(*img_shape), dtype=xp.float32, device=dev)
+
+    A_seq = parallelproj.LinearOperatorSequence(subset_projs)
+    A_par = parallelproj.LinearOperatorSequence(
+        subset_projs, num_workers=3, threads_per_worker=1
+    )
+    assert A_par.num_workers == 3
+    assert A_par.threads_per_worker == 1
+
+    y = A_seq(x)
+    y_par = A_par(x)
+    for k in range(num_subsets):
+        assert allclose(y_par[k], y[k])
+
+    x_back = A_seq.adjoint(y)
+    assert allclose(A_par.adjoint(y), x_back, atol=1e-4, rtol=1e-4)
+
+    out = xp.ones(img_shape, dtype=xp.float32, device=dev)
+    assert A_par.adjoint(y, out=out, accumulate=True) is out
+    assert allclose(out, x_back + 1, atol=1e-4, rtol=1e-4)
+
+    V_seq = parallelproj.VstackOperator(subset_projs)
+    V_par = parallelproj.VstackOperator(subset_projs, num_workers=3)
+
+    z = V_seq(x)
+    assert allclose(V_par(x), z)
+    assert allclose(V_par.adjoint(z), V_seq.adjoint(z), atol=1e-4, rtol=1e-4)
+
+    # the pools are shared by all operators
+    assert opf._thread_pool(3, 1) is opf._thread_pool(3, 1)
+
+    # the least recently used pool is shut down if too many pools are used
+    pool = opf._thread_pool(2, 1)
+    for n in range(opf._THREAD_POOL_CACHE_SIZE):
+        opf._thread_pool(4 + n, 1)
+    assert len(opf._thread_pools) == opf._THREAD_POOL_CACHE_SIZE
+    with pytest.raises(RuntimeError):
+        pool.submit(int)
+    assert opf._thread_pool(2, 1) is not pool
+
+    # the LOR caches of a projector appearing several times are filled
+    # before the workers evaluate it
+    P = parallelproj.RegularPolygonPETProjector(
+        lor_desc, img_shape, (4.0, 4.0, 4.0), views=views[::num_subsets]
+    )
+    assert P.xstart is None
+    M = parallelproj.ElementwiseMultiplicationOperator(
+        xp.full(P.out_shape, 2.0, dtype=xp.float32, device=dev)
+    )
+    A_shared = parallelproj.LinearOperatorSequence(
+        [P, P, parallelproj.CompositeLinearOperator((M, P))],
+        num_workers=3,
+        threads_per_worker=1,
+    )
+    y_shared = A_shared(x)
+    assert P.xstart is not None
+    assert allclose(y_shared[0], subset_projs[0](x))
+    assert allclose(y_shared[1], y_shared[0])
+    assert allclose(y_shared[2], 2 * y_shared[0])
+
+
+def test_out(xp: ModuleType, dev: str):
+    np.random.seed(0)
+
+    A1 = parallelproj.MatrixOperator(xp.asarray(np.random.randn(4, 3), device=dev))
+    A2 = parallelproj.MatrixOperator(xp.asarray(np.random.randn(5, 3), device=dev))
+    v = xp.asarray(np.random.rand(4), device=dev)
+
+    x = xp.asarray(np.random.rand(3), device=dev)
+    y1 = xp.asarray(np.random.rand(4), device=dev)
+    y2 = xp.asarray(np.random.rand(5), device=dev)
+
+    for scale in [1.0, -2.0]:
+        A1.scale = scale
+
+        out = xp.zeros(A1.out_shape, dtype=x.dtype, device=dev)
+        assert A1.apply(x, out=out) is out
+        assert allclose(out, A1(x))
+
+        out = xp.ones(A1.in_shape, dtype=x.dtype, device=dev)
+        assert A1.adjoint(y1, out=out) is out
+        assert allclose(out, A1.adjoint(y1))
+        A1.adjoint(y1, out=out, accumulate=True)
+        assert allclose(out, 2 * A1.adjoint(y1))
+
+    with pytest.raises(ValueError):
+        A1.adjoint(y1, accumulate=True)
+
+    # composite operator
+    op = parallelproj.CompositeLinearOperator(
+        [parallelproj.ElementwiseMultiplicationOperator(v), A1]
+    )
+    out = xp.zeros(op.out_shape, dtype=x.dtype, device=dev)
+    assert op.apply(x, out=out) is out
+    assert allclose(out, op(x))
+    out = xp.ones(op.in_shape, dtype=x.dtype, device=dev)
+    op.adjoint(y1, out=out, accumulate=True)
+    assert allclose(out, 1 + op.adjoint(y1))
+
+    # vstack operator
+    V = parallelproj.VstackOperator((A1, A2))
+    y = xp.concat((y1, y2))
+    out = xp.ones(V.in_shape, dtype=x.dtype, device=dev)
+    assert V.adjoint(y, out=out) is out
+    assert allclose(out, A1.adjoint(y1) + A2.adjoint(y2))
+
+    # operator sequence
+    S = parallelproj.LinearOperatorSequence([A1, A2])
+    out = xp.ones(S.in_shape, dtype=x.dtype, device=dev)
+    assert S.adjoint([y1, y2], out=out) is out
+    assert allclose(out, A1.adjoint(y1) + A2.adjoint(y2))
+    S.adjoint([y1, y2], out=out, accumulate=True)
+    assert allclose(out, 2 * (A1.adjoint(y1) + A2.adjoint(y2)))
+
+
 def test_finite_difference(xp: ModuleType, dev: str):
     # 1D tests
     A = parallelproj.FiniteForwardDifference((3,))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import parallelproj
+import array_api_compat.numpy as np
 import matplotlib.pyplot as plt
 
 from types import ModuleType
@@ -37,6 +38,50 @@ def test_pet_lors(xp: ModuleType, dev: str) -> None:
 
         lor_coords = lor_desc.get_lor_coordinates()
 
+        # plane 0 LORs and axial plane coordinates
+        xs2d, xe2d = lor_desc.get_plane_lor_coordinates()
+        zs, ze = lor_desc.get_plane_axial_coordinates()
+        assert zs.shape == (lor_desc.num_planes,)
+        xs_plane0 = xp.take(
+            lor_coords[0], xp.asarray([0], device=dev), axis=lor_desc.plane_axis_num
+        )
+        assert bool(
+            xp.all(
+                xs_plane0[..., :2]
+                == xp.expand_dims(xs2d, axis=lor_desc.plane_axis_num)[..., :2]
+            )
+        )
+
+        # the LOR endpoint indices must point to the LOR coordinates
+        for views in [None, xp.asarray([1, 4], device=dev)]:
+            xs, xe = lor_desc.get_lor_coordinates(views=views)
+            start_index, end_index = lor_desc.get_lor_indices(views=views)
+
+            assert start_index.dtype == xp.int32
+            assert start_index.shape == xs.shape[:-1]
+            assert end_index.shape == xe.shape[:-1]
+
+            assert bool(
+                xp.all(
+                    xp.take(
+                        scanner.all_lor_endpoints,
+                        xp.reshape(start_index, (-1,)),
+                        axis=0,
+                    )
+                    == xp.reshape(xs, (-1, 3))
+                )
+            )
+            assert bool(
+                xp.all(
+                    xp.take(
+                        scanner.all_lor_endpoints,
+                        xp.reshape(end_index, (-1,)),
+                        axis=0,
+                    )
+                    == xp.reshape(xe, (-1, 3))
+                )
+            )
+
         fig = plt.figure()
         ax = fig.add_subplot(111, projection="3d")
         scanner.show_lor_endpoints(ax, show_linear_index=False)
@@ -142,3 +187,75 @@ def test_pet_lors(xp: ModuleType, dev: str) -> None:
             sl = num_dim * [slice(None)]
             sl[lor_desc2.view_axis_num] = slice(0, None, num_subsets)
             assert subset_slices[0] == tuple(sl)
+
+
+def test_histogram_events(xp: ModuleType, dev: str) -> None:
+    np.random.seed(0)
+
+    num_rings = 3
+    scanner = parallelproj.RegularPolygonPETScannerGeometry(
+        xp,
+        dev,
+        radius=65.0,
+        num_sides=12,
+        num_lor_endpoints_per_side=5,
+        lor_spacing=4.0,
+        ring_positions=xp.linspace(-10, 10, num_rings),
+        symmetry_axis=2,
+    )
+    n = scanner.num_lor_endpoints_per_ring
+    num_tofbins = 5
+
+    for sinogram_order in parallelproj.SinogramSpatialAxisOrder:
+        lor_desc = parallelproj.RegularPolygonPETLORDescriptor(
+            scanner,
+            radial_trim=5,
+            max_ring_difference=1,
+            sinogram_order=sinogram_order,
+        )
+
+        sino = np.random.poisson(0.5, lor_desc.spatial_sinogram_shape + (num_tofbins,))
+
+        # convert the sinogram to events given by detector pairs
+        start_index, end_index = lor_desc.get_lor_indices()
+        start_index = np.asarray(start_index)[..., None] * np.ones(
+            num_tofbins, dtype=np.int64
+        )
+        end_index = np.asarray(end_index)[..., None] * np.ones(
+            num_tofbins, dtype=np.int64
+        )
+        tofbin = np.broadcast_to(np.arange(num_tofbins) - num_tofbins // 2, sino.shape)
+
+        ev_start = np.repeat(start_index.ravel(), sino.ravel())
+        ev_end = np.repeat(end_index.ravel(), sino.ravel())
+        ev_tofbin = np.repeat(tofbin.ravel(), sino.ravel())
+
+        # swap the endpoints (and invert the TOF bin) of every second event
+        swap = np.arange(ev_start.size) % 2 == 1
+        ev_start, ev_end = np.where(swap, ev_end, ev_start), np.where(
+            swap, ev_start, ev_end
+        )
+        ev_tofbin = np.where(swap, -ev_tofbin, ev_tofbin)
+
+        # add events not contained in the sinogram (ring difference 2)
+        ev_start = np.concatenate([ev_start, np.arange(10)])
+        ev_end = np.concatenate([ev_end, 2 * n + n // 2 + np.arange(10)])
+        ev_tofbin = np.concatenate([ev_tofbin, np.zeros(10, dtype=np.int64)])
+
+        args = [
+            xp.asarray(a, dtype=xp.int32, device=dev)
+            for a in [ev_start // n, ev_start % n, ev_end // n, ev_end % n]
+        ]
+
+        tof_hist = lor_desc.histogram_events(
+            *args,
+            tofbin=xp.asarray(ev_tofbin, dtype=xp.int16, device=dev),
+            num_tofbins=num_tofbins,
+            chunk_size=1000,
+        )
+        assert tof_hist.shape == sino.shape
+        assert np.all(np.asarray(tof_hist) == sino)
+
+        nontof_hist = lor_desc.histogram_events(*args)
+        assert nontof_hist.shape == lor_desc.spatial_sinogram_shape
+        assert np.all(np.asarray(nontof_hist) == sino.sum(axis=-1))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import parallelproj
+import array_api_compat
 import array_api_compat.numpy as np
 from array_api_compat import to_device
 import pytest
@@ -12,6 +13,12 @@ from config import pytestmark
 from copy import copy
 
 
+def allclose(x, y, atol: float = 1e-5, rtol: float = 1e-4) -> bool:
+    """check if two arrays are close to each other, given absolute and relative error"""
+    xp = array_api_compat.array_namespace(x)
+    return bool(xp.all(xp.less_equal(xp.abs(x - y), atol + rtol * xp.abs(y))))
+
+
 def test_polygon_projector(xp: ModuleType, dev: str) -> None:
     num_rings = 3
     symmetry_axis = 2
@@ -55,6 +62,70 @@ def test_polygon_projector(xp: ModuleType, dev: str) -> None:
     y = xp.ones(x_fwd.shape, dtype=xp.float32, device=dev)
     y_back = proj.adjoint(y)
 
+    # fused forward / ratio / back projection
+    y_ratio_back = proj.apply_ratio_adjoint(x, y, 0.1)
+    y_ratio_back_ref = proj.adjoint(y / (x_fwd + 0.1))
+    assert bool(
+        xp.all(
+            xp.abs(y_ratio_back - y_ratio_back_ref)
+            <= 1e-5 + 1e-4 * xp.abs(y_ratio_back_ref)
+        )
+    )
+
+    # projector passing LOR endpoint indices to the projection kernels
+    proj_idx = parallelproj.RegularPolygonPETProjector(
+        lor_desc, img_shape, voxel_size, use_lor_endpoint_indices=True
+    )
+    assert proj_idx.use_lor_endpoint_indices
+    assert proj_idx.out_shape == proj.out_shape
+    assert bool(xp.all(xp.abs(proj_idx(x) - x_fwd) <= 1e-5 + 1e-5 * xp.abs(x_fwd)))
+    assert bool(
+        xp.all(xp.abs(proj_idx.adjoint(y) - y_back) <= 1e-5 + 1e-5 * xp.abs(y_back))
+    )
+
+    # projector using the axial symmetry of the LORs
+    with pytest.raises(ValueError):
+        parallelproj.RegularPolygonPETProjector(
+            lor_desc,
+            img_shape,
+            voxel_size,
+            use_lor_endpoint_indices=True,
+            use_axial_symmetry=True,
+        )
+
+    for order in parallelproj.SinogramSpatialAxisOrder:
+        lor_desc_sym = parallelproj.RegularPolygonPETLORDescriptor(
+            scanner,
+            radial_trim=radial_trim,
+            max_ring_difference=max_ring_difference,
+            sinogram_order=order,
+        )
+        proj_ref = parallelproj.RegularPolygonPETProjector(
+            lor_desc_sym, img_shape, voxel_size
+        )
+        proj_sym = parallelproj.RegularPolygonPETProjector(
+            lor_desc_sym, img_shape, voxel_size, use_axial_symmetry=True
+        )
+        assert proj_sym.use_axial_symmetry
+        x_fwd_ref = proj_ref(x)
+        assert bool(
+            xp.all(
+                xp.abs(proj_sym(x) - x_fwd_ref) <= 1e-5 + 1e-5 * xp.abs(x_fwd_ref)
+            )
+        )
+        y_ref = xp.ones(x_fwd_ref.shape, dtype=xp.float32, device=dev)
+        y_back_ref = proj_ref.adjoint(y_ref)
+        assert bool(
+            xp.all(
+                xp.abs(proj_sym.adjoint(y_ref) - y_back_ref)
+                <= 1e-5 + 1e-5 * xp.abs(y_back_ref)
+            )
+        )
+
+    proj_sym = parallelproj.RegularPolygonPETProjector(
+        lor_desc, img_shape, voxel_size, use_axial_symmetry=True
+    )
+
     # test conversion to LM
     # LM converter run over views and TOF bins which determines the output order
     # of the events
@@ -103,6 +174,30 @@ def test_polygon_projector(xp: ModuleType, dev: str) -> None:
     y_tof = xp.ones(x_fwd_tof.shape, dtype=xp.float32, device=dev)
     y_back_tof = proj.adjoint(y_tof)
 
+    proj_idx.tof_parameters = tof_params
+    assert proj_idx.out_shape == proj.out_shape
+    assert bool(
+        xp.all(xp.abs(proj_idx(x) - x_fwd_tof) <= 1e-5 + 1e-5 * xp.abs(x_fwd_tof))
+    )
+    assert bool(
+        xp.all(
+            xp.abs(proj_idx.adjoint(y_tof) - y_back_tof)
+            <= 1e-5 + 1e-5 * xp.abs(y_back_tof)
+        )
+    )
+
+    proj_sym.tof_parameters = tof_params
+    assert proj_sym.out_shape == proj.out_shape
+    assert bool(
+        xp.all(xp.abs(proj_sym(x) - x_fwd_tof) <= 1e-5 + 1e-5 * xp.abs(x_fwd_tof))
+    )
+    assert bool(
+        xp.all(
+            xp.abs(proj_sym.adjoint(y_tof) - y_back_tof)
+            <= 1e-5 + 1e-5 * xp.abs(y_back_tof)
+        )
+    )
+
     # test conversion to LM
     # LM converter run over views and TOF bins which determines the output order
     # of the events
@@ -412,3 +507,215 @@ def test_minimal_reg_polygon_projector(xp, dev) -> None:
             assert proj5.xend is not None
 
             assert bool(xp.all(proj5.views == subset_views))
+
+
+def test_convert_sinogram_to_listmode(xp: ModuleType, dev: str) -> None:
+    np.random.seed(0)
+
+    scanner = parallelproj.DemoPETScannerGeometry(
+        xp, dev, num_rings=2, num_sides=12, radius=120, symmetry_axis=2
+    )
+    img_shape = (20, 20, 3)
+    voxel_size = (4.0, 4.0, 4.0)
+
+    for sinogram_order in parallelproj.SinogramSpatialAxisOrder:
+        lor_desc = parallelproj.RegularPolygonPETLORDescriptor(
+            scanner, radial_trim=60, sinogram_order=sinogram_order
+        )
+        proj = parallelproj.RegularPolygonPETProjector(
+            lor_desc,
+            img_shape,
+            voxel_size,
+            views=xp.arange(1, lor_desc.num_views, 3, device=dev),
+        )
+
+        for tof in [False, True]:
+            if tof:
+                proj.tof_parameters = parallelproj.TOFParameters(
+                    num_tofbins=5, tofbin_width=20.0, sigma_tof=15.0
+                )
+            else:
+                proj.tof_parameters = None
+
+            sino = xp.asarray(
+                np.random.poisson(0.3, proj.out_shape), dtype=xp.int16, device=dev
+            )
+
+            for shuffle in [False, True]:
+                xstart, xend, tofbins = proj.convert_sinogram_to_listmode(
+                    sino, shuffle=shuffle, seed=1
+                )
+                assert xstart.shape == (int(xp.sum(sino)), 3)
+
+                # back projection of the events must match the back projection
+                # of the sinogram
+                lm_proj = parallelproj.ListmodePETProjector(
+                    xstart, xend, img_shape, voxel_size
+                )
+                if tof:
+                    lm_proj.tof_parameters = proj.tof_parameters
+                    lm_proj.event_tofbins = tofbins
+                    lm_proj.tof = True
+                else:
+                    assert tofbins is None
+
+                lm_back = lm_proj.adjoint(
+                    xp.ones(lm_proj.out_shape, dtype=xp.float32, device=dev)
+                )
+                sino_back = proj.adjoint(xp.astype(sino, xp.float32))
+                assert bool(
+                    xp.all(xp.abs(lm_back - sino_back) <= 1e-4 + 1e-4 * sino_back)
+                )
+
+
+def test_polygon_projector_batch(xp: ModuleType, dev: str) -> None:
+    np.random.seed(0)
+
+    scanner = parallelproj.DemoPETScannerGeometry(
+        xp, dev, num_rings=3, num_sides=12, radius=120, symmetry_axis=2
+    )
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(scanner, radial_trim=60)
+
+    img_shape = (20, 20, 5)
+    voxel_size = (4.0, 4.0, 4.0)
+    nbatch = 3
+
+    imgs = xp.asarray(np.random.rand(nbatch, *img_shape), dtype=xp.float32, device=dev)
+
+    for kwargs in [
+        {},
+        {"use_lor_endpoint_indices": True},
+        {"use_axial_symmetry": True},
+    ]:
+        proj = parallelproj.RegularPolygonPETProjector(
+            lor_desc, img_shape, voxel_size, **kwargs
+        )
+
+        for tof in [False, True]:
+            if tof:
+                proj.tof_parameters = parallelproj.TOFParameters(
+                    num_tofbins=5, tofbin_width=20.0, sigma_tof=15.0
+                )
+            else:
+                proj.tof_parameters = None
+
+            img_fwd = proj(imgs)
+            assert img_fwd.shape == (nbatch,) + proj.out_shape
+
+            ys = xp.asarray(
+                np.random.rand(nbatch, *proj.out_shape), dtype=xp.float32, device=dev
+            )
+            y_back = proj.adjoint(ys)
+            assert y_back.shape == (nbatch,) + img_shape
+
+            for b in range(nbatch):
+                x_fwd = proj(imgs[b, ...])
+                assert bool(
+                    xp.all(xp.abs(img_fwd[b, ...] - x_fwd) <= 1e-5 + 1e-5 * x_fwd)
+                )
+                x_back = proj.adjoint(ys[b, ...])
+                assert bool(
+                    xp.all(xp.abs(y_back[b, ...] - x_back) <= 1e-4 + 1e-5 * x_back)
+                )
+
+
+def test_polygon_projector_lor_weights(xp: ModuleType, dev: str) -> None:
+    np.random.seed(0)
+
+    scanner = parallelproj.DemoPETScannerGeometry(
+        xp, dev, num_rings=3, num_sides=12, radius=120, symmetry_axis=2
+    )
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(scanner, radial_trim=60)
+
+    img_shape = (20, 20, 5)
+    voxel_size = (4.0, 4.0, 4.0)
+
+    img = xp.asarray(np.random.rand(*img_shape), dtype=xp.float32, device=dev)
+    imgs = xp.stack([img, 2 * img])
+
+    for kwargs in [
+        {},
+        {"use_lor_endpoint_indices": True},
+        {"use_axial_symmetry": True},
+    ]:
+        proj = parallelproj.RegularPolygonPETProjector(
+            lor_desc, img_shape, voxel_size, **kwargs
+        )
+
+        for tof in [False, True]:
+            if tof:
+                proj.tof_parameters = parallelproj.TOFParameters(
+                    num_tofbins=5, tofbin_width=20.0, sigma_tof=15.0
+                )
+            else:
+                proj.tof_parameters = None
+
+            proj.lor_weights = None
+            w = xp.asarray(
+                np.random.rand(*proj._lor_weights_shape()),
+                dtype=xp.float32,
+                device=dev,
+            )
+            if tof:
+                mult = parallelproj.TOFNonTOFElementwiseMultiplicationOperator(
+                    proj.out_shape, w
+                )
+            else:
+                mult = parallelproj.ElementwiseMultiplicationOperator(w)
+
+            y = xp.asarray(
+                np.random.rand(*proj.out_shape), dtype=xp.float32, device=dev
+            )
+            x_fwd_ref = mult(proj(img))
+            y_back_ref = proj.adjoint(mult.adjoint(y))
+
+            # the multiplication is fused into the projector
+            op = parallelproj.CompositeLinearOperator((mult, proj))
+            assert len(op._fused_operators()) == 1
+            # the fused operators are only built once
+            assert op._fused_operators() is op._fused_operators()
+            assert allclose(op(img), x_fwd_ref)
+            assert allclose(op.adjoint(y), y_back_ref)
+
+            out = xp.zeros(proj.out_shape, dtype=xp.float32, device=dev)
+            assert op.apply(img, out=out) is out
+            assert allclose(out, x_fwd_ref)
+
+            # the ratio adjoint uses the fused operators
+            assert allclose(
+                op.apply_ratio_adjoint(img, y, 0.1),
+                proj.adjoint(mult.adjoint(y / (x_fwd_ref + 0.1))),
+            )
+
+            # LOR weights set in the projector
+            proj.lor_weights = w
+            assert allclose(proj(img), x_fwd_ref)
+            assert allclose(proj.adjoint(y), y_back_ref)
+            assert allclose(
+                proj.apply_ratio_adjoint(img, y, 0.1),
+                proj.adjoint(y / (proj(img) + 0.1)),
+            )
+
+            img_fwd = proj(imgs)
+            assert allclose(img_fwd[1, ...], 2 * x_fwd_ref)
+
+            # LOR weights of the projector and the fused multiplication combine
+            # (the cached fused operators are rebuilt)
+            op_fwd = op(img)
+            assert allclose(op_fwd, mult(x_fwd_ref))
+
+            # a scaled multiplication is not fused
+            mult.scale = 2.0
+            assert len(op._fused_operators()) == 2
+            assert allclose(op(img), 2 * op_fwd)
+            mult.scale = 1.0
+
+            # the scale of the projector is kept in the fused operator
+            proj.scale = 2.0
+            assert len(op._fused_operators()) == 1
+            assert allclose(op(img), 2 * op_fwd)
+            proj.scale = 1.0
+
+            with pytest.raises(ValueError):
+                proj.lor_weights = xp.ones((3,), dtype=xp.float32, device=dev)
+
@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 import parallelproj
 import array_api_compat
+import array_api_compat.numpy as np
 
 from config import pytestmark
 
@@ -225,6 +226,15 @@ def test_lmprojector(
 
     assert isclose
 
+    # fused forward / ratio / back projection
+    data = xp.asarray(
+        [1.0, 0.0, 2.0, 3.0, 1.0, 0.0, 5.0, 1.0, 2.0, 1.0], device=dev
+    )
+    assert allclose(
+        lm_proj.apply_ratio_adjoint(img, data, 0.5),
+        lm_proj.adjoint(data / (lm_proj(img) + 0.5)),
+    )
+
     # TOF LM tests
     tof_params = parallelproj.TOFParameters()
     with pytest.raises(Exception) as e_info:
@@ -261,6 +271,38 @@ def test_lmprojector(
 
     assert lm_proj.adjointness_test(xp, dev)
 
+    # listmode projector using LOR endpoint indices
+    lor_endpoints = xp.concat((xstart, xend))
+    num_events = xstart.shape[0]
+    lm_proj_idx = parallelproj.ListmodePETProjector(
+        xp.arange(num_events, dtype=xp.int32, device=dev),
+        xp.arange(num_events, 2 * num_events, dtype=xp.int32, device=dev),
+        img_dim,
+        voxel_size,
+        img_origin,
+        lor_endpoints=lor_endpoints,
+    )
+
+    assert lm_proj_idx.num_events == num_events
+    assert lm_proj_idx.out_shape == lm_proj.out_shape
+    assert xp.all(lm_proj_idx.event_start_coordinates == xstart)
+    assert xp.all(lm_proj_idx.event_end_coordinates == xend)
+    assert xp.all(lm_proj_idx.lor_endpoints == lor_endpoints)
+
+    y = xp.linspace(0.5, 1.5, num_events, dtype=xp.float32, device=dev)
+
+    lm_proj.tof = False
+    assert allclose(lm_proj_idx(img), img_fwd)
+    assert allclose(lm_proj_idx.adjoint(y), lm_proj.adjoint(y))
+    lm_proj.tof = True
+
+    lm_proj_idx.tof_parameters = tof_params
+    lm_proj_idx.event_tofbins = lm_proj.event_tofbins
+    lm_proj_idx.tof = True
+
+    assert allclose(lm_proj_idx(img), lm_proj(img))
+    assert allclose(lm_proj_idx.adjoint(y), lm_proj.adjoint(y))
+
     # unset the tof parameters and check if tof gets set to False
     lm_proj.tof_parameters = None
     assert lm_proj.tof == False
@@ -274,3 +316,389 @@ def test_lmprojector(
 
     # test a projector with img_origin = None
     lm_proj2 = parallelproj.ListmodePETProjector(xstart, xend, img_dim, voxel_size)
+
+
+def test_lmprojector_sorted_events(xp, dev) -> None:
+    np.random.seed(0)
+
+    img_dim = (12, 11, 10)
+    voxel_size = (2.0, 2.5, 3.0)
+    img = xp.asarray(np.random.rand(*img_dim), dtype=xp.float32, device=dev)
+
+    num_events = 500
+    phi = 2 * np.pi * np.random.rand(num_events)
+    z = 10 * (2 * np.random.rand(num_events, 2) - 1)
+    xstart = xp.asarray(
+        np.stack([25 * np.cos(phi), 25 * np.sin(phi), z[:, 0]], axis=1),
+        dtype=xp.float32,
+        device=dev,
+    )
+    xend = xp.asarray(
+        np.stack([-25 * np.cos(phi), -25 * np.sin(phi), z[:, 1]], axis=1),
+        dtype=xp.float32,
+        device=dev,
+    )
+    tofbins = xp.asarray(
+        np.random.randint(-5, 6, size=num_events), dtype=xp.int16, device=dev
+    )
+    y = xp.asarray(np.random.rand(num_events), dtype=xp.float32, device=dev)
+
+    # the permutation sorts the events by dominant direction first
+    perm = parallelproj.lor_sort_permutation(xstart, xend)
+    direction = xp.argmax(xp.abs(xend - xstart), axis=1)
+    assert bool(xp.all(xp.take(direction, perm[1:]) >= xp.take(direction, perm[:-1])))
+
+    lm_proj = parallelproj.ListmodePETProjector(xstart, xend, img_dim, voxel_size)
+    lm_proj_sorted = parallelproj.ListmodePETProjector(
+        xstart, xend, img_dim, voxel_size, sort_events=True
+    )
+
+    assert lm_proj.event_permutation is None
+    assert bool(xp.all(lm_proj_sorted.event_permutation == perm))
+    # the public properties still use the original event order
+    assert bool(xp.all(lm_proj_sorted.event_start_coordinates == xstart))
+    assert bool(xp.all(lm_proj_sorted.event_end_coordinates == xend))
+
+    for tof in [False, True]:
+        for p in [lm_proj, lm_proj_sorted]:
+            p.tof_parameters = parallelproj.TOFParameters(
+                num_tofbins=11, tofbin_width=3.0, sigma_tof=4.0
+            )
+            p.event_tofbins = tofbins
+            p.tof = tof
+
+        assert bool(xp.all(lm_proj_sorted.event_tofbins == tofbins))
+
+        assert allclose(lm_proj_sorted(img), lm_proj(img), atol=1e-5)
+        assert allclose(lm_proj_sorted.adjoint(y), lm_proj.adjoint(y), atol=1e-5)
+
+        out = xp.zeros(lm_proj.out_shape, dtype=xp.float32, device=dev)
+        assert lm_proj_sorted.apply(img, out=out) is out
+        assert allclose(out, lm_proj(img), atol=1e-5)
+
+        contam = xp.asarray(np.random.rand(num_events), dtype=xp.float32, device=dev)
+        assert allclose(
+            lm_proj_sorted.apply_ratio_adjoint(img, y, contam),
+            lm_proj.apply_ratio_adjoint(img, y, contam),
+            atol=1e-4,
+        )
+
+    # events given by LOR endpoint indices
+    lm_proj.tof = False
+    lor_endpoints = xp.concat((xstart, xend))
+    start_index = xp.arange(num_events, dtype=xp.int32, device=dev)
+    end_index = start_index + num_events
+
+    lm_proj_idx = parallelproj.ListmodePETProjector(
+        start_index,
+        end_index,
+        img_dim,
+        voxel_size,
+        lor_endpoints=lor_endpoints,
+        sort_events=True,
+    )
+    assert bool(xp.all(lm_proj_idx.event_start_indices == start_index))
+    assert allclose(lm_proj_idx(img), lm_proj(img), atol=1e-5)
+    assert allclose(lm_proj_idx.adjoint(y), lm_proj.adjoint(y), atol=1e-5)
+
+
+def test_compact_lmprojector(xp, dev) -> None:
+    np.random.seed(1)
+
+    img_dim = (12, 11, 10)
+    voxel_size = (2.0, 2.5, 3.0)
+    img = xp.asarray(np.random.rand(*img_dim), dtype=xp.float32, device=dev)
+
+    num_endpoints = 64
+    phi = 2 * np.pi * np.arange(num_endpoints // 2) / (num_endpoints // 2)
+    lor_endpoints = xp.asarray(
+        np.concatenate(
+            [
+                np.stack([25 * np.cos(phi), 25 * np.sin(phi), np.full_like(phi, z)], 1)
+                for z in [-6.0, 6.0]
+            ]
+        ),
+        dtype=xp.float32,
+        device=dev,
+    )
+
+    num_events = 300
+    start_index = np.random.randint(0, num_endpoints, num_events)
+    end_index = (start_index + np.random.randint(8, 24, num_events)) % num_endpoints
+    tofbins = np.random.randint(-5, 6, num_events)
+
+    events = parallelproj.make_listmode_events(
+        start_index, end_index, tofbins, tofbin_dtype="int8"
+    )
+    assert events.dtype.itemsize == 9
+
+    with pytest.raises(ValueError):
+        parallelproj.make_listmode_events(
+            start_index, end_index, 1000 * tofbins, tofbin_dtype="int8"
+        )
+
+    # reference projector using the LOR coordinates of all events
+    xstart = xp.take(
+        lor_endpoints, xp.asarray(start_index, dtype=xp.int64, device=dev), axis=0
+    )
+    xend = xp.take(
+        lor_endpoints, xp.asarray(end_index, dtype=xp.int64, device=dev), axis=0
+    )
+    lm_proj = parallelproj.ListmodePETProjector(xstart, xend, img_dim, voxel_size)
+
+    compact_proj = parallelproj.CompactListmodePETProjector(
+        events, lor_endpoints, img_dim, voxel_size, chunk_size=70
+    )
+    assert compact_proj.out_shape == (num_events,)
+    assert compact_proj.adjointness_test(xp, dev)
+
+    # events with LOR endpoint indices outside of lor_endpoints are rejected
+    bad_end_index = end_index.copy()
+    bad_end_index[-1] = num_endpoints
+    with pytest.raises(ValueError):
+        parallelproj.CompactListmodePETProjector(
+            parallelproj.make_listmode_events(start_index, bad_end_index, tofbins),
+            lor_endpoints,
+            img_dim,
+            voxel_size,
+            chunk_size=70,
+        )
+
+    y = xp.asarray(np.random.rand(num_events), dtype=xp.float32, device=dev)
+    tof_parameters = parallelproj.TOFParameters(
+        num_tofbins=11, tofbin_width=3.0, sigma_tof=4.0
+    )
+
+    for tof in [False, True]:
+        for p in [lm_proj, compact_proj]:
+            p.tof_parameters = tof_parameters
+            p.tof = tof
+        lm_proj.event_tofbins = xp.asarray(tofbins, dtype=xp.int16, device=dev)
+
+        assert allclose(compact_proj(img), lm_proj(img), atol=1e-5)
+        assert allclose(compact_proj.adjoint(y), lm_proj.adjoint(y), atol=1e-5)
+
+        out = xp.ones(compact_proj.in_shape, dtype=xp.float32, device=dev)
+        assert compact_proj.adjoint(y, out=out, accumulate=True) is out
+        assert allclose(out, lm_proj.adjoint(y) + 1, atol=1e-5)
+
+
+def test_memmap_lmprojector(xp, dev, tmp_path) -> None:
+    np.random.seed(2)
+
+    img_dim = (12, 11, 10)
+    voxel_size = (2.0, 2.5, 3.0)
+    img = xp.asarray(np.random.rand(*img_dim), dtype=xp.float32, device=dev)
+
+    phi = 2 * np.pi * np.arange(32) / 32
+    lor_endpoints = xp.asarray(
+        np.concatenate(
+            [
+                np.stack([25 * np.cos(phi), 25 * np.sin(phi), np.full_like(phi, z)], 1)
+                for z in [-6.0, 6.0]
+            ]
+        ),
+        dtype=xp.float32,
+        device=dev,
+    )
+
+    num_events = 250
+    start_index = np.random.randint(0, 64, num_events)
+    end_index = (start_index + np.random.randint(8, 24, num_events)) % 64
+    events = parallelproj.make_listmode_events(
+        start_index, end_index, np.random.randint(-5, 6, num_events)
+    )
+    events.tofile(tmp_path / "events.lm")
+
+    compact_proj = parallelproj.CompactListmodePETProjector(
+        events, lor_endpoints, img_dim, voxel_size
+    )
+
+    tof_parameters = parallelproj.TOFParameters(
+        num_tofbins=11, tofbin_width=3.0, sigma_tof=4.0
+    )
+
+    for read_ahead in [False, True]:
+        mm_proj = parallelproj.MemmapListmodePETProjector(
+            tmp_path / "events.lm",
+            lor_endpoints,
+            img_dim,
+            voxel_size,
+            chunk_size=60,
+            read_ahead=read_ahead,
+        )
+        assert mm_proj.num_events == num_events
+
+        for tof in [False, True]:
+            for p in [compact_proj, mm_proj]:
+                p.tof_parameters = tof_parameters
+                p.tof = tof
+
+            img_fwd = compact_proj(img)
+            assert allclose(mm_proj(img), img_fwd, atol=1e-5)
+
+            # forward projection streamed into a memory mapped file
+            mm_fwd = mm_proj.apply_to_memmap(img, tmp_path / "fwd.bin")
+            assert allclose(xp.asarray(np.asarray(mm_fwd), device=dev), img_fwd, atol=1e-5)
+
+            # back projection of memory mapped data
+            y = np.memmap(
+                tmp_path / "fwd.bin", dtype=np.float32, mode="r", shape=(num_events,)
+            )
+            assert allclose(
+                mm_proj.adjoint(y),
+                compact_proj.adjoint(xp.asarray(np.asarray(y), device=dev)),
+                atol=1e-4,
+            )
+
+
+def test_lmprojector_batch(xp, dev) -> None:
+    np.random.seed(0)
+
+    img_dim = (12, 11, 10)
+    voxel_size = (2.0, 2.5, 3.0)
+    nbatch = 3
+    imgs = xp.asarray(np.random.rand(nbatch, *img_dim), dtype=xp.float32, device=dev)
+
+    num_events = 400
+    phi = 2 * np.pi * np.random.rand(num_events)
+    z = 10 * (2 * np.random.rand(num_events, 2) - 1)
+    xstart = xp.asarray(
+        np.stack([25 * np.cos(phi), 25 * np.sin(phi), z[:, 0]], axis=1),
+        dtype=xp.float32,
+        device=dev,
+    )
+    xend = xp.asarray(
+        np.stack([-25 * np.cos(phi), -25 * np.sin(phi), z[:, 1]], axis=1),
+        dtype=xp.float32,
+        device=dev,
+    )
+    tofbins = xp.asarray(
+        np.random.randint(-5, 6, size=num_events), dtype=xp.int16, device=dev
+    )
+    ys = xp.asarray(np.random.rand(nbatch, num_events), dtype=xp.float32, device=dev)
+
+    lor_endpoints = xp.concat((xstart, xend))
+    start_index = xp.arange(num_events, dtype=xp.int32, device=dev)
+
+    projs = [
+        parallelproj.ListmodePETProjector(xstart, xend, img_dim, voxel_size),
+        parallelproj.ListmodePETProjector(
+            xstart, xend, img_dim, voxel_size, sort_events=True
+        ),
+        parallelproj.ListmodePETProjector(
+            start_index,
+            start_index + num_events,
+            img_dim,
+            voxel_size,
+            lor_endpoints=lor_endpoints,
+        ),
+    ]
+
+    for lm_proj in projs:
+        for tof in [False, True]:
+            lm_proj.tof_parameters = parallelproj.TOFParameters(
+                num_tofbins=11, tofbin_width=3.0, sigma_tof=4.0
+            )
+            lm_proj.event_tofbins = tofbins
+            lm_proj.tof = tof
+
+            # projections of the batch must match the projections of all images
+            img_fwd = lm_proj(imgs)
+            assert img_fwd.shape == (nbatch, num_events)
+            for b in range(nbatch):
+                assert allclose(img_fwd[b, ...], lm_proj(imgs[b, ...]), atol=1e-5)
+
+            y_back = lm_proj.adjoint(ys)
+            assert y_back.shape == (nbatch,) + img_dim
+            for b in range(nbatch):
+                assert allclose(y_back[b, ...], lm_proj.adjoint(ys[b, ...]), atol=1e-5)
+
+            out = xp.zeros((nbatch, num_events), dtype=xp.float32, device=dev)
+            assert lm_proj.apply(imgs, out=out) is out
+            assert allclose(out, img_fwd, atol=1e-5)
+
+            out = xp.ones((nbatch,) + img_dim, dtype=xp.float32, device=dev)
+            lm_proj.adjoint(ys, out=out, accumulate=True)
+            assert allclose(out, y_back + 1, atol=1e-5)
+
+
+def test_lmprojector_lor_weights(xp, dev) -> None:
+    np.random.seed(0)
+
+    img_dim = (12, 11, 10)
+    voxel_size = (2.0, 2.5, 3.0)
+    img = xp.asarray(np.random.rand(*img_dim), dtype=xp.float32, device=dev)
+
+    num_events = 200
+    phi = 2 * np.pi * np.random.rand(num_events)
+    z = 10 * (2 * np.random.rand(num_events, 2) - 1)
+    xstart = xp.asarray(
+        np.stack([25 * np.cos(phi), 25 * np.sin(phi), z[:, 0]], axis=1),
+        dtype=xp.float32,
+        device=dev,
+    )
+    xend = xp.asarray(
+        np.stack([-25 * np.cos(phi), -25 * np.sin(phi), z[:, 1]], axis=1),
+        dtype=xp.float32,
+        device=dev,
+    )
+    tofbins = xp.asarray(
+        np.random.randint(-5, 6, size=num_events), dtype=xp.int16, device=dev
+    )
+    y = xp.asarray(np.random.rand(num_events), dtype=xp.float32, device=dev)
+    w = xp.asarray(np.random.rand(num_events), dtype=xp.float32, device=dev)
+    # zero weights are skipped in the kernels
+    w[::7] = 0
+
+    lor_endpoints = xp.concat((xstart, xend))
+    start_index = xp.arange(num_events, dtype=xp.int32, device=dev)
+
+    projs = [
+        parallelproj.ListmodePETProjector(xstart, xend, img_dim, voxel_size),
+        parallelproj.ListmodePETProjector(
+            xstart, xend, img_dim, voxel_size, sort_events=True
+        ),
+        parallelproj.ListmodePETProjector(
+            start_index,
+            start_index + num_events,
+            img_dim,
+            voxel_size,
+            lor_endpoints=lor_endpoints,
+            sort_events=True,
+        ),
+    ]
+
+    for tof in [False, True]:
+        for proj in projs:
+            proj.tof_parameters = parallelproj.TOFParameters(
+                num_tofbins=11, tofbin_width=3.0, sigma_tof=4.0
+            )
+            proj.event_tofbins = tofbins
+            proj.tof = tof
+            proj.lor_weights = None
+
+            x_fwd_ref = w * proj(img)
+            y_back_ref = proj.adjoint(w * y)
+
+            mult = parallelproj.ElementwiseMultiplicationOperator(w)
+            op = parallelproj.CompositeLinearOperator((mult, proj))
+            assert len(op._fused_operators()) == 1
+            assert allclose(op(img), x_fwd_ref, atol=1e-5)
+            assert allclose(op.adjoint(y), y_back_ref, atol=1e-5)
+            assert allclose(
+                op.apply_ratio_adjoint(img, y, 0.5),
+                proj.adjoint(w * y / (x_fwd_ref + 0.5)),
+                atol=1e-5,
+            )
+
+            proj.lor_weights = w
+            assert bool(xp.all(proj.lor_weights == w))
+            assert allclose(proj(img), x_fwd_ref, atol=1e-5)
+            assert allclose(proj.adjoint(y), y_back_ref, atol=1e-5)
+
+            img_fwd = proj(xp.stack([img, 2 * img]))
+            assert allclose(img_fwd[1, ...], 2 * x_fwd_ref, atol=1e-5)
+
+            with pytest.raises(ValueError):
+                proj.lor_weights = w[:-1]
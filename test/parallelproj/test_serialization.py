@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import parallelproj
+import array_api_compat.numpy as np
+
+from types import ModuleType
+
+from config import pytestmark
+
+
+def test_save_load(xp: ModuleType, dev: str, tmp_path) -> None:
+    scanner = parallelproj.DemoPETScannerGeometry(xp, dev, num_rings=2)
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(
+        scanner,
+        radial_trim=120,
+        sinogram_order=parallelproj.SinogramSpatialAxisOrder.PVR,
+    )
+    proj = parallelproj.RegularPolygonPETProjector(
+        lor_desc, (20, 20, 2), (4.0, 4.0, 4.0), views=xp.arange(0, 100, 3, device=dev)
+    )
+    proj.tof_parameters = parallelproj.TOFParameters(num_tofbins=7)
+
+    img = xp.asarray(np.random.rand(*proj.in_shape), dtype=xp.float32, device=dev)
+    # the first projection caches the LOR endpoints
+    img_fwd = proj(img)
+    # the memoized norm is not saved
+    proj_norm = proj.norm(xp, dev, num_iter=3, use_cache=True)
+
+    parallelproj.save(proj, tmp_path / "proj")
+    proj2 = parallelproj.load(tmp_path / "proj")
+
+    assert type(proj2) is parallelproj.RegularPolygonPETProjector
+    assert proj2.xp is proj.xp
+    assert proj2.tof and proj2.tof_parameters == proj.tof_parameters
+    assert proj2.out_shape == proj.out_shape
+    assert bool(xp.all(proj2.views == proj.views))
+    assert proj2._norm_cache is None
+    assert np.isclose(proj2.norm(xp, dev, num_iter=3, use_cache=True), proj_norm)
+
+    # the scanner is shared by the loaded LOR descriptor and the projector
+    lor_desc2 = proj2.lor_descriptor
+    assert lor_desc2.sinogram_order == parallelproj.SinogramSpatialAxisOrder.PVR
+    assert lor_desc2._scanner is lor_desc2.scanner
+    assert bool(
+        xp.all(lor_desc2.scanner.all_lor_endpoints == scanner.all_lor_endpoints)
+    )
+
+    # the cached endpoints are loaded (memory mapped) instead of recomputed
+    assert proj2._xstart is not None
+    if xp.__name__ == "array_api_compat.numpy":
+        assert isinstance(proj2._xstart, np.memmap)
+        assert not proj2._xstart.flags.writeable
+
+    assert bool(xp.all(xp.abs(proj2(img) - img_fwd) <= 1e-6))
+    y = xp.ones(proj.out_shape, dtype=xp.float32, device=dev)
+    assert bool(xp.all(xp.abs(proj2.adjoint(y) - proj.adjoint(y)) <= 1e-4))
+
+    # scanners and LOR descriptors can be saved on their own and loaded
+    # into a different array module
+    parallelproj.save(lor_desc, tmp_path / "lor_desc")
+    lor_desc3 = parallelproj.load(tmp_path / "lor_desc", xp=np, dev="cpu")
+    assert lor_desc3.xp is np
+    assert lor_desc3.spatial_sinogram_shape == lor_desc.spatial_sinogram_shape
+    assert np.all(
+        np.asarray(lor_desc3.start_in_ring_index)
+        == np.asarray(lor_desc.start_in_ring_index)
+    )
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import parallelproj
+import array_api_compat
+import array_api_compat.numpy as np
+
+from types import ModuleType
+
+from config import pytestmark
+
+
+def allclose(x, y, atol: float = 1e-4, rtol: float = 1e-5) -> bool:
+    """check if two arrays are close to each other, given absolute and relative error
+    inspired by numpy.allclose
+    """
+    xp = array_api_compat.array_namespace(x)
+    return bool(xp.all(xp.less_equal(xp.abs(x - y), atol + rtol * xp.abs(y))))
+
+
+def test_sharded_projector(xp: ModuleType, dev: str) -> None:
+    np.random.seed(0)
+
+    scanner = parallelproj.DemoPETScannerGeometry(
+        xp, dev, num_rings=3, num_sides=12, radius=100.0
+    )
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(
+        scanner, radial_trim=5, max_ring_difference=1
+    )
+    img_shape = (20, 20, 5)
+    proj = parallelproj.RegularPolygonPETProjector(
+        lor_desc, img_shape=img_shape, voxel_size=(4.0, 4.0, 2.6)
+    )
+    proj.tof_parameters = parallelproj.TOFParameters(
+        num_tofbins=7, tofbin_width=20.0, sigma_tof=15.0
+    )
+
+    x = xp.asarray(np.random.rand(*img_shape), dtype=xp.float32, device=dev)
+
+    for tof in [False, True]:
+        proj.tof = tof
+
+        with parallelproj.ShardedProjector(proj, num_shards=2) as sharded_proj:
+            assert sharded_proj.num_shards == 2
+            assert sharded_proj.in_shape == proj.in_shape
+            assert sharded_proj.out_shape == proj.out_shape
+
+            x_fwd = sharded_proj(x)
+            assert allclose(x_fwd, proj(x))
+            assert len(sharded_proj.shard_timings) == 2
+            assert all(t >= 0 for t in sharded_proj.shard_timings)
+
+            assert allclose(sharded_proj.adjoint(x_fwd), proj.adjoint(x_fwd))
+
+            out = xp.zeros(img_shape, dtype=xp.float32, device=dev)
+            sharded_proj.adjoint(x_fwd, out=out)
+            sharded_proj.adjoint(x_fwd, out=out, accumulate=True)
+            assert allclose(out, 2 * proj.adjoint(x_fwd))
+
+    # the LOR arguments of the other projector modes are sharded as well,
+    # the planes are split if they are the first sinogram axis
+    for sinogram_order, kwargs in [
+        (parallelproj.SinogramSpatialAxisOrder.RVP, {}),
+        (parallelproj.SinogramSpatialAxisOrder.RVP, {"use_lor_endpoint_indices": True}),
+        (parallelproj.SinogramSpatialAxisOrder.RVP, {"use_axial_symmetry": True}),
+        (parallelproj.SinogramSpatialAxisOrder.PVR, {"use_axial_symmetry": True}),
+    ]:
+        lor_desc = parallelproj.RegularPolygonPETLORDescriptor(
+            scanner,
+            radial_trim=5,
+            max_ring_difference=1,
+            sinogram_order=sinogram_order,
+        )
+        p = parallelproj.RegularPolygonPETProjector(
+            lor_desc, img_shape=img_shape, voxel_size=(4.0, 4.0, 2.6), **kwargs
+        )
+        p.tof_parameters = proj.tof_parameters
+
+        for tof in [False, True]:
+            p.tof = tof
+
+            # LOR weights of the projector are applied by the shards
+            if tof:
+                p.lor_weights = xp.asarray(
+                    np.random.rand(*p._lor_weights_shape()),
+                    dtype=xp.float32,
+                    device=dev,
+                )
+
+            with parallelproj.ShardedProjector(p, num_shards=2) as sharded_proj:
+                x_fwd = sharded_proj(x)
+                assert allclose(x_fwd, p(x))
+                assert allclose(sharded_proj.adjoint(x_fwd), p.adjoint(x_fwd))
+
+        if kwargs:
+            # the full LOR coordinates are not computed
+            assert p.xstart is None
+
+    # TOF listmode projector
+    xstart, xend = proj._get_lor_endpoints()
+    xstart = xp.reshape(xstart, (-1, 3))
+    xend = xp.reshape(xend, (-1, 3))
+    num_events = xstart.shape[0]
+    tofbins = xp.asarray(
+        np.random.randint(-3, 4, size=num_events), dtype=xp.int16, device=dev
+    )
+
+    lm_proj = parallelproj.ListmodePETProjector(
+        xstart, xend, img_shape, proj.voxel_size, proj.img_origin
+    )
+    lm_proj.tof_parameters = proj.tof_parameters
+    lm_proj.event_tofbins = tofbins
+    lm_proj.tof = True
+
+    with parallelproj.ShardedProjector(lm_proj, num_shards=3) as sharded_proj:
+        x_fwd = sharded_proj(x)
+        assert allclose(x_fwd, lm_proj(x))
+        assert allclose(sharded_proj.adjoint(x_fwd), lm_proj.adjoint(x_fwd))
+        assert len(sharded_proj.shard_timings) == 3
+
+    # sorted listmode projectors using coordinates or LOR endpoint indices
+    idx = xp.asarray(np.random.permutation(num_events)[:100], device=dev)
+    lor_endpoints = xp.concat((xstart, xend))
+
+    lm_projs = [
+        parallelproj.ListmodePETProjector(
+            xp.take(xstart, idx, axis=0),
+            xp.take(xend, idx, axis=0),
+            img_shape,
+            proj.voxel_size,
+            proj.img_origin,
+            sort_events=True,
+        ),
+        parallelproj.ListmodePETProjector(
+            xp.astype(idx, xp.int32),
+            xp.astype(idx, xp.int32) + num_events,
+            img_shape,
+            proj.voxel_size,
+            proj.img_origin,
+            lor_endpoints=lor_endpoints,
+            sort_events=True,
+        ),
+    ]
+
+    for lm_proj in lm_projs:
+        lm_proj.tof_parameters = proj.tof_parameters
+        lm_proj.event_tofbins = xp.take(tofbins, idx)
+        for tof in [False, True]:
+            lm_proj.tof = tof
+            if tof:
+                lm_proj.lor_weights = xp.asarray(
+                    np.random.rand(*lm_proj.out_shape), dtype=xp.float32, device=dev
+                )
+
+            with parallelproj.ShardedProjector(lm_proj, num_shards=3) as sharded_proj:
+                x_fwd = sharded_proj(x)
+                assert allclose(x_fwd, lm_proj(x))
+                assert allclose(sharded_proj.adjoint(x_fwd), lm_proj.adjoint(x_fwd))
+
+
+def test_numa_node_cpus(xp: ModuleType, dev: str) -> None:
+    nodes = parallelproj.get_numa_node_cpus()
+    assert len(nodes) >= 1
+    assert all(len(cpus) >= 1 for cpus in nodes)
@@ -1,3 +1,4 @@
+import pytest
 import parallelproj
 import array_api_compat.numpy as np
 
@@ -229,3 +230,102 @@ def test_adjointness(
         print("")
 
     assert isclose(ip_a, ip_b)
+
+
+def test_dtypes(xp: ModuleType, dev: str, nLORs: int = 1000, seed: int = 1) -> None:
+    """test that the output dtype follows the input dtype and that float16
+    TOF sinograms (converted in chunks) match the float32 projections"""
+
+    np.random.seed(seed)
+    n0, n1, n2 = (16, 15, 17)
+
+    img_dim = (n0, n1, n2)
+    voxel_size = xp.asarray([0.7, 0.8, 0.6], dtype=xp.float32, device=dev)
+    img_origin = (
+        -xp.asarray(img_dim, dtype=xp.float32, device=dev) / 2 + 0.5
+    ) * voxel_size
+
+    img = xp.asarray(np.random.rand(n0, n1, n2), dtype=xp.float32, device=dev)
+
+    R = 0.8 * xp.max((xp.asarray(img_dim, dtype=xp.float32, device=dev) * voxel_size))
+
+    xstart = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+    xend = xp.asarray(
+        R * (2 * np.random.rand(nLORs, 3) - 1), dtype=xp.float32, device=dev
+    )
+
+    tof_args = (
+        2.0,
+        xp.asarray([5 / 2.35], dtype=xp.float32, device=dev),
+        xp.asarray([0], dtype=xp.float32, device=dev),
+        3.0,
+        11,
+    )
+
+    img_fwd = parallelproj.joseph3d_fwd_tof_sino(
+        xstart, xend, img, img_origin, voxel_size, *tof_args
+    )
+    back_img = parallelproj.joseph3d_back_tof_sino(
+        xstart, xend, img_dim, img_origin, voxel_size, img_fwd, *tof_args
+    )
+
+    assert img_fwd.dtype == xp.float32
+    assert back_img.dtype == xp.float32
+
+    # float64 in -> float32 out (the kernels compute in float32)
+    with pytest.warns(UserWarning, match="float64"):
+        img_fwd64 = parallelproj.joseph3d_fwd_tof_sino(
+            xstart, xend, xp.astype(img, xp.float64), img_origin, voxel_size, *tof_args
+        )
+    with pytest.warns(UserWarning, match="float64"):
+        back_img64 = parallelproj.joseph3d_back_tof_sino(
+            xstart,
+            xend,
+            img_dim,
+            img_origin,
+            voxel_size,
+            xp.astype(img_fwd, xp.float64),
+            *tof_args,
+        )
+
+    assert img_fwd64.dtype == xp.float32
+    assert back_img64.dtype == xp.float32
+    assert bool(xp.all(img_fwd64 == img_fwd))
+    assert bool(xp.all(back_img64 == back_img))
+
+    # float16 storage (not part of all array namespaces)
+    if hasattr(xp, "float16"):
+        chunk_size = parallelproj.backend._float16_chunk_size
+        parallelproj.backend._float16_chunk_size = 97
+
+        img_fwd16 = parallelproj.joseph3d_fwd_tof_sino(
+            xstart, xend, xp.astype(img, xp.float16), img_origin, voxel_size, *tof_args
+        )
+        back_img16 = parallelproj.joseph3d_back_tof_sino(
+            xstart,
+            xend,
+            img_dim,
+            img_origin,
+            voxel_size,
+            xp.astype(img_fwd, xp.float16),
+            *tof_args,
+        )
+
+        parallelproj.backend._float16_chunk_size = chunk_size
+
+        assert img_fwd16.dtype == xp.float16
+        assert back_img16.dtype == xp.float16
+        assert bool(
+            xp.all(
+                xp.abs(xp.astype(img_fwd16, xp.float32) - img_fwd)
+                <= 1e-2 + 2e-3 * xp.abs(img_fwd)
+            )
+        )
+        assert bool(
+            xp.all(
+                xp.abs(xp.astype(back_img16, xp.float32) - back_img)
+                <= 1e-2 + 2e-3 * xp.abs(back_img)
+            )
+        )
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import array_api_compat.torch as xp
+import parallelproj
+import parallelproj.torch as pptorch
+
+
+def _projector() -> parallelproj.RegularPolygonPETProjector:
+    scanner = parallelproj.RegularPolygonPETScannerGeometry(
+        xp,
+        "cpu",
+        radius=35.0,
+        num_sides=12,
+        num_lor_endpoints_per_side=6,
+        lor_spacing=3.0,
+        ring_positions=xp.linspace(-4, 4, 3),
+        symmetry_axis=1,
+    )
+    lor_desc = parallelproj.RegularPolygonPETLORDescriptor(
+        scanner, radial_trim=10, max_ring_difference=1
+    )
+    return parallelproj.RegularPolygonPETProjector(
+        lor_desc, img_shape=(10, 5, 10), voxel_size=(2.0, 2.0, 2.0)
+    )
+
+
+@pytest.mark.parametrize("use_custom_op", [True, False])
+def test_torch_apply_adjoint(use_custom_op: bool, monkeypatch) -> None:
+    monkeypatch.setattr(
+        pptorch,
+        "_custom_op_available",
+        pptorch._custom_op_available and use_custom_op,
+    )
+
+    proj = _projector()
+    x = torch.rand((3, 2) + proj.in_shape, dtype=torch.float64, requires_grad=True)
+    y = torch.rand((3, 2) + proj.out_shape, dtype=torch.float64)
+
+    x_fwd = pptorch.apply(proj, x)
+    assert x_fwd.shape == (3, 2) + proj.out_shape
+    assert torch.allclose(x_fwd[1, 0], proj(x[1, 0].detach()), atol=1e-5)
+
+    y_back = pptorch.adjoint(proj, y)
+    assert y_back.shape == (3, 2) + proj.in_shape
+    assert torch.allclose(y_back[2, 1], proj.adjoint(y[2, 1]), atol=1e-5)
+
+    # the gradient of <Ax, y> w.r.t. x is A^H y
+    (x_fwd * y).sum().backward()
+    assert torch.allclose(x.grad, y_back, atol=1e-5)
+
+    # double backward
+    x.grad = None
+    z = pptorch.adjoint(proj, pptorch.apply(proj, x))
+    z.sum().backward()
+    ones = torch.ones_like(x, dtype=torch.float64)
+    assert torch.allclose(x.grad, pptorch.adjoint(proj, pptorch.apply(proj, ones)))
+
+
+def test_torch_out() -> None:
+    proj = _projector()
+    x = torch.rand((4,) + proj.in_shape)
+    out = torch.empty((4,) + proj.out_shape)
+
+    res = pptorch.apply(proj, x, out=out)
+    assert res is out
+    assert torch.allclose(out[3], proj(x[3]), atol=1e-5)
+
+    with pytest.raises(RuntimeError):
+        pptorch.apply(proj, x.requires_grad_(), out=out)
+
+    with pytest.raises(ValueError):
+        pptorch.apply(proj, torch.rand(proj.out_shape))
+
+
+def test_torch_layer() -> None:
+    op = parallelproj.MatrixOperator(
+        xp.asarray([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]], dtype=xp.float64)
+    )
+    layer = pptorch.LinearOperatorLayer(op)
+    adjoint_layer = pptorch.LinearOperatorLayer(op, adjoint=True)
+
+    x = torch.rand((5, 2), dtype=torch.float64)
+    assert torch.allclose(layer(x), x @ op.A.T)
+    assert torch.allclose(adjoint_layer(layer(x)), x @ op.A.T @ op.A)
+
+
+def test_torch_gaussian() -> None:
+    import scipy.ndimage as ndimage
+
+    op = parallelproj.GaussianFilterOperator((12, 9, 7), sigma=(1.5, 0.0, 2.0))
+    x = torch.rand((3,) + op.in_shape, dtype=torch.float64, requires_grad=True)
+
+    # torch tensors are filtered with conv1d without leaving the autograd graph
+    x_fwd = op(x)
+    assert x_fwd.requires_grad
+    x_ref = ndimage.gaussian_filter(x[1].detach().numpy(), (1.5, 0.0, 2.0))
+    assert torch.allclose(x_fwd[1], torch.from_numpy(x_ref))
+
+    y = torch.rand(x.shape, dtype=torch.float64)
+    (x_fwd * y).sum().backward()
+    assert torch.allclose(x.grad, op.adjoint(y))
+
+
+def test_torch_tofnontof_grad() -> None:
+    v = torch.rand((4, 3), dtype=torch.float64)
+    op = parallelproj.TOFNonTOFElementwiseMultiplicationOperator((4, 3, 5), v)
+    x = torch.rand(op.in_shape, dtype=torch.float64, requires_grad=True)
+
+    # inputs that require grad are multiplied without out=
+    x_fwd = op(x)
+    assert x_fwd.requires_grad
+    assert torch.allclose(x_fwd, x.detach() * v[..., None])
+
+    y = torch.rand(op.out_shape, dtype=torch.float64)
+    (x_fwd * y).sum().backward()
+    assert torch.allclose(x.grad, op.adjoint(y))
+
+
+@pytest.mark.skipif(
+    not hasattr(torch.library, "custom_op"), reason="requires torch.library.custom_op"
+)
+def test_torch_compile() -> None:
+    proj = _projector()
+    layer = pptorch.LinearOperatorLayer(proj)
+
+    def f(x):
+        return (2 * layer(x)).sum()
+
+    x = torch.rand((2,) + proj.in_shape)
+    assert torch.allclose(torch.compile(f, fullgraph=True)(x), f(x), rtol=1e-4)